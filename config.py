@@ -8,6 +8,9 @@ y otras configuraciones del sistema.
 import os
 from datetime import datetime
 
+# Directorio del proyecto (las rutas relativas de caché se resuelven desde aquí)
+DIRECTORIO_PROYECTO = os.path.dirname(os.path.abspath(__file__))
+
 # Información del sistema
 SISTEMA_INFO = {
     "nombre": "boilerNutri",
@@ -26,6 +29,22 @@ ALGORITMO_CONFIG = {
     "intensidad_mutacion": 0.1,
     "tamano_torneo": 3,
     "elitismo": 5,
+    "estrategia_duplicados": "reutilizar",  # "reutilizar" evaluación o "reemplazar" por inmigrantes
+    "resolucion_duplicados": 1e-6,          # Paso de cuantización para detectar genomas duplicados
+    "instrumentacion": True,                # Tiempos por etapa y contadores en obtener_estadisticas_ejecucion
+    "archivo_traza": None,                  # Ruta .json para exportar una traza de Chrome (None = no)
+    "archivo_punto_control": None,          # Ruta .npz de puntos de control para reanudar (None = no)
+    "frecuencia_punto_control": 10,         # Generaciones entre puntos de control
+    "archivo_eventos": None,                # Ruta .jsonl con un evento JSON por generación (None = no)
+    "id_ejecucion": None,                   # Identificador de la ejecución en la bitácora (None = host-pid-tiempo)
+    "max_registros_historial": None,        # Generaciones guardadas antes de submuestrear el historial (None = todas)
+    "archivo_historial": None,              # Ruta .npy para mapear el historial en disco si excede la memoria
+    "memoria_maxima_historial": 64 * 1024 * 1024,  # Bytes del historial en RAM antes de usar el archivo
+    "reducir_genoma": True,                 # Trabajar solo con ingredientes libres (sin fijos ni excluidos)
+    "presolve": True,                       # Ajustar límites por la restricción de suma antes de buscar
+    "presolve_nutricional": False,          # Tratar también los requerimientos de la etapa como restricciones duras
+    "prob_mutacion_estructural": 0.2,       # Agregar/quitar/sustituir ingredientes si se limita su número
+    "num_procesos": 1,                      # Procesos de evaluación (1 = en serie, 0 = todos los núcleos)
     "criterio_convergencia": {
         "ventana": 30,
         "tolerancia": 1e-6,
@@ -120,6 +139,7 @@ ARCHIVOS_CONFIG = {
     "directorio_graficas": "graficas",
     "directorio_configuraciones": "configuraciones",
     "directorio_datos": "datos",
+    "directorio_perfiles": "perfiles",
     "formatos_exportacion": ["txt", "json", "csv"],
     "codificacion": "utf-8"
 }
@@ -135,7 +155,18 @@ VISUALIZACION_CONFIG = {
         "intermedia": "orange", 
         "final": "red"
     },
-    "paleta_colores": "husl"
+    "paleta_colores": "husl",
+    "directorio_cache": "cache_graficas",  # Gráficas ya dibujadas, por hash de sus datos (relativo a DIRECTORIO_PROYECTO)
+    "max_archivos_cache": 500,             # Archivos en caché antes de borrar los menos usados
+    "procesos_graficas": 0                 # Procesos de renderizado (1 = en serie, 0 = todos los núcleos)
+}
+
+# Configuración de reportes por lotes
+REPORTES_CONFIG = {
+    "procesos_reportes": 0,                # Procesos para reportes de varias ejecuciones (1 = en serie, 0 = todos los núcleos)
+    "min_ejecuciones_paralelo": 500,       # Ejecuciones por lote desde las que compensa arrancar procesos (~1.5 s cada uno)
+    "formatos": ["txt", "json"],           # Archivos escritos por ejecución
+    "archivo_indice": "indice_reportes.jsonl"  # Una línea por reporte terminado en el directorio del lote
 }
 
 # Configuración de logging
@@ -188,6 +219,29 @@ INGREDIENTES_CONFIG = {
     "verificar_disponibilidad": True
 }
 
+# Configuración de la rejilla precalculada de formulaciones
+REJILLA_CONFIG = {
+    "archivo": "rejilla_formulaciones.npz",
+    "edades": [1, 7, 14, 21, 28, 35, 42, 49, 56, 63, 70],
+    "pesos_actuales": [0.05, 0.2, 0.5, 1.0, 1.5, 2.0, 2.5, 3.0],
+    "pesos_objetivo": [1.5, 2.0, 2.5, 3.0, 3.5, 4.0],
+    "algoritmo": {                 # AG de construcción offline
+        "tamano_poblacion": 60,
+        "num_generaciones": 80
+    },
+    "refinamiento": {              # AG corto partiendo de la rejilla
+        "tamano_poblacion": 30,
+        "num_generaciones": 20
+    }
+}
+
+# Configuración de la base de conocimiento externa (SQLite + snapshot compilado)
+BASE_CONOCIMIENTO_CONFIG = {
+    "archivo_bd": "base_conocimiento.sqlite",
+    "archivo_snapshot": "base_conocimiento.npz",
+    "cargar_al_iniciar": True   # Reemplaza los datos integrados si existe la base
+}
+
 # Configuración de proveedores
 PROVEEDORES_CONFIG = {
     "verificar_precios": True,
@@ -212,11 +266,14 @@ def obtener_configuracion_completa():
         "restricciones": RESTRICCIONES_CONFIG,
         "archivos": ARCHIVOS_CONFIG,
         "visualizacion": VISUALIZACION_CONFIG,
+        "reportes": REPORTES_CONFIG,
         "logging": LOGGING_CONFIG,
         "rendimiento": RENDIMIENTO_CONFIG,
         "validacion": VALIDACION_CONFIG,
         "rangos": RANGOS_VALIDACION,
         "ingredientes": INGREDIENTES_CONFIG,
+        "rejilla": REJILLA_CONFIG,
+        "base_conocimiento": BASE_CONOCIMIENTO_CONFIG,
         "proveedores": PROVEEDORES_CONFIG
     }
 
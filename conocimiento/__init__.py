@@ -7,9 +7,16 @@ ingredientes, requerimientos nutricionales, razas y proveedores.
 
 from .ingredientes import INGREDIENTES
 from .requerimientos import REQUERIMIENTOS_NUTRICIONALES, obtener_requerimientos, obtener_etapa
-from .razas import RAZAS_POLLOS, obtener_raza, obtener_peso_esperado, obtener_conversion_alimenticia, estimar_dias_hasta_peso
-from .proveedores import PROVEEDORES, obtener_proveedor, obtener_proveedor_mas_economico, calcular_costo_total_con_proveedor
+from .razas import (RAZAS_POLLOS, obtener_raza, obtener_peso_esperado, obtener_conversion_alimenticia,
+                    estimar_dias_hasta_peso, obtener_tabla_raza, obtener_consumo_diario, estimar_dia_para_peso)
+from .proveedores import (PROVEEDORES, obtener_proveedor, obtener_proveedor_mas_economico, calcular_costo_total_con_proveedor,
+                          obtener_matriz_precios, resolver_proveedores, actualizar_precio)
 from .restricciones_usuario import RestriccionesUsuario
+from .diagnostico import diagnosticar_restricciones, generar_resumen_diagnostico
+from .base_datos import (indexar_ingredientes, crear_base_conocimiento, importar_ingredientes, importar_precios, compilar_snapshot,
+                         cargar_snapshot, aplicar_base_conocimiento, buscar_ingrediente, clasificar_ingrediente,
+                         obtener_ingredientes_de_categoria)
+from config import BASE_CONOCIMIENTO_CONFIG
 
 __all__ = [
     # Datos principales
@@ -27,14 +34,33 @@ __all__ = [
     'obtener_peso_esperado',
     'obtener_conversion_alimenticia',
     'estimar_dias_hasta_peso',
+    'obtener_tabla_raza',
+    'obtener_consumo_diario',
+    'estimar_dia_para_peso',
     
     # Funciones de acceso a proveedores
     'obtener_proveedor',
     'obtener_proveedor_mas_economico',
     'calcular_costo_total_con_proveedor',
+    'obtener_matriz_precios',
+    'resolver_proveedores',
+    'actualizar_precio',
     
     # Restricciones de usuario
-    'RestriccionesUsuario'
+    'RestriccionesUsuario',
+    'diagnosticar_restricciones',
+    'generar_resumen_diagnostico',
+    
+    # Base de conocimiento externa
+    'crear_base_conocimiento',
+    'importar_ingredientes',
+    'importar_precios',
+    'compilar_snapshot',
+    'cargar_snapshot',
+    'aplicar_base_conocimiento',
+    'buscar_ingrediente',
+    'clasificar_ingrediente',
+    'obtener_ingredientes_de_categoria'
 ]
 
 def cargar_base_conocimiento():
@@ -135,11 +161,7 @@ def buscar_ingrediente_por_nombre(nombre):
     Returns:
         Ingrediente encontrado o None
     """
-    nombre_lower = nombre.lower()
-    for ingrediente in INGREDIENTES:
-        if ingrediente["nombre"].lower() == nombre_lower:
-            return ingrediente
-    return None
+    return buscar_ingrediente(nombre=nombre)
 
 def obtener_ingredientes_por_categoria():
     """
@@ -155,22 +177,15 @@ def obtener_ingredientes_por_categoria():
         "otros": []
     }
     
-    for i, ingrediente in enumerate(INGREDIENTES):
-        nombre = ingrediente["nombre"].lower()
-        nutrientes = ingrediente.get("nutrientes", {})
-        proteina = nutrientes.get("proteina", 0)
-        
-        if any(cereal in nombre for cereal in ["maíz", "sorgo", "trigo"]):
-            categorias["cereales"].append((i, ingrediente))
-        elif proteina > 0.25:  # Más del 25% de proteína
-            categorias["proteinas"].append((i, ingrediente))
-        elif any(mineral in nombre for mineral in ["mineral", "premezcla", "vitamina"]):
-            categorias["minerales"].append((i, ingrediente))
-        else:
-            categorias["otros"].append((i, ingrediente))
+    for categoria, posiciones in indexar_ingredientes()["por_categoria"].items():
+        categorias.setdefault(categoria, []).extend((i, INGREDIENTES[i]) for i in posiciones)
     
     return categorias
 
+# Cargar la base de conocimiento externa si existe (snapshot compilado)
+if BASE_CONOCIMIENTO_CONFIG["cargar_al_iniciar"]:
+    aplicar_base_conocimiento()
+
 # Ejecutar validación al importar
 _es_valido, _errores = validar_consistencia_datos()
 if not _es_valido:
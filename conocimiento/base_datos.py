@@ -0,0 +1,784 @@
+"""
+Base de conocimiento externa en SQLite con snapshot compilado.
+
+Los ingredientes, precios, proveedores, razas y requerimientos integrados en
+el código se pueden exportar a una base SQLite (índices por id, nombre y
+categoría) y mantener desde ahí con importaciones masivas de CSV o JSON. Las
+importaciones son transaccionales: si alguna fila es inválida no se aplica
+ninguna.
+
+Al iniciar no se consulta la base: se carga un snapshot binario (.npz) con
+los datos compilados en arreglos, que se reconstruye solo cuando cambia la
+suma de verificación del archivo de la base.
+"""
+
+import copy
+import csv
+import hashlib
+import json
+import math
+import os
+import time
+
+import numpy as np
+
+try:
+    import sqlite3
+    SQLITE_AVAILABLE = True
+except ImportError:
+    SQLITE_AVAILABLE = False
+
+from config import ARCHIVOS_CONFIG, BASE_CONOCIMIENTO_CONFIG
+from conocimiento.ingredientes import INGREDIENTES
+from conocimiento.proveedores import PROVEEDORES, CLAVES_PROVEEDORES, obtener_proveedor, invalidar_precios
+from conocimiento.razas import RAZAS_POLLOS, compilar_tablas_razas
+from conocimiento.requerimientos import REQUERIMIENTOS_NUTRICIONALES
+from conocimiento.cache_listas import CachePorLista
+from conocimiento.restricciones_usuario import invalidar_limites_compilados
+
+# Nutrientes en el orden de las columnas del snapshot (otros se agregan al final)
+NUTRIENTES_BASE = ["proteina", "energia", "lisina", "metionina", "calcio", "fosforo", "fibra"]
+
+# Versión del formato del snapshot: un cambio obliga a reconstruirlo
+VERSION_SNAPSHOT = 1
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS ingredientes (
+    id INTEGER PRIMARY KEY,
+    nombre TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    categoria TEXT NOT NULL,
+    nutrientes TEXT NOT NULL,
+    minimo REAL NOT NULL,
+    maximo REAL NOT NULL,
+    comentario TEXT NOT NULL DEFAULT '',
+    disponibilidad REAL NOT NULL,
+    precio_base REAL
+);
+CREATE INDEX IF NOT EXISTS idx_ingredientes_categoria ON ingredientes (categoria);
+CREATE TABLE IF NOT EXISTS precios (
+    ingrediente_id INTEGER NOT NULL REFERENCES ingredientes (id) ON DELETE CASCADE,
+    proveedor TEXT NOT NULL,
+    precio REAL NOT NULL CHECK (precio >= 0),
+    actualizado REAL NOT NULL,
+    PRIMARY KEY (ingrediente_id, proveedor)
+);
+CREATE INDEX IF NOT EXISTS idx_precios_proveedor ON precios (proveedor);
+CREATE TABLE IF NOT EXISTS documentos (
+    tipo TEXT PRIMARY KEY,
+    datos TEXT NOT NULL
+);
+"""
+
+# Documentos JSON guardados junto a los ingredientes
+TIPOS_DOCUMENTOS = ("proveedores", "razas", "requerimientos")
+
+# Snapshots cargados: ruta de la base -> ((mtime, tamaño), datos)
+_SNAPSHOTS_CARGADOS = {}
+
+# Índices en memoria por lista de ingredientes
+_INDICES_INGREDIENTES = CachePorLista()
+
+
+def obtener_ruta_base_datos():
+    """
+    Obtiene la ruta por defecto de la base de conocimiento
+
+    Returns:
+        Ruta del archivo SQLite
+    """
+    return os.path.join(ARCHIVOS_CONFIG["directorio_datos"], BASE_CONOCIMIENTO_CONFIG["archivo_bd"])
+
+
+def obtener_ruta_snapshot():
+    """
+    Obtiene la ruta por defecto del snapshot compilado
+
+    Returns:
+        Ruta del archivo .npz
+    """
+    return os.path.join(ARCHIVOS_CONFIG["directorio_datos"], BASE_CONOCIMIENTO_CONFIG["archivo_snapshot"])
+
+
+def clasificar_ingrediente(ingrediente):
+    """
+    Obtiene la categoría de un ingrediente
+
+    Usa la categoría declarada si existe; si no, la deduce del nombre y del
+    contenido de proteína.
+
+    Args:
+        ingrediente: Diccionario del ingrediente
+
+    Returns:
+        Categoría ("cereales", "proteinas", "minerales", "otros" u otra declarada)
+    """
+    if ingrediente.get("categoria"):
+        return ingrediente["categoria"]
+
+    nombre = ingrediente["nombre"].lower()
+    proteina = ingrediente.get("nutrientes", {}).get("proteina", 0)
+
+    if any(cereal in nombre for cereal in ["maíz", "sorgo", "trigo"]):
+        return "cereales"
+    if proteina > 0.25:  # Más del 25% de proteína
+        return "proteinas"
+    if any(mineral in nombre for mineral in ["mineral", "premezcla", "vitamina"]):
+        return "minerales"
+    return "otros"
+
+
+# ---------------------------------------------------------------------------
+# Índices en memoria
+# ---------------------------------------------------------------------------
+
+def indexar_ingredientes(ingredientes_data=None):
+    """
+    Obtiene (construyendo si es necesario) los índices de una lista de ingredientes
+
+    Args:
+        ingredientes_data: Lista de datos de ingredientes (por defecto INGREDIENTES)
+
+    Returns:
+        Diccionario con los índices por_nombre (minúsculas), por_id y
+        por_categoria (posiciones en la lista)
+    """
+    ingredientes_data = INGREDIENTES if ingredientes_data is None else ingredientes_data
+    indice = _INDICES_INGREDIENTES.obtener(ingredientes_data)
+    if indice is None:
+        indice = {"por_nombre": {}, "por_id": {}, "por_categoria": {}}
+        for i, ingrediente in enumerate(ingredientes_data):
+            indice["por_nombre"].setdefault(ingrediente["nombre"].lower(), i)
+            if "id" in ingrediente:
+                indice["por_id"].setdefault(ingrediente["id"], i)
+            indice["por_categoria"].setdefault(clasificar_ingrediente(ingrediente), []).append(i)
+        _INDICES_INGREDIENTES.guardar(ingredientes_data, indice)
+    return indice
+
+
+def obtener_posicion_ingrediente(nombre, ingredientes_data=None):
+    """
+    Obtiene la posición de un ingrediente por nombre (sin distinguir mayúsculas)
+
+    Args:
+        nombre: Nombre del ingrediente
+        ingredientes_data: Lista de datos de ingredientes (por defecto INGREDIENTES)
+
+    Returns:
+        Índice en la lista, o None si no existe
+    """
+    ingredientes_data = INGREDIENTES if ingredientes_data is None else ingredientes_data
+    clave = nombre.lower()
+    posicion = indexar_ingredientes(ingredientes_data)["por_nombre"].get(clave)
+
+    # Un nombre editado en su lugar deja el índice desactualizado: se reconstruye una vez
+    if posicion is not None and ingredientes_data[posicion]["nombre"].lower() != clave:
+        _INDICES_INGREDIENTES.descartar(ingredientes_data)
+        posicion = indexar_ingredientes(ingredientes_data)["por_nombre"].get(clave)
+    return posicion
+
+
+def buscar_ingrediente(nombre=None, ingrediente_id=None, ingredientes_data=None):
+    """
+    Busca un ingrediente por nombre o por id usando los índices
+
+    Args:
+        nombre: Nombre del ingrediente (sin distinguir mayúsculas)
+        ingrediente_id: Id del ingrediente
+        ingredientes_data: Lista de datos de ingredientes (por defecto INGREDIENTES)
+
+    Returns:
+        Ingrediente encontrado o None
+    """
+    ingredientes_data = INGREDIENTES if ingredientes_data is None else ingredientes_data
+    if nombre is not None:
+        posicion = obtener_posicion_ingrediente(nombre, ingredientes_data)
+    else:
+        posicion = indexar_ingredientes(ingredientes_data)["por_id"].get(ingrediente_id)
+    return ingredientes_data[posicion] if posicion is not None else None
+
+
+def obtener_ingredientes_de_categoria(categoria, ingredientes_data=None):
+    """
+    Obtiene los ingredientes de una categoría usando el índice
+
+    Args:
+        categoria: Categoría de clasificar_ingrediente
+        ingredientes_data: Lista de datos de ingredientes (por defecto INGREDIENTES)
+
+    Returns:
+        Lista de tuplas (indice, ingrediente)
+    """
+    ingredientes_data = INGREDIENTES if ingredientes_data is None else ingredientes_data
+    posiciones = indexar_ingredientes(ingredientes_data)["por_categoria"].get(categoria, [])
+    return [(i, ingredientes_data[i]) for i in posiciones]
+
+
+# ---------------------------------------------------------------------------
+# Base SQLite
+# ---------------------------------------------------------------------------
+
+def _conectar(ruta):
+    """Abre la base (creando el esquema si hace falta)"""
+    directorio = os.path.dirname(ruta)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio)
+
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("PRAGMA foreign_keys = ON")
+    conexion.executescript(_ESQUEMA)
+    return conexion
+
+
+def _fila_ingrediente(ingrediente):
+    """Convierte un ingrediente al formato de la tabla ingredientes"""
+    limitaciones = ingrediente["limitaciones"]
+    return (
+        int(ingrediente["id"]),
+        ingrediente["nombre"],
+        clasificar_ingrediente(ingrediente),
+        json.dumps(ingrediente.get("nutrientes", {})),
+        float(limitaciones["min"]),
+        float(limitaciones["max"]),
+        limitaciones.get("comentario", ""),
+        float(ingrediente.get("disponibilidadLocal", 0.5)),
+        ingrediente.get("precio_base")
+    )
+
+
+def _guardar_ingredientes(conexion, ingredientes):
+    """Inserta o actualiza ingredientes y sus precios (dentro de la transacción actual)"""
+    conexion.executemany(
+        "INSERT INTO ingredientes (id, nombre, categoria, nutrientes, minimo, maximo, comentario, "
+        "disponibilidad, precio_base) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET nombre = excluded.nombre, categoria = excluded.categoria, "
+        "nutrientes = excluded.nutrientes, minimo = excluded.minimo, maximo = excluded.maximo, "
+        "comentario = excluded.comentario, disponibilidad = excluded.disponibilidad, "
+        "precio_base = excluded.precio_base",
+        [_fila_ingrediente(ingrediente) for ingrediente in ingredientes])
+
+    ahora = time.time()
+    conexion.executemany(
+        "INSERT OR REPLACE INTO precios (ingrediente_id, proveedor, precio, actualizado) VALUES (?, ?, ?, ?)",
+        [(int(ingrediente["id"]), proveedor, float(precio), ahora)
+         for ingrediente in ingredientes
+         for proveedor, precio in ingrediente.get("precios", {}).items()])
+
+
+def crear_base_conocimiento(ruta=None, reemplazar=False):
+    """
+    Crea la base SQLite a partir de los datos integrados en el código
+
+    Args:
+        ruta: Ruta del archivo SQLite (por defecto la de BASE_CONOCIMIENTO_CONFIG)
+        reemplazar: Si es True, borra una base existente
+
+    Returns:
+        Ruta de la base creada, o None si SQLite no está disponible o la base ya existe
+    """
+    if not SQLITE_AVAILABLE:
+        print("❌ sqlite3 no está disponible en esta instalación de Python")
+        return None
+
+    ruta = ruta or obtener_ruta_base_datos()
+    if os.path.exists(ruta):
+        if not reemplazar:
+            print(f"⚠️ La base de conocimiento ya existe: {ruta}")
+            return None
+        os.remove(ruta)
+
+    conexion = _conectar(ruta)
+    try:
+        with conexion:
+            _guardar_ingredientes(conexion, INGREDIENTES)
+            documentos = {
+                "proveedores": PROVEEDORES,
+                "razas": RAZAS_POLLOS,
+                "requerimientos": REQUERIMIENTOS_NUTRICIONALES
+            }
+            conexion.executemany("INSERT OR REPLACE INTO documentos (tipo, datos) VALUES (?, ?)",
+                                 [(tipo, json.dumps(datos)) for tipo, datos in documentos.items()])
+    finally:
+        conexion.close()
+
+    print(f"✅ Base de conocimiento creada: {ruta} ({len(INGREDIENTES)} ingredientes)")
+    return ruta
+
+
+def _leer_filas(archivo):
+    """Lee las filas de un archivo CSV o JSON (lista de objetos)"""
+    with open(archivo, encoding=ARCHIVOS_CONFIG["codificacion"], newline="") as f:
+        if archivo.lower().endswith(".json"):
+            datos = json.load(f)
+            return datos if isinstance(datos, list) else next(iter(datos.values()))
+        return list(csv.DictReader(f))
+
+
+def _numero(valor, nombre_campo, errores, fila):
+    """Convierte un campo a número finito, registrando el error si no es válido"""
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        errores.append(f"Fila {fila}: {nombre_campo} inválido ({valor!r})")
+        return None
+    if not math.isfinite(numero):
+        errores.append(f"Fila {fila}: {nombre_campo} no es finito")
+        return None
+    return numero
+
+
+def _ingrediente_desde_json(fila, numero_fila, errores):
+    """Valida un objeto JSON en el formato de INGREDIENTES (mismas comprobaciones que una fila CSV)"""
+    ingrediente = {
+        "id": _numero(fila.get("id"), "id", errores, numero_fila),
+        "nombre": str(fila.get("nombre") or "").strip(),
+        "nutrientes": {},
+        "precios": {},
+        "limitaciones": {"min": None, "max": None, "comentario": ""},
+        "disponibilidadLocal": _numero(fila.get("disponibilidadLocal", 0.5), "disponibilidadLocal",
+                                       errores, numero_fila)
+    }
+    if fila.get("categoria"):
+        ingrediente["categoria"] = fila["categoria"]
+    if fila.get("precio_base") not in (None, ""):
+        ingrediente["precio_base"] = _numero(fila["precio_base"], "precio_base", errores, numero_fila)
+
+    limitaciones = fila.get("limitaciones")
+    if isinstance(limitaciones, dict) and "min" in limitaciones and "max" in limitaciones:
+        ingrediente["limitaciones"] = {
+            "min": _numero(limitaciones["min"], "min", errores, numero_fila),
+            "max": _numero(limitaciones["max"], "max", errores, numero_fila),
+            "comentario": limitaciones.get("comentario", "") or ""
+        }
+    else:
+        errores.append(f"Fila {numero_fila}: faltan las limitaciones (min y max)")
+
+    for campo, destino in (("nutrientes", ingrediente["nutrientes"]), ("precios", ingrediente["precios"])):
+        valores = fila.get(campo, {})
+        if not isinstance(valores, dict):
+            errores.append(f"Fila {numero_fila}: {campo} debe ser un objeto")
+            continue
+        for clave, valor in valores.items():
+            destino[clave] = _numero(valor, clave, errores, numero_fila)
+    return ingrediente
+
+
+def _ingrediente_desde_fila(fila, numero_fila, errores):
+    """Convierte una fila plana de CSV al formato de INGREDIENTES"""
+    ingrediente = {
+        "id": _numero(fila.get("id"), "id", errores, numero_fila),
+        "nombre": (fila.get("nombre") or "").strip(),
+        "nutrientes": {},
+        "precios": {},
+        "limitaciones": {
+            "min": _numero(fila.get("min", 0), "min", errores, numero_fila),
+            "max": _numero(fila.get("max", 1), "max", errores, numero_fila),
+            "comentario": fila.get("comentario", "") or ""
+        },
+        "disponibilidadLocal": _numero(fila.get("disponibilidadLocal", 0.5), "disponibilidadLocal",
+                                       errores, numero_fila)
+    }
+    if fila.get("categoria"):
+        ingrediente["categoria"] = fila["categoria"]
+    if fila.get("precio_base") not in (None, ""):
+        ingrediente["precio_base"] = _numero(fila["precio_base"], "precio_base", errores, numero_fila)
+
+    for campo, valor in fila.items():
+        if valor in (None, ""):
+            continue
+        if campo in NUTRIENTES_BASE:
+            ingrediente["nutrientes"][campo] = _numero(valor, campo, errores, numero_fila)
+        elif campo in CLAVES_PROVEEDORES:
+            ingrediente["precios"][campo] = _numero(valor, campo, errores, numero_fila)
+    return ingrediente
+
+
+def importar_ingredientes(archivo, ruta=None):
+    """
+    Importa (inserta o actualiza) ingredientes desde CSV o JSON en una transacción
+
+    El CSV tiene columnas id, nombre, min, max, disponibilidadLocal y,
+    opcionalmente, categoria, comentario, precio_base, una columna por
+    nutriente y una por clave de proveedor con su precio. El JSON es una lista
+    de ingredientes con el formato de INGREDIENTES.
+
+    Args:
+        archivo: Ruta del archivo a importar
+        ruta: Ruta de la base SQLite (por defecto la de BASE_CONOCIMIENTO_CONFIG)
+
+    Returns:
+        Diccionario con importados y errores (si hay errores no se importa nada)
+    """
+    if not SQLITE_AVAILABLE:
+        return {"importados": 0, "errores": ["sqlite3 no está disponible"]}
+
+    # Toda fila se valida antes de importar, sea plana (CSV) u objeto (JSON)
+    convertir = _ingrediente_desde_json if archivo.lower().endswith(".json") else _ingrediente_desde_fila
+    errores = []
+    ingredientes = []
+    for numero_fila, fila in enumerate(_leer_filas(archivo), start=1):
+        if not isinstance(fila, dict):
+            errores.append(f"Fila {numero_fila}: no es un objeto ({type(fila).__name__})")
+            continue
+        ingrediente = convertir(fila, numero_fila, errores)
+        if not ingrediente.get("nombre") or ingrediente.get("id") is None:
+            errores.append(f"Fila {numero_fila}: falta el id o el nombre")
+            continue
+        limitaciones = ingrediente.get("limitaciones", {})
+        if limitaciones.get("min") is not None and limitaciones.get("max") is not None \
+                and not 0 <= limitaciones["min"] <= limitaciones["max"] <= 1:
+            errores.append(f"Fila {numero_fila}: límites inválidos para {ingrediente['nombre']}")
+        if any(precio is not None and precio < 0 for precio in ingrediente.get("precios", {}).values()):
+            errores.append(f"Fila {numero_fila}: precio negativo para {ingrediente['nombre']}")
+        ingredientes.append(ingrediente)
+
+    if errores:
+        print(f"❌ Importación de ingredientes cancelada: {len(errores)} errores")
+        return {"importados": 0, "errores": errores}
+
+    conexion = _conectar(ruta or obtener_ruta_base_datos())
+    try:
+        with conexion:
+            _guardar_ingredientes(conexion, ingredientes)
+    except sqlite3.Error as e:
+        print(f"❌ Importación de ingredientes cancelada: {e}")
+        return {"importados": 0, "errores": [str(e)]}
+    finally:
+        conexion.close()
+
+    print(f"✅ {len(ingredientes)} ingredientes importados")
+    return {"importados": len(ingredientes), "errores": []}
+
+
+def importar_precios(archivo, ruta=None):
+    """
+    Importa precios masivamente desde CSV o JSON en una sola transacción
+
+    Cada fila tiene ingrediente (id o nombre), proveedor (clave) y precio.
+    Si alguna fila es inválida no se aplica ningún cambio.
+
+    Args:
+        archivo: Ruta del archivo a importar
+        ruta: Ruta de la base SQLite (por defecto la de BASE_CONOCIMIENTO_CONFIG)
+
+    Returns:
+        Diccionario con importados y errores
+    """
+    if not SQLITE_AVAILABLE:
+        return {"importados": 0, "errores": ["sqlite3 no está disponible"]}
+
+    conexion = _conectar(ruta or obtener_ruta_base_datos())
+    try:
+        # Índices de la base: nombre (sin mayúsculas) e id -> id
+        ids = {}
+        for ingrediente_id, nombre in conexion.execute("SELECT id, nombre FROM ingredientes"):
+            ids[nombre.lower()] = ingrediente_id
+            ids[str(ingrediente_id)] = ingrediente_id
+        fila_proveedores = conexion.execute("SELECT datos FROM documentos WHERE tipo = 'proveedores'").fetchone()
+        proveedores = set(CLAVES_PROVEEDORES)
+        if fila_proveedores:
+            proveedores.update(proveedor["clave"] for proveedor in json.loads(fila_proveedores[0]))
+
+        errores = []
+        precios = []
+        ahora = time.time()
+        for numero_fila, fila in enumerate(_leer_filas(archivo), start=1):
+            referencia = str(fila.get("ingrediente", "")).strip()
+            ingrediente_id = ids.get(referencia.lower())
+            if ingrediente_id is None:
+                errores.append(f"Fila {numero_fila}: ingrediente desconocido ({referencia!r})")
+            proveedor = str(fila.get("proveedor", "")).strip()
+            if proveedor not in proveedores:
+                errores.append(f"Fila {numero_fila}: proveedor desconocido ({proveedor!r})")
+            precio = _numero(fila.get("precio"), "precio", errores, numero_fila)
+            if precio is not None and precio < 0:
+                errores.append(f"Fila {numero_fila}: precio negativo")
+            precios.append((ingrediente_id, proveedor, precio, ahora))
+
+        if errores:
+            print(f"❌ Importación de precios cancelada: {len(errores)} errores")
+            return {"importados": 0, "errores": errores}
+
+        with conexion:
+            conexion.executemany(
+                "INSERT OR REPLACE INTO precios (ingrediente_id, proveedor, precio, actualizado) "
+                "VALUES (?, ?, ?, ?)", precios)
+    except sqlite3.Error as e:
+        print(f"❌ Importación de precios cancelada: {e}")
+        return {"importados": 0, "errores": [str(e)]}
+    finally:
+        conexion.close()
+
+    print(f"✅ {len(precios)} precios importados")
+    return {"importados": len(precios), "errores": []}
+
+
+def _restaurar_razas(razas):
+    """Restaura las claves enteras (días) de las curvas tras pasar por JSON"""
+    for raza in razas:
+        curvas = raza.get("curvas_crecimiento", {})
+        for tabla in ("pesos_referencia", "conversion_alimenticia"):
+            if tabla in curvas:
+                curvas[tabla] = {int(dia): valor for dia, valor in curvas[tabla].items()}
+    return razas
+
+
+def leer_base_conocimiento(ruta=None):
+    """
+    Lee la base SQLite completa
+
+    Args:
+        ruta: Ruta de la base SQLite (por defecto la de BASE_CONOCIMIENTO_CONFIG)
+
+    Returns:
+        Diccionario con ingredientes (formato de INGREDIENTES, ordenados por id),
+        proveedores, razas y requerimientos
+    """
+    conexion = _conectar(ruta or obtener_ruta_base_datos())
+    try:
+        precios = {}
+        for ingrediente_id, proveedor, precio in conexion.execute(
+                "SELECT ingrediente_id, proveedor, precio FROM precios ORDER BY ingrediente_id, proveedor"):
+            precios.setdefault(ingrediente_id, {})[proveedor] = precio
+
+        ingredientes = []
+        for (ingrediente_id, nombre, categoria, nutrientes, minimo, maximo, comentario,
+             disponibilidad, precio_base) in conexion.execute("SELECT * FROM ingredientes ORDER BY id"):
+            ingrediente = {
+                "id": ingrediente_id,
+                "nombre": nombre,
+                "categoria": categoria,
+                "nutrientes": json.loads(nutrientes),
+                "precios": precios.get(ingrediente_id, {}),
+                "limitaciones": {"min": minimo, "max": maximo, "comentario": comentario},
+                "disponibilidadLocal": disponibilidad
+            }
+            if precio_base is not None:
+                ingrediente["precio_base"] = precio_base
+            ingredientes.append(ingrediente)
+
+        documentos = dict(conexion.execute("SELECT tipo, datos FROM documentos").fetchall())
+    finally:
+        conexion.close()
+
+    datos = {"ingredientes": ingredientes}
+    for tipo in TIPOS_DOCUMENTOS:
+        datos[tipo] = json.loads(documentos[tipo]) if tipo in documentos else None
+    if datos["razas"]:
+        _restaurar_razas(datos["razas"])
+    return datos
+
+
+# ---------------------------------------------------------------------------
+# Snapshot compilado
+# ---------------------------------------------------------------------------
+
+def calcular_checksum(ruta):
+    """
+    Calcula la suma de verificación SHA-256 de un archivo
+
+    Args:
+        ruta: Ruta del archivo
+
+    Returns:
+        String hexadecimal
+    """
+    suma = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(1 << 20), b""):
+            suma.update(bloque)
+    return suma.hexdigest()
+
+
+def compilar_snapshot(ruta_bd=None, ruta_snapshot=None):
+    """
+    Compila la base SQLite en un snapshot binario .npz
+
+    Args:
+        ruta_bd: Ruta de la base SQLite
+        ruta_snapshot: Ruta del snapshot de salida
+
+    Returns:
+        Ruta del snapshot escrito, o None si SQLite no está disponible
+    """
+    if not SQLITE_AVAILABLE:
+        print("❌ sqlite3 no está disponible: no se puede compilar el snapshot")
+        return None
+
+    ruta_bd = ruta_bd or obtener_ruta_base_datos()
+    ruta_snapshot = ruta_snapshot or obtener_ruta_snapshot()
+    checksum = calcular_checksum(ruta_bd)
+    datos = leer_base_conocimiento(ruta_bd)
+    ingredientes = datos["ingredientes"]
+
+    claves_nutrientes = list(NUTRIENTES_BASE)
+    claves_proveedores = list(CLAVES_PROVEEDORES)
+    for ingrediente in ingredientes:
+        claves_nutrientes.extend(n for n in ingrediente["nutrientes"] if n not in claves_nutrientes)
+        claves_proveedores.extend(p for p in ingrediente["precios"] if p not in claves_proveedores)
+
+    # Nutrientes y precios ausentes se guardan como NaN
+    nutrientes = np.full((len(ingredientes), len(claves_nutrientes)), np.nan)
+    precios = np.full((len(ingredientes), len(claves_proveedores)), np.nan)
+    for i, ingrediente in enumerate(ingredientes):
+        for nutriente, valor in ingrediente["nutrientes"].items():
+            nutrientes[i, claves_nutrientes.index(nutriente)] = valor
+        for proveedor, precio in ingrediente["precios"].items():
+            precios[i, claves_proveedores.index(proveedor)] = precio
+
+    arreglos = {
+        "version": np.array(VERSION_SNAPSHOT),
+        "checksum": np.array(checksum),
+        "ids": np.array([ingrediente["id"] for ingrediente in ingredientes], dtype=np.int64),
+        "nombres": np.array([ingrediente["nombre"] for ingrediente in ingredientes], dtype=str),
+        "categorias": np.array([ingrediente["categoria"] for ingrediente in ingredientes], dtype=str),
+        "comentarios": np.array([ingrediente["limitaciones"]["comentario"] for ingrediente in ingredientes], dtype=str),
+        "minimos": np.array([ingrediente["limitaciones"]["min"] for ingrediente in ingredientes], dtype=float),
+        "maximos": np.array([ingrediente["limitaciones"]["max"] for ingrediente in ingredientes], dtype=float),
+        "disponibilidad": np.array([ingrediente["disponibilidadLocal"] for ingrediente in ingredientes], dtype=float),
+        "precio_base": np.array([ingrediente.get("precio_base", np.nan) for ingrediente in ingredientes], dtype=float),
+        "claves_nutrientes": np.array(claves_nutrientes, dtype=str),
+        "nutrientes": nutrientes,
+        "claves_proveedores": np.array(claves_proveedores, dtype=str),
+        "precios": precios,
+        "documentos": np.array(json.dumps({tipo: datos[tipo] for tipo in TIPOS_DOCUMENTOS}))
+    }
+
+    directorio = os.path.dirname(ruta_snapshot)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio)
+
+    # Escritura atómica: un arranque concurrente nunca ve un snapshot a medias
+    temporal = ruta_snapshot + ".tmp.npz"
+    np.savez(temporal, **arreglos)
+    os.replace(temporal, ruta_snapshot)
+    return ruta_snapshot
+
+
+def _leer_snapshot(ruta_snapshot, checksum):
+    """Carga un snapshot si corresponde a la suma de verificación dada (o None)"""
+    if not os.path.exists(ruta_snapshot):
+        return None
+    try:
+        with np.load(ruta_snapshot, allow_pickle=False) as snapshot:
+            if int(snapshot["version"]) != VERSION_SNAPSHOT or str(snapshot["checksum"]) != checksum:
+                return None
+            arreglos = {clave: snapshot[clave] for clave in snapshot.files}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    claves_nutrientes = arreglos["claves_nutrientes"].tolist()
+    claves_proveedores = arreglos["claves_proveedores"].tolist()
+    ingredientes = []
+    for i, (ingrediente_id, nombre, categoria, comentario, minimo, maximo, disponibilidad, precio_base,
+            nutrientes, precios) in enumerate(zip(
+                arreglos["ids"].tolist(), arreglos["nombres"].tolist(), arreglos["categorias"].tolist(),
+                arreglos["comentarios"].tolist(), arreglos["minimos"].tolist(), arreglos["maximos"].tolist(),
+                arreglos["disponibilidad"].tolist(), arreglos["precio_base"].tolist(),
+                arreglos["nutrientes"].tolist(), arreglos["precios"].tolist())):
+        ingrediente = {
+            "id": ingrediente_id,
+            "nombre": nombre,
+            "categoria": categoria,
+            "nutrientes": {n: v for n, v in zip(claves_nutrientes, nutrientes) if v == v},
+            "precios": {p: v for p, v in zip(claves_proveedores, precios) if v == v},
+            "limitaciones": {"min": minimo, "max": maximo, "comentario": comentario},
+            "disponibilidadLocal": disponibilidad
+        }
+        if precio_base == precio_base:
+            ingrediente["precio_base"] = precio_base
+        ingredientes.append(ingrediente)
+
+    datos = json.loads(str(arreglos["documentos"]))
+    datos["ingredientes"] = ingredientes
+    if datos.get("razas"):
+        _restaurar_razas(datos["razas"])
+    return datos
+
+
+def cargar_snapshot(ruta_bd=None, ruta_snapshot=None):
+    """
+    Carga la base de conocimiento desde su snapshot compilado
+
+    El snapshot se reconstruye solo si falta o si la suma de verificación de
+    la base cambió desde que se compiló.
+
+    Args:
+        ruta_bd: Ruta de la base SQLite
+        ruta_snapshot: Ruta del snapshot
+
+    Returns:
+        Diccionario con ingredientes, proveedores, razas, requerimientos,
+        reconstruido y tiempo; None si no se pudo cargar
+    """
+    inicio = time.perf_counter()
+    ruta_bd = os.path.abspath(ruta_bd or obtener_ruta_base_datos())
+    ruta_snapshot = ruta_snapshot or obtener_ruta_snapshot()
+
+    if not os.path.exists(ruta_bd):
+        return None
+
+    estado = os.stat(ruta_bd)
+    firma = (estado.st_mtime, estado.st_size)
+    en_cache = _SNAPSHOTS_CARGADOS.get(ruta_bd)
+    if en_cache and en_cache[0] == firma:
+        return en_cache[1]
+
+    checksum = calcular_checksum(ruta_bd)
+    datos = _leer_snapshot(ruta_snapshot, checksum)
+    reconstruido = datos is None
+    if reconstruido:
+        if compilar_snapshot(ruta_bd, ruta_snapshot) is None:
+            return None
+        datos = _leer_snapshot(ruta_snapshot, checksum)
+        if datos is None:
+            print(f"❌ No se pudo leer el snapshot compilado: {ruta_snapshot}")
+            return None
+
+    datos["reconstruido"] = reconstruido
+    datos["tiempo"] = time.perf_counter() - inicio
+    _SNAPSHOTS_CARGADOS[ruta_bd] = (firma, datos)
+    return datos
+
+
+def aplicar_base_conocimiento(ruta_bd=None, ruta_snapshot=None):
+    """
+    Reemplaza en su lugar los datos integrados por los de la base externa
+
+    Las listas y diccionarios del paquete se actualizan sin cambiar de
+    identidad, así que los módulos que ya los importaron ven los datos nuevos;
+    las cachés de precios, límites, razas e índices se invalidan.
+
+    Args:
+        ruta_bd: Ruta de la base SQLite
+        ruta_snapshot: Ruta del snapshot
+
+    Returns:
+        True si se cargó la base, False si no existe o no se pudo cargar
+    """
+    datos = cargar_snapshot(ruta_bd, ruta_snapshot)
+    if datos is None:
+        return False
+
+    # Copias: actualizar_precio modifica los ingredientes y no debe alterar la caché
+    INGREDIENTES[:] = copy.deepcopy(datos["ingredientes"])
+    if datos.get("razas"):
+        RAZAS_POLLOS[:] = copy.deepcopy(datos["razas"])
+        compilar_tablas_razas()
+    if datos.get("requerimientos"):
+        REQUERIMIENTOS_NUTRICIONALES.clear()
+        REQUERIMIENTOS_NUTRICIONALES.update(copy.deepcopy(datos["requerimientos"]))
+    for proveedor in datos.get("proveedores") or []:
+        existente = obtener_proveedor(proveedor.get("clave"))
+        if existente is not None:
+            existente.update(proveedor)
+        else:
+            print(f"⚠️ Proveedor {proveedor.get('clave')!r} de la base de conocimiento no está registrado; se ignora")
+
+    invalidar_precios()
+    invalidar_limites_compilados()
+    _INDICES_INGREDIENTES.limpiar()
+
+    origen = "snapshot reconstruido" if datos["reconstruido"] else "snapshot"
+    print(f"✅ Base de conocimiento cargada: {len(INGREDIENTES)} ingredientes "
+          f"({origen}, {datos['tiempo'] * 1000:.1f} ms)")
+    return True
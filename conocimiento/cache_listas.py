@@ -0,0 +1,75 @@
+"""
+Caché acotada de datos derivados de una lista de ingredientes.
+
+Los límites compilados, el modelo lineal, la matriz de precios y los índices
+se calculan una vez por lista. La clave no puede ser solo id(lista): al
+liberarse una lista (por ejemplo la reducida de un AlgoritmoGenetico) CPython
+reutiliza su id y otra lista recibiría datos ajenos. Cada entrada guarda la
+propia lista y solo se devuelve si es el mismo objeto; como la referencia la
+mantiene viva, su id no se reutiliza mientras la entrada exista. Las entradas
+menos usadas se descartan al superar el máximo, de modo que la caché no
+crece con cada ejecución.
+"""
+
+from collections import OrderedDict
+
+# Entradas por caché antes de descartar la menos usada recientemente
+MAX_ENTRADAS_CACHE_LISTAS = 16
+
+
+class CachePorLista:
+    """
+    Caché LRU de valores asociados a una lista de ingredientes (por identidad)
+    """
+
+    def __init__(self, max_entradas=MAX_ENTRADAS_CACHE_LISTAS):
+        """
+        Args:
+            max_entradas: Entradas antes de descartar la menos usada recientemente
+        """
+        self.max_entradas = max_entradas
+        self.entradas = OrderedDict()
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def obtener(self, lista, variante=None):
+        """
+        Obtiene el valor guardado para una lista
+
+        Args:
+            lista: Lista de datos de ingredientes
+            variante: Parte adicional de la clave (p. ej. la versión de los precios)
+
+        Returns:
+            Valor guardado, o None si no hay uno para esta misma lista
+        """
+        clave = (id(lista), len(lista), variante)
+        entrada = self.entradas.get(clave)
+        if entrada is None or entrada[0] is not lista:
+            return None
+        self.entradas.move_to_end(clave)
+        return entrada[1]
+
+    def guardar(self, lista, valor, variante=None):
+        """
+        Guarda el valor de una lista (descarta la entrada menos usada si se llena)
+
+        Args:
+            lista: Lista de datos de ingredientes
+            valor: Valor derivado de la lista
+            variante: Parte adicional de la clave
+        """
+        clave = (id(lista), len(lista), variante)
+        self.entradas[clave] = (lista, valor)
+        self.entradas.move_to_end(clave)
+        while len(self.entradas) > self.max_entradas:
+            self.entradas.popitem(last=False)
+
+    def descartar(self, lista, variante=None):
+        """Descarta el valor de una lista (tras modificarla en su lugar)"""
+        self.entradas.pop((id(lista), len(lista), variante), None)
+
+    def limpiar(self):
+        """Descarta todas las entradas"""
+        self.entradas.clear()
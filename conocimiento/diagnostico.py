@@ -0,0 +1,232 @@
+"""
+Diagnóstico de factibilidad de las restricciones del usuario.
+
+Las restricciones duras del problema (Σx = 1, límites por ingrediente,
+exclusiones y presupuesto por kg) forman un programa lineal muy simple: la
+factibilidad de la caja con la suma se decide con las sumas de mínimos y
+máximos, y el costo mínimo se obtiene llenando la masa restante con los
+ingredientes más baratos. Cuando no hay solución se extrae un conjunto
+mínimo de restricciones en conflicto (IIS) con un filtro de eliminación y se
+sugiere, para cada una, cuánto habría que relajarla.
+"""
+
+import time
+
+import numpy as np
+
+from conocimiento.restricciones_usuario import compilar_limites
+from conocimiento.proveedores import resolver_proveedores
+
+# Tolerancia numérica de factibilidad
+TOLERANCIA_DIAGNOSTICO = 1e-9
+
+# Iteraciones de bisección para calcular relajaciones
+ITERACIONES_RELAJACION = 50
+
+
+def _costo_minimo(minimos, maximos, precios):
+    """Costo mínimo por kg sobre la caja con Σx = 1 (supone la caja factible)"""
+    restante = 1.0 - minimos.sum()
+    orden = np.argsort(precios, kind="stable")
+    capacidades = (maximos - minimos)[orden]
+    llenado = np.clip(restante - (np.cumsum(capacidades) - capacidades), 0.0, capacidades)
+    return float(precios @ minimos + precios[orden] @ llenado)
+
+
+def _es_factible(minimos, maximos, precios, presupuesto=None):
+    """Comprueba si la caja admite una mezcla con Σx = 1 dentro del presupuesto"""
+    if np.any(minimos > maximos + TOLERANCIA_DIAGNOSTICO):
+        return False
+    if minimos.sum() > 1.0 + TOLERANCIA_DIAGNOSTICO or maximos.sum() < 1.0 - TOLERANCIA_DIAGNOSTICO:
+        return False
+    if presupuesto is not None:
+        return _costo_minimo(minimos, maximos, precios) <= presupuesto + TOLERANCIA_DIAGNOSTICO
+    return True
+
+
+def _construir_caja(restricciones_activas, limites, num_ingredientes):
+    """
+    Construye la caja de límites con solo las restricciones activas
+
+    Sin su mínimo un ingrediente puede valer 0 y sin su máximo hasta 1; una
+    exclusión activa lo fija en 0 (igual que en el algoritmo genético).
+    """
+    minimos = np.zeros(num_ingredientes)
+    maximos = np.ones(num_ingredientes)
+    presupuesto = None
+
+    for tipo, i in restricciones_activas:
+        if tipo == "minimo":
+            minimos[i] = limites["minimos"][i]
+        elif tipo == "maximo":
+            maximos[i] = min(1.0, limites["maximos"][i])
+        elif tipo == "presupuesto":
+            presupuesto = limites["presupuesto"]
+
+    for tipo, i in restricciones_activas:
+        if tipo == "exclusion":
+            minimos[i] = 0.0
+            maximos[i] = 0.0
+
+    return minimos, maximos, presupuesto
+
+
+def _describir_restriccion(restriccion, limites, ingredientes_data, restricciones_usuario):
+    """Texto legible de una restricción"""
+    tipo, i = restriccion
+    if tipo == "presupuesto":
+        return f"Presupuesto máximo ${limites['presupuesto']:.2f}/kg"
+
+    nombre = ingredientes_data[i]["nombre"]
+    origen = "personalizado" if restricciones_usuario and i in restricciones_usuario.limites_personalizados else "del ingrediente"
+    if tipo == "minimo":
+        return f"{nombre}: mínimo {limites['minimos'][i]:.2%} ({origen})"
+    if tipo == "maximo":
+        return f"{nombre}: máximo {limites['maximos'][i]:.2%} ({origen})"
+    return f"{nombre}: excluido o no disponible"
+
+
+def _sugerir_relajacion(restriccion, candidatas, limites, precios, ingredientes_data):
+    """
+    Relajación mínima de una restricción del conflicto que, por sí sola,
+    vuelve factible el conjunto completo
+
+    Returns:
+        Texto con la sugerencia, o None si relajar solo esa restricción no basta
+    """
+    tipo, i = restriccion
+    num_ingredientes = len(ingredientes_data)
+    minimos, maximos, presupuesto = _construir_caja(candidatas, limites, num_ingredientes)
+
+    if tipo == "presupuesto":
+        if not _es_factible(minimos, maximos, precios):
+            return None
+        return f"Aumentar el presupuesto a ${_costo_minimo(minimos, maximos, precios):.2f}/kg"
+
+    nombre = ingredientes_data[i]["nombre"]
+    if tipo == "exclusion":
+        otras = [r for r in candidatas if r != restriccion]
+        minimos, maximos, presupuesto = _construir_caja(otras, limites, num_ingredientes)
+        if not _es_factible(minimos, maximos, precios, presupuesto):
+            return None
+        return f"Permitir {nombre}"
+
+    # Bisección sobre el valor del límite: la factibilidad es monótona al relajarlo
+    arreglo = minimos if tipo == "minimo" else maximos
+    actual = arreglo[i]
+    extremo = 0.0 if tipo == "minimo" else 1.0
+
+    arreglo[i] = extremo
+    if not _es_factible(minimos, maximos, precios, presupuesto):
+        return None
+
+    infactible, factible = actual, extremo
+    for _ in range(ITERACIONES_RELAJACION):
+        medio = (infactible + factible) / 2
+        arreglo[i] = medio
+        if _es_factible(minimos, maximos, precios, presupuesto):
+            factible = medio
+        else:
+            infactible = medio
+
+    if tipo == "minimo":
+        return f"Reducir el mínimo de {nombre} a {factible:.2%} o menos"
+    return f"Aumentar el máximo de {nombre} a {factible:.2%} o más"
+
+
+def diagnosticar_restricciones(ingredientes_data, restricciones_usuario=None):
+    """
+    Verifica si las restricciones duras admiten alguna formulación
+
+    Si no la admiten devuelve un conjunto irreducible de restricciones en
+    conflicto (IIS): quitando cualquiera de ellas el resto es factible.
+
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (opcional)
+
+    Returns:
+        Diccionario con factible, costo_minimo (None si no es factible),
+        conflicto (descripciones del IIS), sugerencias y tiempo en segundos
+    """
+    inicio = time.perf_counter()
+    num_ingredientes = len(ingredientes_data)
+    compilados = compilar_limites(ingredientes_data, restricciones_usuario)
+    precios = resolver_proveedores(ingredientes_data, restricciones_usuario)["precios"]
+
+    limites = {
+        "minimos": compilados["minimos"],
+        "maximos": compilados["maximos"],
+        "presupuesto": restricciones_usuario.presupuesto_maximo if restricciones_usuario else None
+    }
+
+    # Restricciones no triviales, de las del catálogo a las del usuario: el
+    # filtro descarta antes las primeras, así el conflicto queda en lo que el
+    # usuario puede cambiar
+    personalizados = restricciones_usuario.limites_personalizados if restricciones_usuario else {}
+    candidatas = []
+    for es_personalizado in (False, True):
+        for i in range(num_ingredientes):
+            if (i in personalizados) != es_personalizado:
+                continue
+            if limites["minimos"][i] > 0:
+                candidatas.append(("minimo", i))
+            if limites["maximos"][i] < 1:
+                candidatas.append(("maximo", i))
+    candidatas.extend(("exclusion", int(i)) for i in np.flatnonzero(~compilados["validos"]))
+    if limites["presupuesto"]:
+        candidatas.append(("presupuesto", None))
+
+    minimos, maximos, presupuesto = _construir_caja(candidatas, limites, num_ingredientes)
+    if _es_factible(minimos, maximos, precios, presupuesto):
+        return {
+            "factible": True,
+            "costo_minimo": _costo_minimo(minimos, maximos, precios),
+            "conflicto": [],
+            "sugerencias": [],
+            "tiempo": time.perf_counter() - inicio
+        }
+
+    # Filtro de eliminación: se quita cada restricción que no hace falta para el conflicto
+    conflicto = list(candidatas)
+    for restriccion in candidatas:
+        prueba = [r for r in conflicto if r != restriccion]
+        minimos, maximos, presupuesto = _construir_caja(prueba, limites, num_ingredientes)
+        if not _es_factible(minimos, maximos, precios, presupuesto):
+            conflicto = prueba
+
+    sugerencias = []
+    for restriccion in conflicto:
+        sugerencia = _sugerir_relajacion(restriccion, candidatas, limites, precios, ingredientes_data)
+        if sugerencia:
+            sugerencias.append(sugerencia)
+
+    return {
+        "factible": False,
+        "costo_minimo": None,
+        "conflicto": [_describir_restriccion(r, limites, ingredientes_data, restricciones_usuario)
+                      for r in conflicto],
+        "sugerencias": sugerencias,
+        "tiempo": time.perf_counter() - inicio
+    }
+
+
+def generar_resumen_diagnostico(diagnostico):
+    """
+    Genera un resumen legible del diagnóstico
+
+    Args:
+        diagnostico: Diccionario de diagnosticar_restricciones
+
+    Returns:
+        String con el resumen
+    """
+    if diagnostico["factible"]:
+        return f"Restricciones factibles (costo mínimo alcanzable ${diagnostico['costo_minimo']:.2f}/kg)"
+
+    resumen = ["Las restricciones no admiten ninguna formulación. Conflicto mínimo (Σ ingredientes = 100%):"]
+    resumen.extend(f"  • {descripcion}" for descripcion in diagnostico["conflicto"])
+    if diagnostico["sugerencias"]:
+        resumen.append("Cualquiera de estos cambios lo resuelve:")
+        resumen.extend(f"  • {sugerencia}" for sugerencia in diagnostico["sugerencias"])
+    return "\n".join(resumen)
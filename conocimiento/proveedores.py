@@ -5,6 +5,10 @@ Contiene datos de contacto, factores de precios
 y disponibilidad de cada proveedor.
 """
 
+import numpy as np
+
+from conocimiento.cache_listas import CachePorLista
+
 # Proveedores locales
 PROVEEDORES = [
     {
@@ -39,6 +43,16 @@ PROVEEDORES = [
     }
 ]
 
+# Índices de proveedores: clave -> datos y clave -> columna de la matriz de precios
+_PROVEEDORES_POR_CLAVE = {proveedor["clave"]: proveedor for proveedor in PROVEEDORES}
+CLAVES_PROVEEDORES = [proveedor["clave"] for proveedor in PROVEEDORES]
+
+# Versión de los precios: se incrementa con cada actualización para invalidar cachés
+_VERSION_PRECIOS = 0
+
+# Matrices de precios compiladas por lista de ingredientes (se vacía al cambiar los precios)
+_MATRICES_PRECIOS = CachePorLista()
+
 def obtener_proveedor(clave_proveedor):
     """
     Obtiene la información de un proveedor específico
@@ -49,10 +63,171 @@ def obtener_proveedor(clave_proveedor):
     Returns:
         Diccionario con información del proveedor o None si no se encuentra
     """
-    for proveedor in PROVEEDORES:
-        if proveedor["clave"] == clave_proveedor:
-            return proveedor
-    return None
+    return _PROVEEDORES_POR_CLAVE.get(clave_proveedor)
+
+def obtener_version_precios():
+    """
+    Obtiene la versión actual de los precios
+    
+    Returns:
+        Entero que cambia con cada actualización de precios
+    """
+    return _VERSION_PRECIOS
+
+def actualizar_precio(ingredientes_data, ingrediente_id, proveedor_clave, precio):
+    """
+    Actualiza el precio de un ingrediente con un proveedor e invalida las matrices de precios
+    
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        ingrediente_id: Índice del ingrediente
+        proveedor_clave: Clave del proveedor
+        precio: Nuevo precio por kg
+    """
+    ingredientes_data[ingrediente_id]["precios"][proveedor_clave] = precio
+    invalidar_precios()
+
+def invalidar_precios():
+    """
+    Invalida las matrices y resoluciones de precios compiladas
+    
+    Debe llamarse tras modificar precios directamente en los datos de
+    ingredientes (por ejemplo, al cargar la base de conocimiento).
+    """
+    global _VERSION_PRECIOS
+    
+    _VERSION_PRECIOS += 1
+    _MATRICES_PRECIOS.limpiar()
+
+def compilar_matriz_precios(ingredientes_data):
+    """
+    Compila la matriz de precios (ingredientes x proveedores)
+    
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        
+    Returns:
+        Diccionario con la matriz de precios (NaN donde no hay precio),
+        las claves de proveedor por columna y su índice
+    """
+    claves = list(CLAVES_PROVEEDORES)
+    for ingrediente in ingredientes_data:
+        for clave in ingrediente.get("precios", {}):
+            if clave not in claves:
+                claves.append(clave)
+    
+    indice = {clave: j for j, clave in enumerate(claves)}
+    precios = np.full((len(ingredientes_data), len(claves)), np.nan)
+    
+    for i, ingrediente in enumerate(ingredientes_data):
+        for clave, precio in ingrediente.get("precios", {}).items():
+            precios[i, indice[clave]] = precio
+    
+    return {
+        "precios": precios,
+        "claves": claves,
+        "indice": indice
+    }
+
+def obtener_matriz_precios(ingredientes_data):
+    """
+    Obtiene (compilando si es necesario) la matriz de precios vigente
+    
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        
+    Returns:
+        Diccionario de compilar_matriz_precios
+    """
+    matriz = _MATRICES_PRECIOS.obtener(ingredientes_data)
+    if matriz is None:
+        matriz = compilar_matriz_precios(ingredientes_data)
+        _MATRICES_PRECIOS.guardar(ingredientes_data, matriz)
+    return matriz
+
+def obtener_vector_preferencias(matriz, preferencias_proveedor=None):
+    """
+    Construye el vector de factores de preferencia por columna de proveedor
+    
+    Args:
+        matriz: Diccionario de obtener_matriz_precios
+        preferencias_proveedor: Diccionario proveedor -> factor (<1 es preferido)
+        
+    Returns:
+        Arreglo con un factor por proveedor (1.0 sin preferencia)
+    """
+    factores = np.ones(len(matriz["claves"]))
+    for clave, factor in (preferencias_proveedor or {}).items():
+        if clave in matriz["indice"]:
+            factores[matriz["indice"][clave]] = factor
+    return factores
+
+def calcular_resolucion_proveedores(matriz, preferencias_proveedor=None):
+    """
+    Resuelve el proveedor más económico de cada ingrediente con preferencias
+    
+    El precio efectivo es precio x factor de preferencia; el precio devuelto
+    es el real del proveedor elegido.
+    
+    Args:
+        matriz: Diccionario de obtener_matriz_precios
+        preferencias_proveedor: Diccionario proveedor -> factor
+        
+    Returns:
+        Diccionario con el índice de proveedor por ingrediente (-1 si no hay),
+        las claves de proveedor (None si no hay) y el precio real (0 si no hay)
+    """
+    precios = matriz["precios"]
+    efectivos = precios * obtener_vector_preferencias(matriz, preferencias_proveedor)
+    
+    con_precio = ~np.all(np.isnan(efectivos), axis=1)
+    indices = np.full(len(precios), -1, dtype=int)
+    if np.any(con_precio):
+        indices[con_precio] = np.nanargmin(efectivos[con_precio], axis=1)
+    
+    filas = np.arange(len(precios))
+    precio_real = np.where(indices >= 0, precios[filas, np.maximum(indices, 0)], 0.0)
+    precio_efectivo = np.where(indices >= 0, efectivos[filas, np.maximum(indices, 0)], 0.0)
+    
+    # Igual que obtener_proveedor_mas_economico: un mínimo de 0 se considera sin proveedor
+    sin_proveedor = (indices < 0) | ~(precio_efectivo != 0)
+    indices[sin_proveedor] = -1
+    precio_real[sin_proveedor] = 0.0
+    
+    return {
+        "indices": indices,
+        "proveedores": [matriz["claves"][j] if j >= 0 else None for j in indices],
+        "precios": precio_real
+    }
+
+def resolver_proveedores(ingredientes_data, restricciones_usuario=None):
+    """
+    Obtiene la resolución de proveedores vigente, calculándola solo cuando
+    cambian los precios o las preferencias del usuario
+    
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (preferencias de proveedor)
+        
+    Returns:
+        Diccionario de calcular_resolucion_proveedores
+    """
+    matriz = obtener_matriz_precios(ingredientes_data)
+    
+    if restricciones_usuario is None or not restricciones_usuario.preferencias_proveedor:
+        # Se guarda en la propia matriz: se descarta con ella
+        if "resolucion_base" not in matriz:
+            matriz["resolucion_base"] = calcular_resolucion_proveedores(matriz)
+        return matriz["resolucion_base"]
+    
+    # La caché vive en las restricciones y se invalida con su contador de versión
+    # o con otra matriz (se compara por identidad)
+    version = getattr(restricciones_usuario, "version", 0)
+    cache = getattr(restricciones_usuario, "_cache_proveedores", None)
+    if cache is None or cache[0] is not matriz or cache[1] != version:
+        cache = (matriz, version, calcular_resolucion_proveedores(matriz, restricciones_usuario.preferencias_proveedor))
+        restricciones_usuario._cache_proveedores = cache
+    return cache[2]
 
 def obtener_proveedor_mas_economico(precios):
     """
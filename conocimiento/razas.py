@@ -5,6 +5,8 @@ Contiene curvas de crecimiento, conversión alimenticia
 y características específicas de cada raza.
 """
 
+import numpy as np
+
 # Información de razas disponibles
 RAZAS_POLLOS = [
     {
@@ -61,6 +63,109 @@ RAZAS_POLLOS = [
     }
 ]
 
+# Resolución diaria de las tablas compiladas (días 0-70)
+DIAS_TABLA = np.arange(0, 71)
+
+# Consumo diario de alimento por ave según edad: (edad máxima en días, kg/día)
+CONSUMO_DIARIO_POR_EDAD = [
+    (7, 0.020),
+    (14, 0.045),
+    (21, 0.080),
+    (28, 0.115),
+    (35, 0.150),
+    (None, 0.180)
+]
+
+_LIMITES_CONSUMO = np.array([limite for limite, _ in CONSUMO_DIARIO_POR_EDAD[:-1]])
+_CONSUMOS = np.array([consumo for _, consumo in CONSUMO_DIARIO_POR_EDAD])
+
+# Tablas compiladas por raza e índice nombre -> posición
+_TABLAS_RAZAS = []
+_INDICE_RAZAS = {}
+
+def obtener_consumo_diario(edad_dias):
+    """
+    Obtiene el consumo diario de alimento por ave según la edad
+    
+    Args:
+        edad_dias: Edad en días (escalar o arreglo de NumPy)
+        
+    Returns:
+        Consumo en kg/día (mismo tipo que la entrada)
+    """
+    consumo = _CONSUMOS[np.searchsorted(_LIMITES_CONSUMO, edad_dias, side='left')]
+    return float(consumo) if np.ndim(consumo) == 0 else consumo
+
+def compilar_tablas_razas():
+    """
+    Compila las curvas de cada raza en arreglos de NumPy con resolución diaria
+    
+    Se ejecuta al importar el módulo; debe volver a llamarse si se modifica
+    RAZAS_POLLOS en tiempo de ejecución.
+    """
+    _TABLAS_RAZAS.clear()
+    _INDICE_RAZAS.clear()
+    
+    for i, raza in enumerate(RAZAS_POLLOS):
+        curvas = raza["curvas_crecimiento"]
+        
+        dias_peso = np.array(sorted(curvas["pesos_referencia"]), dtype=float)
+        pesos = np.array([curvas["pesos_referencia"][d] for d in sorted(curvas["pesos_referencia"])])
+        
+        # Días de conversión en orden de definición (desempate igual que min())
+        dias_conversion = np.array(list(curvas["conversion_alimenticia"]), dtype=float)
+        conversiones = np.array(list(curvas["conversion_alimenticia"].values()))
+        orden = np.argsort(dias_conversion, kind='stable')
+        dias_conversion = dias_conversion[orden]
+        conversiones = conversiones[orden]
+        
+        tabla = {
+            "raza": raza,
+            "peso_inicial": curvas["peso_inicial"],
+            "dias_peso": dias_peso,
+            "pesos": pesos,
+            "dias_conversion": dias_conversion,
+            "conversiones": conversiones,
+            # Puntos medios entre días de conversión para búsqueda del más cercano
+            "cortes_conversion": (dias_conversion[:-1] + dias_conversion[1:]) / 2
+        }
+        
+        tabla["peso_diario"] = _interpolar_peso(tabla, DIAS_TABLA)
+        tabla["conversion_diaria"] = _conversion_mas_cercana(tabla, DIAS_TABLA)
+        tabla["consumo_diario"] = obtener_consumo_diario(DIAS_TABLA)
+        
+        # Curva estrictamente creciente (primer día de cada peso) para la búsqueda inversa
+        tabla["pesos_inversa"], primeros_dias = np.unique(tabla["peso_diario"], return_index=True)
+        tabla["dias_inversa"] = DIAS_TABLA[primeros_dias]
+        
+        _TABLAS_RAZAS.append(tabla)
+        _INDICE_RAZAS[raza["nombre"].lower()] = i
+
+def _interpolar_peso(tabla, edad_dias):
+    """Interpola el peso sobre los puntos de referencia (peso inicial antes del primero)"""
+    peso = np.interp(edad_dias, tabla["dias_peso"], tabla["pesos"])
+    return np.where(np.asarray(edad_dias) < tabla["dias_peso"][0], tabla["peso_inicial"], peso)
+
+def _conversion_mas_cercana(tabla, edad_dias):
+    """Obtiene la conversión del día de referencia más cercano"""
+    return tabla["conversiones"][np.searchsorted(tabla["cortes_conversion"], edad_dias, side='left')]
+
+def obtener_tabla_raza(nombre_raza):
+    """
+    Obtiene la tabla compilada de una raza
+    
+    Args:
+        nombre_raza: Nombre de la raza (sin distinguir mayúsculas)
+        
+    Returns:
+        Diccionario con arreglos peso_diario, conversion_diaria y consumo_diario
+        (índice = día, 0-70) y los puntos de referencia, o None si no existe
+    """
+    indice = _INDICE_RAZAS.get(nombre_raza.lower())
+    if indice is None:
+        return None
+    return _TABLAS_RAZAS[indice]
+
 def obtener_raza(nombre_raza):
     """
     Obtiene la información de una raza específica
@@ -71,10 +176,8 @@ def obtener_raza(nombre_raza):
     Returns:
         Diccionario con información de la raza o None si no se encuentra
     """
-    for raza in RAZAS_POLLOS:
-        if raza["nombre"].lower() == nombre_raza.lower():
-            return raza
-    return None
+    tabla = obtener_tabla_raza(nombre_raza)
+    return tabla["raza"] if tabla else None
 
 def obtener_peso_esperado(nombre_raza, edad_dias):
     """
@@ -82,43 +185,17 @@ def obtener_peso_esperado(nombre_raza, edad_dias):
     
     Args:
         nombre_raza: Nombre de la raza
-        edad_dias: Edad en días
+        edad_dias: Edad en días (escalar o arreglo de NumPy)
         
     Returns:
         Peso esperado en kg o None si no se encuentra
     """
-    raza = obtener_raza(nombre_raza)
-    if not raza:
+    tabla = obtener_tabla_raza(nombre_raza)
+    if not tabla:
         return None
     
-    pesos = raza["curvas_crecimiento"]["pesos_referencia"]
-    
-    # Buscar el día más cercano
-    if edad_dias in pesos:
-        return pesos[edad_dias]
-    
-    # Interpolación lineal si no existe el día exacto
-    dias_disponibles = sorted(pesos.keys())
-    
-    if edad_dias < dias_disponibles[0]:
-        return raza["curvas_crecimiento"]["peso_inicial"]
-    
-    if edad_dias > dias_disponibles[-1]:
-        return pesos[dias_disponibles[-1]]
-    
-    # Encontrar los días que rodean la edad
-    for i in range(len(dias_disponibles) - 1):
-        if dias_disponibles[i] <= edad_dias <= dias_disponibles[i + 1]:
-            dia_menor = dias_disponibles[i]
-            dia_mayor = dias_disponibles[i + 1]
-            peso_menor = pesos[dia_menor]
-            peso_mayor = pesos[dia_mayor]
-            
-            # Interpolación lineal
-            factor = (edad_dias - dia_menor) / (dia_mayor - dia_menor)
-            return peso_menor + factor * (peso_mayor - peso_menor)
-    
-    return None
+    peso = _interpolar_peso(tabla, edad_dias)
+    return float(peso) if np.ndim(peso) == 0 else peso
 
 def obtener_conversion_alimenticia(nombre_raza, edad_dias):
     """
@@ -126,25 +203,35 @@ def obtener_conversion_alimenticia(nombre_raza, edad_dias):
     
     Args:
         nombre_raza: Nombre de la raza
-        edad_dias: Edad en días
+        edad_dias: Edad en días (escalar o arreglo de NumPy)
         
     Returns:
-        Conversión alimenticia o None si no se encuentra
+        Conversión alimenticia del día de referencia más cercano o None si no se encuentra
     """
-    raza = obtener_raza(nombre_raza)
-    if not raza:
+    tabla = obtener_tabla_raza(nombre_raza)
+    if not tabla:
         return None
     
-    conversiones = raza["curvas_crecimiento"]["conversion_alimenticia"]
+    conversion = _conversion_mas_cercana(tabla, edad_dias)
+    return float(conversion) if np.ndim(conversion) == 0 else conversion
+
+def estimar_dia_para_peso(nombre_raza, peso):
+    """
+    Búsqueda inversa continua: edad en la que la curva de la raza alcanza un peso
     
-    # Buscar el día más cercano
-    if edad_dias in conversiones:
-        return conversiones[edad_dias]
+    Args:
+        nombre_raza: Nombre de la raza
+        peso: Peso en kg (escalar o arreglo de NumPy)
+        
+    Returns:
+        Edad en días (interpolada, limitada al rango de la tabla) o None si no se encuentra
+    """
+    tabla = obtener_tabla_raza(nombre_raza)
+    if not tabla:
+        return None
     
-    # Usar el día más cercano
-    dias_disponibles = list(conversiones.keys())
-    dia_mas_cercano = min(dias_disponibles, key=lambda x: abs(x - edad_dias))
-    return conversiones[dia_mas_cercano]
+    dia = np.interp(peso, tabla["pesos_inversa"], tabla["dias_inversa"])
+    return float(dia) if np.ndim(dia) == 0 else dia
 
 def estimar_dias_hasta_peso(peso_actual, peso_objetivo, nombre_raza, edad_actual):
     """
@@ -159,34 +246,26 @@ def estimar_dias_hasta_peso(peso_actual, peso_objetivo, nombre_raza, edad_actual
     Returns:
         Número estimado de días hasta alcanzar el peso objetivo
     """
-    raza = obtener_raza(nombre_raza)
-    if not raza:
+    tabla = obtener_tabla_raza(nombre_raza)
+    if not tabla:
         return None
     
-    pesos = raza["curvas_crecimiento"]["pesos_referencia"]
-    dias_disponibles = sorted(pesos.keys())
-    
-    # Buscar en qué día se alcanza el peso objetivo
-    for dia in dias_disponibles:
-        if pesos[dia] >= peso_objetivo:
-            return max(0, dia - edad_actual)
-    
-    # Si no se encuentra en los datos, estimar basado en la tendencia
-    # Usar los últimos dos puntos para proyectar
-    if len(dias_disponibles) >= 2:
-        ultimo_dia = dias_disponibles[-1]
-        penultimo_dia = dias_disponibles[-2]
-        ultimo_peso = pesos[ultimo_dia]
-        penultimo_peso = pesos[penultimo_dia]
-        
-        if ultimo_peso >= peso_objetivo:
-            return max(0, ultimo_dia - edad_actual)
-        
-        # Calcular tasa de crecimiento diaria
-        tasa_crecimiento = (ultimo_peso - penultimo_peso) / (ultimo_dia - penultimo_dia)
+    dias = tabla["dias_peso"]
+    pesos = tabla["pesos"]
+    
+    # Primer día de referencia en que se alcanza el peso objetivo
+    indice = int(np.searchsorted(pesos, peso_objetivo, side='left'))
+    if indice < len(dias):
+        return max(0, int(dias[indice]) - edad_actual)
+    
+    # Si no se encuentra en los datos, proyectar con los últimos dos puntos
+    if len(dias) >= 2:
+        tasa_crecimiento = (pesos[-1] - pesos[-2]) / (dias[-1] - dias[-2])
         
         if tasa_crecimiento > 0:
-            dias_adicionales = (peso_objetivo - ultimo_peso) / tasa_crecimiento
-            return max(0, int(ultimo_dia + dias_adicionales - edad_actual))
+            dias_adicionales = (peso_objetivo - pesos[-1]) / tasa_crecimiento
+            return max(0, int(dias[-1] + dias_adicionales - edad_actual))
     
-    return None
\ No newline at end of file
+    return None
+
+compilar_tablas_razas()
@@ -5,6 +5,96 @@ Maneja limitaciones personalizadas, exclusiones de ingredientes
 y configuraciones particulares del usuario.
 """
 
+import numpy as np
+
+from conocimiento.cache_listas import CachePorLista
+
+# Tolerancia para considerar un ingrediente con porcentaje fijo (min == max)
+TOLERANCIA_FIJO = 1e-6
+
+# Límites compilados sin restricciones de usuario, por lista de ingredientes
+_LIMITES_BASE = CachePorLista()
+
+# Se incrementa al modificar en su lugar los datos de ingredientes: invalida
+# también los límites compilados en cada RestriccionesUsuario
+_VERSION_DATOS = 0
+
+def compilar_limites(ingredientes_data, restricciones_usuario=None):
+    """
+    Obtiene los límites efectivos compilados en arreglos
+    
+    Sin restricciones se cachean por lista de ingredientes (ver
+    conocimiento.cache_listas); con restricciones se cachean en el propio
+    objeto y se reconstruyen cuando cambia su versión o la lista.
+    
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (opcional)
+        
+    Returns:
+        Diccionario con arreglos minimos, maximos, fijos y validos (uno por ingrediente)
+    """
+    if restricciones_usuario is not None:
+        return restricciones_usuario.compilar(ingredientes_data)
+    
+    limites = _LIMITES_BASE.obtener(ingredientes_data)
+    if limites is None:
+        limites = _construir_limites(ingredientes_data)
+        _LIMITES_BASE.guardar(ingredientes_data, limites)
+    return limites
+
+def registrar_limites_compilados(ingredientes_data, limites, restricciones_usuario=None):
+    """
+    Registra límites ya compilados (por ejemplo, vistas de memoria compartida)
+    para que compilar_limites los use sin reconstruirlos
+    
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        limites: Diccionario con arreglos minimos, maximos, fijos y validos
+        restricciones_usuario: Restricciones del usuario (opcional)
+    """
+    if restricciones_usuario is not None:
+        restricciones_usuario._limites_compilados = ((restricciones_usuario.version, _VERSION_DATOS),
+                                                     ingredientes_data, limites)
+    else:
+        _LIMITES_BASE.guardar(ingredientes_data, limites)
+
+def invalidar_limites_compilados():
+    """
+    Descarta los límites compilados sin restricciones de usuario
+    
+    Debe llamarse tras modificar en su lugar las limitaciones de una lista de
+    ingredientes (la caché se indexa por identidad y longitud de la lista).
+    Los límites ya compilados en objetos RestriccionesUsuario se reconstruyen
+    en su siguiente uso.
+    """
+    global _VERSION_DATOS
+
+    _LIMITES_BASE.limpiar()
+    _VERSION_DATOS += 1
+
+def _construir_limites(ingredientes_data, restricciones_usuario=None):
+    """Construye los arreglos de límites efectivos y validez"""
+    num_ingredientes = len(ingredientes_data)
+    minimos = np.empty(num_ingredientes)
+    maximos = np.empty(num_ingredientes)
+    validos = np.ones(num_ingredientes, dtype=bool)
+    
+    for i, ingrediente in enumerate(ingredientes_data):
+        limites = ingrediente["limitaciones"]
+        if restricciones_usuario is not None:
+            limites = restricciones_usuario.obtener_limites(i, limites)
+            validos[i] = restricciones_usuario.es_ingrediente_valido(i)
+        minimos[i] = limites["min"]
+        maximos[i] = limites["max"]
+    
+    return {
+        "minimos": minimos,
+        "maximos": maximos,
+        "fijos": np.abs(minimos - maximos) < TOLERANCIA_FIJO,
+        "validos": validos
+    }
+
 class RestriccionesUsuario:
     """
     Clase para gestionar restricciones específicas del usuario
@@ -18,6 +108,37 @@ class RestriccionesUsuario:
         self.presupuesto_maximo = None
         self.preferencias_proveedor = {}
         
+        # Conjuntos para consultas O(1) (se mantienen junto con las listas)
+        self._excluidos = set()
+        self._disponibles = set()
+        
+        # Se incrementa con cada cambio para invalidar cálculos derivados
+        self.version = 0
+        self._limites_compilados = None
+    
+    def _registrar_cambio(self):
+        """Incrementa la versión para que los consumidores reconstruyan sus cachés"""
+        self.version += 1
+        self._limites_compilados = None
+    
+    def compilar(self, ingredientes_data):
+        """
+        Obtiene los límites efectivos y la máscara de validez en arreglos
+        
+        Args:
+            ingredientes_data: Lista de datos de ingredientes
+            
+        Returns:
+            Diccionario con arreglos minimos, maximos, fijos y validos
+        """
+        # La entrada guarda la lista: se compara por identidad, no por id()
+        version = (self.version, _VERSION_DATOS)
+        cache = self._limites_compilados
+        if cache is None or cache[0] != version or cache[1] is not ingredientes_data:
+            cache = (version, ingredientes_data, _construir_limites(ingredientes_data, self))
+            self._limites_compilados = cache
+        return cache[2]
+        
     def agregar_exclusion(self, ingrediente_id):
         """
         Excluye un ingrediente de la formulación
@@ -25,8 +146,10 @@ class RestriccionesUsuario:
         Args:
             ingrediente_id: ID del ingrediente a excluir
         """
-        if ingrediente_id not in self.ingredientes_excluidos:
+        if ingrediente_id not in self._excluidos:
             self.ingredientes_excluidos.append(ingrediente_id)
+            self._excluidos.add(ingrediente_id)
+            self._registrar_cambio()
     
     def remover_exclusion(self, ingrediente_id):
         """
@@ -35,8 +158,10 @@ class RestriccionesUsuario:
         Args:
             ingrediente_id: ID del ingrediente a incluir nuevamente
         """
-        if ingrediente_id in self.ingredientes_excluidos:
+        if ingrediente_id in self._excluidos:
             self.ingredientes_excluidos.remove(ingrediente_id)
+            self._excluidos.discard(ingrediente_id)
+            self._registrar_cambio()
         
     def establecer_limite(self, ingrediente_id, min_val, max_val):
         """
@@ -51,6 +176,7 @@ class RestriccionesUsuario:
             "min": min_val,
             "max": max_val
         }
+        self._registrar_cambio()
     
     def establecer_capacidad_planta(self, capacidad_kg_dia):
         """
@@ -60,6 +186,7 @@ class RestriccionesUsuario:
             capacidad_kg_dia: Capacidad en kg por día
         """
         self.capacidad_planta = capacidad_kg_dia
+        self._registrar_cambio()
     
     def establecer_presupuesto_maximo(self, presupuesto):
         """
@@ -69,6 +196,7 @@ class RestriccionesUsuario:
             presupuesto: Presupuesto máximo en pesos por kg
         """
         self.presupuesto_maximo = presupuesto
+        self._registrar_cambio()
     
     def agregar_ingrediente_disponible(self, ingrediente_id):
         """
@@ -77,8 +205,10 @@ class RestriccionesUsuario:
         Args:
             ingrediente_id: ID del ingrediente disponible
         """
-        if ingrediente_id not in self.ingredientes_disponibles:
+        if ingrediente_id not in self._disponibles:
             self.ingredientes_disponibles.append(ingrediente_id)
+            self._disponibles.add(ingrediente_id)
+            self._registrar_cambio()
     
     def establecer_preferencia_proveedor(self, proveedor_clave, factor_preferencia):
         """
@@ -89,6 +219,7 @@ class RestriccionesUsuario:
             factor_preferencia: Factor de preferencia (0.8-1.2, donde <1 es preferido)
         """
         self.preferencias_proveedor[proveedor_clave] = factor_preferencia
+        self._registrar_cambio()
     
     def es_ingrediente_valido(self, ingrediente_id):
         """
@@ -101,11 +232,11 @@ class RestriccionesUsuario:
             True si el ingrediente es válido, False si está excluido
         """
         # Si hay lista de disponibles, solo permitir esos
-        if self.ingredientes_disponibles:
-            return ingrediente_id in self.ingredientes_disponibles
+        if self._disponibles:
+            return ingrediente_id in self._disponibles
         
         # Si no hay lista de disponibles, solo excluir los que están en la lista de exclusión
-        return ingrediente_id not in self.ingredientes_excluidos
+        return ingrediente_id not in self._excluidos
     
     def obtener_limites(self, ingrediente_id, limites_originales):
         """
@@ -118,13 +249,8 @@ class RestriccionesUsuario:
         Returns:
             Diccionario con límites efectivos (min, max)
         """
-        if ingrediente_id in self.limites_personalizados:
-            return self.limites_personalizados[ingrediente_id]
-        
-        return {
-            "min": limites_originales["min"],
-            "max": limites_originales["max"]
-        }
+        # Se devuelve el diccionario existente (solo lectura) en lugar de una copia
+        return self.limites_personalizados.get(ingrediente_id, limites_originales)
     
     def validar_restricciones(self, individuo, ingredientes_data):
         """
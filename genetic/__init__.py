@@ -6,11 +6,20 @@ con estrategia adaptativa por fases.
 """
 
 from .ag import AlgoritmoGenetico
-from .individuo import Individuo
+from .individuo import Individuo, obtener_soporte_disperso
 from .inicializacion import crear_poblacion_inicial
 from .seleccion import seleccionar_padre, seleccion_elitista
 from .cruza import cruza_aritmetica, cruza_blx_alpha, cruza_un_punto
 from .mutacion import mutar_no_uniforme, mutar_intercambio, mutar_diferencial
+from .duplicados import agrupar_duplicados, evaluar_poblacion_sin_duplicados
+from .presolve import presolver_limites
+from .cardinalidad import (construir_cardinalidad, reparar_cardinalidad, mutar_agregar_ingrediente,
+                           mutar_quitar_ingrediente, mutar_sustituir_ingrediente)
+from .rejilla import construir_rejilla_formulaciones, cargar_rejilla, consultar_formulacion, refinar_formulacion
+from .instrumentacion import Instrumentacion
+from .historial import HistorialMetricas
+from .bitacora import BitacoraEventos
+from .puntos_control import guardar_punto_control, cargar_punto_control, restaurar_punto_control
 
 __all__ = [
     # Clase principal
@@ -18,6 +27,7 @@ __all__ = [
     
     # Representación
     'Individuo',
+    'obtener_soporte_disperso',
     
     # Inicialización
     'crear_poblacion_inicial',
@@ -34,7 +44,41 @@ __all__ = [
     # Mutación
     'mutar_no_uniforme',
     'mutar_intercambio',
-    'mutar_diferencial'
+    'mutar_diferencial',
+    
+    # Duplicados
+    'agrupar_duplicados',
+    'evaluar_poblacion_sin_duplicados',
+    
+    # Presolve de límites
+    'presolver_limites',
+    
+    # Cardinalidad limitada
+    'construir_cardinalidad',
+    'reparar_cardinalidad',
+    'mutar_agregar_ingrediente',
+    'mutar_quitar_ingrediente',
+    'mutar_sustituir_ingrediente',
+    
+    # Rejilla precalculada
+    'construir_rejilla_formulaciones',
+    'cargar_rejilla',
+    'consultar_formulacion',
+    'refinar_formulacion',
+    
+    # Instrumentación
+    'Instrumentacion',
+    
+    # Historial de métricas
+    'HistorialMetricas',
+    
+    # Bitácora de eventos
+    'BitacoraEventos',
+    
+    # Puntos de control
+    'guardar_punto_control',
+    'cargar_punto_control',
+    'restaurar_punto_control'
 ]
 
 # Versión del paquete
@@ -1,10 +1,23 @@
 import time
 import random
+import numpy as np
+from genetic.individuo import Individuo
 from genetic.inicializacion import crear_poblacion_inicial, generar_estadisticas_poblacion
 from genetic.seleccion import seleccionar_padre, seleccion_elitista, calcular_metricas_seleccion
 from genetic.cruza import seleccionar_operador_cruza, validar_hijo, reparar_hijo
 from genetic.mutacion import seleccionar_operador_mutacion
-from genetic.fitness.agregacion import calcular_fitness_adaptativo, evaluar_poblacion, detectar_convergencia
+from genetic.fitness.agregacion import calcular_fitness_adaptativo, detectar_convergencia, enriquecer_individuos
+from genetic.duplicados import evaluar_poblacion_sin_duplicados, RESOLUCION_DUPLICADOS
+from genetic.paralelo import crear_evaluador
+from genetic.reduccion import construir_problema_reducido, reducir_porcentajes, expandir_individuo
+from genetic.presolve import presolver_limites, obtener_requerimientos_presolve
+from genetic.cardinalidad import construir_cardinalidad, reparar_cardinalidad, mutar_estructura
+from genetic.instrumentacion import Instrumentacion, activar_instrumentacion, medir, contar
+from genetic.historial import HistorialMetricas, MEMORIA_MAXIMA_HISTORIAL
+from genetic.bitacora import BitacoraEventos
+from genetic.puntos_control import guardar_punto_control, cargar_punto_control, restaurar_punto_control
+from conocimiento.diagnostico import diagnosticar_restricciones, generar_resumen_diagnostico
+from config import INGREDIENTES_CONFIG
 
 class AlgoritmoGenetico:
     """
@@ -22,7 +35,16 @@ class AlgoritmoGenetico:
         self.poblacion = []
         self.mejores_individuos = []  # Mantener los 3 mejores individuos encontrados
         self.historico_fitness = []
-        self.historico_metricas = []
+        
+        # Historial columnar (acotado con max_registros_historial; en disco si excede la memoria)
+        self.historico_metricas = HistorialMetricas(
+            max_registros=config.get("max_registros_historial"),
+            archivo=config.get("archivo_historial"),
+            memoria_maxima=config.get("memoria_maxima_historial", MEMORIA_MAXIMA_HISTORIAL)
+        )
+        
+        # Diversidad de la población ya ordenada (la usan las métricas y la generación siguiente)
+        self.diversidad_actual = None
         
         # Parámetros del algoritmo
         self.tamano_poblacion = config.get("tamano_poblacion", 100)
@@ -35,6 +57,78 @@ class AlgoritmoGenetico:
         self.ingredientes_data = config.get("ingredientes_data", [])
         self.restricciones_usuario = config.get("restricciones_usuario", None)
         self.config_evaluacion = config.get("config_evaluacion", {})
+        self.poblacion_semilla = config.get("poblacion_semilla", [])  # Porcentajes para arranque en caliente
+        
+        # Tratamiento de genomas duplicados ("reutilizar" evaluación o "reemplazar" por inmigrantes)
+        self.estrategia_duplicados = config.get("estrategia_duplicados", "reutilizar")
+        self.resolucion_duplicados = config.get("resolucion_duplicados", RESOLUCION_DUPLICADOS)
+        self.cache_evaluaciones = {}
+        self.estadisticas_duplicados = {}
+        
+        # Diagnóstico de factibilidad de las restricciones (se calcula al ejecutar)
+        self.diagnostico = None
+        
+        # Presolve: límites ajustados por la suma (y opcionalmente por nutrientes)
+        self.presolve = config.get("presolve", True)
+        self.presolve_nutricional = config.get("presolve_nutricional", False)
+        self.resultado_presolve = None
+        if self.presolve and self.ingredientes_data:
+            requerimientos = None
+            if self.presolve_nutricional:
+                requerimientos = obtener_requerimientos_presolve(self.config_evaluacion)
+            self.resultado_presolve = presolver_limites(self.ingredientes_data, self.restricciones_usuario,
+                                                        requerimientos)
+            for mensaje in self.resultado_presolve["mensajes"]:
+                print(f"⚠️ Presolve: {mensaje}")
+        
+        # Genoma reducido a los ingredientes libres (sin fijos ni excluidos)
+        self.reducir_genoma = config.get("reducir_genoma", True)
+        self.problema_reducido = None
+        if self.reducir_genoma:
+            limites_presolve = None
+            if self.resultado_presolve is not None and self.resultado_presolve["factible"]:
+                limites_presolve = self.resultado_presolve
+            self.problema_reducido = construir_problema_reducido(self.ingredientes_data, self.restricciones_usuario,
+                                                                 limites_presolve)
+        
+        # Datos con los que trabajan los operadores (las restricciones quedan absorbidas al reducir)
+        if self.problema_reducido is not None:
+            self.ingredientes_genoma = self.problema_reducido["ingredientes"]
+            self.restricciones_genoma = None
+        else:
+            self.ingredientes_genoma = self.ingredientes_data
+            self.restricciones_genoma = self.restricciones_usuario
+        
+        # Modo de cardinalidad limitada: máximo de ingredientes por formulación
+        self.max_ingredientes = config.get("max_ingredientes", INGREDIENTES_CONFIG["numero_maximo_ingredientes"])
+        self.porcentaje_minimo_significativo = config.get("porcentaje_minimo_significativo",
+                                                          INGREDIENTES_CONFIG["porcentaje_minimo_significativo"])
+        self.prob_mutacion_estructural = config.get("prob_mutacion_estructural", 0.2)
+        umbral_genoma, ocupados = self.porcentaje_minimo_significativo, 0
+        if self.problema_reducido is not None:
+            # Umbral en unidades del genoma reducido; los fijos usados también cuentan
+            umbral_genoma /= self.problema_reducido["masa_libre"]
+            ocupados = int(np.count_nonzero(self.problema_reducido["valores_fijos"]))
+        self.cardinalidad = construir_cardinalidad(self.max_ingredientes, umbral_genoma, self.ingredientes_genoma,
+                                                   self.restricciones_genoma, ocupados)
+        
+        # Evaluación paralela con memoria compartida (1 = en serie, 0 = todos los núcleos)
+        self.num_procesos = config.get("num_procesos", 1)
+        self.evaluador = None
+        
+        # Instrumentación por etapas (tiempos y contadores) y traza de Chrome opcional
+        self.instrumentar = config.get("instrumentacion", True)
+        self.archivo_traza = config.get("archivo_traza")
+        self.instrumentacion = None
+        
+        # Puntos de control periódicos para reanudar ejecuciones interrumpidas
+        self.archivo_punto_control = config.get("archivo_punto_control")
+        self.frecuencia_punto_control = config.get("frecuencia_punto_control", 10)
+        
+        # Bitácora JSON Lines de eventos por generación para monitoreo externo
+        self.archivo_eventos = config.get("archivo_eventos")
+        self.id_ejecucion = config.get("id_ejecucion")
+        self.bitacora = None
         
         # Métricas de ejecución
         self.tiempo_inicio = None
@@ -50,26 +144,89 @@ class AlgoritmoGenetico:
             "final": {"inicio": 0.7, "fin": 1.0}
         }
     
-    def ejecutar(self):
+    def ejecutar(self, reanudar=None):
         """
         Ejecuta el algoritmo genético completo
         
+        Args:
+            reanudar: Ruta de un punto de control para continuar una ejecución
+                interrumpida (la configuración debe ser la misma)
+        
         Returns:
             Diccionario con resultados de la ejecución
         """
         print("🧬 Iniciando algoritmo genético...")
         self.tiempo_inicio = time.time()
         
+        punto_control = None
+        if reanudar:
+            punto_control = cargar_punto_control(reanudar)
+            if punto_control is None:
+                return self._rechazar_ejecucion({"error": f"No se pudo leer el punto de control {reanudar}"})
+        
+        # Restricciones contradictorias: no se lanza una búsqueda que no puede tener éxito
+        self.diagnostico = diagnosticar_restricciones(self.ingredientes_data, self.restricciones_usuario)
+        if not self.diagnostico["factible"]:
+            print(f"⚠️ {generar_resumen_diagnostico(self.diagnostico)}")
+            return self._rechazar_ejecucion({
+                "error": "Restricciones infactibles: " + "; ".join(self.diagnostico["conflicto"]),
+                "diagnostico": self.diagnostico
+            })
+
+        # Infactibilidad detectada por el presolve (p. ej. con requerimientos nutricionales)
+        if self.resultado_presolve is not None and not self.resultado_presolve["factible"]:
+            mensaje = "Restricciones infactibles: " + "; ".join(self.resultado_presolve["mensajes"])
+            print(f"⚠️ {mensaje}")
+            return self._rechazar_ejecucion({"error": mensaje, "diagnostico": self.diagnostico})
+
+        # Máximo de ingredientes con el que ninguna fórmula puede sumar 100%
+        if self.cardinalidad is not None and not self.cardinalidad["diagnostico"]["factible"]:
+            print(f"⚠️ {generar_resumen_diagnostico(self.cardinalidad['diagnostico'])}")
+            return self._rechazar_ejecucion({
+                "error": "Máximo de ingredientes infactible: " + "; ".join(self.cardinalidad["diagnostico"]["conflicto"]),
+                "diagnostico": self.cardinalidad["diagnostico"]
+            })
+
+        if self.instrumentar:
+            self.instrumentacion = Instrumentacion(traza=bool(self.archivo_traza))
+        instrumentacion_anterior = activar_instrumentacion(self.instrumentacion)
+        
+        if self.archivo_eventos:
+            self.bitacora = BitacoraEventos(self.archivo_eventos, self.id_ejecucion)
+        
         try:
-            # Inicializar población
-            self._inicializar_poblacion()
+            # Procesos trabajadores para evaluar (None si se evalúa en serie)
+            self.evaluador = crear_evaluador(self.num_procesos, self.tamano_poblacion,
+                                             self.ingredientes_data, self.config_evaluacion,
+                                             self.restricciones_usuario)
             
-            # Evaluar población inicial
-            self._evaluar_poblacion_inicial()
+            primera_generacion = 0
+            if punto_control is not None:
+                # Continuar desde la generación siguiente a la guardada
+                tiempo_previo = restaurar_punto_control(self, punto_control)
+                if tiempo_previo is None:
+                    return self._rechazar_ejecucion(
+                        {"error": f"El punto de control {reanudar} no corresponde a esta configuración"})
+                self.tiempo_inicio -= tiempo_previo
+                primera_generacion = self.generacion_actual + 1
+                print(f"🔁 Reanudando desde la generación {self.generacion_actual} ({reanudar})")
+                self._emitir_evento("inicio", reanudada_desde=self.generacion_actual,
+                                    configuracion=self.exportar_configuracion())
+            else:
+                # Inicializar población
+                with medir("inicializacion"):
+                    self._inicializar_poblacion()
+                
+                # Evaluar población inicial
+                self._evaluar_poblacion_inicial()
+                if self.instrumentacion is not None:
+                    self.instrumentacion.cerrar_generacion(-1)
+                self._emitir_evento("inicio", configuracion=self.exportar_configuracion())
             
             # Ciclo evolutivo principal
-            for generacion in range(self.num_generaciones):
+            for generacion in range(primera_generacion, self.num_generaciones):
                 self.generacion_actual = generacion
+                inicio_generacion = time.perf_counter()
                 
                 # Actualizar fase actual
                 self._actualizar_fase()
@@ -84,23 +241,45 @@ class AlgoritmoGenetico:
                 
                 # Evaluar nueva población
                 self.poblacion = nueva_poblacion
-                evaluar_poblacion(self.poblacion, self.config_evaluacion, self.ingredientes_data,
-                                self.fase_actual, self.restricciones_usuario)
+                with medir("evaluacion"):
+                    self.estadisticas_duplicados = evaluar_poblacion_sin_duplicados(
+                        self.poblacion, self.config_evaluacion, self.ingredientes_data,
+                        self.restricciones_usuario, self.fase_actual, generacion,
+                        cache=self.cache_evaluaciones,
+                        estrategia=self.estrategia_duplicados,
+                        resolucion=self.resolucion_duplicados,
+                        evaluador=self.evaluador,
+                        problema_reducido=self.problema_reducido,
+                        cardinalidad=self.cardinalidad
+                    )
+                self._contar_evaluaciones()
                 
                 # Ordenar por fitness
-                self.poblacion.sort(key=lambda ind: ind.fitness)
+                with medir("ordenamiento"):
+                    self.poblacion.sort(key=lambda ind: ind.fitness)
+                
+                with medir("metricas"):
+                    # Actualizar mejores individuos
+                    self._actualizar_mejores_individuos()
+                    
+                    # Registrar métricas
+                    metricas = self._registrar_metricas()
                 
-                # Actualizar mejores individuos
-                self._actualizar_mejores_individuos()
+                if self.instrumentacion is not None:
+                    self.instrumentacion.cerrar_generacion(generacion)
                 
-                # Registrar métricas
-                self._registrar_metricas()
+                if self.bitacora is not None:
+                    self._emitir_generacion(metricas, time.perf_counter() - inicio_generacion)
                 
                 # Verificar convergencia
                 if self._verificar_convergencia():
                     print(f"Convergencia detectada en generación {generacion}")
                     self.convergencia_detectada = True
                     break
+                
+                if self.archivo_punto_control and (generacion + 1) % self.frecuencia_punto_control == 0:
+                    with medir("punto_control"):
+                        guardar_punto_control(self, self.archivo_punto_control, time.time() - self.tiempo_inicio)
             
             # Finalizar ejecución
             self._finalizar_ejecucion()
@@ -109,7 +288,17 @@ class AlgoritmoGenetico:
         
         except Exception as e:
             print(f"Error durante la ejecución del algoritmo: {e}")
+            self._emitir_evento("error", generacion=self.generacion_actual, mensaje=str(e))
             return {"error": str(e)}
+        
+        finally:
+            activar_instrumentacion(instrumentacion_anterior)
+            if self.bitacora is not None:
+                self.bitacora.cerrar()
+                self.bitacora = None
+            if self.evaluador is not None:
+                self.evaluador.cerrar()
+                self.evaluador = None
     
     def _inicializar_poblacion(self):
         """Inicializa la población inicial"""
@@ -117,13 +306,28 @@ class AlgoritmoGenetico:
         
         self.poblacion = crear_poblacion_inicial(
             self.tamano_poblacion,
-            self.ingredientes_data,
-            self.restricciones_usuario,
+            self.ingredientes_genoma,
+            self.restricciones_genoma,
             estrategia="mixta"
         )
         
+        # Arranque en caliente: sustituir los primeros individuos por las semillas
+        for i, porcentajes in enumerate(self.poblacion_semilla[:len(self.poblacion)]):
+            porcentajes = np.array(porcentajes, dtype=float)
+            if self.problema_reducido is not None:
+                porcentajes = reducir_porcentajes(porcentajes, self.problema_reducido)
+            semilla = Individuo(len(self.ingredientes_genoma))
+            semilla.porcentajes = porcentajes
+            semilla.normalizar(self.ingredientes_genoma, self.restricciones_genoma)
+            self.poblacion[i] = semilla
+        
+        # Cardinalidad limitada: ningún individuo inicial excede el máximo de ingredientes
+        if self.cardinalidad is not None:
+            for individuo in self.poblacion:
+                reparar_cardinalidad(individuo, self.cardinalidad, self.ingredientes_genoma, self.restricciones_genoma)
+        
         # Generar estadísticas de población inicial
-        estadisticas = generar_estadisticas_poblacion(self.poblacion, self.ingredientes_data)
+        estadisticas = generar_estadisticas_poblacion(self.poblacion, self.ingredientes_genoma)
         print(f"   • Población creada: {estadisticas['tamano_poblacion']} individuos")
         print(f"   • Individuos válidos: {estadisticas['suma_valida']}")
         print(f"   • Diversidad inicial: {estadisticas.get('diversidad_poblacion', 0):.3f}")
@@ -132,11 +336,22 @@ class AlgoritmoGenetico:
         """Evalúa la población inicial"""
         print("🔍 Evaluando población inicial...")
         
-        evaluar_poblacion(self.poblacion, self.config_evaluacion, self.ingredientes_data,
-                         self.fase_actual, self.restricciones_usuario)
+        with medir("evaluacion"):
+            self.estadisticas_duplicados = evaluar_poblacion_sin_duplicados(
+                self.poblacion, self.config_evaluacion, self.ingredientes_data,
+                self.restricciones_usuario, self.fase_actual,
+                cache=self.cache_evaluaciones,
+                estrategia=self.estrategia_duplicados,
+                resolucion=self.resolucion_duplicados,
+                evaluador=self.evaluador,
+                problema_reducido=self.problema_reducido,
+                cardinalidad=self.cardinalidad
+            )
+        self._contar_evaluaciones()
         
         # Ordenar por fitness (menor es mejor)
-        self.poblacion.sort(key=lambda ind: ind.fitness)
+        with medir("ordenamiento"):
+            self.poblacion.sort(key=lambda ind: ind.fitness)
         
         # Inicializar mejores individuos
         self._actualizar_mejores_individuos()
@@ -145,6 +360,59 @@ class AlgoritmoGenetico:
         print(f"   • Mejor fitness inicial: {mejor_fitness:.4f}")
         print(f"   • Peor fitness inicial: {self.poblacion[-1].fitness:.4f}")
     
+    def _contar_evaluaciones(self):
+        """Acumula en la instrumentación los contadores de la última evaluación"""
+        contar("evaluaciones", self.estadisticas_duplicados.get("evaluados", 0))
+        contar("aciertos_cache", self.estadisticas_duplicados.get("reutilizados", 0))
+        contar("duplicados", self.estadisticas_duplicados.get("duplicados", 0))
+        contar("inmigrantes", self.estadisticas_duplicados.get("inmigrantes", 0))
+    
+    def _emitir_evento(self, tipo, **datos):
+        """Envía un evento a la bitácora JSON Lines (si está activa)"""
+        if self.bitacora is not None:
+            self.bitacora.emitir(tipo, **datos)
+    
+    def _rechazar_ejecucion(self, resultado):
+        """
+        Registra en la bitácora una ejecución que termina sin buscar
+        
+        Args:
+            resultado: Diccionario con "error" (y "diagnostico" si lo hay)
+        
+        Returns:
+            El mismo resultado
+        """
+        if self.archivo_eventos:
+            bitacora = self.bitacora or BitacoraEventos(self.archivo_eventos, self.id_ejecucion)
+            bitacora.emitir("error", generacion=None, mensaje=resultado["error"],
+                            diagnostico=resultado.get("diagnostico"))
+            if bitacora is not self.bitacora:
+                bitacora.cerrar()
+        return resultado
+    
+    def _emitir_generacion(self, metricas, duracion):
+        """
+        Envía a la bitácora el evento de la generación recién registrada
+        
+        Args:
+            metricas: Métricas de la generación (de _registrar_metricas; el
+                historial submuestreado puede no conservarlas)
+            duracion: Segundos de reloj de la generación
+        """
+        metricas = dict(metricas)
+        metricas.pop("generacion", None)
+        metricas.pop("num_mejores_encontrados", None)
+        etapas = {}
+        if self.instrumentacion is not None and self.instrumentacion.por_generacion:
+            etapas = self.instrumentacion.por_generacion[-1]["etapas"]
+        self.bitacora.emitir(
+            "generacion",
+            generacion=self.generacion_actual,
+            duracion=duracion,
+            etapas=etapas,
+            **metricas
+        )
+    
     def _actualizar_fase(self):
         """Actualiza la fase actual del algoritmo según el progreso"""
         progreso = self.generacion_actual / self.num_generaciones
@@ -161,34 +429,55 @@ class AlgoritmoGenetico:
         nueva_poblacion = []
         
         # Elitismo: conservar los mejores individuos
-        elite = seleccion_elitista(self.poblacion, self.elitismo)
-        nueva_poblacion.extend([ind.clonar() for ind in elite])
+        with medir("seleccion"):
+            elite = seleccion_elitista(self.poblacion, self.elitismo)
+            nueva_poblacion.extend([ind.clonar() for ind in elite])
         
         # Obtener operadores adaptativos para la fase actual
-        operador_cruza = seleccionar_operador_cruza(self.fase_actual, self.ingredientes_data, self.restricciones_usuario)
-        operador_mutacion = seleccionar_operador_mutacion(self.fase_actual, self._calcular_diversidad_poblacion())
+        operador_cruza = seleccionar_operador_cruza(self.fase_actual, self.ingredientes_genoma, self.restricciones_genoma)
+        diversidad = self.diversidad_actual
+        if diversidad is None:
+            diversidad = self._calcular_diversidad_poblacion()
+        self.diversidad_actual = None
+        operador_mutacion = seleccionar_operador_mutacion(self.fase_actual, diversidad)
         
         # Generar resto de la población
         while len(nueva_poblacion) < self.tamano_poblacion:
             # Seleccionar padres
-            padre1 = seleccionar_padre(self.poblacion, metodo="torneo", tamano_torneo=self._obtener_tamano_torneo())
-            padre2 = seleccionar_padre(self.poblacion, metodo="torneo", tamano_torneo=self._obtener_tamano_torneo())
+            with medir("seleccion"):
+                padre1 = seleccionar_padre(self.poblacion, metodo="torneo", tamano_torneo=self._obtener_tamano_torneo())
+                padre2 = seleccionar_padre(self.poblacion, metodo="torneo", tamano_torneo=self._obtener_tamano_torneo())
             
             # Aplicar cruza
             if random.random() < self.prob_cruza:
-                hijo = operador_cruza(padre1, padre2)
+                with medir("cruza"):
+                    hijo = operador_cruza(padre1, padre2)
                 
                 # Validar y reparar hijo si es necesario
-                if not validar_hijo(hijo, self.ingredientes_data, self.restricciones_usuario):
-                    hijo = reparar_hijo(hijo, self.ingredientes_data, self.restricciones_usuario)
+                with medir("reparacion"):
+                    if not validar_hijo(hijo, self.ingredientes_genoma, self.restricciones_genoma):
+                        hijo = reparar_hijo(hijo, self.ingredientes_genoma, self.restricciones_genoma)
+                        contar("reparaciones")
             else:
                 # Sin cruza, clonar uno de los padres
                 hijo = padre1.clonar() if random.random() < 0.5 else padre2.clonar()
             
             # Aplicar mutación
             if random.random() < self.prob_mutacion:
-                hijo = operador_mutacion(hijo, self.generacion_actual, self.num_generaciones,
-                                       self.ingredientes_data, self.restricciones_usuario)
+                with medir("mutacion"):
+                    hijo = operador_mutacion(hijo, self.generacion_actual, self.num_generaciones,
+                                           self.ingredientes_genoma, self.restricciones_genoma)
+            
+            # Cardinalidad limitada: reparar el conjunto activo y mutar su estructura
+            if self.cardinalidad is not None:
+                with medir("reparacion"):
+                    if reparar_cardinalidad(hijo, self.cardinalidad, self.ingredientes_genoma,
+                                            self.restricciones_genoma):
+                        contar("reparaciones_cardinalidad")
+                if random.random() < self.prob_mutacion_estructural:
+                    with medir("mutacion"):
+                        hijo = mutar_estructura(hijo, self.cardinalidad, 0.1,
+                                                self.ingredientes_genoma, self.restricciones_genoma)
             
             nueva_poblacion.append(hijo)
         
@@ -208,14 +497,14 @@ class AlgoritmoGenetico:
         if len(self.poblacion) < 2:
             return 1.0
         
-        fitness_values = [ind.fitness for ind in self.poblacion]
-        promedio = sum(fitness_values) / len(fitness_values)
+        fitness_values = np.fromiter((ind.fitness for ind in self.poblacion), dtype=float, count=len(self.poblacion))
+        promedio = fitness_values.mean()
         
         if promedio == 0:
             return 1.0
         
-        varianza = sum((f - promedio) ** 2 for f in fitness_values) / len(fitness_values)
-        coef_variacion = (varianza ** 0.5) / promedio if promedio > 0 else 0
+        varianza = np.mean((fitness_values - promedio) ** 2)
+        coef_variacion = float(varianza ** 0.5 / promedio) if promedio > 0 else 0
         
         # Normalizar a rango 0-1
         return min(1.0, coef_variacion)
@@ -271,29 +560,40 @@ class AlgoritmoGenetico:
         return max(0, similitud)
     
     def _registrar_metricas(self):
-        """Registra métricas de la generación actual"""
+        """
+        Registra métricas de la generación actual
+        
+        Returns:
+            Diccionario con las métricas registradas
+        """
         mejor_fitness = self.poblacion[0].fitness
         self.historico_fitness.append(mejor_fitness)
         
         # Calcular métricas adicionales
-        fitness_values = [ind.fitness for ind in self.poblacion]
-        costos = [ind.costo_total for ind in self.poblacion if hasattr(ind, 'costo_total')]
+        fitness_values = np.fromiter((ind.fitness for ind in self.poblacion), dtype=float, count=len(self.poblacion))
+        costos = np.fromiter((ind.costo_total for ind in self.poblacion), dtype=float, count=len(self.poblacion))
+        self.diversidad_actual = self._calcular_diversidad_poblacion()
         
         metricas = {
             "generacion": self.generacion_actual,
             "fase": self.fase_actual,
             "mejor_fitness": mejor_fitness,
-            "peor_fitness": max(fitness_values),
-            "fitness_promedio": sum(fitness_values) / len(fitness_values),
-            "diversidad": self._calcular_diversidad_poblacion(),
-            "num_mejores_encontrados": len(self.mejores_individuos)
+            "peor_fitness": fitness_values.max(),
+            "fitness_promedio": fitness_values.mean(),
+            "diversidad": self.diversidad_actual,
+            "num_mejores_encontrados": len(self.mejores_individuos),
+            "duplicados": self.estadisticas_duplicados.get("duplicados", 0),
+            "evaluaciones_reutilizadas": self.estadisticas_duplicados.get("reutilizados", 0),
+            "inmigrantes": self.estadisticas_duplicados.get("inmigrantes", 0),
+            "evaluaciones": self.estadisticas_duplicados.get("evaluados", len(self.poblacion))
         }
         
-        if costos:
-            metricas["mejor_costo"] = min(costos)
-            metricas["costo_promedio"] = sum(costos) / len(costos)
+        if len(costos):
+            metricas["mejor_costo"] = costos.min()
+            metricas["costo_promedio"] = costos.mean()
         
-        self.historico_metricas.append(metricas)
+        self.historico_metricas.registrar(metricas)
+        return metricas
     
     def _verificar_convergencia(self):
         """Verifica si el algoritmo ha convergido"""
@@ -305,12 +605,32 @@ class AlgoritmoGenetico:
     def _finalizar_ejecucion(self):
         """Finaliza la ejecución y calcula métricas finales"""
         self.tiempo_ejecucion = time.time() - self.tiempo_inicio
+        self.historico_metricas.cerrar()
         
         print(f"\n✅ Algoritmo finalizado!")
         print(f"   • Tiempo de ejecución: {self.tiempo_ejecucion:.2f} segundos")
         print(f"   • Generaciones ejecutadas: {self.generacion_actual + 1}")
         print(f"   • Mejores individuos encontrados: {len(self.mejores_individuos)}")
         
+        if self.bitacora is not None:
+            self.bitacora.emitir(
+                "fin",
+                generaciones_ejecutadas=self.generacion_actual + 1,
+                tiempo_ejecucion=self.tiempo_ejecucion,
+                convergencia_detectada=self.convergencia_detectada,
+                mejor_fitness=self.mejores_individuos[0].fitness if self.mejores_individuos else None,
+                mejor_costo=getattr(self.mejores_individuos[0], "costo_total", None) if self.mejores_individuos else None,
+                evaluaciones_totales=int(self.historico_metricas.suma("evaluaciones"))
+            )
+        
+        if self.instrumentacion is not None:
+            etapas = self.instrumentacion.obtener_resumen()["etapas"]
+            if etapas:
+                etapa, datos = next(iter(etapas.items()))
+                print(f"   • Etapa más costosa: {etapa} ({datos['total']:.2f} s)")
+            if self.archivo_traza and self.instrumentacion.exportar_traza_chrome(self.archivo_traza):
+                print(f"   • Traza de Chrome guardada en: {self.archivo_traza}")
+        
         if self.mejores_individuos:
             mejor_global = self.mejores_individuos[0]
             print(f"   • Mejor fitness global: {mejor_global.fitness:.4f}")
@@ -319,6 +639,15 @@ class AlgoritmoGenetico:
     
     def _generar_resultado_final(self):
         """Genera el resultado final del algoritmo"""
+        # Las formulaciones completas solo se reconstruyen en la frontera de resultados
+        if self.problema_reducido is not None:
+            self.mejores_individuos = [expandir_individuo(ind, self.problema_reducido) for ind in self.mejores_individuos]
+            self.poblacion = [expandir_individuo(ind, self.problema_reducido) for ind in self.poblacion]
+        
+        # Solo los individuos que se reportan reciben proveedores y perfil detallado
+        enriquecer_individuos(self.mejores_individuos[:3] + self.poblacion[:10],
+                              self.ingredientes_data, self.restricciones_usuario)
+        
         resultado = {
             "mejor_individuo": self.mejores_individuos[0] if self.mejores_individuos else None,
             "mejores_individuos": self.mejores_individuos[:3],  # Top 3
@@ -373,7 +702,7 @@ class AlgoritmoGenetico:
         Returns:
             Diccionario con estadísticas
         """
-        if not self.historico_metricas:
+        if not len(self.historico_metricas):
             return {}
         
         estadisticas = {
@@ -383,7 +712,7 @@ class AlgoritmoGenetico:
                 "mejora_total": 0,
                 "mejora_porcentual": 0
             },
-            "fases_ejecutadas": set(m["fase"] for m in self.historico_metricas),
+            "fases_ejecutadas": set(self.historico_metricas.fases()),
             "convergencia": {
                 "detectada": self.convergencia_detectada,
                 "generacion": self.generacion_actual if self.convergencia_detectada else None
@@ -395,10 +724,23 @@ class AlgoritmoGenetico:
             "rendimiento": {
                 "tiempo_total": self.tiempo_ejecucion,
                 "tiempo_por_generacion": self.tiempo_ejecucion / max(1, self.generacion_actual + 1),
-                "evaluaciones_totales": (self.generacion_actual + 1) * self.tamano_poblacion
+                "evaluaciones_totales": int(self.historico_metricas.suma("evaluaciones")),
+                "duplicados_totales": int(self.historico_metricas.suma("duplicados"))
             }
         }
         
+        if self.instrumentacion is not None:
+            estadisticas["instrumentacion"] = self.instrumentacion.obtener_resumen()
+            estadisticas["rendimiento"]["aciertos_cache"] = self.instrumentacion.contadores.get("aciertos_cache", 0)
+            estadisticas["rendimiento"]["reparaciones"] = self.instrumentacion.contadores.get("reparaciones", 0)
+        
+        if self.resultado_presolve is not None:
+            estadisticas["presolve"] = {
+                "limites_ajustados": self.resultado_presolve["ajustados"],
+                "nuevos_fijos": self.resultado_presolve["nuevos_fijos"],
+                "iteraciones": self.resultado_presolve["iteraciones"]
+            }
+        
         # Calcular mejora
         if len(self.historico_fitness) >= 2:
             inicial = self.historico_fitness[0]
@@ -424,5 +766,17 @@ class AlgoritmoGenetico:
             "elitismo": self.elitismo,
             "fases_config": self.fases_config,
             "num_ingredientes": len(self.ingredientes_data),
-            "tiene_restricciones_usuario": self.restricciones_usuario is not None
+            "tiene_restricciones_usuario": self.restricciones_usuario is not None,
+            "estrategia_duplicados": self.estrategia_duplicados,
+            "num_procesos": self.num_procesos,
+            "reducir_genoma": self.reducir_genoma,
+            "num_ingredientes_libres": len(self.ingredientes_genoma),
+            "presolve": self.presolve,
+            "max_ingredientes": self.max_ingredientes,
+            "modo_cardinalidad": self.cardinalidad is not None,
+            "presolve_nutricional": self.presolve_nutricional,
+            "instrumentacion": self.instrumentar,
+            "frecuencia_punto_control": self.frecuencia_punto_control,
+            "archivo_eventos": self.archivo_eventos,
+            "resolucion_duplicados": self.resolucion_duplicados
         }
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Bitácora de eventos de generación en formato JSON Lines.
+
+Escribe una línea JSON por evento (inicio, cada generación, fin o error de
+la ejecución) para que tableros basados en `tail -f` y orquestadores de
+lotes sigan muchas ejecuciones concurrentes sin interpretar la consola.
+
+El algoritmo solo deposita diccionarios en una cola acotada; un hilo
+escritor los serializa y escribe por lotes con un búfer de archivo,
+vaciándolo tras cada lote para que las líneas sean visibles enseguida. Si el
+disco no da abasto y la cola se llena, los eventos se descartan (y se
+cuentan) en lugar de frenar la búsqueda.
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+
+# Eventos en espera antes de empezar a descartar
+CAPACIDAD_COLA_EVENTOS = 10000
+
+# Eventos que el hilo escritor serializa por escritura
+TAMANO_LOTE_EVENTOS = 256
+
+# Marca de fin para el hilo escritor
+_FIN = object()
+
+
+def crear_id_ejecucion():
+    """
+    Crea un identificador de ejecución único entre máquinas y procesos
+
+    Returns:
+        Cadena host-pid-marca de tiempo
+    """
+    return f"{socket.gethostname()}-{os.getpid()}-{int(time.time() * 1000)}"
+
+
+class BitacoraEventos:
+    """
+    Escritor de eventos JSON Lines en un hilo propio
+    """
+
+    def __init__(self, archivo, id_ejecucion=None, capacidad=CAPACIDAD_COLA_EVENTOS):
+        """
+        Abre la bitácora (en modo de anexar: una ejecución reanudada sigue el mismo archivo)
+
+        Args:
+            archivo: Ruta del archivo .jsonl
+            id_ejecucion: Identificador incluido en cada evento (None = crear_id_ejecucion())
+            capacidad: Eventos en espera antes de descartar
+        """
+        self.archivo = archivo
+        self.id_ejecucion = id_ejecucion or crear_id_ejecucion()
+        self.descartados = 0
+        self.escritos = 0
+        self.cola = queue.Queue(maxsize=capacidad)
+
+        directorio = os.path.dirname(archivo)
+        if directorio and not os.path.exists(directorio):
+            os.makedirs(directorio)
+        self._salida = open(archivo, "a", encoding="utf-8", buffering=1024 * 1024)
+
+        self._hilo = threading.Thread(target=self._escribir, name="bitacora-eventos", daemon=True)
+        self._hilo.start()
+
+    def emitir(self, tipo, **datos):
+        """
+        Encola un evento sin bloquear
+
+        Args:
+            tipo: Tipo de evento ("inicio", "generacion", "fin", "error")
+            **datos: Campos del evento (tipos serializables a JSON)
+
+        Returns:
+            True si el evento se encoló, False si se descartó por cola llena
+        """
+        evento = {"evento": tipo, "ejecucion": self.id_ejecucion, "tiempo": time.time()}
+        evento.update(datos)
+        try:
+            self.cola.put_nowait(evento)
+            return True
+        except queue.Full:
+            self.descartados += 1
+            return False
+
+    def _escribir(self):
+        """Bucle del hilo escritor: serializa y escribe los eventos por lotes"""
+        terminar = False
+        while not terminar:
+            lote = [self.cola.get()]
+            while len(lote) < TAMANO_LOTE_EVENTOS:
+                try:
+                    lote.append(self.cola.get_nowait())
+                except queue.Empty:
+                    break
+
+            lineas = []
+            for evento in lote:
+                if evento is _FIN:
+                    terminar = True
+                    continue
+                lineas.append(json.dumps(evento, ensure_ascii=False, default=str))
+
+            try:
+                if lineas:
+                    self._salida.write("\n".join(lineas) + "\n")
+                    self.escritos += len(lineas)
+                self._salida.flush()
+            except (OSError, ValueError) as e:
+                print(f"❌ Error al escribir la bitácora de eventos: {e}")
+                self.descartados += len(lineas)
+
+    def cerrar(self, tiempo_espera=5.0):
+        """
+        Escribe los eventos pendientes y cierra el archivo
+
+        Args:
+            tiempo_espera: Segundos máximos para vaciar la cola
+        """
+        if self._salida.closed:
+            return
+        # La marca de fin puede esperar lugar en la cola: el escritor la está vaciando
+        try:
+            self.cola.put(_FIN, timeout=tiempo_espera)
+        except queue.Full:
+            pass
+        self._hilo.join(tiempo_espera)
+        if self._hilo.is_alive():
+            print(f"⚠️ La bitácora de eventos no terminó de escribirse: {self.archivo}")
+            return
+        self._salida.close()
+        if self.descartados:
+            print(f"⚠️ Bitácora de eventos: {self.descartados} eventos descartados")
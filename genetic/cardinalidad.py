@@ -0,0 +1,303 @@
+"""
+Modo de cardinalidad limitada: como máximo k ingredientes por formulación.
+
+Las plantas de mezclado cobran por ingrediente manejado, así que
+INGREDIENTES_CONFIG["numero_maximo_ingredientes"] limita cuántos
+ingredientes puede usar una fórmula. El conjunto activo de un individuo son
+sus porcentajes distintos de cero: la reparación anula los ingredientes
+insignificantes (por debajo de porcentaje_minimo_significativo) y los
+excedentes de menor porcentaje, y los operadores estructurales agregan,
+quitan o sustituyen ingredientes tocando solo O(k) genes, con registro del
+cambio para la evaluación incremental.
+"""
+
+import random
+import time
+
+import numpy as np
+
+from conocimiento.restricciones_usuario import compilar_limites
+from genetic.fitness.incremental import registrar_delta_mutacion
+
+# Holgura al comparar la suma de máximos con el 100%
+TOLERANCIA_CARDINALIDAD = 1e-9
+
+
+def construir_cardinalidad(max_ingredientes, umbral, ingredientes_data, restricciones_usuario=None, ocupados=0):
+    """
+    Prepara los datos del modo de cardinalidad limitada
+
+    Args:
+        max_ingredientes: Máximo de ingredientes por formulación (None o 0 = sin límite)
+        umbral: Porcentaje mínimo significativo (en las unidades del genoma)
+        ingredientes_data: Lista de datos de ingredientes del genoma
+        restricciones_usuario: Restricciones del usuario (opcional)
+        ocupados: Ingredientes usados fuera del genoma (fijos de un genoma reducido)
+
+    Returns:
+        Diccionario con max_activos, umbral, candidatos, obligatorios, minimos,
+        maximos y diagnostico (de diagnosticar_cardinalidad), o None si el
+        límite nunca puede excederse
+    """
+    if not max_ingredientes or not ingredientes_data:
+        return None
+
+    limites = compilar_limites(ingredientes_data, restricciones_usuario)
+    candidatos = limites["validos"] & (limites["maximos"] > umbral)
+    max_activos = max_ingredientes - ocupados
+
+    if np.count_nonzero(candidatos) <= max_activos:
+        return None
+
+    # Los ingredientes con mínimo positivo siempre forman parte de la fórmula
+    obligatorios = candidatos & (limites["minimos"] > 0)
+    diagnostico = diagnosticar_cardinalidad(candidatos, obligatorios, limites["maximos"], max_ingredientes,
+                                            ocupados, ingredientes_data)
+
+    return {
+        "max_activos": max(max_activos, int(np.count_nonzero(obligatorios))),
+        "umbral": umbral,
+        "candidatos": candidatos,
+        "obligatorios": obligatorios,
+        "minimos": limites["minimos"],
+        "maximos": limites["maximos"],
+        "diagnostico": diagnostico
+    }
+
+
+def diagnosticar_cardinalidad(candidatos, obligatorios, maximos, max_ingredientes, ocupados, ingredientes_data):
+    """
+    Verifica que alguna fórmula con el máximo de ingredientes pueda sumar 100%
+
+    La mejor elección posible son los obligatorios más los opcionales de
+    mayor máximo: si sus máximos no alcanzan el 100%, ningún individuo
+    reparado puede cumplir sus límites.
+
+    Args:
+        candidatos: Máscara de ingredientes que pueden usarse
+        obligatorios: Máscara de ingredientes con mínimo positivo
+        maximos: Máximos efectivos (en las unidades del genoma)
+        max_ingredientes: Máximo de ingredientes por formulación
+        ocupados: Ingredientes usados fuera del genoma
+        ingredientes_data: Lista de datos de ingredientes del genoma
+
+    Returns:
+        Diccionario con factible, conflicto y sugerencias (mismo formato que
+        diagnosticar_restricciones)
+    """
+    inicio = time.perf_counter()
+    max_activos = max_ingredientes - ocupados
+    indices_obligatorios = np.flatnonzero(obligatorios)
+    opcionales = np.flatnonzero(candidatos & ~obligatorios)
+    opcionales = opcionales[np.argsort(-maximos[opcionales], kind="stable")]
+
+    # Ingredientes necesarios para alcanzar el 100% con la mejor elección
+    acumulado = np.cumsum(np.concatenate(([maximos[indices_obligatorios].sum()], maximos[opcionales])))
+    alcanzan = np.flatnonzero(acumulado >= 1.0 - TOLERANCIA_CARDINALIDAD)
+    necesarios = len(indices_obligatorios) + int(alcanzan[0]) + ocupados if len(alcanzan) else None
+
+    conflicto = []
+    if len(indices_obligatorios) > max_activos:
+        conflicto.append(f"{len(indices_obligatorios) + ocupados} ingredientes tienen mínimo obligatorio "
+                         f"y el máximo es de {max_ingredientes} ingredientes")
+    elif necesarios is None or necesarios > max_ingredientes:
+        elegidos = np.concatenate((indices_obligatorios, opcionales[:max_activos - len(indices_obligatorios)]))
+        detalle = ", ".join(f"{ingredientes_data[i]['nombre']} ≤ {maximos[i]:.1%}" for i in elegidos)
+        conflicto.append(f"Con {max_ingredientes} ingredientes los máximos suman a lo más "
+                         f"{maximos[elegidos].sum():.1%} ({detalle})")
+
+    sugerencias = []
+    if conflicto and necesarios is not None:
+        sugerencias.append(f"Permitir al menos {necesarios} ingredientes (max_ingredientes)")
+
+    return {
+        "factible": not conflicto,
+        "costo_minimo": None,
+        "conflicto": conflicto,
+        "sugerencias": sugerencias,
+        "tiempo": time.perf_counter() - inicio
+    }
+
+
+def contar_activos(individuo):
+    """
+    Cuenta los ingredientes activos (porcentaje distinto de cero)
+
+    Args:
+        individuo: Individuo a revisar
+
+    Returns:
+        Número de ingredientes activos
+    """
+    return int(np.count_nonzero(individuo.porcentajes))
+
+
+def reparar_cardinalidad(individuo, cardinalidad, ingredientes_data=None, restricciones_usuario=None):
+    """
+    Anula los ingredientes insignificantes y los que exceden el máximo
+
+    Se conservan los obligatorios y, entre los demás, los de mayor porcentaje.
+
+    Args:
+        individuo: Individuo a reparar (se modifica)
+        cardinalidad: Datos de construir_cardinalidad
+        ingredientes_data: Lista de datos de ingredientes del genoma
+        restricciones_usuario: Restricciones del usuario (opcional)
+
+    Returns:
+        True si el individuo cambió
+    """
+    porcentajes = individuo.porcentajes
+    obligatorios = cardinalidad["obligatorios"]
+
+    anular = (porcentajes > 0) & (porcentajes <= cardinalidad["umbral"]) & ~obligatorios
+    anular |= (porcentajes > 0) & ~cardinalidad["candidatos"]
+    activos = np.flatnonzero((porcentajes > 0) & ~anular)
+
+    sobran = len(activos) - cardinalidad["max_activos"]
+    if sobran > 0:
+        opcionales = activos[~obligatorios[activos]]
+        anular[opcionales[np.argsort(porcentajes[opcionales])[:sobran]]] = True
+
+    if not anular.any():
+        return False
+
+    porcentajes[anular] = 0
+    if ingredientes_data:
+        individuo.aplicar_limites(ingredientes_data, restricciones_usuario)
+    else:
+        individuo.normalizar()
+    individuo.delta_mutacion = None
+    return True
+
+
+def _elegir_opcional_activo(porcentajes, cardinalidad):
+    """Índice aleatorio de un ingrediente activo no obligatorio (o None)"""
+    opcionales = np.flatnonzero((porcentajes > 0) & ~cardinalidad["obligatorios"])
+    return int(random.choice(opcionales)) if len(opcionales) else None
+
+
+def _elegir_inactivo(porcentajes, cardinalidad):
+    """Índice aleatorio de un ingrediente candidato sin usar (o None)"""
+    inactivos = np.flatnonzero((porcentajes == 0) & cardinalidad["candidatos"])
+    return int(random.choice(inactivos)) if len(inactivos) else None
+
+
+def mutar_agregar_ingrediente(individuo, cardinalidad, intensidad=0.1, ingredientes_data=None,
+                              restricciones_usuario=None):
+    """
+    Agrega un ingrediente sin usar con un porcentaje pequeño
+
+    Si la fórmula ya tiene el máximo de ingredientes, sustituye uno.
+
+    Args:
+        individuo: Individuo a mutar
+        cardinalidad: Datos de construir_cardinalidad
+        intensidad: Porcentaje máximo con el que entra el ingrediente
+        ingredientes_data: Lista de datos de ingredientes del genoma
+        restricciones_usuario: Restricciones del usuario (opcional)
+
+    Returns:
+        Individuo mutado
+    """
+    if contar_activos(individuo) >= cardinalidad["max_activos"]:
+        return mutar_sustituir_ingrediente(individuo, cardinalidad, ingredientes_data, restricciones_usuario)
+
+    resultado = individuo.clonar()
+    nuevo = _elegir_inactivo(resultado.porcentajes, cardinalidad)
+    if nuevo is None:
+        return resultado
+
+    minimo = max(cardinalidad["minimos"][nuevo], cardinalidad["umbral"])
+    maximo = max(minimo, min(cardinalidad["maximos"][nuevo], intensidad))
+    valor = minimo + random.random() * (maximo - minimo)
+    resultado.porcentajes[nuevo] = valor
+
+    factor = resultado.normalizar(ingredientes_data, restricciones_usuario)
+    if ingredientes_data:
+        registrar_delta_mutacion(resultado, individuo, [(nuevo, valor)], factor)
+    return resultado
+
+
+def mutar_quitar_ingrediente(individuo, cardinalidad, ingredientes_data=None, restricciones_usuario=None):
+    """
+    Quita un ingrediente activo no obligatorio y reparte su porcentaje
+
+    Args:
+        individuo: Individuo a mutar
+        cardinalidad: Datos de construir_cardinalidad
+        ingredientes_data: Lista de datos de ingredientes del genoma
+        restricciones_usuario: Restricciones del usuario (opcional)
+
+    Returns:
+        Individuo mutado
+    """
+    resultado = individuo.clonar()
+    quitado = _elegir_opcional_activo(resultado.porcentajes, cardinalidad)
+    if quitado is None or contar_activos(resultado) <= 1:
+        return resultado
+
+    cambio = -resultado.porcentajes[quitado]
+    resultado.porcentajes[quitado] = 0
+
+    factor = resultado.normalizar(ingredientes_data, restricciones_usuario)
+    if ingredientes_data:
+        registrar_delta_mutacion(resultado, individuo, [(quitado, cambio)], factor)
+    return resultado
+
+
+def mutar_sustituir_ingrediente(individuo, cardinalidad, ingredientes_data=None, restricciones_usuario=None):
+    """
+    Sustituye un ingrediente activo no obligatorio por uno sin usar
+
+    El nuevo ingrediente recibe el porcentaje del sustituido (hasta su máximo).
+
+    Args:
+        individuo: Individuo a mutar
+        cardinalidad: Datos de construir_cardinalidad
+        ingredientes_data: Lista de datos de ingredientes del genoma
+        restricciones_usuario: Restricciones del usuario (opcional)
+
+    Returns:
+        Individuo mutado
+    """
+    resultado = individuo.clonar()
+    quitado = _elegir_opcional_activo(resultado.porcentajes, cardinalidad)
+    nuevo = _elegir_inactivo(resultado.porcentajes, cardinalidad)
+    if quitado is None or nuevo is None:
+        return resultado
+
+    valor_quitado = resultado.porcentajes[quitado]
+    valor_nuevo = max(cardinalidad["umbral"], min(valor_quitado, cardinalidad["maximos"][nuevo]))
+    resultado.porcentajes[quitado] = 0
+    resultado.porcentajes[nuevo] = valor_nuevo
+
+    factor = resultado.normalizar(ingredientes_data, restricciones_usuario)
+    if ingredientes_data:
+        registrar_delta_mutacion(resultado, individuo, [(quitado, -valor_quitado), (nuevo, valor_nuevo)], factor)
+    return resultado
+
+
+def mutar_estructura(individuo, cardinalidad, intensidad=0.1, ingredientes_data=None, restricciones_usuario=None):
+    """
+    Aplica un operador estructural (agregar, quitar o sustituir ingrediente)
+
+    Con la fórmula llena solo se quita o sustituye.
+
+    Args:
+        individuo: Individuo a mutar
+        cardinalidad: Datos de construir_cardinalidad
+        intensidad: Porcentaje máximo de un ingrediente agregado
+        ingredientes_data: Lista de datos de ingredientes del genoma
+        restricciones_usuario: Restricciones del usuario (opcional)
+
+    Returns:
+        Individuo mutado
+    """
+    rand = random.random()
+    if contar_activos(individuo) < cardinalidad["max_activos"] and rand < 0.4:
+        return mutar_agregar_ingrediente(individuo, cardinalidad, intensidad, ingredientes_data, restricciones_usuario)
+    elif rand < 0.7:
+        return mutar_sustituir_ingrediente(individuo, cardinalidad, ingredientes_data, restricciones_usuario)
+    else:
+        return mutar_quitar_ingrediente(individuo, cardinalidad, ingredientes_data, restricciones_usuario)
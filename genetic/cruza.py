@@ -1,6 +1,44 @@
 import random
 import numpy as np
 from genetic.individuo import Individuo
+from conocimiento.restricciones_usuario import compilar_limites
+
+def _soporte_cruza(padre1, padre2, ingredientes_data=None, restricciones_usuario=None):
+    """
+    Unión de los soportes de los padres y límites de sus genes
+
+    Un gen que vale cero en ambos padres queda en cero en el hijo con
+    cualquiera de los operadores, así que solo se recorre la unión de los
+    soportes: con genomas dispersos el costo sigue a los ingredientes activos
+    y no al tamaño del catálogo.
+
+    Args:
+        padre1: Primer padre
+        padre2: Segundo padre
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Objeto con restricciones del usuario
+
+    Returns:
+        Tupla (indices, minimos, maximos) sobre el soporte
+    """
+    num_genes = len(padre1.porcentajes)
+    indices = np.flatnonzero((padre1.porcentajes != 0) | (padre2.porcentajes != 0))
+
+    minimos = np.zeros(len(indices))
+    maximos = np.ones(len(indices))
+    if ingredientes_data:
+        limites = compilar_limites(ingredientes_data, restricciones_usuario)
+        con_datos = indices < min(num_genes, len(ingredientes_data))
+        minimos[con_datos] = limites["minimos"][indices[con_datos]]
+        maximos[con_datos] = limites["maximos"][indices[con_datos]]
+
+    return indices, minimos, maximos
+
+def _crear_hijo(num_genes, indices, valores):
+    """Crea un hijo con los valores dados sobre el soporte y cero en el resto"""
+    hijo = Individuo(num_genes)
+    hijo.porcentajes[indices] = valores
+    return hijo
 
 def cruza_blx_alpha(padre1, padre2, alpha=0.5, ingredientes_data=None, restricciones_usuario=None):
     """
@@ -19,41 +57,25 @@ def cruza_blx_alpha(padre1, padre2, alpha=0.5, ingredientes_data=None, restricci
     Returns:
         Individuo hijo generado
     """
-    hijo = Individuo(len(padre1.porcentajes))
-    
-    for i in range(len(padre1.porcentajes)):
-        # Obtener valores de los padres
-        val1 = padre1.porcentajes[i]
-        val2 = padre2.porcentajes[i]
-        
-        # Calcular rango y extensión
-        min_val = min(val1, val2)
-        max_val = max(val1, val2)
-        rango = max_val - min_val
-        extension = alpha * rango
-        
-        # Calcular límites extendidos
-        limite_inferior = min_val - extension
-        limite_superior = max_val + extension
-        
-        # Aplicar restricciones de ingredientes si están disponibles
-        if ingredientes_data and i < len(ingredientes_data):
-            limites_originales = ingredientes_data[i]["limitaciones"]
-            if restricciones_usuario:
-                limites = restricciones_usuario.obtener_limites(i, limites_originales)
-            else:
-                limites = limites_originales
-            
-            # Respetar límites del ingrediente
-            limite_inferior = max(limite_inferior, limites["min"])
-            limite_superior = min(limite_superior, limites["max"])
-        
-        # Generar valor aleatorio en el rango extendido
-        if limite_inferior <= limite_superior:
-            hijo.porcentajes[i] = random.uniform(limite_inferior, limite_superior)
-        else:
-            # Si los límites se cruzan, usar el valor promedio de los padres
-            hijo.porcentajes[i] = (val1 + val2) / 2
+    indices, minimos, maximos = _soporte_cruza(padre1, padre2, ingredientes_data, restricciones_usuario)
+    val1 = padre1.porcentajes[indices]
+    val2 = padre2.porcentajes[indices]
+    
+    # Calcular rango y extensión
+    min_val = np.minimum(val1, val2)
+    max_val = np.maximum(val1, val2)
+    extension = alpha * (max_val - min_val)
+    
+    # Límites extendidos respetando los límites de cada ingrediente
+    limite_inferior = np.maximum(min_val - extension, minimos)
+    limite_superior = np.minimum(max_val + extension, maximos)
+    
+    # Valor aleatorio en el rango extendido; si los límites se cruzan, promedio de los padres
+    aleatorios = np.random.random(len(indices))
+    valores = np.where(limite_inferior <= limite_superior,
+                       limite_inferior + aleatorios * (limite_superior - limite_inferior),
+                       (val1 + val2) / 2)
+    hijo = _crear_hijo(len(padre1.porcentajes), indices, valores)
     
     # Normalizar para que sumen 1
     hijo.normalizar(ingredientes_data, restricciones_usuario)
@@ -75,14 +97,14 @@ def cruza_aritmetica(padre1, padre2, ingredientes_data=None, restricciones_usuar
     Returns:
         Individuo hijo generado
     """
-    hijo = Individuo(len(padre1.porcentajes))
+    indices, _, _ = _soporte_cruza(padre1, padre2)
     
     # Factor de mezcla aleatorio
     beta = random.random()
     
     # Combinar proporcionalmente
-    for i in range(len(padre1.porcentajes)):
-        hijo.porcentajes[i] = beta * padre1.porcentajes[i] + (1 - beta) * padre2.porcentajes[i]
+    valores = beta * padre1.porcentajes[indices] + (1 - beta) * padre2.porcentajes[indices]
+    hijo = _crear_hijo(len(padre1.porcentajes), indices, valores)
     
     # Aplicar límites si están disponibles
     if ingredientes_data:
@@ -97,7 +119,8 @@ def cruza_un_punto(padre1, padre2, ingredientes_data=None, restricciones_usuario
     """
     Cruza de un punto alternativa
     
-    Intercambia segmentos de ingredientes entre los padres.
+    Intercambia segmentos de ingredientes entre los padres. El punto de corte
+    se elige entre los genes del soporte común.
     
     Args:
         padre1: Primer padre
@@ -108,20 +131,17 @@ def cruza_un_punto(padre1, padre2, ingredientes_data=None, restricciones_usuario
     Returns:
         Individuo hijo generado
     """
-    hijo = Individuo(len(padre1.porcentajes))
+    indices, _, _ = _soporte_cruza(padre1, padre2)
     
     # Punto de corte aleatorio (evitar extremos)
-    if len(padre1.porcentajes) > 2:
-        punto = random.randint(1, len(padre1.porcentajes) - 1)
+    if len(indices) > 2:
+        punto = random.randint(1, len(indices) - 1)
     else:
         punto = 1
     
     # Combinar segmentos
-    for i in range(len(padre1.porcentajes)):
-        if i < punto:
-            hijo.porcentajes[i] = padre1.porcentajes[i]
-        else:
-            hijo.porcentajes[i] = padre2.porcentajes[i]
+    valores = np.concatenate((padre1.porcentajes[indices[:punto]], padre2.porcentajes[indices[punto:]]))
+    hijo = _crear_hijo(len(padre1.porcentajes), indices, valores)
     
     # Aplicar límites si están disponibles
     if ingredientes_data:
@@ -146,14 +166,12 @@ def cruza_uniforme(padre1, padre2, prob_intercambio=0.5, ingredientes_data=None,
     Returns:
         Individuo hijo generado
     """
-    hijo = Individuo(len(padre1.porcentajes))
+    indices, _, _ = _soporte_cruza(padre1, padre2)
     
     # Para cada gen, decidir de qué padre heredar
-    for i in range(len(padre1.porcentajes)):
-        if random.random() < prob_intercambio:
-            hijo.porcentajes[i] = padre2.porcentajes[i]
-        else:
-            hijo.porcentajes[i] = padre1.porcentajes[i]
+    intercambio = np.random.random(len(indices)) < prob_intercambio
+    valores = np.where(intercambio, padre2.porcentajes[indices], padre1.porcentajes[indices])
+    hijo = _crear_hijo(len(padre1.porcentajes), indices, valores)
     
     # Aplicar límites si están disponibles
     if ingredientes_data:
@@ -178,62 +196,32 @@ def cruza_sbx(padre1, padre2, eta=20, ingredientes_data=None, restricciones_usua
     Returns:
         Individuo hijo generado
     """
-    hijo = Individuo(len(padre1.porcentajes))
+    indices, xl, xu = _soporte_cruza(padre1, padre2, ingredientes_data, restricciones_usuario)
     
-    for i in range(len(padre1.porcentajes)):
-        # Obtener valores de los padres
-        x1 = padre1.porcentajes[i]
-        x2 = padre2.porcentajes[i]
-        
-        # Asegurar que x1 <= x2
-        if x1 > x2:
-            x1, x2 = x2, x1
-        
-        # Calcular límites
-        xl = 0.0  # límite inferior por defecto
-        xu = 1.0  # límite superior por defecto
-        
-        if ingredientes_data and i < len(ingredientes_data):
-            limites_originales = ingredientes_data[i]["limitaciones"]
-            if restricciones_usuario:
-                limites = restricciones_usuario.obtener_limites(i, limites_originales)
-            else:
-                limites = limites_originales
-            
-            xl = limites["min"]
-            xu = limites["max"]
-        
-        # Aplicar SBX
-        if abs(x2 - x1) < 1e-14:
-            # Padres idénticos
-            hijo.porcentajes[i] = x1
-        else:
-            # Calcular betas
-            if (x1 - xl) > (xu - x2):
-                beta_max = (xu - x1) / (x2 - x1)
-            else:
-                beta_max = (x1 - xl) / (x2 - x1)
-            
-            # Generar número aleatorio
-            u = random.random()
-            
-            if u <= 0.5:
-                beta = (2 * u) ** (1 / (eta + 1))
-            else:
-                beta = (1 / (2 * (1 - u))) ** (1 / (eta + 1))
-            
-            # Limitar beta
-            if beta > beta_max:
-                beta = beta_max
-            if beta < -beta_max:
-                beta = -beta_max
-            
-            # Calcular hijo
-            child_value = 0.5 * ((1 + beta) * x1 + (1 - beta) * x2)
-            
-            # Asegurar que esté dentro de límites
-            child_value = max(xl, min(xu, child_value))
-            hijo.porcentajes[i] = child_value
+    # Asegurar que x1 <= x2
+    x1 = np.minimum(padre1.porcentajes[indices], padre2.porcentajes[indices])
+    x2 = np.maximum(padre1.porcentajes[indices], padre2.porcentajes[indices])
+    
+    # Padres idénticos en un gen: el hijo hereda el valor
+    identicos = np.abs(x2 - x1) < 1e-14
+    diferencia = np.where(identicos, 1.0, x2 - x1)
+    
+    # Calcular betas
+    beta_max = np.where((x1 - xl) > (xu - x2), (xu - x1) / diferencia, (x1 - xl) / diferencia)
+    u = np.random.random(len(indices))
+    beta = np.where(u <= 0.5,
+                    (2 * u) ** (1 / (eta + 1)),
+                    (1 / (2 * (1 - u))) ** (1 / (eta + 1)))
+    
+    # Limitar beta
+    beta = np.where(beta > beta_max, beta_max, beta)
+    beta = np.where(beta < -beta_max, -beta_max, beta)
+    
+    # Calcular hijo y asegurar que esté dentro de límites
+    valores = 0.5 * ((1 + beta) * x1 + (1 - beta) * x2)
+    valores = np.maximum(xl, np.minimum(xu, valores))
+    valores = np.where(identicos, x1, valores)
+    hijo = _crear_hijo(len(padre1.porcentajes), indices, valores)
     
     # Normalizar para mantener suma = 1
     hijo.normalizar(ingredientes_data, restricciones_usuario)
@@ -375,21 +363,22 @@ def validar_hijo(hijo, ingredientes_data=None, restricciones_usuario=None):
     
     # Verificar límites de ingredientes
     if ingredientes_data:
-        for i, porcentaje in enumerate(hijo.porcentajes):
-            if i < len(ingredientes_data):
-                limites_originales = ingredientes_data[i]["limitaciones"]
-                if restricciones_usuario:
-                    limites = restricciones_usuario.obtener_limites(i, limites_originales)
-                else:
-                    limites = limites_originales
-                
-                if porcentaje < limites["min"] - 1e-6 or porcentaje > limites["max"] + 1e-6:
-                    return False
-    
-    # Verificar restricciones del usuario
+        limites = compilar_limites(ingredientes_data, restricciones_usuario)
+        n = min(len(hijo.porcentajes), len(ingredientes_data))
+        porcentajes = hijo.porcentajes[:n]
+        
+        if np.any((porcentajes < limites["minimos"][:n] - 1e-6) | (porcentajes > limites["maximos"][:n] + 1e-6)):
+            return False
+        
+        # Verificar restricciones del usuario
+        if restricciones_usuario and np.any((porcentajes > 1e-6) & ~limites["validos"][:n]):
+            return False
+    
+    # Ingredientes sin datos: validar directamente con las restricciones del usuario
     if restricciones_usuario:
-        for i, porcentaje in enumerate(hijo.porcentajes):
-            if porcentaje > 1e-6 and not restricciones_usuario.es_ingrediente_valido(i):
+        inicio = len(ingredientes_data) if ingredientes_data else 0
+        for i in range(inicio, len(hijo.porcentajes)):
+            if hijo.porcentajes[i] > 1e-6 and not restricciones_usuario.es_ingrediente_valido(i):
                 return False
     
     return True
@@ -410,10 +399,10 @@ def reparar_hijo(hijo, ingredientes_data=None, restricciones_usuario=None):
     if ingredientes_data:
         hijo.aplicar_limites(ingredientes_data, restricciones_usuario)
     
-    # Eliminar ingredientes excluidos
+    # Eliminar ingredientes excluidos (solo pueden estar activos los del soporte)
     if restricciones_usuario:
-        for i in range(len(hijo.porcentajes)):
-            if not restricciones_usuario.es_ingrediente_valido(i):
+        for i in np.flatnonzero(hijo.porcentajes):
+            if not restricciones_usuario.es_ingrediente_valido(int(i)):
                 hijo.porcentajes[i] = 0
     
     # Renormalizar
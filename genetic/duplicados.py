@@ -0,0 +1,181 @@
+"""
+Detección y eliminación de genomas duplicados por generación.
+
+El elitismo y la clonación sin cruza llenan las fases finales de copias
+exactas o casi exactas. Los genomas se cuantizan y se agrupan por su clave
+en una tabla hash (O(N) por generación), de modo que cada genoma distinto se
+evalúa una sola vez: los duplicados reutilizan la evaluación del representante
+(o de la generación anterior) o se sustituyen por inmigrantes aleatorios.
+"""
+
+import numpy as np
+
+from genetic.inicializacion import crear_individuo_aleatorio
+from genetic.paralelo import evaluar_con_evaluador
+from genetic.reduccion import evaluar_individuos_reducidos
+from genetic.cardinalidad import reparar_cardinalidad
+
+# Estrategias disponibles para los duplicados de una generación
+ESTRATEGIAS_DUPLICADOS = ("reutilizar", "reemplazar")
+
+# Resolución de cuantización por defecto (fracción de la formulación)
+RESOLUCION_DUPLICADOS = 1e-6
+
+# Atributos que se copian al reutilizar una evaluación
+_ATRIBUTOS_EVALUACION = (
+    "costo_total", "fitness", "conversion_alimenticia", "dias_peso_objetivo",
+    "disponibilidad_score", "penalizacion_restricciones"
+)
+
+
+def calcular_clave_genoma(porcentajes, resolucion=RESOLUCION_DUPLICADOS):
+    """
+    Calcula la clave hash de un genoma cuantizado
+
+    Args:
+        porcentajes: Arreglo de porcentajes del individuo
+        resolucion: Tamaño del paso de cuantización
+
+    Returns:
+        Clave (bytes) idéntica para genomas dentro del mismo paso
+    """
+    return np.round(np.asarray(porcentajes) / resolucion).astype(np.int64).tobytes()
+
+
+def agrupar_duplicados(poblacion, resolucion=RESOLUCION_DUPLICADOS):
+    """
+    Agrupa los individuos de una población por genoma cuantizado
+
+    Args:
+        poblacion: Lista de individuos
+        resolucion: Tamaño del paso de cuantización
+
+    Returns:
+        Diccionario clave -> lista de índices (el primero es el representante)
+    """
+    grupos = {}
+    for i, individuo in enumerate(poblacion):
+        grupos.setdefault(calcular_clave_genoma(individuo.porcentajes, resolucion), []).append(i)
+    return grupos
+
+
+def copiar_evaluacion(origen, destino):
+    """
+    Copia los resultados de evaluación de un individuo a otro con el mismo genoma
+
+    Args:
+        origen: Individuo ya evaluado
+        destino: Individuo que reutiliza la evaluación
+    """
+    for atributo in _ATRIBUTOS_EVALUACION:
+        setattr(destino, atributo, getattr(origen, atributo))
+    destino.propiedades_nutricionales = origen.propiedades_nutricionales.copy()
+    destino.proveedor_recomendado = {}
+    destino.delta_mutacion = None
+    
+    # Los totales lineales son la base de la evaluación delta de los hijos:
+    # solo se comparten si el genoma es idéntico, no solo igual tras cuantizar
+    if np.array_equal(origen.porcentajes, destino.porcentajes):
+        destino.totales_lineales = origen.totales_lineales
+        destino.profundidad_delta = origen.profundidad_delta
+    else:
+        destino.totales_lineales = None
+        destino.profundidad_delta = 0
+
+
+def evaluar_poblacion_sin_duplicados(poblacion, config_evaluacion, ingredientes_data,
+                                     restricciones_usuario=None, fase="inicial", generacion=0,
+                                     cache=None, estrategia="reutilizar",
+                                     resolucion=RESOLUCION_DUPLICADOS, evaluador=None,
+                                     problema_reducido=None, cardinalidad=None):
+    """
+    Evalúa una población evaluando una sola vez cada genoma distinto
+
+    Args:
+        poblacion: Lista de individuos (se modifica en el lugar si se reemplazan duplicados)
+        config_evaluacion: Configuración para evaluación
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario
+        fase: Fase actual del algoritmo
+        generacion: Generación actual
+        cache: Diccionario de evaluaciones de la generación anterior (se actualiza)
+        estrategia: "reutilizar" la evaluación o "reemplazar" los duplicados por inmigrantes
+        resolucion: Tamaño del paso de cuantización
+        evaluador: EvaluadorParalelo para evaluar en varios procesos (opcional)
+        problema_reducido: Problema de construir_problema_reducido si los genomas son reducidos
+        cardinalidad: Datos de construir_cardinalidad para reparar los inmigrantes (opcional)
+
+    Returns:
+        Diccionario con el conteo de duplicados, reutilizados, inmigrantes y evaluados
+    """
+    if estrategia not in ESTRATEGIAS_DUPLICADOS:
+        print(f"⚠️ Estrategia de duplicados desconocida '{estrategia}', usando 'reutilizar'")
+        estrategia = "reutilizar"
+
+    # Las evaluaciones de otra fase usan otros pesos y no son reutilizables
+    evaluaciones_previas = {}
+    if cache is not None and cache.get("fase") == fase:
+        evaluaciones_previas = cache.get("evaluaciones", {})
+
+    grupos = agrupar_duplicados(poblacion, resolucion)
+    
+    # Los inmigrantes se crean en el mismo espacio que los genomas
+    if problema_reducido is not None:
+        ingredientes_genoma, restricciones_genoma = problema_reducido["ingredientes"], None
+    else:
+        ingredientes_genoma, restricciones_genoma = ingredientes_data, restricciones_usuario
+
+    a_evaluar = []
+    reutilizados = 0
+    inmigrantes = 0
+    duplicados = len(poblacion) - len(grupos)
+
+    for clave, indices in grupos.items():
+        representante = poblacion[indices[0]]
+        previo = evaluaciones_previas.get(clave)
+
+        if previo is not None:
+            copiar_evaluacion(previo, representante)
+            reutilizados += 1
+        else:
+            a_evaluar.append(representante)
+
+        if estrategia == "reemplazar":
+            # Sustituir las copias por individuos nuevos para recuperar diversidad
+            for i in indices[1:]:
+                inmigrante = crear_individuo_aleatorio(len(representante.porcentajes),
+                                                       ingredientes_genoma, restricciones_genoma)
+                if cardinalidad is not None:
+                    reparar_cardinalidad(inmigrante, cardinalidad, ingredientes_genoma, restricciones_genoma)
+                poblacion[i] = inmigrante
+                a_evaluar.append(inmigrante)
+                inmigrantes += 1
+
+    if problema_reducido is not None:
+        evaluar_individuos_reducidos(a_evaluar, problema_reducido, config_evaluacion, ingredientes_data,
+                                     restricciones_usuario, fase, generacion, evaluador)
+    else:
+        evaluar_con_evaluador(a_evaluar, config_evaluacion, ingredientes_data,
+                              restricciones_usuario, fase, generacion, evaluador)
+
+    nuevas_evaluaciones = {}
+    for clave, indices in grupos.items():
+        representante = poblacion[indices[0]]
+        nuevas_evaluaciones[clave] = representante
+
+        if estrategia == "reutilizar":
+            for i in indices[1:]:
+                copiar_evaluacion(representante, poblacion[i])
+                reutilizados += 1
+
+    if cache is not None:
+        cache["fase"] = fase
+        cache["evaluaciones"] = nuevas_evaluaciones
+
+    return {
+        "duplicados": duplicados,
+        "genomas_unicos": len(grupos),
+        "reutilizados": reutilizados,
+        "inmigrantes": inmigrantes,
+        "evaluados": len(a_evaluar)
+    }
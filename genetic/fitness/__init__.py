@@ -1,18 +1,21 @@
 # Importaciones principales (solo las que se usan externamente)
-from .agregacion import calcular_fitness, evaluar_poblacion
+from .agregacion import calcular_fitness, evaluar_poblacion, enriquecer_individuo, enriquecer_individuos
 
 # Importaciones individuales solo si se necesitan por separado
 from .nutricion import calcular_discrepancia_nutricional, calcular_propiedades_nutricionales
-from .costo import calcular_costo_total, seleccionar_proveedor_optimo
+from .costo import calcular_costo_total, seleccionar_proveedor_optimo, construir_proveedores_recomendados
 from .eficiencia import estimar_eficiencia_alimenticia, obtener_conversion_base
 from .disponibilidad import calcular_disponibilidad_local, evaluar_disponibilidad_ingrediente
 from .tiempo import estimar_tiempo_peso_objetivo, calcular_ganancia_diaria
 from .restricciones import verificar_restricciones, es_formulacion_factible
+from .simulacion import simular_crecimiento, calcular_factores_formulacion
 
 __all__ = [
     # Funciones principales (las más usadas)
     'calcular_fitness',
     'evaluar_poblacion',
+    'enriquecer_individuo',
+    'enriquecer_individuos',
     
     # Configuración de objetivos
     'OBJETIVOS',
@@ -24,6 +27,7 @@ __all__ = [
     'calcular_propiedades_nutricionales',
     'calcular_costo_total',
     'seleccionar_proveedor_optimo',
+    'construir_proveedores_recomendados',
     'estimar_eficiencia_alimenticia',
     'obtener_conversion_base',
     'calcular_disponibilidad_local',
@@ -31,5 +35,7 @@ __all__ = [
     'estimar_tiempo_peso_objetivo',
     'calcular_ganancia_diaria',
     'verificar_restricciones',
-    'es_formulacion_factible'
+    'es_formulacion_factible',
+    'simular_crecimiento',
+    'calcular_factores_formulacion'
 ]
\ No newline at end of file
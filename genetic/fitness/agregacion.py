@@ -1,10 +1,11 @@
-from genetic.fitness.nutricion import calcular_discrepancia_nutricional
-from genetic.fitness.costo import calcular_costo_total
+from genetic.fitness.nutricion import calcular_discrepancia_desde_propiedades, calcular_propiedades_nutricionales
+from genetic.fitness.costo import construir_proveedores_recomendados
 from genetic.fitness.eficiencia import estimar_eficiencia_alimenticia
-from genetic.fitness.disponibilidad import calcular_disponibilidad_local
+from genetic.fitness.incremental import obtener_modelo_lineal, calcular_totales_lineales, aplicar_totales_lineales
 from genetic.fitness.tiempo import estimar_tiempo_peso_objetivo
 from genetic.fitness.restricciones import verificar_restricciones
 from conocimiento.requerimientos import obtener_etapa
+from genetic.instrumentacion import medir
 
 def calcular_fitness(individuo, config_evaluacion, ingredientes_data, restricciones_usuario=None):
   
@@ -20,40 +21,50 @@ def calcular_fitness(individuo, config_evaluacion, ingredientes_data, restriccio
     
     componentes = {}
     
+    # Componentes lineales (nutrientes, costo, disponibilidad): incrementales tras una mutación
+    with medir("fitness.lineal"):
+        modelo_lineal = obtener_modelo_lineal(ingredientes_data, restricciones_usuario)
+        totales = calcular_totales_lineales(individuo, modelo_lineal)
+        aplicar_totales_lineales(individuo, totales)
+    
     # 1. Discrepancia nutricional (PRIORIDAD ALTA)
-    componentes["discrepancia_nutricional"] = calcular_discrepancia_nutricional(
-        individuo, etapa, ingredientes_data
-    )
+    with medir("fitness.nutricion"):
+        componentes["discrepancia_nutricional"] = calcular_discrepancia_desde_propiedades(
+            individuo.propiedades_nutricionales, etapa
+        )
     
-    # 2. Costo total
-    componentes["costo"] = calcular_costo_total(
-        individuo, ingredientes_data, restricciones_usuario
-    )
+    # 2. Costo total (los proveedores recomendados se construyen en enriquecer_individuo)
+    componentes["costo"] = individuo.costo_total
+    if individuo.proveedor_recomendado:
+        individuo.proveedor_recomendado = {}
     
     # 3. Eficiencia alimenticia
-    componentes["eficiencia"] = estimar_eficiencia_alimenticia(
-        individuo, raza, edad_dias, ingredientes_data
-    )
+    with medir("fitness.eficiencia"):
+        componentes["eficiencia"] = estimar_eficiencia_alimenticia(
+            individuo, raza, edad_dias, ingredientes_data, componentes["discrepancia_nutricional"]
+        )
     
     # 4. Disponibilidad local
-    componentes["disponibilidad"] = calcular_disponibilidad_local(
-        individuo, ingredientes_data
-    )
+    componentes["disponibilidad"] = individuo.disponibilidad_score
     
     # 5. Tiempo hasta peso objetivo
-    componentes["tiempo"] = estimar_tiempo_peso_objetivo(
-        individuo, peso_actual, peso_objetivo, raza, edad_dias, ingredientes_data
-    )
+    with medir("fitness.tiempo"):
+        componentes["tiempo"] = estimar_tiempo_peso_objetivo(
+            individuo, peso_actual, peso_objetivo, raza, edad_dias, ingredientes_data,
+            componentes["discrepancia_nutricional"], componentes["eficiencia"]
+        )
     
     # 6. Penalización por restricciones
-    componentes["restricciones"] = verificar_restricciones(
-        individuo, ingredientes_data, restricciones_usuario
-    )
-    
-    componentes_normalizados = normalizar_objetivos_mejorado(componentes)
+    with medir("fitness.restricciones"):
+        componentes["restricciones"] = verificar_restricciones(
+            individuo, ingredientes_data, restricciones_usuario
+        )
     
-    # Aplicar ponderaciones
-    fitness = calcular_fitness_ponderado(componentes_normalizados, pesos)
+    with medir("fitness.agregacion"):
+        componentes_normalizados = normalizar_objetivos_mejorado(componentes)
+        
+        # Aplicar ponderaciones
+        fitness = calcular_fitness_ponderado(componentes_normalizados, pesos)
     
     # Almacenar en el individuo
     individuo.fitness = fitness
@@ -213,6 +224,46 @@ def evaluar_poblacion(poblacion, config_evaluacion, ingredientes_data,
     # Ordenar por fitness (menor es mejor)
     poblacion.sort(key=lambda ind: ind.fitness)
 
+def enriquecer_individuo(individuo, ingredientes_data, restricciones_usuario=None):
+    """
+    Completa los campos de reporte de un individuo ya evaluado.
+    
+    La evaluación del ciclo evolutivo solo calcula los objetivos escalares;
+    la asignación de proveedores y el perfil nutricional detallado se
+    construyen aquí, solo para los individuos que se muestran o exportan.
+    
+    Args:
+        individuo: Individuo evaluado
+        ingredientes_data: Datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (opcional)
+        
+    Returns:
+        El mismo individuo, enriquecido
+    """
+    if not individuo.propiedades_nutricionales:
+        calcular_propiedades_nutricionales(individuo, ingredientes_data)
+    
+    construir_proveedores_recomendados(individuo, ingredientes_data, restricciones_usuario)
+    
+    return individuo
+
+def enriquecer_individuos(individuos, ingredientes_data, restricciones_usuario=None):
+    """
+    Enriquece una lista de individuos para reportes
+    
+    Args:
+        individuos: Lista de individuos evaluados
+        ingredientes_data: Datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (opcional)
+        
+    Returns:
+        La misma lista de individuos
+    """
+    for individuo in individuos:
+        enriquecer_individuo(individuo, ingredientes_data, restricciones_usuario)
+    
+    return individuos
+
 def detectar_convergencia(historico_fitness, ventana=25, tolerancia=5e-5):
     """
     Detecta si el algoritmo ha convergido (MEJORADO)
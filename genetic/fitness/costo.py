@@ -5,7 +5,7 @@ Evalúa el costo por kilogramo de la formulación
 considerando precios de diferentes proveedores.
 """
 
-from conocimiento.proveedores import obtener_proveedor_mas_economico, obtener_proveedor
+from conocimiento.proveedores import resolver_proveedores, obtener_proveedor
 
 def calcular_costo_total(individuo, ingredientes_data, restricciones_usuario=None):
     """
@@ -25,42 +25,46 @@ def calcular_costo_total(individuo, ingredientes_data, restricciones_usuario=Non
     Returns:
         Costo total por kilogramo
     """
-    costo_total = 0
+    proveedor_recomendado = construir_proveedores_recomendados(individuo, ingredientes_data, restricciones_usuario)
+    costo_total = sum(individuo.porcentajes[i] * info["precio"] for i, info in proveedor_recomendado.items())
+    
+    # Actualizar propiedades del individuo
+    individuo.costo_total = costo_total
+    
+    return costo_total
+
+def construir_proveedores_recomendados(individuo, ingredientes_data, restricciones_usuario=None):
+    """
+    Construye la asignación de proveedores de cada ingrediente para reportes.
+    
+    No forma parte de la evaluación en el ciclo evolutivo (el costo se obtiene
+    del modelo lineal); solo se usa al enriquecer los individuos que se muestran
+    o exportan.
+    
+    Args:
+        individuo: Objeto individuo con porcentajes
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Objeto con restricciones del usuario (opcional)
+        
+    Returns:
+        Diccionario índice -> proveedor, precio, ingrediente y porcentaje
+    """
+    resolucion = resolver_proveedores(ingredientes_data, restricciones_usuario)
     proveedor_recomendado = {}
     
     for i, porcentaje in enumerate(individuo.porcentajes):
-        if porcentaje > 0 and i < len(ingredientes_data):
-            ingrediente = ingredientes_data[i]
-            precios = ingrediente["precios"]
-            
-            # Aplicar preferencias de proveedor si existen
-            precios_ajustados = precios.copy()
-            if restricciones_usuario and restricciones_usuario.preferencias_proveedor:
-                for proveedor_clave, factor in restricciones_usuario.preferencias_proveedor.items():
-                    if proveedor_clave in precios_ajustados:
-                        precios_ajustados[proveedor_clave] *= factor
-            
-            # Encontrar el proveedor más económico
-            proveedor_mas_economico, precio_minimo = obtener_proveedor_mas_economico(precios_ajustados)
-            
-            if proveedor_mas_economico and precio_minimo:
-                # Si se aplicó factor de preferencia, usar el precio original
-                precio_real = precios[proveedor_mas_economico]
-                costo_total += porcentaje * precio_real
-                
-                # Guardar el proveedor recomendado
-                proveedor_recomendado[i] = {
-                    "proveedor": proveedor_mas_economico,
-                    "precio": precio_real,
-                    "ingrediente": ingrediente["nombre"],
-                    "porcentaje": porcentaje * 100
-                }
+        if porcentaje > 0 and i < len(ingredientes_data) and resolucion["proveedores"][i]:
+            # Proveedor elegido con el precio efectivo; se reporta el precio real
+            proveedor_recomendado[i] = {
+                "proveedor": resolucion["proveedores"][i],
+                "precio": float(resolucion["precios"][i]),
+                "ingrediente": ingredientes_data[i]["nombre"],
+                "porcentaje": porcentaje * 100
+            }
     
-    # Actualizar propiedades del individuo
-    individuo.costo_total = costo_total
     individuo.proveedor_recomendado = proveedor_recomendado
     
-    return costo_total
+    return proveedor_recomendado
 
 def seleccionar_proveedor_optimo(ingrediente_id, ingredientes_data, restricciones_usuario=None):
     """
@@ -77,21 +81,11 @@ def seleccionar_proveedor_optimo(ingrediente_id, ingredientes_data, restriccione
     if ingrediente_id >= len(ingredientes_data):
         return None, None, None
     
-    ingrediente = ingredientes_data[ingrediente_id]
-    precios = ingrediente["precios"]
-    
-    # Aplicar preferencias de proveedor si existen
-    precios_ajustados = precios.copy()
-    if restricciones_usuario and restricciones_usuario.preferencias_proveedor:
-        for proveedor_clave, factor in restricciones_usuario.preferencias_proveedor.items():
-            if proveedor_clave in precios_ajustados:
-                precios_ajustados[proveedor_clave] *= factor
-    
-    # Encontrar el proveedor más económico
-    proveedor_clave, _ = obtener_proveedor_mas_economico(precios_ajustados)
+    resolucion = resolver_proveedores(ingredientes_data, restricciones_usuario)
+    proveedor_clave = resolucion["proveedores"][ingrediente_id]
     
     if proveedor_clave:
-        precio_real = precios[proveedor_clave]
+        precio_real = float(resolucion["precios"][ingrediente_id])
         proveedor_info = obtener_proveedor(proveedor_clave)
         nombre_proveedor = proveedor_info["nombre"] if proveedor_info else proveedor_clave
         
@@ -221,6 +215,7 @@ def calcular_costo_total_produccion(individuo, cantidad_pollos, peso_actual, pes
         Diccionario con costos totales de producción
     """
     from conocimiento.razas import estimar_dias_hasta_peso
+    from genetic.fitness.simulacion import calcular_consumo_periodo
     
     # Estimar días hasta peso objetivo
     dias_hasta_objetivo = estimar_dias_hasta_peso(peso_actual, peso_objetivo, raza, edad_dias)
@@ -228,25 +223,8 @@ def calcular_costo_total_produccion(individuo, cantidad_pollos, peso_actual, pes
     if not dias_hasta_objetivo:
         return {"error": "No se pudo estimar el tiempo hasta peso objetivo"}
     
-    # Estimar consumo diario por ave según edad (datos aproximados)
-    consumo_total_kg = 0
-    for dia_offset in range(dias_hasta_objetivo + 1):
-        edad_dia = edad_dias + dia_offset
-        
-        if edad_dia <= 7:
-            consumo_diario_g = 20
-        elif edad_dia <= 14:
-            consumo_diario_g = 45
-        elif edad_dia <= 21:
-            consumo_diario_g = 80
-        elif edad_dia <= 28:
-            consumo_diario_g = 115
-        elif edad_dia <= 35:
-            consumo_diario_g = 150
-        else:
-            consumo_diario_g = 180
-        
-        consumo_total_kg += (consumo_diario_g / 1000) * cantidad_pollos
+    # Consumo acumulado de la parvada según edad (datos aproximados)
+    consumo_total_kg = calcular_consumo_periodo(edad_dias, dias_hasta_objetivo + 1, cantidad_pollos)
     
     # Calcular costos
     costo_por_kg = individuo.costo_total
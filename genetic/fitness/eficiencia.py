@@ -5,10 +5,13 @@ Estima la conversión alimenticia (kg alimento/kg ganancia)
 basada en la calidad nutricional de la formulación.
 """
 
-from conocimiento.razas import obtener_conversion_alimenticia
+import numpy as np
+
+from conocimiento.razas import obtener_conversion_alimenticia, obtener_consumo_diario
 from genetic.fitness.nutricion import calcular_discrepancia_nutricional, obtener_etapa
+from genetic.fitness.simulacion import simular_crecimiento
 
-def estimar_eficiencia_alimenticia(individuo, raza, edad_dias, ingredientes_data):
+def estimar_eficiencia_alimenticia(individuo, raza, edad_dias, ingredientes_data, discrepancia=None):
     """
     Estima la eficiencia de conversión alimenticia.
     
@@ -22,6 +25,7 @@ def estimar_eficiencia_alimenticia(individuo, raza, edad_dias, ingredientes_data
         raza: Nombre de la raza
         edad_dias: Edad actual en días
         ingredientes_data: Lista de datos de ingredientes
+        discrepancia: Discrepancia nutricional ya calculada para la etapa (opcional)
         
     Returns:
         Conversión alimenticia estimada (kg alimento/kg ganancia)
@@ -36,7 +40,8 @@ def estimar_eficiencia_alimenticia(individuo, raza, edad_dias, ingredientes_data
     etapa = obtener_etapa(edad_dias)
     
     # Calcular discrepancia nutricional
-    discrepancia = calcular_discrepancia_nutricional(individuo, etapa, ingredientes_data)
+    if discrepancia is None:
+        discrepancia = calcular_discrepancia_nutricional(individuo, etapa, ingredientes_data)
     
     # Ajustar según balance nutricional
     # Una formulación con balance perfecto mantiene la conversión base
@@ -138,8 +143,10 @@ def calcular_factor_digestibilidad(individuo, ingredientes_data):
     digestibilidad_promedio = 0
     peso_total = 0
     
-    for i, porcentaje in enumerate(individuo.porcentajes):
-        if porcentaje > 0 and i < len(ingredientes_data):
+    # Solo se recorren los ingredientes activos (O(k) en fórmulas dispersas)
+    for i in np.flatnonzero(individuo.porcentajes > 0):
+        if i < len(ingredientes_data):
+            porcentaje = individuo.porcentajes[i]
             nombre_ingrediente = ingredientes_data[i]["nombre"]
             factor = factores_digestibilidad.get(nombre_ingrediente, 0.85)  # Valor por defecto
             
@@ -205,18 +212,7 @@ def estimar_ganancia_peso_diaria(individuo, raza, edad_dias, ingredientes_data):
         Ganancia de peso diaria estimada en gramos
     """
     # Estimar consumo diario según edad
-    if edad_dias <= 7:
-        consumo_diario_g = 20
-    elif edad_dias <= 14:
-        consumo_diario_g = 45
-    elif edad_dias <= 21:
-        consumo_diario_g = 80
-    elif edad_dias <= 28:
-        consumo_diario_g = 115
-    elif edad_dias <= 35:
-        consumo_diario_g = 150
-    else:
-        consumo_diario_g = 180
+    consumo_diario_g = obtener_consumo_diario(edad_dias) * 1000
     
     # Obtener conversión alimenticia
     conversion = estimar_eficiencia_alimenticia(individuo, raza, edad_dias, ingredientes_data)
@@ -243,52 +239,35 @@ def proyectar_rendimiento_periodo(individuo, raza, edad_inicial, dias_periodo, i
     Returns:
         Diccionario con proyección de rendimiento
     """
+    simulacion = simular_crecimiento(individuo, raza, edad_inicial, dias_periodo, ingredientes_data)
+    
+    consumo_g = simulacion["consumo_g"]
+    ganancia_g = simulacion["ganancia_g"][0]
+    conversiones = simulacion["conversion"][0]
+    
     proyeccion = {
-        "consumo_total": 0,
-        "ganancia_total": 0,
+        "consumo_total": float(np.sum(consumo_g)),
+        "ganancia_total": float(np.sum(ganancia_g)),
         "conversion_promedio": 0,
-        "detalle_diario": []
+        "detalle_diario": [
+            {
+                "dia": dia + 1,
+                "edad": int(edad),
+                "consumo_g": float(consumo_g[dia]),
+                "ganancia_g": float(ganancia_g[dia]),
+                "conversion": float(conversiones[dia])
+            }
+            for dia, edad in enumerate(simulacion["edades"])
+        ]
     }
     
-    conversiones_diarias = []
-    
-    for dia in range(dias_periodo):
-        edad_dia = edad_inicial + dia
-        
-        # Estimar consumo diario
-        if edad_dia <= 7:
-            consumo_g = 20
-        elif edad_dia <= 14:
-            consumo_g = 45
-        elif edad_dia <= 21:
-            consumo_g = 80
-        elif edad_dia <= 28:
-            consumo_g = 115
-        elif edad_dia <= 35:
-            consumo_g = 150
-        else:
-            consumo_g = 180
-        
-        # Calcular conversión para esta edad
-        conversion = estimar_eficiencia_alimenticia(individuo, raza, edad_dia, ingredientes_data)
-        ganancia_g = consumo_g / conversion if conversion > 0 else 0
-        
-        proyeccion["consumo_total"] += consumo_g
-        proyeccion["ganancia_total"] += ganancia_g
-        conversiones_diarias.append(conversion)
-        
-        proyeccion["detalle_diario"].append({
-            "dia": dia + 1,
-            "edad": edad_dia,
-            "consumo_g": consumo_g,
-            "ganancia_g": ganancia_g,
-            "conversion": conversion
-        })
+    if dias_periodo > 0:
+        individuo.conversion_alimenticia = float(conversiones[-1])
     
     # Calcular conversión promedio ponderada
     if proyeccion["ganancia_total"] > 0:
         proyeccion["conversion_promedio"] = proyeccion["consumo_total"] / proyeccion["ganancia_total"]
     else:
-        proyeccion["conversion_promedio"] = max(conversiones_diarias) if conversiones_diarias else 2.0
+        proyeccion["conversion_promedio"] = float(np.max(conversiones)) if dias_periodo > 0 else 2.0
     
-    return proyeccion
\ No newline at end of file
+    return proyeccion
@@ -0,0 +1,212 @@
+"""
+Evaluación incremental (delta) de los componentes lineales del fitness.
+
+Los nutrientes, el costo y la disponibilidad son lineales en el genoma, de modo
+que se pueden expresar como totales T = C @ x sobre una matriz compilada C
+(componentes x ingredientes). Cuando una mutación solo cambia unos pocos genes
+y después normaliza (escala los ingredientes variables), los totales del hijo
+se obtienen de los del padre con una corrección de costo O(genes cambiados).
+"""
+
+import numpy as np
+
+from conocimiento.cache_listas import CachePorLista
+from conocimiento.proveedores import resolver_proveedores, obtener_version_precios
+from conocimiento.restricciones_usuario import compilar_limites
+from genetic.individuo import obtener_soporte_disperso
+
+# Nutrientes que forman parte del perfil nutricional (mismo orden que nutricion.py)
+NUTRIENTES_LINEALES = ["proteina", "energia", "lisina", "metionina", "calcio", "fosforo", "fibra"]
+
+# Filas adicionales de la matriz lineal
+FILA_COSTO = len(NUTRIENTES_LINEALES)
+FILA_DIFICULTAD = FILA_COSTO + 1
+FILA_SUMA = FILA_COSTO + 2
+
+# Número máximo de actualizaciones delta encadenadas antes de recalcular desde cero
+MAX_PROFUNDIDAD_DELTA = 50
+
+# Modelos compilados sin restricciones de usuario, por lista de ingredientes y versión de precios
+_MODELOS_LINEALES = CachePorLista()
+
+
+def _version_modelo(restricciones_usuario):
+    """Versión de los precios y de las restricciones con la que se compila un modelo"""
+    return (obtener_version_precios(), getattr(restricciones_usuario, "version", 0))
+
+
+def obtener_modelo_lineal(ingredientes_data, restricciones_usuario=None):
+    """
+    Obtiene (compilando si es necesario) la matriz de componentes lineales
+
+    Sin restricciones el modelo se cachea por lista de ingredientes (ver
+    conocimiento.cache_listas); con restricciones se cachea en el propio
+    objeto y se recompila cuando cambia la lista, su versión (límites,
+    exclusiones o preferencias) o la de los precios.
+
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (preferencias y límites)
+
+    Returns:
+        Diccionario con la matriz, los índices fijos y sus sumas precalculadas
+    """
+    version = _version_modelo(restricciones_usuario)
+
+    if restricciones_usuario is None:
+        modelo = _MODELOS_LINEALES.obtener(ingredientes_data, version)
+        if modelo is None:
+            modelo = compilar_modelo_lineal(ingredientes_data)
+            _MODELOS_LINEALES.guardar(ingredientes_data, modelo, version)
+        return modelo
+
+    # La entrada guarda la lista: se compara por identidad, no por id()
+    cache = getattr(restricciones_usuario, "_modelo_lineal", None)
+    if cache is None or cache[0] != version or cache[1] is not ingredientes_data:
+        cache = (version, ingredientes_data, compilar_modelo_lineal(ingredientes_data, restricciones_usuario))
+        restricciones_usuario._modelo_lineal = cache
+    return cache[2]
+
+
+def registrar_modelo_lineal(ingredientes_data, modelo, restricciones_usuario=None):
+    """
+    Registra un modelo ya compilado (por ejemplo, vistas de memoria compartida)
+    para que obtener_modelo_lineal lo use sin recompilarlo
+
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        modelo: Diccionario con matriz, indices_fijos y suma_variables
+        restricciones_usuario: Restricciones del usuario (opcional)
+    """
+    version = _version_modelo(restricciones_usuario)
+    if restricciones_usuario is None:
+        _MODELOS_LINEALES.guardar(ingredientes_data, modelo, version)
+    else:
+        restricciones_usuario._modelo_lineal = (version, ingredientes_data, modelo)
+
+
+def compilar_modelo_lineal(ingredientes_data, restricciones_usuario=None):
+    """
+    Compila la matriz de contribuciones lineales por ingrediente
+
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (preferencias y límites)
+
+    Returns:
+        Diccionario del modelo lineal
+    """
+    num_ingredientes = len(ingredientes_data)
+    matriz = np.zeros((FILA_SUMA + 1, num_ingredientes))
+
+    for i, ingrediente in enumerate(ingredientes_data):
+        nutrientes = ingrediente.get("nutrientes", {})
+        for n, nutriente in enumerate(NUTRIENTES_LINEALES):
+            matriz[n, i] = nutrientes.get(nutriente, 0)
+
+        matriz[FILA_DIFICULTAD, i] = 1 - ingrediente.get("disponibilidadLocal", 0.5)
+        matriz[FILA_SUMA, i] = 1.0
+
+    # Precio real del proveedor más económico (con preferencias) de cada ingrediente
+    matriz[FILA_COSTO, :] = resolver_proveedores(ingredientes_data, restricciones_usuario)["precios"]
+
+    # Ingredientes fijos con el mismo criterio que Individuo.normalizar
+    indices_fijos = np.flatnonzero(compilar_limites(ingredientes_data, restricciones_usuario)["fijos"])
+
+    return {
+        "matriz": matriz,
+        "indices_fijos": indices_fijos,
+        "suma_variables": matriz.sum(axis=1) - matriz[:, indices_fijos].sum(axis=1)
+    }
+
+
+def registrar_delta_mutacion(resultado, padre, cambios, factor_normalizacion, desplazamiento=0.0):
+    """
+    Registra en un hijo mutado la información necesaria para la evaluación delta
+
+    Args:
+        resultado: Individuo hijo (ya normalizado)
+        padre: Individuo del que se clonó el hijo
+        cambios: Lista de tuplas (indice, cambio) aplicadas antes de normalizar
+        factor_normalizacion: Factor devuelto por Individuo.normalizar (None si no fue un escalado)
+        desplazamiento: Cambio uniforme aplicado al resto de ingredientes variables
+    """
+    totales_padre = getattr(padre, "totales_lineales", None)
+
+    if totales_padre is None or factor_normalizacion is None:
+        resultado.delta_mutacion = None
+        return
+
+    resultado.delta_mutacion = {
+        "totales_padre": totales_padre,
+        "profundidad": getattr(padre, "profundidad_delta", 0) + 1,
+        "cambios": cambios,
+        "desplazamiento": desplazamiento,
+        "factor": factor_normalizacion
+    }
+
+
+def calcular_totales_lineales(individuo, modelo):
+    """
+    Calcula los totales lineales de un individuo, de forma incremental si es posible
+
+    Args:
+        individuo: Individuo a evaluar
+        modelo: Modelo lineal de obtener_modelo_lineal
+
+    Returns:
+        Arreglo con los totales (nutrientes, costo, dificultad, suma)
+    """
+    matriz = modelo["matriz"]
+    delta = getattr(individuo, "delta_mutacion", None)
+    individuo.delta_mutacion = None
+
+    if delta is None or delta["profundidad"] > MAX_PROFUNDIDAD_DELTA:
+        activos = obtener_soporte_disperso(individuo.porcentajes)
+        if activos is not None:
+            # Fórmula dispersa: producto solo con las columnas activas
+            totales = matriz[:, activos] @ individuo.porcentajes[activos]
+        else:
+            totales = matriz @ individuo.porcentajes
+        individuo.profundidad_delta = 0
+    else:
+        fijos = modelo["indices_fijos"]
+        # Los ingredientes fijos no cambian con la mutación ni con la normalización
+        totales_fijos = matriz[:, fijos] @ individuo.porcentajes[fijos]
+        totales_variables = delta["totales_padre"] - totales_fijos
+
+        if delta["desplazamiento"]:
+            # Desplazamiento uniforme sobre los variables no mutados
+            columnas_otras = modelo["suma_variables"].copy()
+            if delta["cambios"]:
+                columnas_otras -= matriz[:, [indice for indice, _ in delta["cambios"]]].sum(axis=1)
+            totales_variables = totales_variables + delta["desplazamiento"] * columnas_otras
+
+        if delta["cambios"]:
+            # Producto disperso: O(genes cambiados) columnas de la matriz
+            indices = [indice for indice, _ in delta["cambios"]]
+            cambios = np.array([cambio for _, cambio in delta["cambios"]])
+            totales_variables = totales_variables + matriz[:, indices] @ cambios
+
+        totales = totales_fijos + delta["factor"] * totales_variables
+        individuo.profundidad_delta = delta["profundidad"]
+
+    individuo.totales_lineales = totales
+    return totales
+
+
+def aplicar_totales_lineales(individuo, totales):
+    """
+    Actualiza propiedades nutricionales, costo y disponibilidad del individuo
+
+    Args:
+        individuo: Individuo evaluado
+        totales: Totales de calcular_totales_lineales
+    """
+    individuo.propiedades_nutricionales = {
+        nutriente: float(totales[n]) for n, nutriente in enumerate(NUTRIENTES_LINEALES)
+    }
+    individuo.costo_total = float(totales[FILA_COSTO])
+
+    suma = totales[FILA_SUMA]
+    individuo.disponibilidad_score = float(totales[FILA_DIFICULTAD] / suma) if suma > 0 else 0.0
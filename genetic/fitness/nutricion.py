@@ -78,8 +78,21 @@ def calcular_discrepancia_nutricional(individuo, etapa, ingredientes_data):
         Valor de discrepancia nutricional (menor es mejor)
     """
     # Calcular propiedades nutricionales primero
-    calcular_propiedades_nutricionales(individuo, ingredientes_data)
+    propiedades = calcular_propiedades_nutricionales(individuo, ingredientes_data)
+    
+    return calcular_discrepancia_desde_propiedades(propiedades, etapa)
+
+def calcular_discrepancia_desde_propiedades(propiedades, etapa):
+    """
+    Calcula la discrepancia nutricional a partir de un perfil ya calculado
     
+    Args:
+        propiedades: Diccionario con propiedades nutricionales de la formulación
+        etapa: Etapa de crecimiento ("iniciacion", "crecimiento", "finalizacion")
+        
+    Returns:
+        Valor de discrepancia nutricional (menor es mejor)
+    """
     discrepancia_total = 0
     num_nutrientes = 0
     requerimientos = REQUERIMIENTOS_NUTRICIONALES.get(etapa, {})
@@ -88,8 +101,8 @@ def calcular_discrepancia_nutricional(individuo, etapa, ingredientes_data):
         return 100  # Penalización alta si no hay requerimientos definidos
     
     for nutriente, valor_referencia in requerimientos.items():
-        if nutriente in individuo.propiedades_nutricionales:
-            valor_obtenido = individuo.propiedades_nutricionales[nutriente]
+        if nutriente in propiedades:
+            valor_obtenido = propiedades[nutriente]
             
             # Diferentes tipos de nutrientes tienen diferentes modos de evaluación
             if nutriente == "fibra":
@@ -5,6 +5,10 @@ Evalúa si la formulación cumple con todas las restricciones
 y calcula penalizaciones para violaciones.
 """
 
+import numpy as np
+
+from conocimiento.restricciones_usuario import compilar_limites
+
 def verificar_restricciones(individuo, ingredientes_data, restricciones_usuario=None):
     """
     Verifica si la formulación cumple con todas las restricciones.
@@ -58,29 +62,14 @@ def verificar_limites_ingredientes(individuo, ingredientes_data, restricciones_u
     Returns:
         Penalización por violación de límites
     """
-    penalizacion = 0
+    limites = compilar_limites(ingredientes_data, restricciones_usuario)
+    n = min(len(individuo.porcentajes), len(ingredientes_data))
+    porcentajes = individuo.porcentajes[:n]
     
-    for i, porcentaje in enumerate(individuo.porcentajes):
-        if i >= len(ingredientes_data):
-            continue
-        
-        # Obtener límites efectivos
-        limites_originales = ingredientes_data[i]["limitaciones"]
-        if restricciones_usuario:
-            limites = restricciones_usuario.obtener_limites(i, limites_originales)
-        else:
-            limites = limites_originales
-        
-        min_val = limites["min"]
-        max_val = limites["max"]
-        
-        # Penalizar violaciones de límites
-        if porcentaje < min_val:
-            violacion = min_val - porcentaje
-            penalizacion += 100 * violacion  # Penalización alta por déficit
-        elif porcentaje > max_val:
-            violacion = porcentaje - max_val
-            penalizacion += 100 * violacion  # Penalización alta por exceso
+    # Penalización alta por déficit o exceso respecto a los límites
+    deficit = np.maximum(limites["minimos"][:n] - porcentajes, 0)
+    exceso = np.maximum(porcentajes - limites["maximos"][:n], 0)
+    penalizacion = 100 * float(np.sum(deficit) + np.sum(exceso))
     
     return penalizacion
 
@@ -115,13 +104,16 @@ def verificar_exclusiones_usuario(individuo, ingredientes_data, restricciones_us
     Returns:
         Penalización por uso de ingredientes excluidos
     """
-    penalizacion = 0
+    validos = restricciones_usuario.compilar(ingredientes_data)["validos"]
+    n = min(len(individuo.porcentajes), len(validos))
+    porcentajes = individuo.porcentajes[:n]
     
-    for i, porcentaje in enumerate(individuo.porcentajes):
-        if porcentaje > 1e-6:  # Ingrediente con uso significativo
-            if not restricciones_usuario.es_ingrediente_valido(i):
-                # Penalización severa por usar ingrediente excluido
-                penalizacion += 500 * porcentaje
+    # Penalización severa por usar ingredientes excluidos con uso significativo
+    penalizacion = 500 * float(np.sum(porcentajes[(porcentajes > 1e-6) & ~validos[:n]]))
+    
+    for i in range(n, len(individuo.porcentajes)):
+        if individuo.porcentajes[i] > 1e-6 and not restricciones_usuario.es_ingrediente_valido(i):
+            penalizacion += 500 * individuo.porcentajes[i]
     
     return penalizacion
 
@@ -0,0 +1,134 @@
+"""
+Simulación vectorizada de crecimiento.
+
+Calcula consumo diario, conversión, ganancia de peso, peso acumulado y
+alimento acumulado para varias formulaciones y días a la vez como
+operaciones de arreglos (formulaciones x días), en lugar de recalcular
+el perfil nutricional día por día.
+"""
+
+import numpy as np
+
+from conocimiento.razas import obtener_conversion_alimenticia, obtener_consumo_diario
+from genetic.fitness.nutricion import calcular_discrepancia_nutricional
+
+# Etapas en el orden de índice usado por la simulación
+ETAPAS_SIMULACION = ("iniciacion", "crecimiento", "finalizacion")
+
+# Edad máxima (inclusive) de cada etapa, consistente con obtener_etapa
+_LIMITES_ETAPAS = np.array([21, 35])
+
+
+def obtener_indices_etapa(edades):
+    """
+    Obtiene el índice de etapa (0, 1, 2) para cada edad
+
+    Args:
+        edades: Arreglo de edades en días
+
+    Returns:
+        Arreglo de índices sobre ETAPAS_SIMULACION
+    """
+    return np.searchsorted(_LIMITES_ETAPAS, edades, side='left')
+
+
+def calcular_factores_formulacion(individuos, ingredientes_data):
+    """
+    Calcula el factor de ajuste de conversión de cada formulación por etapa
+
+    El factor es el mismo que aplica estimar_eficiencia_alimenticia sobre la
+    conversión base de la raza, que solo depende de la edad a través de la etapa.
+
+    Args:
+        individuos: Lista de individuos
+        ingredientes_data: Lista de datos de ingredientes
+
+    Returns:
+        Arreglo (formulaciones x etapas) con los factores de ajuste
+    """
+    from genetic.fitness.eficiencia import calcular_factor_calidad_nutricional, calcular_factor_digestibilidad
+
+    factores = np.ones((len(individuos), len(ETAPAS_SIMULACION)))
+
+    for f, individuo in enumerate(individuos):
+        factor_digestibilidad = calcular_factor_digestibilidad(individuo, ingredientes_data)
+
+        for e, etapa in enumerate(ETAPAS_SIMULACION):
+            discrepancia = calcular_discrepancia_nutricional(individuo, etapa, ingredientes_data)
+            factor_ajuste = 1.0 + min(0.25, discrepancia * 1.5)
+            factor_calidad = calcular_factor_calidad_nutricional(individuo, etapa, ingredientes_data)
+
+            factores[f, e] = factor_ajuste * factor_calidad * factor_digestibilidad
+
+    return factores
+
+
+def simular_crecimiento(individuos, raza, edad_inicial, num_dias, ingredientes_data,
+                        peso_inicial=0.0, cantidad_pollos=1, factores=None):
+    """
+    Simula el crecimiento de una parvada para varias formulaciones a la vez
+
+    Args:
+        individuos: Individuo o lista de individuos
+        raza: Nombre de la raza
+        edad_inicial: Edad del primer día simulado
+        num_dias: Número de días a simular
+        ingredientes_data: Lista de datos de ingredientes
+        peso_inicial: Peso por ave antes del primer día, en kg
+        cantidad_pollos: Número de aves de la parvada
+        factores: Factores por etapa ya calculados (opcional, ver calcular_factores_formulacion)
+
+    Returns:
+        Diccionario con arreglos de la simulación:
+            edades (D), consumo_g (D) por ave, conversion (F x D),
+            ganancia_g (F x D) por ave, peso_kg (F x D) por ave al final de cada día,
+            alimento_acumulado_kg (D) de toda la parvada
+    """
+    if not isinstance(individuos, (list, tuple)):
+        individuos = [individuos]
+
+    edades = edad_inicial + np.arange(num_dias)
+
+    if factores is None:
+        factores = calcular_factores_formulacion(individuos, ingredientes_data)
+
+    # Conversión base de la raza por día (2.0 si la raza no existe, igual que en eficiencia)
+    conversion_base = obtener_conversion_alimenticia(raza, edades)
+    if conversion_base is None:
+        conversion = np.full((len(individuos), num_dias), 2.0)
+    else:
+        conversion = conversion_base[np.newaxis, :] * factores[:, obtener_indices_etapa(edades)]
+
+    consumo_g = np.asarray(obtener_consumo_diario(edades)) * 1000
+
+    ganancia_g = np.divide(consumo_g, conversion, out=np.zeros_like(conversion), where=conversion > 0)
+    peso_kg = peso_inicial + np.cumsum(ganancia_g, axis=1) / 1000
+    alimento_acumulado_kg = np.cumsum(consumo_g) / 1000 * cantidad_pollos
+
+    return {
+        "edades": edades,
+        "consumo_g": consumo_g,
+        "conversion": conversion,
+        "ganancia_g": ganancia_g,
+        "peso_kg": peso_kg,
+        "alimento_acumulado_kg": alimento_acumulado_kg
+    }
+
+
+def calcular_consumo_periodo(edad_inicial, num_dias, cantidad_pollos=1):
+    """
+    Calcula el consumo total de alimento de una parvada durante un período
+
+    Args:
+        edad_inicial: Edad del primer día
+        num_dias: Número de días del período
+        cantidad_pollos: Número de aves
+
+    Returns:
+        Consumo total en kg
+    """
+    if num_dias <= 0:
+        return 0.0
+
+    edades = edad_inicial + np.arange(num_dias)
+    return float(np.sum(obtener_consumo_diario(edades))) * cantidad_pollos
@@ -5,10 +5,14 @@ Estima el tiempo necesario para alcanzar el peso de venta
 basado en la calidad de la formulación.
 """
 
+import numpy as np
+
 from conocimiento.razas import  estimar_dias_hasta_peso
 from genetic.fitness.eficiencia import estimar_ganancia_peso_diaria
+from genetic.fitness.simulacion import simular_crecimiento
 
-def estimar_tiempo_peso_objetivo(individuo, peso_actual, peso_objetivo, raza, edad_dias, ingredientes_data):
+def estimar_tiempo_peso_objetivo(individuo, peso_actual, peso_objetivo, raza, edad_dias, ingredientes_data,
+                                 discrepancia=None, conversion=None):
     """
     Estima los días necesarios para alcanzar el peso objetivo.
     
@@ -24,6 +28,8 @@ def estimar_tiempo_peso_objetivo(individuo, peso_actual, peso_objetivo, raza, ed
         raza: Nombre de la raza
         edad_dias: Edad actual en días
         ingredientes_data: Lista de datos de ingredientes
+        discrepancia: Discrepancia nutricional ya calculada para la etapa (opcional)
+        conversion: Conversión alimenticia ya estimada (opcional)
         
     Returns:
         Número estimado de días hasta alcanzar el peso objetivo
@@ -46,7 +52,8 @@ def estimar_tiempo_peso_objetivo(individuo, peso_actual, peso_objetivo, raza, ed
                                                   raza, edad_dias, ingredientes_data)
     else:
         # Ajustar el baseline según la calidad de la formulación
-        factor_ajuste = calcular_factor_ajuste_tiempo(individuo, raza, edad_dias, ingredientes_data)
+        factor_ajuste = calcular_factor_ajuste_tiempo(individuo, raza, edad_dias, ingredientes_data,
+                                                      discrepancia, conversion)
         dias_estimados = dias_baseline * factor_ajuste
     
     # Asegurar que el resultado sea realista
@@ -72,7 +79,8 @@ def calcular_ganancia_diaria(formulacion, raza, edad_dias, ingredientes_data):
     """
     return estimar_ganancia_peso_diaria(formulacion, raza, edad_dias, ingredientes_data)
 
-def calcular_factor_ajuste_tiempo(individuo, raza, edad_dias, ingredientes_data):
+def calcular_factor_ajuste_tiempo(individuo, raza, edad_dias, ingredientes_data,
+                                  discrepancia=None, conversion=None):
     """
     Calcula un factor de ajuste del tiempo basado en la calidad nutricional
     
@@ -81,6 +89,8 @@ def calcular_factor_ajuste_tiempo(individuo, raza, edad_dias, ingredientes_data)
         raza: Nombre de la raza
         edad_dias: Edad actual en días
         ingredientes_data: Lista de datos de ingredientes
+        discrepancia: Discrepancia nutricional ya calculada para la etapa (opcional)
+        conversion: Conversión alimenticia ya estimada (opcional)
         
     Returns:
         Factor de ajuste (1.0 = normal, >1.0 = más tiempo, <1.0 = menos tiempo)
@@ -95,11 +105,13 @@ def calcular_factor_ajuste_tiempo(individuo, raza, edad_dias, ingredientes_data)
     factor = 1.0
     
     # Ajuste por discrepancia nutricional
-    discrepancia = calcular_discrepancia_nutricional(individuo, etapa, ingredientes_data)
+    if discrepancia is None:
+        discrepancia = calcular_discrepancia_nutricional(individuo, etapa, ingredientes_data)
     factor += discrepancia * 0.3  # Hasta 30% más tiempo por mala nutrición
     
     # Ajuste por eficiencia alimenticia
-    conversion = estimar_eficiencia_alimenticia(individuo, raza, edad_dias, ingredientes_data)
+    if conversion is None:
+        conversion = estimar_eficiencia_alimenticia(individuo, raza, edad_dias, ingredientes_data, discrepancia)
     if conversion > 0:
         from conocimiento.razas import obtener_conversion_alimenticia
         conversion_base = obtener_conversion_alimenticia(raza, edad_dias)
@@ -269,28 +281,25 @@ def proyectar_curva_crecimiento(individuo, peso_inicial, edad_inicial, dias_proy
     Returns:
         Lista con proyección día a día
     """
-    proyeccion = []
-    peso_actual = peso_inicial
+    simulacion = simular_crecimiento(individuo, raza, edad_inicial + 1, dias_proyeccion,
+                                     ingredientes_data, peso_inicial=peso_inicial)
     
-    for dia in range(dias_proyeccion + 1):
-        edad_dia = edad_inicial + dia
-        
-        if dia == 0:
-            # Día inicial
-            ganancia_g = 0
-        else:
-            # Calcular ganancia para este día
-            ganancia_g = calcular_ganancia_diaria(individuo, raza, edad_dia, ingredientes_data)
-            peso_actual += ganancia_g / 1000  # Convertir g a kg
-        
-        proyeccion.append({
-            "dia": dia,
-            "edad": edad_dia,
-            "peso_kg": peso_actual,
-            "ganancia_diaria_g": ganancia_g
-        })
+    # El día 0 es el punto de partida, sin ganancia
+    ganancias = np.concatenate(([0.0], simulacion["ganancia_g"][0]))
+    pesos = np.concatenate(([peso_inicial], simulacion["peso_kg"][0]))
+    
+    if dias_proyeccion > 0:
+        individuo.conversion_alimenticia = float(simulacion["conversion"][0, -1])
     
-    return proyeccion
+    return [
+        {
+            "dia": dia,
+            "edad": edad_inicial + dia,
+            "peso_kg": float(pesos[dia]),
+            "ganancia_diaria_g": float(ganancias[dia])
+        }
+        for dia in range(dias_proyeccion + 1)
+    ]
 
 def calcular_eficiencia_temporal(individuo, peso_actual, peso_objetivo, raza, edad_dias, ingredientes_data):
     """
@@ -0,0 +1,317 @@
+"""
+Historial columnar de métricas por generación.
+
+Sustituye la lista de diccionarios de historico_metricas por una matriz de
+NumPy con una fila por métrica (cada columna del historial es un arreglo
+contiguo), preasignada y con crecimiento geométrico. Opcionalmente:
+
+- Limita el número de registros: al llenarse conserva uno de cada dos y
+  desde entonces guarda una generación de cada 2^k (la última generación
+  registrada siempre está disponible).
+- Pasa a un archivo mapeado en memoria (np.memmap) cuando la matriz supera
+  un presupuesto de memoria.
+
+Las gráficas leen las columnas sin copiarlas con columna(); por
+compatibilidad el historial también se indexa e itera como lista de
+diccionarios.
+"""
+
+import os
+
+import numpy as np
+
+# Métricas que se registran por generación (todas se guardan como float64)
+COLUMNAS_HISTORIAL = (
+    "generacion", "fase", "mejor_fitness", "peor_fitness", "fitness_promedio", "diversidad",
+    "num_mejores_encontrados", "duplicados", "evaluaciones_reutilizadas", "inmigrantes",
+    "evaluaciones", "mejor_costo", "costo_promedio"
+)
+
+# Métricas enteras (se devuelven como int al leer una generación)
+COLUMNAS_ENTERAS = ("generacion", "num_mejores_encontrados", "duplicados", "evaluaciones_reutilizadas",
+                    "inmigrantes", "evaluaciones")
+
+# La fase se guarda como su posición en esta tupla
+FASES_HISTORIAL = ("inicial", "intermedia", "final")
+
+# Capacidad inicial en generaciones
+CAPACIDAD_INICIAL_HISTORIAL = 256
+
+# Presupuesto de memoria antes de pasar a un archivo mapeado (bytes)
+MEMORIA_MAXIMA_HISTORIAL = 64 * 1024 * 1024
+
+
+class HistorialMetricas:
+    """
+    Historial de métricas por generación en arreglos columnares
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_INICIAL_HISTORIAL, max_registros=None, archivo=None,
+                 memoria_maxima=MEMORIA_MAXIMA_HISTORIAL):
+        """
+        Inicializa el historial
+
+        Args:
+            capacidad: Generaciones preasignadas
+            max_registros: Máximo de generaciones guardadas antes de submuestrear (None = sin límite)
+            archivo: Ruta del archivo mapeado si se excede memoria_maxima (None = siempre en RAM)
+            memoria_maxima: Bytes de la matriz a partir de los cuales se usa el archivo
+        """
+        self.max_registros = max_registros
+        self.archivo = archivo
+        self.memoria_maxima = memoria_maxima
+        self.indices = {columna: i for i, columna in enumerate(COLUMNAS_HISTORIAL)}
+
+        self.datos = np.full((len(COLUMNAS_HISTORIAL), max(1, capacidad)), np.nan)
+        self.ruta_mapeada = None
+        self.num_registros = 0
+        self.pendiente = False
+        self.paso = 1
+        self.total_registrados = 0
+
+        # Sumas exactas de todas las generaciones (también de las descartadas al submuestrear)
+        self.sumas = np.zeros(len(COLUMNAS_HISTORIAL))
+
+    @property
+    def capacidad(self):
+        """Generaciones que caben sin crecer"""
+        return self.datos.shape[1]
+
+    @property
+    def mapeado(self):
+        """True si el historial está en un archivo mapeado en memoria"""
+        return self.ruta_mapeada is not None
+
+    def _crecer(self):
+        """Duplica la capacidad (en RAM o en el archivo mapeado)"""
+        nueva_capacidad = self.capacidad * 2
+        bytes_necesarios = len(COLUMNAS_HISTORIAL) * nueva_capacidad * 8
+        ruta_anterior = self.ruta_mapeada
+
+        if self.archivo and (self.mapeado or bytes_necesarios > self.memoria_maxima):
+            # Un archivo .npy por capacidad: el anterior puede seguir mapeado
+            # por vistas entregadas a las gráficas
+            raiz, extension = os.path.splitext(self.archivo)
+            self.ruta_mapeada = f"{raiz}_{nueva_capacidad}{extension or '.npy'}"
+            directorio = os.path.dirname(self.ruta_mapeada)
+            if directorio and not os.path.exists(directorio):
+                os.makedirs(directorio)
+            if ruta_anterior is None:
+                print(f"💾 Historial de métricas mapeado en disco: {self.ruta_mapeada}")
+            nuevos = np.lib.format.open_memmap(self.ruta_mapeada, mode="w+", dtype=np.float64,
+                                               shape=(len(COLUMNAS_HISTORIAL), nueva_capacidad))
+        else:
+            nuevos = np.empty((len(COLUMNAS_HISTORIAL), nueva_capacidad))
+
+        nuevos[:, :self.capacidad] = self.datos
+        nuevos[:, self.capacidad:] = np.nan
+        self.datos = nuevos
+
+        if ruta_anterior is not None:
+            try:
+                os.remove(ruta_anterior)
+            except OSError:
+                # En Windows no se puede borrar mientras siga mapeado
+                pass
+
+    def _submuestrear(self):
+        """Conserva una de cada dos generaciones y duplica el paso de registro"""
+        conservados = (self.num_registros + 1) // 2
+        ultima = self.datos[:, self.num_registros - 1].copy()
+        self.datos[:, :conservados] = self.datos[:, :self.num_registros:2]
+        self.datos[:, conservados:self.num_registros] = np.nan
+        self.paso *= 2
+
+        # La última generación no cae en el nuevo paso si ocupaba una posición
+        # impar: queda como registro pendiente hasta que llega la siguiente
+        self.pendiente = self.num_registros % 2 == 0
+        if self.pendiente:
+            self.datos[:, conservados] = ultima
+        self.num_registros = conservados
+
+    def registrar(self, metricas):
+        """
+        Agrega las métricas de una generación
+
+        Args:
+            metricas: Diccionario métrica -> valor (las métricas ausentes quedan en NaN)
+        """
+        if self.num_registros >= self.capacidad:
+            self._crecer()
+
+        fila = self.datos[:, self.num_registros]
+        fila[:] = np.nan
+        for columna, valor in metricas.items():
+            indice = self.indices.get(columna)
+            if indice is None:
+                continue
+            if columna == "fase":
+                valor = FASES_HISTORIAL.index(valor) if valor in FASES_HISTORIAL else np.nan
+            fila[indice] = valor
+        self.sumas += np.nan_to_num(fila)
+
+        # Con submuestreo solo se fijan las generaciones múltiplo del paso; las
+        # demás ocupan el último lugar hasta que llega la siguiente
+        self.pendiente = self.total_registrados % self.paso != 0
+        self.total_registrados += 1
+        if not self.pendiente:
+            self.num_registros += 1
+            if self.max_registros and self.num_registros >= self.max_registros:
+                self._submuestrear()
+
+    def __len__(self):
+        return self.num_registros + self.pendiente
+
+    def columna(self, nombre):
+        """
+        Obtiene una métrica de todas las generaciones guardadas sin copiarla
+
+        Args:
+            nombre: Nombre de la métrica
+
+        Returns:
+            Vista de NumPy (de solo lectura)
+        """
+        vista = self.datos[self.indices[nombre], :len(self)]
+        vista = vista.view()
+        vista.flags.writeable = False
+        return vista
+
+    def suma(self, nombre):
+        """
+        Suma de una métrica sobre todas las generaciones registradas
+
+        Args:
+            nombre: Nombre de la métrica
+
+        Returns:
+            Suma (incluye las generaciones descartadas por el submuestreo)
+        """
+        return float(self.sumas[self.indices[nombre]])
+
+    def fases(self):
+        """
+        Obtiene el nombre de la fase de cada generación guardada
+
+        Returns:
+            Lista de nombres de fase
+        """
+        return [FASES_HISTORIAL[int(codigo)] if codigo == codigo else None
+                for codigo in self.columna("fase").tolist()]
+
+    def tiene_columna(self, nombre):
+        """
+        Indica si una métrica se registró en alguna generación
+
+        Args:
+            nombre: Nombre de la métrica
+
+        Returns:
+            True si la métrica tiene al menos un valor
+        """
+        return nombre in self.indices and bool(len(self)) and not np.isnan(self.columna(nombre)).all()
+
+    def __getitem__(self, posicion):
+        """Métricas de una generación como diccionario (compatibilidad)"""
+        if isinstance(posicion, slice):
+            return [self[i] for i in range(*posicion.indices(len(self)))]
+        if posicion < 0:
+            posicion += len(self)
+        if not 0 <= posicion < len(self):
+            raise IndexError("índice de historial fuera de rango")
+
+        metricas = {}
+        for columna, valor in zip(COLUMNAS_HISTORIAL, self.datos[:, posicion].tolist()):
+            if valor != valor:
+                continue
+            if columna == "fase":
+                valor = FASES_HISTORIAL[int(valor)]
+            elif columna in COLUMNAS_ENTERAS:
+                valor = int(valor)
+            metricas[columna] = valor
+        return metricas
+
+    def __iter__(self):
+        for posicion in range(len(self)):
+            yield self[posicion]
+
+    def a_lista(self):
+        """
+        Convierte el historial en lista de diccionarios
+
+        Returns:
+            Lista con las métricas de cada generación guardada
+        """
+        return list(self)
+
+    def exportar_arreglos(self):
+        """
+        Obtiene el estado del historial como arreglos (para puntos de control)
+
+        Returns:
+            Diccionario de arreglos
+        """
+        return {
+            "historial_datos": np.array(self.datos[:, :len(self)]),
+            "historial_estado": np.array([self.num_registros, self.pendiente, self.paso,
+                                          self.total_registrados], dtype=np.int64),
+            "historial_sumas": self.sumas.copy()
+        }
+
+    def restaurar_arreglos(self, arreglos):
+        """
+        Restablece el estado guardado con exportar_arreglos
+
+        Args:
+            arreglos: Diccionario de arreglos
+        """
+        datos = arreglos["historial_datos"]
+        while self.capacidad < datos.shape[1]:
+            self._crecer()
+        self.datos[:, :datos.shape[1]] = datos
+        self.datos[:, datos.shape[1]:] = np.nan
+        num_registros, pendiente, paso, total = arreglos["historial_estado"].tolist()
+        self.num_registros = num_registros
+        self.pendiente = bool(pendiente)
+        self.paso = paso
+        self.total_registrados = total
+        self.sumas = arreglos["historial_sumas"].copy()
+
+    def cerrar(self):
+        """Escribe a disco el archivo mapeado (si se usa)"""
+        if self.mapeado:
+            self.datos.flush()
+
+
+def validar_submuestreo(max_registros=8, generaciones=40):
+    """
+    Verifica que el submuestreo conserve siempre la última generación registrada
+
+    Args:
+        max_registros: Límite de registros del historial
+        generaciones: Generaciones a registrar
+
+    Returns:
+        True si la última generación y las sumas son correctas, False en caso contrario
+    """
+    historial = HistorialMetricas(capacidad=4, max_registros=max_registros)
+    for generacion in range(generaciones):
+        historial.registrar({"generacion": generacion, "mejor_fitness": generacion / 10})
+        if historial[-1]["generacion"] != generacion:
+            print(f"⚠️ Tras registrar la generación {generacion} la última guardada es "
+                  f"{historial[-1]['generacion']}")
+            return False
+        if len(historial) > max_registros:
+            print(f"⚠️ El historial guarda {len(historial)} generaciones (máximo {max_registros})")
+            return False
+
+    if historial.suma("generacion") != sum(range(generaciones)):
+        print("⚠️ Las sumas del historial no incluyen todas las generaciones")
+        return False
+
+    print("✅ Submuestreo del historial validado correctamente")
+    return True
+
+
+if __name__ == "__main__":
+    validar_submuestreo()
@@ -9,6 +9,29 @@ import numpy as np
 import random
 import copy
 
+from conocimiento.restricciones_usuario import compilar_limites
+
+# Fracción de ingredientes activos por debajo de la cual una fórmula se trata
+# como dispersa (operadores y evaluación trabajan solo sobre su soporte)
+FRACCION_DISPERSA = 0.25
+
+
+def obtener_soporte_disperso(porcentajes):
+    """
+    Obtiene el soporte (ingredientes activos) de una fórmula dispersa
+
+    Args:
+        porcentajes: Vector de porcentajes del genoma
+
+    Returns:
+        Arreglo de índices activos, o None si la fórmula es densa
+    """
+    activos = np.flatnonzero(porcentajes)
+    if len(activos) < len(porcentajes) * FRACCION_DISPERSA:
+        return activos
+    return None
+
+
 class Individuo:
     """
     Representa una formulación de alimento como solución individual
@@ -42,6 +65,11 @@ class Individuo:
         self.disponibilidad_score = 0
         self.penalizacion_restricciones = 0
         
+        # Evaluación incremental: totales lineales vigentes y cambio pendiente
+        self.totales_lineales = None
+        self.profundidad_delta = 0
+        self.delta_mutacion = None
+        
     def inicializar_aleatorio(self, ingredientes_data, restricciones_usuario=None):
         """
         Inicializa el individuo con valores aleatorios respetando límites
@@ -86,50 +114,46 @@ class Individuo:
         Args:
             ingredientes_data: Lista con datos de ingredientes (opcional)
             restricciones_usuario: Objeto con restricciones del usuario (opcional)
+            
+        Returns:
+            Factor aplicado a los ingredientes variables, o None si no fue un escalado
         """
-        # Identificar ingredientes con porcentaje fijo
-        indices_fijos = []
-        suma_fijos = 0
+        # Los porcentajes cambian: los totales lineales dejan de ser válidos
+        self.totales_lineales = None
         
+        # Identificar ingredientes con porcentaje fijo
+        fijos = np.zeros(len(self.porcentajes), dtype=bool)
         if ingredientes_data:
-            for i in range(min(len(self.porcentajes), len(ingredientes_data))):
-                # Obtener límites efectivos
-                limites_originales = ingredientes_data[i]["limitaciones"]
-                if restricciones_usuario:
-                    limites = restricciones_usuario.obtener_limites(i, limites_originales)
-                else:
-                    limites = limites_originales
-                
-                # Verificar si es un ingrediente con porcentaje fijo
-                if abs(limites["min"] - limites["max"]) < 1e-6:
-                    indices_fijos.append(i)
-                    suma_fijos += self.porcentajes[i]
+            fijos_compilados = compilar_limites(ingredientes_data, restricciones_usuario)["fijos"]
+            n = min(len(fijos), len(fijos_compilados))
+            fijos[:n] = fijos_compilados[:n]
+        
+        variables = ~fijos
+        num_variables = np.count_nonzero(variables)
         
         # Calcular cuánto deben sumar los ingredientes variables
-        suma_objetivo_variables = 1.0 - suma_fijos
+        suma_objetivo_variables = 1.0 - self.porcentajes[fijos].sum()
         
         # Si la suma objetivo es negativa o muy pequeña, hay un problema con los ingredientes fijos
         if suma_objetivo_variables <= 0:
             # Redistribuir proporcionalmente todos los no fijos
-            indices_variables = [i for i in range(len(self.porcentajes)) if i not in indices_fijos]
-            if indices_variables:
-                for i in indices_variables:
-                    self.porcentajes[i] = suma_objetivo_variables / len(indices_variables)
-            return
+            if num_variables:
+                self.porcentajes[variables] = suma_objetivo_variables / num_variables
+            return None
         
         # Calcular suma actual de ingredientes variables
-        indices_variables = [i for i in range(len(self.porcentajes)) if i not in indices_fijos]
-        suma_variables = sum(self.porcentajes[i] for i in indices_variables)
+        suma_variables = self.porcentajes[variables].sum()
         
         # Normalizar ingredientes variables
         if suma_variables > 0:
             factor = suma_objetivo_variables / suma_variables
-            for i in indices_variables:
-                self.porcentajes[i] *= factor
-        elif indices_variables:
+            self.porcentajes[variables] *= factor
+            return factor
+        elif num_variables:
             # Si la suma de variables es 0, distribuir uniformemente
-            for i in indices_variables:
-                self.porcentajes[i] = suma_objetivo_variables / len(indices_variables)
+            self.porcentajes[variables] = suma_objetivo_variables / num_variables
+        
+        return None
     
     def clonar(self):
         """
@@ -143,14 +167,41 @@ class Individuo:
         nuevo_individuo.propiedades_nutricionales = self.propiedades_nutricionales.copy()
         nuevo_individuo.costo_total = self.costo_total
         nuevo_individuo.fitness = self.fitness
-        nuevo_individuo.proveedor_recomendado = copy.deepcopy(self.proveedor_recomendado)
+        # Solo los individuos enriquecidos para reportes tienen proveedores asignados
+        if self.proveedor_recomendado:
+            nuevo_individuo.proveedor_recomendado = copy.deepcopy(self.proveedor_recomendado)
         nuevo_individuo.conversion_alimenticia = self.conversion_alimenticia
         nuevo_individuo.dias_peso_objetivo = self.dias_peso_objetivo
         nuevo_individuo.disponibilidad_score = self.disponibilidad_score
         nuevo_individuo.penalizacion_restricciones = self.penalizacion_restricciones
+        nuevo_individuo.totales_lineales = self.totales_lineales
+        nuevo_individuo.profundidad_delta = self.profundidad_delta
         
         return nuevo_individuo
     
+    def obtener_disperso(self):
+        """
+        Obtiene la representación dispersa del genoma
+
+        Returns:
+            Tupla (indices, valores) de los ingredientes activos
+        """
+        indices = np.flatnonzero(self.porcentajes)
+        return indices, self.porcentajes[indices]
+
+    def establecer_disperso(self, indices, valores):
+        """
+        Reemplaza el genoma a partir de su representación dispersa
+
+        Args:
+            indices: Índices de los ingredientes activos
+            valores: Porcentajes de esos ingredientes
+        """
+        self.porcentajes = np.zeros(len(self.porcentajes))
+        self.porcentajes[indices] = valores
+        self.totales_lineales = None
+        self.delta_mutacion = None
+
     def validar_suma(self, tolerancia=1e-6):
         """
         Valida que la suma de porcentajes sea 1
@@ -172,22 +223,12 @@ class Individuo:
             ingredientes_data: Lista con datos de ingredientes
             restricciones_usuario: Objeto con restricciones del usuario (opcional)
         """
-        for i in range(min(len(self.porcentajes), len(ingredientes_data))):
-            # Verificar disponibilidad según restricciones del usuario
-            if restricciones_usuario and not restricciones_usuario.es_ingrediente_valido(i):
-                self.porcentajes[i] = 0
-                continue
-            
-            # Obtener límites efectivos
-            limites_originales = ingredientes_data[i]["limitaciones"]
-            if restricciones_usuario:
-                limites = restricciones_usuario.obtener_limites(i, limites_originales)
-            else:
-                limites = limites_originales
-            
-            # Aplicar límites
-            self.porcentajes[i] = max(limites["min"], 
-                                    min(self.porcentajes[i], limites["max"]))
+        limites = compilar_limites(ingredientes_data, restricciones_usuario)
+        n = min(len(self.porcentajes), len(ingredientes_data))
+        
+        # Aplicar límites y anular ingredientes no disponibles según restricciones del usuario
+        self.porcentajes[:n] = np.maximum(limites["minimos"][:n], np.minimum(self.porcentajes[:n], limites["maximos"][:n]))
+        self.porcentajes[:n][~limites["validos"][:n]] = 0
         
         # Renormalizar después de aplicar límites
         self.normalizar(ingredientes_data, restricciones_usuario)
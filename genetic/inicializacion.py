@@ -9,6 +9,9 @@ import random
 import numpy as np
 from genetic.individuo import Individuo
 
+# Intentos por individuo faltante antes de aceptar individuos sin validar
+MAX_INTENTOS_POR_INDIVIDUO = 100
+
 def crear_poblacion_inicial(tamano_poblacion, ingredientes_data, restricciones_usuario=None, 
                           estrategia="mixta", semilla=None):
     """
@@ -72,10 +75,16 @@ def crear_poblacion_inicial(tamano_poblacion, ingredientes_data, restricciones_u
             if individuo_reparado:
                 poblacion_validada.append(individuo_reparado)
     
-    # Si no tenemos suficientes individuos válidos, crear más aleatorios
+    # Si no tenemos suficientes individuos válidos, crear más aleatorios (con
+    # restricciones contradictorias ningún individuo valida: no girar sin fin)
+    intentos_restantes = MAX_INTENTOS_POR_INDIVIDUO * max(0, tamano_poblacion - len(poblacion_validada))
     while len(poblacion_validada) < tamano_poblacion:
         nuevo_individuo = crear_individuo_aleatorio(num_ingredientes, ingredientes_data, restricciones_usuario)
-        if validar_individuo(nuevo_individuo, ingredientes_data, restricciones_usuario):
+        intentos_restantes -= 1
+        if intentos_restantes < 0:
+            print("⚠️ No se generan individuos válidos; se completa la población sin validar")
+            poblacion_validada.append(nuevo_individuo)
+        elif validar_individuo(nuevo_individuo, ingredientes_data, restricciones_usuario):
             poblacion_validada.append(nuevo_individuo)
     
     return poblacion_validada[:tamano_poblacion]
@@ -0,0 +1,271 @@
+"""
+Instrumentación por etapas del algoritmo genético.
+
+Acumula el tiempo de cada etapa (inicialización, selección, cruza,
+reparación, mutación, evaluación y cada objetivo del fitness, ordenamiento)
+y contadores (evaluaciones, reparaciones, aciertos de caché), en total y por
+generación, sin necesidad de un perfilador externo. Opcionalmente registra
+cada medición como evento de una traza de Chrome (chrome://tracing o
+Perfetto).
+
+Las mediciones se hacen contra la instrumentación activa del proceso
+(establecida por el AG durante ejecutar); sin instrumentación activa medir()
+devuelve un contexto nulo compartido y el costo es una llamada a función.
+Los objetivos evaluados en procesos trabajadores no se desglosan: su tiempo
+queda dentro de la etapa "evaluacion" del proceso principal.
+"""
+
+import json
+import os
+import threading
+import time
+
+# Máximo de eventos que se guardan para la traza de Chrome
+MAX_EVENTOS_TRAZA = 200000
+
+# Instrumentación activa del proceso (None = sin medir)
+_ACTIVA = None
+
+
+class _MedicionNula:
+    """Contexto que no mide nada"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+_MEDICION_NULA = _MedicionNula()
+
+
+class _Medicion:
+    """Contexto que acumula el tiempo de una etapa"""
+
+    __slots__ = ("instrumentacion", "etapa", "inicio")
+
+    def __init__(self, instrumentacion, etapa):
+        self.instrumentacion = instrumentacion
+        self.etapa = etapa
+        self.inicio = 0.0
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.instrumentacion.registrar(self.etapa, self.inicio, time.perf_counter())
+        return False
+
+
+class Instrumentacion:
+    """
+    Acumula tiempos por etapa, contadores y (opcionalmente) eventos de traza
+    """
+
+    def __init__(self, traza=False, max_eventos=MAX_EVENTOS_TRAZA):
+        """
+        Inicializa la instrumentación
+
+        Args:
+            traza: Si es True, guarda cada medición para exportar una traza de Chrome
+            max_eventos: Máximo de eventos de traza guardados
+        """
+        self.traza = traza
+        self.max_eventos = max_eventos
+        self.origen = time.perf_counter()
+
+        # etapa -> [segundos, llamadas]
+        self.etapas = {}
+        self.contadores = {}
+        self.por_generacion = []
+        self.eventos = []
+        self.eventos_descartados = 0
+
+        # Totales al cierre de la generación anterior (para calcular diferencias)
+        self._etapas_previas = {}
+        self._contadores_previos = {}
+        self._cierres = []
+
+    def medir(self, etapa):
+        """
+        Crea un contexto que mide el tiempo de una etapa
+
+        Args:
+            etapa: Nombre de la etapa (por ejemplo "cruza" o "fitness.nutricion")
+
+        Returns:
+            Contexto de medición
+        """
+        return _Medicion(self, etapa)
+
+    def registrar(self, etapa, inicio, fin):
+        """
+        Registra una medición ya tomada con time.perf_counter
+
+        Args:
+            etapa: Nombre de la etapa
+            inicio: Instante inicial
+            fin: Instante final
+        """
+        acumulado = self.etapas.get(etapa)
+        if acumulado is None:
+            acumulado = self.etapas[etapa] = [0.0, 0]
+        acumulado[0] += fin - inicio
+        acumulado[1] += 1
+
+        if self.traza:
+            if len(self.eventos) < self.max_eventos:
+                self.eventos.append((etapa, inicio, fin))
+            else:
+                self.eventos_descartados += 1
+
+    def contar(self, contador, cantidad=1):
+        """
+        Incrementa un contador
+
+        Args:
+            contador: Nombre del contador
+            cantidad: Incremento
+        """
+        self.contadores[contador] = self.contadores.get(contador, 0) + cantidad
+
+    def cerrar_generacion(self, generacion):
+        """
+        Guarda los tiempos y contadores acumulados desde la generación anterior
+
+        Args:
+            generacion: Número de generación que termina
+        """
+        etapas = {}
+        for etapa, (segundos, _) in self.etapas.items():
+            diferencia = segundos - self._etapas_previas.get(etapa, 0.0)
+            if diferencia > 0:
+                etapas[etapa] = diferencia
+            self._etapas_previas[etapa] = segundos
+
+        contadores = {}
+        for contador, valor in self.contadores.items():
+            diferencia = valor - self._contadores_previos.get(contador, 0)
+            if diferencia:
+                contadores[contador] = diferencia
+            self._contadores_previos[contador] = valor
+
+        self.por_generacion.append({"generacion": generacion, "etapas": etapas, "contadores": contadores})
+        self._cierres.append(time.perf_counter())
+
+    def obtener_resumen(self):
+        """
+        Obtiene el resumen de la instrumentación
+
+        Returns:
+            Diccionario con etapas (total, llamadas y promedio por etapa, de
+            mayor a menor tiempo), contadores y por_generacion
+        """
+        etapas = {}
+        for etapa, (segundos, llamadas) in sorted(self.etapas.items(), key=lambda e: -e[1][0]):
+            etapas[etapa] = {
+                "total": segundos,
+                "llamadas": llamadas,
+                "promedio": segundos / llamadas if llamadas else 0.0
+            }
+        return {
+            "etapas": etapas,
+            "contadores": dict(self.contadores),
+            "por_generacion": self.por_generacion
+        }
+
+    def exportar_traza_chrome(self, archivo):
+        """
+        Escribe las mediciones como traza de Chrome (formato JSON de eventos)
+
+        Args:
+            archivo: Ruta del archivo .json
+
+        Returns:
+            True si se escribió la traza
+        """
+        proceso = os.getpid()
+        hilo = threading.get_ident()
+        eventos = [{
+            "name": etapa,
+            "cat": etapa.split(".")[0],
+            "ph": "X",
+            "ts": (inicio - self.origen) * 1e6,
+            "dur": (fin - inicio) * 1e6,
+            "pid": proceso,
+            "tid": hilo
+        } for etapa, inicio, fin in self.eventos]
+
+        # Fin de cada generación como evento instantáneo con sus contadores
+        for registro, instante in zip(self.por_generacion, self._cierres):
+            eventos.append({
+                "name": "generacion",
+                "ph": "i",
+                "s": "p",
+                "ts": (instante - self.origen) * 1e6,
+                "pid": proceso,
+                "tid": hilo,
+                "args": {"generacion": registro["generacion"], **registro["contadores"]}
+            })
+
+        try:
+            directorio = os.path.dirname(archivo)
+            if directorio and not os.path.exists(directorio):
+                os.makedirs(directorio)
+            with open(archivo, "w", encoding="utf-8") as f:
+                json.dump({
+                    "traceEvents": eventos,
+                    "displayTimeUnit": "ms",
+                    "otherData": {"eventos_descartados": self.eventos_descartados}
+                }, f)
+            return True
+        except OSError as e:
+            print(f"❌ Error al escribir la traza: {e}")
+            return False
+
+
+def activar_instrumentacion(instrumentacion):
+    """
+    Establece la instrumentación activa del proceso
+
+    Args:
+        instrumentacion: Instrumentacion a usar, o None para dejar de medir
+
+    Returns:
+        La instrumentación activa anterior
+    """
+    global _ACTIVA
+    anterior = _ACTIVA
+    _ACTIVA = instrumentacion
+    return anterior
+
+
+def medir(etapa):
+    """
+    Contexto que mide una etapa en la instrumentación activa (si la hay)
+
+    Args:
+        etapa: Nombre de la etapa
+
+    Returns:
+        Contexto de medición
+    """
+    if _ACTIVA is None:
+        return _MEDICION_NULA
+    return _Medicion(_ACTIVA, etapa)
+
+
+def contar(contador, cantidad=1):
+    """
+    Incrementa un contador de la instrumentación activa (si la hay)
+
+    Args:
+        contador: Nombre del contador
+        cantidad: Incremento
+    """
+    if _ACTIVA is not None:
+        _ACTIVA.contar(contador, cantidad)
@@ -7,7 +7,34 @@ la restricción de suma = 1 en los porcentajes.
 
 import random
 import math
-from genetic.individuo import Individuo
+import numpy as np
+from genetic.individuo import Individuo, obtener_soporte_disperso
+from genetic.fitness.incremental import registrar_delta_mutacion
+from conocimiento.restricciones_usuario import compilar_limites
+
+def obtener_indices_variables(num_genes, ingredientes_data=None, restricciones_usuario=None, porcentajes=None):
+    """
+    Obtiene los índices de ingredientes no fijos a partir de los límites compilados
+    
+    Args:
+        num_genes: Longitud del genoma
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Objeto con restricciones del usuario
+        porcentajes: Genoma a mutar (opcional); si es disperso solo se
+            consideran sus ingredientes activos
+        
+    Returns:
+        Lista de índices variables
+    """
+    soporte = obtener_soporte_disperso(porcentajes) if porcentajes is not None else None
+    if soporte is None:
+        soporte = np.arange(num_genes)
+    
+    if not ingredientes_data:
+        return soporte.tolist()
+    
+    fijos = compilar_limites(ingredientes_data, restricciones_usuario)["fijos"]
+    return [int(i) for i in soporte if i >= len(fijos) or not fijos[i]]
 
 def mutar_no_uniforme(individuo, generacion_actual, max_generaciones, intensidad=0.1, 
                      ingredientes_data=None, restricciones_usuario=None):
@@ -30,21 +57,9 @@ def mutar_no_uniforme(individuo, generacion_actual, max_generaciones, intensidad
     """
     resultado = individuo.clonar()
     
-    # Identificar ingredientes con porcentaje fijo
-    indices_fijos = []
-    if ingredientes_data:
-        for i in range(min(len(resultado.porcentajes), len(ingredientes_data))):
-            limites_originales = ingredientes_data[i]["limitaciones"]
-            if restricciones_usuario:
-                limites = restricciones_usuario.obtener_limites(i, limites_originales)
-            else:
-                limites = limites_originales
-            
-            if abs(limites["min"] - limites["max"]) < 1e-6:
-                indices_fijos.append(i)
-    
-    # Identificar ingredientes variables
-    indices_variables = [i for i in range(len(resultado.porcentajes)) if i not in indices_fijos]
+    # Identificar ingredientes variables (no fijos)
+    indices_variables = obtener_indices_variables(len(resultado.porcentajes), ingredientes_data,
+                                                  restricciones_usuario, resultado.porcentajes)
     
     if len(indices_variables) == 0:
         return resultado
@@ -61,6 +76,7 @@ def mutar_no_uniforme(individuo, generacion_actual, max_generaciones, intensidad
     indices_mutacion = random.sample(indices_variables, num_ingredientes_a_mutar)
     
     # Aplicar mutación no uniforme
+    cambios = []
     for indice in indices_mutacion:
         valor_actual = resultado.porcentajes[indice]
         
@@ -100,10 +116,15 @@ def mutar_no_uniforme(individuo, generacion_actual, max_generaciones, intensidad
         
         # Asegurar que está dentro de límites
         nuevo_valor = max(min_val, min(nuevo_valor, max_val))
+        cambios.append((indice, nuevo_valor - valor_actual))
         resultado.porcentajes[indice] = nuevo_valor
     
     # Normalizar para mantener suma = 1
-    resultado.normalizar(ingredientes_data, restricciones_usuario)
+    factor = resultado.normalizar(ingredientes_data, restricciones_usuario)
+    
+    # Permitir la evaluación incremental a partir de los totales del padre
+    if ingredientes_data:
+        registrar_delta_mutacion(resultado, individuo, cambios, factor)
     
     return resultado
 
@@ -125,24 +146,10 @@ def mutar_intercambio(individuo, intensidad=0.1, ingredientes_data=None, restric
     """
     resultado = individuo.clonar()
     
-    # Identificar ingredientes con porcentaje fijo
-    indices_fijos = []
-    if ingredientes_data:
-        for i in range(min(len(resultado.porcentajes), len(ingredientes_data))):
-            limites_originales = ingredientes_data[i]["limitaciones"]
-            if restricciones_usuario:
-                limites = restricciones_usuario.obtener_limites(i, limites_originales)
-            else:
-                limites = limites_originales
-            
-            if abs(limites["min"] - limites["max"]) < 1e-6:
-                indices_fijos.append(i)
-    
-    # Identificar ingredientes variables con uso significativo
-    indices_variables = []
-    for i in range(len(resultado.porcentajes)):
-        if i not in indices_fijos and resultado.porcentajes[i] > 0.01:  # Al menos 1%
-            indices_variables.append(i)
+    # Identificar ingredientes variables con uso significativo (al menos 1%)
+    indices_variables = [i for i in obtener_indices_variables(len(resultado.porcentajes), ingredientes_data,
+                                                              restricciones_usuario, resultado.porcentajes)
+                         if resultado.porcentajes[i] > 0.01]
     
     if len(indices_variables) < 2:
         return resultado  # No hay suficientes ingredientes para intercambiar
@@ -184,11 +191,18 @@ def mutar_intercambio(individuo, intensidad=0.1, ingredientes_data=None, restric
             # Transferir de ingrediente 1 a ingrediente 2
             resultado.porcentajes[indice1] -= cantidad_intercambio
             resultado.porcentajes[indice2] += cantidad_intercambio
+            signo = -1
         else:
             # Transferir de ingrediente 2 a ingrediente 1
             resultado.porcentajes[indice1] += cantidad_intercambio
             resultado.porcentajes[indice2] -= cantidad_intercambio
-    
+            signo = 1
+
+        # La suma se conserva, así que no hay escalado (factor 1)
+        registrar_delta_mutacion(resultado, individuo,
+                                 [(indice1, signo * cantidad_intercambio), (indice2, -signo * cantidad_intercambio)],
+                                 1.0)
+
     return resultado
 
 def mutar_diferencial(individuo, intensidad=0.1, ingredientes_data=None, restricciones_usuario=None):
@@ -208,21 +222,9 @@ def mutar_diferencial(individuo, intensidad=0.1, ingredientes_data=None, restric
     """
     resultado = individuo.clonar()
     
-    # Identificar ingredientes con porcentaje fijo
-    indices_fijos = []
-    if ingredientes_data:
-        for i in range(min(len(resultado.porcentajes), len(ingredientes_data))):
-            limites_originales = ingredientes_data[i]["limitaciones"]
-            if restricciones_usuario:
-                limites = restricciones_usuario.obtener_limites(i, limites_originales)
-            else:
-                limites = limites_originales
-            
-            if abs(limites["min"] - limites["max"]) < 1e-6:
-                indices_fijos.append(i)
-    
-    # Identificar ingredientes variables
-    indices_variables = [i for i in range(len(resultado.porcentajes)) if i not in indices_fijos]
+    # Identificar ingredientes variables (no fijos)
+    indices_variables = obtener_indices_variables(len(resultado.porcentajes), ingredientes_data,
+                                                  restricciones_usuario, resultado.porcentajes)
     
     if len(indices_variables) == 0:
         return resultado
@@ -265,6 +267,8 @@ def mutar_diferencial(individuo, intensidad=0.1, ingredientes_data=None, restric
     # Compensar el cambio total distribuyendo entre los demás ingredientes variables
     delta_total = sum(deltas)
     otros_indices = [i for i in indices_variables if i not in indices_mutacion]
+    compensacion_por_ingrediente = 0.0
+    compensacion_uniforme = True  # False si algún límite recorta la compensación
     
     if otros_indices and abs(delta_total) > 1e-6:
         compensacion_por_ingrediente = -delta_total / len(otros_indices)
@@ -285,10 +289,23 @@ def mutar_diferencial(individuo, intensidad=0.1, ingredientes_data=None, restric
             else:
                 nuevo_valor = max(0.0, min(nuevo_valor, 1.0))
             
+            if nuevo_valor != valor_actual + compensacion_por_ingrediente:
+                compensacion_uniforme = False
             resultado.porcentajes[indice] = nuevo_valor
     
     # Normalizar para asegurar suma = 1
-    resultado.normalizar(ingredientes_data, restricciones_usuario)
+    factor = resultado.normalizar(ingredientes_data, restricciones_usuario)
+    
+    # Permitir la evaluación incremental solo si la compensación fue uniforme
+    if ingredientes_data:
+        if not compensacion_uniforme:
+            factor = None
+        cambios = list(zip(indices_mutacion, deltas))
+        if compensacion_por_ingrediente and obtener_soporte_disperso(individuo.porcentajes) is not None:
+            # Genoma disperso: la compensación solo tocó el soporte y se registra gen a gen
+            cambios.extend((indice, compensacion_por_ingrediente) for indice in otros_indices)
+            compensacion_por_ingrediente = 0.0
+        registrar_delta_mutacion(resultado, individuo, cambios, factor, compensacion_por_ingrediente)
     
     return resultado
 
@@ -306,33 +323,28 @@ def mutar_gaussiana(individuo, sigma=0.1, ingredientes_data=None, restricciones_
         Individuo mutado
     """
     resultado = individuo.clonar()
+    num_genes = len(resultado.porcentajes)
     
-    # Aplicar mutación gaussiana a cada gen
-    for i in range(len(resultado.porcentajes)):
-        # Verificar si es ingrediente fijo
-        if ingredientes_data and i < len(ingredientes_data):
-            limites_originales = ingredientes_data[i]["limitaciones"]
-            if restricciones_usuario:
-                limites = restricciones_usuario.obtener_limites(i, limites_originales)
-            else:
-                limites = limites_originales
-            
-            if abs(limites["min"] - limites["max"]) < 1e-6:
-                continue  # Saltar ingredientes fijos
-            
-            min_val = limites["min"]
-            max_val = limites["max"]
-        else:
-            min_val = 0.0
-            max_val = 1.0
-        
-        # Generar perturbación gaussiana
-        perturbacion = random.gauss(0, sigma)
-        nuevo_valor = resultado.porcentajes[i] + perturbacion
+    # Genes a perturbar: todos, o solo el soporte si el genoma es disperso
+    indices = obtener_soporte_disperso(resultado.porcentajes)
+    if indices is None:
+        indices = np.arange(num_genes)
+    
+    minimos = np.zeros(len(indices))
+    maximos = np.ones(len(indices))
+    if ingredientes_data:
+        limites = compilar_limites(ingredientes_data, restricciones_usuario)
+        con_datos = indices < len(ingredientes_data)
+        minimos[con_datos] = limites["minimos"][indices[con_datos]]
+        maximos[con_datos] = limites["maximos"][indices[con_datos]]
         
-        # Aplicar límites
-        nuevo_valor = max(min_val, min(nuevo_valor, max_val))
-        resultado.porcentajes[i] = nuevo_valor
+        # Saltar ingredientes fijos
+        variables = ~con_datos | ~limites["fijos"][np.where(con_datos, indices, 0)]
+        indices, minimos, maximos = indices[variables], minimos[variables], maximos[variables]
+    
+    # Generar perturbación gaussiana y aplicar límites
+    nuevos_valores = resultado.porcentajes[indices] + np.random.normal(0, sigma, len(indices))
+    resultado.porcentajes[indices] = np.maximum(minimos, np.minimum(nuevos_valores, maximos))
     
     # Normalizar
     resultado.normalizar(ingredientes_data, restricciones_usuario)
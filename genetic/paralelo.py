@@ -0,0 +1,284 @@
+"""
+Evaluación paralela de poblaciones con memoria compartida.
+
+Los arreglos compilados (modelo lineal de ingredientes y precios, límites)
+se publican una sola vez en segmentos de multiprocessing.shared_memory y los
+procesos trabajadores los adjuntan como vistas sin copia. Los genomas de
+cada generación se escriben en una matriz compartida y los resultados se
+leen de otra, de modo que por tarea solo viaja un rango de filas y no listas
+de Individuo serializadas.
+"""
+
+import multiprocessing
+
+import numpy as np
+
+try:
+    from multiprocessing import shared_memory
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+from genetic.individuo import Individuo
+from genetic.fitness.agregacion import calcular_fitness_adaptativo, evaluar_poblacion
+from genetic.fitness.incremental import (obtener_modelo_lineal, registrar_modelo_lineal,
+                                         aplicar_totales_lineales)
+from conocimiento.restricciones_usuario import compilar_limites, registrar_limites_compilados
+from genetic.instrumentacion import activar_instrumentacion
+
+# Columnas escalares de la matriz de resultados (seguidas de los totales lineales)
+COLUMNAS_RESULTADO = ("fitness", "conversion_alimenticia", "dias_peso_objetivo", "penalizacion_restricciones")
+
+# Estado de cada proceso trabajador (vistas compartidas y datos del problema)
+_DATOS_TRABAJADOR = {}
+
+
+def _crear_segmento(arreglo):
+    """Copia un arreglo a un segmento nuevo de memoria compartida"""
+    segmento = shared_memory.SharedMemory(create=True, size=max(1, arreglo.nbytes))
+    vista = np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=segmento.buf)
+    vista[...] = arreglo
+    return segmento, {"nombre": segmento.name, "forma": arreglo.shape, "tipo": arreglo.dtype.str}
+
+
+def _adjuntar_segmento(descriptor):
+    """Adjunta un segmento existente y devuelve (segmento, vista sin copia)"""
+    segmento = shared_memory.SharedMemory(name=descriptor["nombre"])
+    vista = np.ndarray(descriptor["forma"], dtype=np.dtype(descriptor["tipo"]), buffer=segmento.buf)
+    return segmento, vista
+
+
+def _inicializar_trabajador(descriptores, ingredientes_data, restricciones_usuario, config_evaluacion):
+    """
+    Inicializa un proceso trabajador: adjunta los segmentos compartidos y
+    registra las vistas en las cachés de modelo lineal y límites
+
+    Los datos de ingredientes y restricciones se reciben una sola vez por
+    proceso (solo se usan para los términos no lineales).
+    """
+    # Un trabajador creado por fork hereda la instrumentación del padre: no debe acumular en ella
+    activar_instrumentacion(None)
+    
+    segmentos = {}
+    vistas = {}
+    for clave, descriptor in descriptores.items():
+        segmentos[clave], vistas[clave] = _adjuntar_segmento(descriptor)
+
+    registrar_modelo_lineal(ingredientes_data, {
+        "matriz": vistas["matriz"],
+        "indices_fijos": vistas["indices_fijos"],
+        "suma_variables": vistas["suma_variables"]
+    }, restricciones_usuario)
+
+    registrar_limites_compilados(ingredientes_data, {
+        "minimos": vistas["minimos"],
+        "maximos": vistas["maximos"],
+        "fijos": vistas["fijos"],
+        "validos": vistas["validos"]
+    }, restricciones_usuario)
+
+    _DATOS_TRABAJADOR.update({
+        "segmentos": segmentos,
+        "genomas": vistas["genomas"],
+        "resultados": vistas["resultados"],
+        "ingredientes_data": ingredientes_data,
+        "restricciones_usuario": restricciones_usuario,
+        "config_evaluacion": config_evaluacion
+    })
+
+
+def _evaluar_bloque(tarea):
+    """
+    Evalúa un rango de filas de la matriz compartida de genomas
+
+    Args:
+        tarea: Tupla (inicio, fin, fase, generacion)
+
+    Returns:
+        Número de individuos evaluados
+    """
+    inicio, fin, fase, generacion = tarea
+    datos = _DATOS_TRABAJADOR
+    genomas = datos["genomas"]
+    resultados = datos["resultados"]
+    num_escalares = len(COLUMNAS_RESULTADO)
+
+    for fila in range(inicio, fin):
+        individuo = Individuo(genomas.shape[1])
+        individuo.porcentajes = genomas[fila].copy()
+
+        calcular_fitness_adaptativo(individuo, datos["config_evaluacion"], datos["ingredientes_data"],
+                                    datos["restricciones_usuario"], fase, generacion)
+
+        for c, atributo in enumerate(COLUMNAS_RESULTADO):
+            resultados[fila, c] = getattr(individuo, atributo)
+        resultados[fila, num_escalares:] = individuo.totales_lineales
+
+    return fin - inicio
+
+
+class EvaluadorParalelo:
+    """
+    Evalúa poblaciones en varios procesos usando memoria compartida
+    """
+
+    def __init__(self, num_procesos, capacidad, ingredientes_data, config_evaluacion,
+                 restricciones_usuario=None):
+        """
+        Publica los arreglos compilados y arranca los procesos trabajadores
+
+        Args:
+            num_procesos: Número de procesos trabajadores
+            capacidad: Número máximo de genomas por lote (normalmente el tamaño de población)
+            ingredientes_data: Lista de datos de ingredientes
+            config_evaluacion: Configuración para evaluación
+            restricciones_usuario: Restricciones del usuario (opcional)
+        """
+        self.num_procesos = num_procesos
+        self.capacidad = max(1, capacidad)
+        self.ingredientes_data = ingredientes_data
+        self.config_evaluacion = config_evaluacion
+        self.restricciones_usuario = restricciones_usuario
+        self._segmentos = []
+
+        modelo = obtener_modelo_lineal(ingredientes_data, restricciones_usuario)
+        limites = compilar_limites(ingredientes_data, restricciones_usuario)
+        num_totales = modelo["matriz"].shape[0]
+
+        arreglos = {
+            "matriz": modelo["matriz"],
+            "indices_fijos": modelo["indices_fijos"],
+            "suma_variables": modelo["suma_variables"],
+            "minimos": limites["minimos"],
+            "maximos": limites["maximos"],
+            "fijos": limites["fijos"],
+            "validos": limites["validos"],
+            "genomas": np.zeros((self.capacidad, len(ingredientes_data))),
+            "resultados": np.zeros((self.capacidad, len(COLUMNAS_RESULTADO) + num_totales))
+        }
+
+        descriptores = {}
+        vistas = {}
+        try:
+            for clave, arreglo in arreglos.items():
+                segmento, descriptores[clave] = _crear_segmento(np.ascontiguousarray(arreglo))
+                self._segmentos.append(segmento)
+                vistas[clave] = np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=segmento.buf)
+
+            self.genomas = vistas["genomas"]
+            self.resultados = vistas["resultados"]
+
+            self._pool = multiprocessing.Pool(
+                num_procesos,
+                initializer=_inicializar_trabajador,
+                initargs=(descriptores, ingredientes_data, restricciones_usuario, config_evaluacion)
+            )
+        except Exception:
+            self.cerrar()
+            raise
+
+    def evaluar(self, individuos, fase="inicial", generacion=0):
+        """
+        Evalúa una lista de individuos y copia los resultados en ellos
+
+        Args:
+            individuos: Lista de individuos a evaluar
+            fase: Fase actual del algoritmo
+            generacion: Generación actual
+        """
+        num_escalares = len(COLUMNAS_RESULTADO)
+
+        for desplazamiento in range(0, len(individuos), self.capacidad):
+            lote = individuos[desplazamiento:desplazamiento + self.capacidad]
+            for fila, individuo in enumerate(lote):
+                self.genomas[fila] = individuo.porcentajes
+
+            # Un bloque contiguo por proceso: solo viajan índices, no individuos
+            limites = np.linspace(0, len(lote), min(self.num_procesos, len(lote)) + 1).astype(int)
+            tareas = [(int(inicio), int(fin), fase, generacion)
+                      for inicio, fin in zip(limites[:-1], limites[1:]) if fin > inicio]
+            self._pool.map(_evaluar_bloque, tareas)
+
+            for fila, individuo in enumerate(lote):
+                valores = self.resultados[fila]
+                for c, atributo in enumerate(COLUMNAS_RESULTADO):
+                    setattr(individuo, atributo, float(valores[c]))
+                totales = valores[num_escalares:].copy()
+                individuo.totales_lineales = totales
+                individuo.profundidad_delta = 0
+                individuo.delta_mutacion = None
+                aplicar_totales_lineales(individuo, totales)
+                if individuo.proveedor_recomendado:
+                    individuo.proveedor_recomendado = {}
+
+    def cerrar(self):
+        """Detiene los procesos trabajadores y libera la memoria compartida"""
+        pool = getattr(self, "_pool", None)
+        if pool is not None:
+            pool.close()
+            pool.join()
+            self._pool = None
+
+        self.genomas = None
+        self.resultados = None
+        for segmento in self._segmentos:
+            try:
+                segmento.close()
+                segmento.unlink()
+            except (FileNotFoundError, BufferError):
+                pass
+        self._segmentos = []
+
+
+def crear_evaluador(num_procesos, capacidad, ingredientes_data, config_evaluacion, restricciones_usuario=None):
+    """
+    Crea un evaluador paralelo si es posible
+
+    Args:
+        num_procesos: Número de procesos solicitado (0 o None = todos los núcleos)
+        capacidad: Número máximo de genomas por lote
+        ingredientes_data: Lista de datos de ingredientes
+        config_evaluacion: Configuración para evaluación
+        restricciones_usuario: Restricciones del usuario (opcional)
+
+    Returns:
+        EvaluadorParalelo o None si se debe evaluar en serie
+    """
+    if not num_procesos:
+        num_procesos = multiprocessing.cpu_count()
+
+    if num_procesos <= 1:
+        return None
+
+    if not SHARED_MEMORY_AVAILABLE:
+        print("⚠️ multiprocessing.shared_memory no disponible, evaluando en serie")
+        return None
+
+    try:
+        return EvaluadorParalelo(num_procesos, capacidad, ingredientes_data,
+                                 config_evaluacion, restricciones_usuario)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ No se pudo iniciar la evaluación paralela ({e}), evaluando en serie")
+        return None
+
+
+def evaluar_con_evaluador(individuos, config_evaluacion, ingredientes_data, restricciones_usuario=None,
+                          fase="inicial", generacion=0, evaluador=None):
+    """
+    Evalúa individuos con el evaluador paralelo o, si no hay, en serie
+
+    Args:
+        individuos: Lista de individuos
+        config_evaluacion: Configuración para evaluación
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario
+        fase: Fase actual del algoritmo
+        generacion: Generación actual
+        evaluador: EvaluadorParalelo (opcional)
+    """
+    if evaluador is None or not individuos:
+        evaluar_poblacion(individuos, config_evaluacion, ingredientes_data,
+                          restricciones_usuario, fase, generacion)
+    else:
+        evaluador.evaluar(individuos, fase, generacion)
+        individuos.sort(key=lambda ind: ind.fitness)
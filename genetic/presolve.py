@@ -0,0 +1,228 @@
+"""
+Presolve de límites de ingredientes antes de la búsqueda.
+
+Con la restricción de suma (Σx = 1) y los límites declarados en
+``limitaciones`` y ``limites_personalizados`` muchos límites efectivos son
+más estrechos que los declarados: max_i ≤ 1 − Σ_{j≠i} min_j y
+min_i ≥ 1 − Σ_{j≠i} max_j. Opcionalmente los requerimientos nutricionales
+de la etapa (mínimos, y máximo de fibra) implican cotas adicionales, por
+ejemplo un mínimo de la fuente de proteína más concentrada o un máximo del
+cereal que diluye la proteína.
+
+El resultado tiene el mismo formato que compilar_limites, de modo que la
+reducción del genoma lo usa directamente: las variables que quedan fijas se
+eliminan y las libres trabajan sobre la caja ajustada.
+"""
+
+import numpy as np
+
+from conocimiento.restricciones_usuario import compilar_limites, TOLERANCIA_FIJO
+from conocimiento.requerimientos import obtener_requerimientos
+
+# Nutrientes cuyo requerimiento es un máximo (el resto son mínimos)
+NUTRIENTES_MAXIMOS = ("fibra",)
+
+# Tolerancia de factibilidad y de cambio entre iteraciones
+TOLERANCIA_PRESOLVE = 1e-9
+
+# Máximo de pasadas de propagación (normalmente converge en 2 o 3)
+MAX_ITERACIONES_PRESOLVE = 20
+
+
+def _ajustar_por_suma(minimos, maximos):
+    """Una pasada de propagación de la restricción Σx = 1"""
+    suma_minimos = minimos.sum()
+    suma_maximos = maximos.sum()
+    nuevos_maximos = np.minimum(maximos, 1.0 - (suma_minimos - minimos))
+    nuevos_minimos = np.maximum(minimos, 1.0 - (suma_maximos - maximos))
+    return nuevos_minimos, nuevos_maximos
+
+
+def _es_factible(minimos, maximos):
+    """Comprueba que la caja de límites sea compatible con Σx = 1"""
+    return bool(minimos.sum() <= 1.0 + TOLERANCIA_PRESOLVE and maximos.sum() >= 1.0 - TOLERANCIA_PRESOLVE
+                and not np.any(minimos > maximos + TOLERANCIA_PRESOLVE))
+
+
+def _aporte_maximo(x, aporte_i, aportes_otros, minimos_otros, capacidades_otros, orden):
+    """
+    Máximo aporte de nutriente de la mezcla con x_i = x: el resto de la masa
+    se llena de forma voraz con los demás ingredientes de mayor aporte
+
+    Args:
+        x: Valor (o arreglo de valores) de x_i
+
+    Returns:
+        Aporte máximo para cada x
+    """
+    # El llenado voraz es lineal entre las capacidades acumuladas (en orden de
+    # aporte): se interpola sobre sus aportes acumulados
+    acumulado = np.concatenate(([0.0], np.cumsum(capacidades_otros[orden])))
+    aporte_acumulado = np.concatenate(([0.0], np.cumsum(aportes_otros[orden] * capacidades_otros[orden])))
+    restante = (1.0 - np.asarray(x, dtype=float)) - minimos_otros.sum()
+    return (aporte_i * x + (aportes_otros * minimos_otros).sum()
+            + np.interp(restante, acumulado, aporte_acumulado))
+
+
+def _intervalo_nutriente(minimo, maximo, aporte_i, aportes_otros, minimos_otros, capacidades_otros, objetivo):
+    """
+    Intervalo de x_i en [minimo, maximo] en el que la mezcla aún puede
+    alcanzar Σ a_j x_j ≥ objetivo
+
+    El aporte máximo es lineal por tramos en x_i, con quiebres donde la masa
+    restante (1 − x_i − Σ min_j) cruza una capacidad acumulada de los demás
+    ingredientes. Se evalúa en los quiebres y los extremos, y los cruces con
+    el objetivo se obtienen por interpolación exacta en su tramo (sin
+    búsqueda iterativa).
+
+    Returns:
+        Tupla (minimo, maximo) ajustada, o None si ningún x_i alcanza el objetivo
+    """
+    orden = np.argsort(aportes_otros)[::-1]
+    acumulado = np.concatenate(([0.0], np.cumsum(capacidades_otros[orden])))
+    quiebres = (1.0 - minimos_otros.sum()) - acumulado
+    puntos = np.unique(np.concatenate(([minimo, maximo], quiebres[(quiebres > minimo) & (quiebres < maximo)])))
+    valores = _aporte_maximo(puntos, aporte_i, aportes_otros, minimos_otros, capacidades_otros, orden)
+
+    pico = int(np.argmax(valores))
+    if valores[pico] < objetivo - TOLERANCIA_PRESOLVE:
+        return None
+
+    alcanzan = np.flatnonzero(valores >= objetivo)
+    if len(alcanzan) == 0:
+        # Solo el pico alcanza el objetivo (dentro de la tolerancia)
+        return puntos[pico], puntos[pico]
+
+    def cruce(k_fuera, k_dentro):
+        """Punto del tramo entre dos puntos en el que el aporte vale el objetivo"""
+        x0, x1 = puntos[k_fuera], puntos[k_dentro]
+        v0, v1 = valores[k_fuera], valores[k_dentro]
+        return x0 + (objetivo - v0) * (x1 - x0) / (v1 - v0)
+
+    primero, ultimo = alcanzan[0], alcanzan[-1]
+    nuevo_minimo = minimo if primero == 0 else cruce(primero - 1, primero)
+    nuevo_maximo = maximo if ultimo == len(puntos) - 1 else cruce(ultimo + 1, ultimo)
+    return nuevo_minimo, nuevo_maximo
+
+
+def _ajustar_por_nutrientes(minimos, maximos, validos, ingredientes_data, requerimientos):
+    """
+    Una pasada de cotas implicadas por los requerimientos nutricionales
+
+    Cada requerimiento mínimo Σ a_j x_j ≥ b acota x_i por los dos lados (muy
+    poco de la fuente más concentrada, o demasiado de un ingrediente pobre,
+    impiden alcanzarlo). Los máximos (fibra) se tratan igual cambiando el
+    signo del aporte y del objetivo.
+
+    Returns:
+        Tupla (minimos, maximos, mensajes)
+    """
+    minimos = minimos.copy()
+    maximos = maximos.copy()
+    mensajes = []
+    indices = np.flatnonzero(validos)
+    if len(indices) < 2:
+        return minimos, maximos, mensajes
+
+    for nutriente, objetivo in requerimientos.items():
+        aportes = np.array([ingredientes_data[i]["nutrientes"].get(nutriente, 0.0) for i in indices], dtype=float)
+        if nutriente in NUTRIENTES_MAXIMOS:
+            aportes, objetivo = -aportes, -objetivo
+
+        for k, i in enumerate(indices):
+            otros = np.arange(len(indices)) != k
+            intervalo = _intervalo_nutriente(
+                minimos[i], maximos[i], aportes[k], aportes[otros],
+                minimos[indices[otros]], maximos[indices[otros]] - minimos[indices[otros]], objetivo)
+            if intervalo is None:
+                mensajes.append(f"Ninguna mezcla dentro de los límites cumple el requerimiento de {nutriente}")
+                break
+            minimos[i], maximos[i] = intervalo
+
+    return minimos, maximos, mensajes
+
+
+def presolver_limites(ingredientes_data, restricciones_usuario=None, requerimientos=None,
+                      max_iteraciones=MAX_ITERACIONES_PRESOLVE):
+    """
+    Ajusta los límites efectivos de los ingredientes antes de la búsqueda
+
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (opcional)
+        requerimientos: Requerimientos nutricionales a tratar como restricciones
+            duras (opcional; por defecto solo se usa la restricción de suma)
+        max_iteraciones: Máximo de pasadas de propagación
+
+    Returns:
+        Diccionario con los arreglos minimos, maximos, fijos y validos ajustados,
+        más factible, mensajes, ajustados (número de límites estrechados),
+        nuevos_fijos e iteraciones
+    """
+    limites = compilar_limites(ingredientes_data, restricciones_usuario)
+    validos = limites["validos"]
+
+    # Los excluidos no aportan masa: caja [0, 0]
+    minimos = np.where(validos, limites["minimos"], 0.0)
+    maximos = np.where(validos, np.minimum(limites["maximos"], 1.0), 0.0)
+    mensajes = []
+
+    iteraciones = 0
+    factible = _es_factible(minimos, maximos)
+    # Con límites infactibles la propagación diverge: se detiene en cuanto se detecta
+    while factible and iteraciones < max_iteraciones:
+        iteraciones += 1
+        nuevos_minimos, nuevos_maximos = _ajustar_por_suma(minimos, maximos)
+        if requerimientos:
+            nuevos_minimos, nuevos_maximos, mensajes_nutrientes = _ajustar_por_nutrientes(
+                nuevos_minimos, nuevos_maximos, validos, ingredientes_data, requerimientos)
+            if mensajes_nutrientes:
+                # Requerimiento duro inalcanzable: no hay formulación factible
+                mensajes.extend(mensajes_nutrientes)
+                factible = False
+                break
+
+        cambio = max(np.abs(nuevos_minimos - minimos).max(initial=0.0),
+                     np.abs(nuevos_maximos - maximos).max(initial=0.0))
+        minimos, maximos = nuevos_minimos, nuevos_maximos
+        factible = _es_factible(minimos, maximos)
+        if cambio <= TOLERANCIA_PRESOLVE:
+            break
+
+    # Detección temprana de infactibilidad
+    if minimos.sum() > 1.0 + TOLERANCIA_PRESOLVE:
+        mensajes.append(f"La suma de mínimos ({minimos.sum():.2%}) excede el 100%")
+    if maximos.sum() < 1.0 - TOLERANCIA_PRESOLVE:
+        mensajes.append(f"La suma de máximos ({maximos.sum():.2%}) no alcanza el 100%")
+    for i in np.flatnonzero(minimos > maximos + TOLERANCIA_PRESOLVE):
+        mensajes.append(f"{ingredientes_data[i]['nombre']}: mínimo {minimos[i]:.2%} mayor que máximo {maximos[i]:.2%}")
+
+    # Solo se reportan como ajustes los límites estrechados de ingredientes válidos
+    ajustados = validos & ((minimos > limites["minimos"] + TOLERANCIA_PRESOLVE) |
+                           (maximos < limites["maximos"] - TOLERANCIA_PRESOLVE))
+    fijos = np.abs(minimos - maximos) < TOLERANCIA_FIJO
+
+    return {
+        "minimos": minimos,
+        "maximos": maximos,
+        "fijos": fijos,
+        "validos": validos,
+        "factible": bool(factible),
+        "mensajes": mensajes,
+        "ajustados": int(np.count_nonzero(ajustados)),
+        "nuevos_fijos": int(np.count_nonzero(fijos & validos & ~limites["fijos"])),
+        "iteraciones": iteraciones
+    }
+
+
+def obtener_requerimientos_presolve(config_evaluacion):
+    """
+    Requerimientos de la etapa a usar como restricciones duras en el presolve
+
+    Args:
+        config_evaluacion: Configuración para evaluación (usa edad_dias)
+
+    Returns:
+        Diccionario nutriente -> valor requerido
+    """
+    return obtener_requerimientos(config_evaluacion.get("edad_dias", 35))
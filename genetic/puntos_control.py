@@ -0,0 +1,245 @@
+"""
+Puntos de control de ejecuciones largas del algoritmo genético.
+
+Guarda periódicamente, en un archivo .npz, todo lo que determina la
+continuación de la búsqueda: matriz de genomas, arreglos de evaluación y
+totales lineales de cada individuo, mejores individuos (hall of fame),
+caché de evaluaciones de la última generación, estado de los generadores
+aleatorios (random y numpy), fase, generación e históricos (el de métricas
+con sus arreglos columnares). Al reanudar con la misma configuración la
+ejecución continúa de forma idéntica bit a bit a la que no se interrumpió.
+
+La escritura es atómica (archivo temporal, fsync y os.replace): un proceso
+que muere a mitad de la escritura deja intacto el punto de control anterior.
+"""
+
+import json
+import os
+import random
+
+import numpy as np
+
+from genetic.individuo import Individuo
+from genetic.duplicados import calcular_clave_genoma, _ATRIBUTOS_EVALUACION
+
+# Versión del formato; cambia si cambian los arreglos guardados
+VERSION_PUNTO_CONTROL = 2
+
+
+def _parametros_ejecucion(ag):
+    """Parámetros que deben coincidir para reanudar de forma idéntica"""
+    return {
+        "tamano_poblacion": ag.tamano_poblacion,
+        "num_generaciones": ag.num_generaciones,
+        "prob_cruza": ag.prob_cruza,
+        "prob_mutacion": ag.prob_mutacion,
+        "elitismo": ag.elitismo,
+        "estrategia_duplicados": ag.estrategia_duplicados,
+        "resolucion_duplicados": ag.resolucion_duplicados,
+        "prob_mutacion_estructural": ag.prob_mutacion_estructural,
+        "num_genes": len(ag.ingredientes_genoma),
+        "num_ingredientes": len(ag.ingredientes_data),
+        "config_evaluacion": ag.config_evaluacion
+    }
+
+
+def _empaquetar_individuos(individuos, prefijo):
+    """
+    Convierte una lista de individuos en arreglos
+
+    Las propiedades nutricionales se guardan como matriz sobre la unión de
+    claves (NaN donde un individuo no tiene la propiedad).
+    """
+    num_genes = len(individuos[0].porcentajes) if individuos else 0
+    claves = []
+    for individuo in individuos:
+        claves.extend(c for c in individuo.propiedades_nutricionales if c not in claves)
+
+    totales = [ind.totales_lineales for ind in individuos]
+    num_totales = next((len(t) for t in totales if t is not None), 0)
+
+    propiedades = np.full((len(individuos), len(claves)), np.nan)
+    matriz_totales = np.zeros((len(individuos), num_totales))
+    for i, individuo in enumerate(individuos):
+        for j, clave in enumerate(claves):
+            if clave in individuo.propiedades_nutricionales:
+                propiedades[i, j] = individuo.propiedades_nutricionales[clave]
+        if totales[i] is not None:
+            matriz_totales[i] = totales[i]
+
+    return {
+        f"{prefijo}_genomas": np.array([ind.porcentajes for ind in individuos]).reshape(len(individuos), num_genes),
+        f"{prefijo}_evaluacion": np.array([[getattr(ind, a) for a in _ATRIBUTOS_EVALUACION] for ind in individuos],
+                                          dtype=float).reshape(len(individuos), len(_ATRIBUTOS_EVALUACION)),
+        f"{prefijo}_totales": matriz_totales,
+        f"{prefijo}_con_totales": np.array([t is not None for t in totales], dtype=bool),
+        f"{prefijo}_profundidad": np.array([ind.profundidad_delta for ind in individuos], dtype=np.int64),
+        f"{prefijo}_claves_propiedades": np.array(claves, dtype=str),
+        f"{prefijo}_propiedades": propiedades
+    }
+
+
+def _desempaquetar_individuos(arreglos, prefijo):
+    """Reconstruye los individuos guardados por _empaquetar_individuos"""
+    genomas = arreglos[f"{prefijo}_genomas"]
+    claves = arreglos[f"{prefijo}_claves_propiedades"].tolist()
+    individuos = []
+    for i in range(len(genomas)):
+        individuo = Individuo(genomas.shape[1])
+        individuo.porcentajes = genomas[i].copy()
+        for atributo, valor in zip(_ATRIBUTOS_EVALUACION, arreglos[f"{prefijo}_evaluacion"][i].tolist()):
+            setattr(individuo, atributo, valor)
+        individuo.propiedades_nutricionales = {
+            clave: valor for clave, valor in zip(claves, arreglos[f"{prefijo}_propiedades"][i].tolist())
+            if valor == valor
+        }
+        if arreglos[f"{prefijo}_con_totales"][i]:
+            individuo.totales_lineales = arreglos[f"{prefijo}_totales"][i].copy()
+        individuo.profundidad_delta = int(arreglos[f"{prefijo}_profundidad"][i])
+        individuos.append(individuo)
+    return individuos
+
+
+def _estado_aleatorio():
+    """Estado de los generadores random y numpy como arreglos"""
+    version, estado, gauss = random.getstate()
+    nombre, claves, posicion, tiene_gauss, gauss_numpy = np.random.get_state()
+    return {
+        "rng_python_version": np.array(version),
+        "rng_python_estado": np.array(estado, dtype=np.int64),
+        "rng_python_gauss": np.array(np.nan if gauss is None else gauss),
+        "rng_numpy_nombre": np.array(nombre),
+        "rng_numpy_claves": claves,
+        "rng_numpy_posicion": np.array(posicion),
+        "rng_numpy_tiene_gauss": np.array(tiene_gauss),
+        "rng_numpy_gauss": np.array(gauss_numpy)
+    }
+
+
+def _restaurar_estado_aleatorio(arreglos):
+    """Restablece los generadores random y numpy"""
+    gauss = float(arreglos["rng_python_gauss"])
+    random.setstate((int(arreglos["rng_python_version"]),
+                     tuple(arreglos["rng_python_estado"].tolist()),
+                     None if gauss != gauss else gauss))
+    np.random.set_state((str(arreglos["rng_numpy_nombre"]), arreglos["rng_numpy_claves"],
+                         int(arreglos["rng_numpy_posicion"]), int(arreglos["rng_numpy_tiene_gauss"]),
+                         float(arreglos["rng_numpy_gauss"])))
+
+
+def guardar_punto_control(ag, ruta, tiempo_transcurrido=0.0):
+    """
+    Guarda el estado de una ejecución al terminar una generación
+
+    Args:
+        ag: AlgoritmoGenetico en ejecución
+        ruta: Ruta del archivo .npz
+        tiempo_transcurrido: Segundos de ejecución acumulados
+
+    Returns:
+        True si se guardó el punto de control
+    """
+    # La caché de evaluaciones apunta a individuos de la población: se guardan sus posiciones
+    posiciones = {id(individuo): i for i, individuo in enumerate(ag.poblacion)}
+    cache = ag.cache_evaluaciones.get("evaluaciones", {})
+    indices_cache = [posiciones[id(ind)] for ind in cache.values() if id(ind) in posiciones]
+
+    arreglos = {
+        "version": np.array(VERSION_PUNTO_CONTROL),
+        "parametros": np.array(json.dumps(_parametros_ejecucion(ag), sort_keys=True)),
+        "generacion": np.array(ag.generacion_actual),
+        "fase": np.array(ag.fase_actual),
+        "convergencia_detectada": np.array(ag.convergencia_detectada),
+        "tiempo_transcurrido": np.array(tiempo_transcurrido),
+        "historico_fitness": np.array(ag.historico_fitness, dtype=float),
+        "estadisticas_duplicados": np.array(json.dumps(ag.estadisticas_duplicados)),
+        "cache_fase": np.array(ag.cache_evaluaciones.get("fase", "")),
+        "cache_indices": np.array(indices_cache, dtype=np.int64)
+    }
+    arreglos.update(_empaquetar_individuos(ag.poblacion, "poblacion"))
+    arreglos.update(_empaquetar_individuos(ag.mejores_individuos, "mejores"))
+    arreglos.update(ag.historico_metricas.exportar_arreglos())
+    arreglos.update(_estado_aleatorio())
+
+    try:
+        directorio = os.path.dirname(ruta)
+        if directorio and not os.path.exists(directorio):
+            os.makedirs(directorio)
+
+        # Escritura atómica y durable: el archivo anterior se reemplaza solo
+        # cuando el nuevo está completo en disco
+        temporal = ruta + ".tmp.npz"
+        with open(temporal, "wb") as f:
+            np.savez(f, **arreglos)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporal, ruta)
+        return True
+    except OSError as e:
+        print(f"❌ Error al guardar el punto de control: {e}")
+        return False
+
+
+def cargar_punto_control(ruta):
+    """
+    Lee un punto de control
+
+    Args:
+        ruta: Ruta del archivo .npz
+
+    Returns:
+        Diccionario de arreglos, o None si no existe o no es válido
+    """
+    if not os.path.exists(ruta):
+        print(f"❌ Punto de control no encontrado: {ruta}")
+        return None
+    try:
+        with np.load(ruta, allow_pickle=False) as datos:
+            if int(datos["version"]) != VERSION_PUNTO_CONTROL:
+                print(f"❌ Versión de punto de control no compatible: {int(datos['version'])}")
+                return None
+            return {clave: datos[clave] for clave in datos.files}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Error al leer el punto de control: {e}")
+        return None
+
+
+def restaurar_punto_control(ag, arreglos):
+    """
+    Restablece en el algoritmo el estado guardado en un punto de control
+
+    Args:
+        ag: AlgoritmoGenetico construido con la misma configuración
+        arreglos: Diccionario de cargar_punto_control
+
+    Returns:
+        Segundos de ejecución acumulados antes del punto de control, o None
+        si la configuración no coincide con la guardada
+    """
+    guardados = json.loads(str(arreglos["parametros"]))
+    actuales = json.loads(json.dumps(_parametros_ejecucion(ag), sort_keys=True))
+    diferentes = sorted(clave for clave in set(guardados) | set(actuales)
+                        if guardados.get(clave) != actuales.get(clave))
+    if diferentes:
+        print(f"❌ El punto de control no corresponde a esta configuración (difiere: {', '.join(diferentes)})")
+        return None
+
+    ag.generacion_actual = int(arreglos["generacion"])
+    ag.fase_actual = str(arreglos["fase"])
+    ag.convergencia_detectada = bool(arreglos["convergencia_detectada"])
+    ag.historico_fitness = arreglos["historico_fitness"].tolist()
+    ag.historico_metricas.restaurar_arreglos(arreglos)
+    ag.estadisticas_duplicados = json.loads(str(arreglos["estadisticas_duplicados"]))
+    ag.poblacion = _desempaquetar_individuos(arreglos, "poblacion")
+    ag.mejores_individuos = _desempaquetar_individuos(arreglos, "mejores")
+
+    ag.cache_evaluaciones = {}
+    if str(arreglos["cache_fase"]):
+        ag.cache_evaluaciones["fase"] = str(arreglos["cache_fase"])
+        ag.cache_evaluaciones["evaluaciones"] = {
+            calcular_clave_genoma(ag.poblacion[i].porcentajes, ag.resolucion_duplicados): ag.poblacion[i]
+            for i in arreglos["cache_indices"].tolist()
+        }
+
+    _restaurar_estado_aleatorio(arreglos)
+    return float(arreglos["tiempo_transcurrido"])
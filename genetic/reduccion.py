@@ -0,0 +1,165 @@
+"""
+Reducción del genoma a los ingredientes libres.
+
+Los ingredientes fijos (mínimo = máximo) y los excluidos por el usuario no
+aportan grados de libertad, pero los operadores los recorren en cada cruza,
+mutación y normalización. El problema reducido trabaja solo con los
+ingredientes libres sobre el simplex restante (la masa fija se descuenta de
+antemano); las formulaciones completas se reconstruyen para evaluar y en la
+frontera de resultados y reportes.
+"""
+
+import numpy as np
+
+from conocimiento.restricciones_usuario import compilar_limites
+from genetic.paralelo import evaluar_con_evaluador
+
+
+def construir_problema_reducido(ingredientes_data, restricciones_usuario=None, limites=None):
+    """
+    Construye el problema reducido a los ingredientes libres
+
+    Args:
+        ingredientes_data: Lista de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario (exclusiones y límites)
+        limites: Límites ya ajustados por presolver_limites (opcional; por
+            defecto los compilados)
+
+    Returns:
+        Diccionario del problema reducido, o None si no hay nada que reducir
+        (ningún ingrediente fijo ni excluido ni límite ajustado) o la masa fija
+        no deja margen
+    """
+    if not ingredientes_data:
+        return None
+
+    if limites is None:
+        limites = compilar_limites(ingredientes_data, restricciones_usuario)
+    fijos = limites["fijos"] & limites["validos"]
+    libres = ~limites["fijos"] & limites["validos"]
+
+    indices_libres = np.flatnonzero(libres)
+    if len(indices_libres) == 0:
+        return None
+    if len(indices_libres) == len(ingredientes_data) and not limites.get("ajustados"):
+        return None
+
+    valores_fijos = np.where(fijos, limites["minimos"], 0.0)
+    masa_libre = 1.0 - float(valores_fijos.sum())
+    if masa_libre <= 0:
+        print("⚠️ Los ingredientes fijos ocupan toda la formulación, no se reduce el genoma")
+        return None
+
+    # Límites de los libres reescalados al simplex reducido (suma = 1)
+    ingredientes_reducidos = []
+    for i in indices_libres:
+        ingrediente = dict(ingredientes_data[i])
+        ingrediente["limitaciones"] = {
+            "min": min(1.0, limites["minimos"][i] / masa_libre),
+            "max": min(1.0, limites["maximos"][i] / masa_libre)
+        }
+        ingredientes_reducidos.append(ingrediente)
+
+    return {
+        "indices_libres": indices_libres,
+        "valores_fijos": valores_fijos,
+        "masa_libre": masa_libre,
+        "ingredientes": ingredientes_reducidos,
+        "num_ingredientes": len(ingredientes_data)
+    }
+
+
+def expandir_porcentajes(porcentajes, problema):
+    """
+    Reconstruye la formulación completa a partir del genoma reducido
+
+    Args:
+        porcentajes: Genoma reducido (suma 1 sobre los libres)
+        problema: Problema de construir_problema_reducido
+
+    Returns:
+        Arreglo con los porcentajes de todos los ingredientes
+    """
+    completos = problema["valores_fijos"].copy()
+    completos[problema["indices_libres"]] = np.asarray(porcentajes) * problema["masa_libre"]
+    return completos
+
+
+def reducir_porcentajes(porcentajes, problema):
+    """
+    Proyecta una formulación completa sobre el genoma reducido
+
+    Args:
+        porcentajes: Porcentajes de todos los ingredientes
+        problema: Problema de construir_problema_reducido
+
+    Returns:
+        Genoma reducido
+    """
+    return np.asarray(porcentajes, dtype=float)[problema["indices_libres"]] / problema["masa_libre"]
+
+
+def expandir_individuo(individuo, problema):
+    """
+    Crea una copia del individuo con la formulación completa
+
+    Args:
+        individuo: Individuo con genoma reducido (ya evaluado)
+        problema: Problema de construir_problema_reducido
+
+    Returns:
+        Nuevo individuo con porcentajes de todos los ingredientes
+    """
+    completo = individuo.clonar()
+    completo.porcentajes = expandir_porcentajes(individuo.porcentajes, problema)
+    return completo
+
+
+def _expandir_delta(delta, problema, num_genes):
+    """Traduce una mutación registrada en el genoma reducido a índices completos"""
+    libres = problema["indices_libres"]
+    masa_libre = problema["masa_libre"]
+    cambios = [(int(libres[j]), cambio * masa_libre) for j, cambio in delta["cambios"]]
+
+    # En el modelo completo los excluidos también son variables: el desplazamiento
+    # uniforme se expresa como cambios explícitos sobre los libres no mutados
+    if delta["desplazamiento"]:
+        mutados = {j for j, _ in delta["cambios"]}
+        cambios.extend((int(libres[j]), delta["desplazamiento"] * masa_libre)
+                       for j in range(num_genes) if j not in mutados)
+
+    expandido = dict(delta)
+    expandido["cambios"] = cambios
+    expandido["desplazamiento"] = 0.0
+    return expandido
+
+
+def evaluar_individuos_reducidos(individuos, problema, config_evaluacion, ingredientes_data,
+                                 restricciones_usuario=None, fase="inicial", generacion=0, evaluador=None):
+    """
+    Evalúa individuos con genoma reducido sobre su formulación completa
+
+    Args:
+        individuos: Lista de individuos con genoma reducido
+        problema: Problema de construir_problema_reducido
+        config_evaluacion: Configuración para evaluación
+        ingredientes_data: Lista completa de datos de ingredientes
+        restricciones_usuario: Restricciones del usuario
+        fase: Fase actual del algoritmo
+        generacion: Generación actual
+        evaluador: EvaluadorParalelo (opcional)
+    """
+    genomas_reducidos = []
+    for individuo in individuos:
+        genomas_reducidos.append(individuo.porcentajes)
+        if individuo.delta_mutacion is not None:
+            individuo.delta_mutacion = _expandir_delta(individuo.delta_mutacion, problema,
+                                                       len(individuo.porcentajes))
+        individuo.porcentajes = expandir_porcentajes(individuo.porcentajes, problema)
+
+    try:
+        evaluar_con_evaluador(list(individuos), config_evaluacion, ingredientes_data,
+                              restricciones_usuario, fase, generacion, evaluador)
+    finally:
+        for individuo, genoma in zip(individuos, genomas_reducidos):
+            individuo.porcentajes = genoma
@@ -0,0 +1,299 @@
+"""
+Rejilla precalculada de formulaciones óptimas.
+
+Permite ejecutar el algoritmo genético de forma offline sobre una rejilla de
+escenarios (raza, edad, peso actual, peso objetivo), guardar los resultados en
+un archivo .npz indexado y consultar en tiempo interactivo la formulación más
+cercana o interpolada, con un refinamiento opcional mediante un AG corto que
+parte de la formulación encontrada.
+"""
+
+import os
+import time
+import numpy as np
+
+from config import ALGORITMO_CONFIG, ARCHIVOS_CONFIG, RANGOS_VALIDACION, REJILLA_CONFIG
+from conocimiento.razas import RAZAS_POLLOS
+
+# Caché en memoria de rejillas cargadas: ruta -> (mtime, rejilla)
+_REJILLAS_CARGADAS = {}
+
+
+def generar_escenarios_rejilla(razas=None, edades=None, pesos_actuales=None, pesos_objetivo=None):
+    """
+    Genera la lista de escenarios válidos de la rejilla
+
+    Args:
+        razas: Lista de nombres de razas (por defecto todas las de RAZAS_POLLOS)
+        edades: Lista de edades en días
+        pesos_actuales: Lista de pesos actuales en kg
+        pesos_objetivo: Lista de pesos objetivo en kg
+
+    Returns:
+        Lista de tuplas (raza, edad_dias, peso_actual, peso_objetivo)
+    """
+    razas = razas or [raza["nombre"] for raza in RAZAS_POLLOS]
+    edades = edades if edades is not None else REJILLA_CONFIG["edades"]
+    pesos_actuales = pesos_actuales if pesos_actuales is not None else REJILLA_CONFIG["pesos_actuales"]
+    pesos_objetivo = pesos_objetivo if pesos_objetivo is not None else REJILLA_CONFIG["pesos_objetivo"]
+
+    edad_min, edad_max = RANGOS_VALIDACION["edad_dias"]
+
+    escenarios = []
+    for raza in razas:
+        for edad in edades:
+            if not (edad_min <= edad <= edad_max):
+                continue
+            for peso_actual in pesos_actuales:
+                for peso_objetivo in pesos_objetivo:
+                    # Solo tienen sentido los escenarios con crecimiento pendiente
+                    if peso_objetivo > peso_actual:
+                        escenarios.append((raza, edad, peso_actual, peso_objetivo))
+
+    return escenarios
+
+
+def construir_rejilla_formulaciones(archivo=None, razas=None, edades=None, pesos_actuales=None,
+                                    pesos_objetivo=None, config_algoritmo=None, ingredientes_data=None):
+    """
+    Ejecuta el algoritmo genético sobre cada escenario de la rejilla y guarda los resultados
+
+    Args:
+        archivo: Ruta del archivo .npz de salida (por defecto la de REJILLA_CONFIG)
+        razas: Lista de razas a incluir
+        edades: Lista de edades en días
+        pesos_actuales: Lista de pesos actuales en kg
+        pesos_objetivo: Lista de pesos objetivo en kg
+        config_algoritmo: Parámetros del AG (por defecto los de REJILLA_CONFIG)
+        ingredientes_data: Datos de ingredientes (por defecto INGREDIENTES)
+
+    Returns:
+        Diccionario con los arreglos de la rejilla construida
+    """
+    # Importaciones locales para evitar ciclos genetic <-> conocimiento
+    from conocimiento.ingredientes import INGREDIENTES
+    from genetic.ag import AlgoritmoGenetico
+
+    archivo = archivo or obtener_ruta_rejilla()
+    ingredientes_data = ingredientes_data or INGREDIENTES
+    escenarios = generar_escenarios_rejilla(razas, edades, pesos_actuales, pesos_objetivo)
+
+    if not escenarios:
+        raise ValueError("La rejilla no contiene escenarios válidos")
+
+    nombres_razas = sorted(set(e[0] for e in escenarios))
+    indice_razas = {nombre: i for i, nombre in enumerate(nombres_razas)}
+
+    num_escenarios = len(escenarios)
+    num_ingredientes = len(ingredientes_data)
+
+    coordenadas = np.zeros((num_escenarios, 3))
+    raza_idx = np.zeros(num_escenarios, dtype=np.int16)
+    porcentajes = np.zeros((num_escenarios, num_ingredientes))
+    fitness = np.full(num_escenarios, np.inf)
+    costos = np.zeros(num_escenarios)
+
+    print(f"🗂️ Construyendo rejilla de formulaciones: {num_escenarios} escenarios")
+    inicio = time.time()
+
+    for i, (raza, edad, peso_actual, peso_objetivo) in enumerate(escenarios):
+        config = ALGORITMO_CONFIG.copy()
+        config.update(REJILLA_CONFIG["algoritmo"])
+        if config_algoritmo:
+            config.update(config_algoritmo)
+
+        config["ingredientes_data"] = ingredientes_data
+        config["restricciones_usuario"] = None
+        config["config_evaluacion"] = {
+            "raza": raza,
+            "edad_dias": edad,
+            "peso_actual": peso_actual,
+            "peso_objetivo": peso_objetivo
+        }
+
+        resultado = AlgoritmoGenetico(config).ejecutar()
+        mejor = resultado.get("mejor_individuo")
+
+        coordenadas[i] = (edad, peso_actual, peso_objetivo)
+        raza_idx[i] = indice_razas[raza]
+
+        if mejor is not None:
+            porcentajes[i] = mejor.porcentajes
+            fitness[i] = mejor.fitness
+            costos[i] = mejor.costo_total
+        else:
+            print(f"⚠️ Escenario sin solución: {raza}, {edad} días, {peso_actual}->{peso_objetivo} kg")
+
+    print(f"✅ Rejilla construida en {time.time() - inicio:.1f} s")
+
+    rejilla = {
+        "razas": np.array(nombres_razas),
+        "raza_idx": raza_idx,
+        "coordenadas": coordenadas,
+        "porcentajes": porcentajes,
+        "fitness": fitness,
+        "costo": costos,
+        "ids_ingredientes": np.array([ing["id"] for ing in ingredientes_data])
+    }
+
+    guardar_rejilla(rejilla, archivo)
+    return rejilla
+
+
+def guardar_rejilla(rejilla, archivo):
+    """
+    Guarda la rejilla en un archivo .npz sin comprimir para que la carga sea inmediata
+
+    Args:
+        rejilla: Diccionario con los arreglos de la rejilla
+        archivo: Ruta del archivo de salida
+    """
+    directorio = os.path.dirname(archivo)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio)
+
+    np.savez(archivo, **rejilla)
+    _REJILLAS_CARGADAS.pop(os.path.abspath(archivo), None)
+    print(f"💾 Rejilla guardada en: {archivo}")
+
+
+def cargar_rejilla(archivo=None):
+    """
+    Carga una rejilla desde disco, reutilizando la copia en memoria si no cambió
+
+    Args:
+        archivo: Ruta del archivo .npz (por defecto la de REJILLA_CONFIG)
+
+    Returns:
+        Diccionario con los arreglos de la rejilla y escalas precalculadas,
+        o None si el archivo no existe
+    """
+    archivo = os.path.abspath(archivo or obtener_ruta_rejilla())
+
+    if not os.path.exists(archivo):
+        return None
+
+    mtime = os.path.getmtime(archivo)
+    en_cache = _REJILLAS_CARGADAS.get(archivo)
+    if en_cache and en_cache[0] == mtime:
+        return en_cache[1]
+
+    with np.load(archivo) as datos:
+        rejilla = {clave: datos[clave] for clave in datos.files}
+
+    # Escalas por dimensión para que edad y pesos pesen igual en la distancia
+    coordenadas = rejilla["coordenadas"]
+    escalas = coordenadas.max(axis=0) - coordenadas.min(axis=0)
+    escalas[escalas == 0] = 1.0
+    rejilla["escalas"] = escalas
+    rejilla["indice_razas"] = {str(nombre).lower(): i for i, nombre in enumerate(rejilla["razas"])}
+
+    _REJILLAS_CARGADAS[archivo] = (mtime, rejilla)
+    return rejilla
+
+
+def consultar_formulacion(raza, edad_dias, peso_actual, peso_objetivo, rejilla=None,
+                          interpolar=True, vecinos=4):
+    """
+    Obtiene la formulación precalculada más cercana al escenario solicitado
+
+    Args:
+        raza: Nombre de la raza
+        edad_dias: Edad en días
+        peso_actual: Peso actual en kg
+        peso_objetivo: Peso objetivo en kg
+        rejilla: Rejilla cargada o ruta del archivo (por defecto la de REJILLA_CONFIG)
+        interpolar: Si True, promedia los vecinos ponderando por distancia inversa
+        vecinos: Número de vecinos usados en la interpolación
+
+    Returns:
+        Diccionario con porcentajes, escenario de referencia y distancia,
+        o None si no hay rejilla o la raza no está incluida
+    """
+    if rejilla is None or isinstance(rejilla, str):
+        rejilla = cargar_rejilla(rejilla)
+    if rejilla is None:
+        return None
+
+    indice = rejilla["indice_razas"].get(str(raza).lower())
+    if indice is None:
+        return None
+
+    filas = np.flatnonzero(rejilla["raza_idx"] == indice)
+    if filas.size == 0:
+        return None
+
+    punto = np.array([edad_dias, peso_actual, peso_objetivo], dtype=float)
+    diferencias = (rejilla["coordenadas"][filas] - punto) / rejilla["escalas"]
+    distancias = np.sqrt(np.sum(diferencias ** 2, axis=1))
+
+    orden = np.argsort(distancias)
+    mas_cercano = filas[orden[0]]
+    distancia_min = float(distancias[orden[0]])
+
+    if interpolar and distancia_min > 1e-9 and filas.size > 1:
+        seleccion = orden[:vecinos]
+        pesos = 1.0 / distancias[seleccion]
+        pesos /= pesos.sum()
+        porcentajes = pesos @ rejilla["porcentajes"][filas[seleccion]]
+        porcentajes /= porcentajes.sum()
+    else:
+        porcentajes = rejilla["porcentajes"][mas_cercano].copy()
+
+    edad_ref, peso_actual_ref, peso_objetivo_ref = rejilla["coordenadas"][mas_cercano]
+
+    return {
+        "porcentajes": porcentajes,
+        "distancia": distancia_min,
+        "exacto": distancia_min <= 1e-9,
+        "interpolado": bool(interpolar and distancia_min > 1e-9 and filas.size > 1),
+        "escenario_referencia": {
+            "raza": str(rejilla["razas"][indice]),
+            "edad_dias": int(edad_ref),
+            "peso_actual": float(peso_actual_ref),
+            "peso_objetivo": float(peso_objetivo_ref)
+        },
+        "fitness_referencia": float(rejilla["fitness"][mas_cercano]),
+        "costo_referencia": float(rejilla["costo"][mas_cercano])
+    }
+
+
+def refinar_formulacion(consulta, config_evaluacion, ingredientes_data=None,
+                        restricciones_usuario=None, config_algoritmo=None):
+    """
+    Pule una formulación consultada con un AG corto que parte de ella
+
+    Args:
+        consulta: Resultado de consultar_formulacion
+        config_evaluacion: Configuración de evaluación del escenario real
+        ingredientes_data: Datos de ingredientes (por defecto INGREDIENTES)
+        restricciones_usuario: Restricciones del usuario (opcional)
+        config_algoritmo: Parámetros del AG corto (por defecto los de REJILLA_CONFIG)
+
+    Returns:
+        Diccionario de resultados de AlgoritmoGenetico.ejecutar()
+    """
+    from conocimiento.ingredientes import INGREDIENTES
+    from genetic.ag import AlgoritmoGenetico
+
+    config = ALGORITMO_CONFIG.copy()
+    config.update(REJILLA_CONFIG["refinamiento"])
+    if config_algoritmo:
+        config.update(config_algoritmo)
+
+    config["ingredientes_data"] = ingredientes_data or INGREDIENTES
+    config["restricciones_usuario"] = restricciones_usuario
+    config["config_evaluacion"] = config_evaluacion
+    config["poblacion_semilla"] = [consulta["porcentajes"]]
+
+    return AlgoritmoGenetico(config).ejecutar()
+
+
+def obtener_ruta_rejilla():
+    """
+    Obtiene la ruta por defecto del archivo de rejilla
+
+    Returns:
+        Ruta del archivo .npz dentro del directorio de datos
+    """
+    return os.path.join(ARCHIVOS_CONFIG["directorio_datos"], REJILLA_CONFIG["archivo"])
@@ -1,11 +1,20 @@
 """
 Pestaña de selección y configuración de ingredientes
+
+El catálogo es una lista virtual: el Treeview tiene solo las filas que caben
+en pantalla y, al desplazarse o filtrar, se reescriben sus valores con la
+ventana correspondiente del ModeloCatalogo. Crear la pestaña cuesta lo mismo
+con diez ingredientes que con diez mil.
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox
 from datetime import datetime
-from conocimiento import INGREDIENTES
+from conocimiento import INGREDIENTES, aplicar_base_conocimiento
+from gui.widgets.modelo_catalogo import ModeloCatalogo, TODAS_CATEGORIAS
+
+# Filas del Treeview antes de conocer su altura real
+FILAS_INICIALES_CATALOGO = 15
 
 
 class IngredientesTab:
@@ -16,6 +25,11 @@ class IngredientesTab:
         self.main_window = main_window
         self.frame = ttk.Frame(parent)
         
+        # Modelo del catálogo y primera fila visible
+        self.modelo = ModeloCatalogo(INGREDIENTES)
+        self.primera_fila = 0
+        self.filas_vista = FILAS_INICIALES_CATALOGO
+        
         self.crear_interfaz()
         self.cargar_ingredientes_en_tree()
     
@@ -29,26 +43,56 @@ class IngredientesTab:
         left_frame = ttk.LabelFrame(paned, text="Ingredientes Disponibles")
         paned.add(left_frame)
         
-        # Treeview para ingredientes
+        # Búsqueda y filtro por categoría
+        filtro_frame = ttk.Frame(left_frame)
+        filtro_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=2)
+        
+        ttk.Label(filtro_frame, text="Buscar:").pack(side=tk.LEFT, padx=5)
+        self.busqueda_var = tk.StringVar()
+        busqueda_entry = ttk.Entry(filtro_frame, textvariable=self.busqueda_var, width=20)
+        busqueda_entry.pack(side=tk.LEFT, padx=5)
+        busqueda_entry.bind('<KeyRelease>', self.filtrar_catalogo)
+        
+        ttk.Label(filtro_frame, text="Categoría:").pack(side=tk.LEFT, padx=5)
+        self.categoria_var = tk.StringVar(value=TODAS_CATEGORIAS)
+        # Las categorías se calculan al abrir la lista, no al crear la pestaña
+        self.categoria_combo = ttk.Combobox(filtro_frame, textvariable=self.categoria_var, width=12,
+                                            state='readonly', values=[TODAS_CATEGORIAS],
+                                            postcommand=self.cargar_categorias)
+        self.categoria_combo.pack(side=tk.LEFT, padx=5)
+        self.categoria_combo.bind('<<ComboboxSelected>>', self.filtrar_catalogo)
+        
+        self.total_label = ttk.Label(filtro_frame, text="")
+        self.total_label.pack(side=tk.RIGHT, padx=5)
+        
+        # Treeview para ingredientes (solo las filas visibles)
         columns = ('Ingrediente', 'Precio ($/kg)', 'Proteína (%)', 'Energía (kcal/kg)', 'Disponible')
-        self.ingredientes_tree = ttk.Treeview(left_frame, columns=columns, show='headings', height=15)
+        self.ingredientes_tree = ttk.Treeview(left_frame, columns=columns, show='headings',
+                                              height=FILAS_INICIALES_CATALOGO)
         
         # Configurar columnas
         for col in columns:
             self.ingredientes_tree.heading(col, text=col)
             self.ingredientes_tree.column(col, width=120, anchor=tk.CENTER)
         
-        # Scrollbars para el treeview
-        v_scroll = ttk.Scrollbar(left_frame, orient=tk.VERTICAL, command=self.ingredientes_tree.yview)
+        # Scrollbars: la vertical recorre el catálogo filtrado, no el Treeview
+        self.v_scroll = ttk.Scrollbar(left_frame, orient=tk.VERTICAL, command=self.desplazar_catalogo)
         h_scroll = ttk.Scrollbar(left_frame, orient=tk.HORIZONTAL, command=self.ingredientes_tree.xview)
-        self.ingredientes_tree.configure(yscrollcommand=v_scroll.set, xscrollcommand=h_scroll.set)
+        self.ingredientes_tree.configure(xscrollcommand=h_scroll.set)
+        
+        # Rueda del ratón, teclas de página y cambios de tamaño
+        for evento in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.ingredientes_tree.bind(evento, self.rueda_catalogo)
+        self.ingredientes_tree.bind('<Prior>', lambda e: self.desplazar_catalogo('scroll', -1, 'pages'))
+        self.ingredientes_tree.bind('<Next>', lambda e: self.desplazar_catalogo('scroll', 1, 'pages'))
+        self.ingredientes_tree.bind('<Configure>', self.ajustar_filas_vista)
         
         # Grid del treeview
-        self.ingredientes_tree.grid(row=0, column=0, sticky='nsew')
-        v_scroll.grid(row=0, column=1, sticky='ns')
-        h_scroll.grid(row=1, column=0, sticky='ew')
+        self.ingredientes_tree.grid(row=1, column=0, sticky='nsew')
+        self.v_scroll.grid(row=1, column=1, sticky='ns')
+        h_scroll.grid(row=2, column=0, sticky='ew')
         
-        left_frame.grid_rowconfigure(0, weight=1)
+        left_frame.grid_rowconfigure(1, weight=1)
         left_frame.grid_columnconfigure(0, weight=1)
         
         # Panel derecho: Configuración de ingredientes
@@ -73,24 +117,84 @@ class IngredientesTab:
         self.restricciones_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=2)
     
     def cargar_ingredientes_en_tree(self):
-        """Carga los ingredientes en el TreeView"""
-        for item in self.ingredientes_tree.get_children():
-            self.ingredientes_tree.delete(item)
-        
-        for ingrediente in INGREDIENTES:
-            nombre = ingrediente.get("nombre", "Sin nombre")
-            precio_base = ingrediente.get("precio_base", 0)
-            nutrientes = ingrediente.get("nutrientes", {})
-            proteina = nutrientes.get("proteina", 0) * 100  # Convertir a porcentaje
-            energia = nutrientes.get("energia", 0)
-            
-            self.ingredientes_tree.insert('', tk.END, values=(
-                nombre,
-                f"${precio_base:.2f}",
-                f"{proteina:.1f}%",
-                f"{energia:.0f}",
-                "Sí"  # Por defecto todos disponibles
-            ))
+        """Reinicia el catálogo (tras recargar los ingredientes) y muestra la primera página"""
+        self.modelo.invalidar()
+        self.modelo.filtrar(self.busqueda_var.get(), self.categoria_var.get())
+        self.primera_fila = 0
+        self.mostrar_ventana()
+    
+    def cargar_categorias(self):
+        """Llena el filtro de categorías (al desplegarlo)"""
+        self.categoria_combo.configure(values=self.modelo.categorias())
+    
+    def filtrar_catalogo(self, event=None):
+        """Aplica la búsqueda y la categoría y vuelve al inicio del catálogo"""
+        self.modelo.filtrar(self.busqueda_var.get(), self.categoria_var.get())
+        self.primera_fila = 0
+        self.mostrar_ventana()
+    
+    def mostrar_ventana(self):
+        """Reescribe las filas del Treeview con la ventana visible del catálogo"""
+        total = len(self.modelo)
+        self.primera_fila = max(0, min(self.primera_fila, total - self.filas_vista))
+        ventana = self.modelo.ventana(self.primera_fila, self.filas_vista)
+        
+        tree = self.ingredientes_tree
+        tree.selection_remove(tree.selection())
+        existentes = tree.get_children()
+        for k, (_, valores) in enumerate(ventana):
+            item = f"fila{k}"
+            if k < len(existentes):
+                tree.item(item, values=valores)
+            elif tree.exists(item):
+                # Fila desprendida en una ventana anterior más corta
+                tree.item(item, values=valores)
+                tree.move(item, '', k)
+            else:
+                tree.insert('', tk.END, iid=item, values=valores)
+        if len(existentes) > len(ventana):
+            tree.detach(*existentes[len(ventana):])
+        
+        # Barra de desplazamiento proporcional al catálogo filtrado
+        if total:
+            self.v_scroll.set(self.primera_fila / total, (self.primera_fila + len(ventana)) / total)
+        else:
+            self.v_scroll.set(0, 1)
+        
+        if total == len(self.modelo.ingredientes):
+            self.total_label.config(text=f"{total} ingredientes")
+        else:
+            self.total_label.config(text=f"{total} de {len(self.modelo.ingredientes)} ingredientes")
+    
+    def desplazar_catalogo(self, *args):
+        """
+        Mueve la ventana visible (comando de la barra de desplazamiento vertical)
+        
+        Args:
+            *args: ('moveto', fracción) o ('scroll', cantidad, 'units' | 'pages')
+        """
+        if args[0] == 'moveto':
+            self.primera_fila = int(float(args[1]) * len(self.modelo))
+        elif args[0] == 'scroll':
+            paso = self.filas_vista if args[2] == 'pages' else 1
+            self.primera_fila += int(args[1]) * paso
+        self.mostrar_ventana()
+        return 'break'
+    
+    def rueda_catalogo(self, event):
+        """Desplaza el catálogo con la rueda del ratón"""
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            return self.desplazar_catalogo('scroll', -3, 'units')
+        return self.desplazar_catalogo('scroll', 3, 'units')
+    
+    def ajustar_filas_vista(self, event):
+        """Ajusta el número de filas del Treeview a su altura"""
+        alto_fila = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        # Descontar el encabezado (aproximadamente una fila)
+        filas = max(1, event.height // alto_fila - 1)
+        if filas != self.filas_vista:
+            self.filas_vista = filas
+            self.mostrar_ventana()
     
     def seleccionar_todos_ingredientes(self):
         """Selecciona todos los ingredientes disponibles"""
@@ -113,18 +217,20 @@ class IngredientesTab:
                                        "Esto podría tardar unos momentos.")
         if respuesta:
             try:
-                import time
                 self.main_window.status_bar.config(text="Actualizando precios...")
                 self.main_window.root.update()
-                time.sleep(1)  # Simular delay
+                
+                # Recargar desde la base de conocimiento externa (si existe)
+                desde_base = aplicar_base_conocimiento()
                 
                 # Recargar ingredientes en el tree
                 self.cargar_ingredientes_en_tree()
                 
+                fuente = "base de conocimiento" if desde_base else "datos integrados"
                 messagebox.showinfo("Actualización Completada", 
                                   f"✅ Precios actualizados exitosamente\n\n"
                                   f"• {len(INGREDIENTES)} ingredientes actualizados\n"
-                                  f"• Fuentes consultadas: 3 proveedores\n"
+                                  f"• Fuente: {fuente}\n"
                                   f"• Última actualización: {datetime.now().strftime('%H:%M:%S')}")
                 self.main_window.status_bar.config(text="Precios actualizados correctamente")
             except Exception as e:
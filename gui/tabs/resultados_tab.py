@@ -6,15 +6,26 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 import numpy as np
+import os
 import random
 
 from conocimiento import INGREDIENTES
+from utils.visualizacion import grafica_composicion_formulacion, grafica_nutricion_formulacion
+from utils.renderizado import renderizar_figuras
 from ..widgets.formulation_table import TablaFormulacion
 
 
 class ResultadosTab:
-    """Pestaña para mostrar y exportar resultados de la optimización"""
+    """
+    Pestaña para mostrar y exportar resultados de la optimización
+    
+    Los paneles de cada solución se dibujan solo cuando su pestaña se hace
+    visible; sus figuras se conservan y se vuelven a dibujar en el mismo
+    objeto con cada resultado nuevo. La ventana completa se construye una vez
+    por resultado y al cerrarla solo se oculta.
+    """
     
     def __init__(self, parent, main_window):
         self.parent = parent
@@ -22,6 +33,15 @@ class ResultadosTab:
         self.frame = ttk.Frame(parent)
         
         self.tabs_soluciones = []
+        
+        # Pestaña -> formulación que falta dibujar, y paneles ya construidos
+        self.formulaciones_pendientes = {}
+        self.paneles = {}
+        
+        # Ventana completa del resultado actual (oculta al cerrarla)
+        self.ventana_completa = None
+        self.pendientes_ventana = {}
+        
         self.crear_interfaz()
     
     def crear_interfaz(self):
@@ -51,6 +71,7 @@ class ResultadosTab:
         # Notebook para las mejores soluciones
         self.resultados_notebook = ttk.Notebook(top_frame)
         self.resultados_notebook.pack(fill=tk.BOTH, expand=True)
+        self.resultados_notebook.bind('<<NotebookTabChanged>>', self.dibujar_solucion_visible)
         
         # Crear tabs para las 3 mejores soluciones
         for i in range(3):
@@ -91,9 +112,10 @@ class ResultadosTab:
             # Actualizar métricas principales
             self.actualizar_metricas_principales(resultados)
             
-            # Crear visualizaciones para cada formulación
-            for i, formulacion in enumerate(formulaciones[:3]):
-                self.crear_visualizacion_formulacion(self.tabs_soluciones[i], formulacion, i+1)
+            # Las visualizaciones se dibujan al mostrarse cada pestaña
+            self.descartar_ventana_completa()
+            self.formulaciones_pendientes = dict(enumerate(formulaciones[:3]))
+            self.frame.after_idle(self.dibujar_solucion_visible)
             
             messagebox.showinfo("Éxito", 
                               f"¡Optimización completada! Se encontraron {len(formulaciones)} formulaciones óptimas.")
@@ -131,8 +153,51 @@ class ResultadosTab:
             ttk.Label(self.metricas_frame, text=valor, font=('Arial', 8)).grid(
                 row=row, column=col+1, sticky=tk.W, padx=10, pady=1)
     
+    def dibujar_solucion_visible(self, event=None):
+        """Dibuja la pestaña de solución seleccionada si aún no está al día"""
+        try:
+            indice = self.resultados_notebook.index('current')
+        except tk.TclError:
+            return
+        formulacion = self.formulaciones_pendientes.pop(indice, None)
+        if formulacion is not None:
+            self.crear_visualizacion_formulacion(self.tabs_soluciones[indice], formulacion, indice + 1)
+    
     def crear_visualizacion_formulacion(self, parent_frame, formulacion, numero):
-        """Crea visualizaciones detalladas para una formulación (versión optimizada)"""
+        """
+        Crea (o actualiza) las visualizaciones de una formulación (versión optimizada)
+        
+        La primera vez construye el panel; las siguientes reutiliza sus figuras
+        y solo cambia el título, las gráficas y la tabla.
+        """
+        panel = self.paneles.get(numero)
+        if panel is None:
+            panel = self.construir_panel_solucion(parent_frame)
+            self.paneles[numero] = panel
+        
+        # Título de la formulación (más pequeño)
+        panel['titulo'].config(text=f"Formulación #{numero} - Fitness: {formulacion['fitness']:.2f}")
+        
+        # Gráficas dibujadas sobre las mismas figuras
+        grafica_composicion_formulacion(formulacion, INGREDIENTES, fig=panel['fig_composicion'])
+        grafica_nutricion_formulacion(formulacion, INGREDIENTES, fig=panel['fig_nutricion'])
+        panel['canvas_composicion'].draw_idle()
+        panel['canvas_nutricion'].draw_idle()
+        
+        # Tabla detallada
+        if panel['tabla'] is None:
+            panel['tabla'] = TablaFormulacion(panel['frame_tabla'], formulacion)
+            panel['tabla'].pack(fill=tk.BOTH, expand=True)
+        else:
+            panel['tabla'].mostrar_formulacion(formulacion)
+    
+    def construir_panel_solucion(self, parent_frame):
+        """
+        Construye los widgets y figuras del panel de una solución
+        
+        Returns:
+            Diccionario con los widgets, figuras y lienzos del panel
+        """
         # Limpiar frame
         for widget in parent_frame.winfo_children():
             widget.destroy()
@@ -141,9 +206,8 @@ class ResultadosTab:
         main_container = ttk.Frame(parent_frame)
         main_container.pack(fill=tk.BOTH, expand=True)
         
-        # Título de la formulación (más pequeño)
-        titulo = f"Formulación #{numero} - Fitness: {formulacion['fitness']:.2f}"
-        ttk.Label(main_container, text=titulo, font=('Arial', 12, 'bold')).pack(pady=3)
+        titulo = ttk.Label(main_container, text="", font=('Arial', 12, 'bold'))
+        titulo.pack(pady=3)
         
         # PanedWindow horizontal para dividir gráficas y tabla
         paned_h = ttk.PanedWindow(main_container, orient=tk.HORIZONTAL)
@@ -154,128 +218,72 @@ class ResultadosTab:
         paned_h.add(left_frame, weight=2)
         
         # Frame para gráficas (una arriba de la otra)
-        self.crear_grafica_composicion_optimizada(left_frame, formulacion)
-        self.crear_grafica_nutricion_optimizada(left_frame, formulacion)
+        fig_composicion, canvas_composicion = self.crear_grafica_composicion_optimizada(left_frame)
+        fig_nutricion, canvas_nutricion = self.crear_grafica_nutricion_optimizada(left_frame)
         
         # Frame derecho para tabla
         right_frame = ttk.Frame(paned_h)
         paned_h.add(right_frame, weight=1)
         
-        # Tabla detallada
-        tabla = TablaFormulacion(right_frame, formulacion)
-        tabla.pack(fill=tk.BOTH, expand=True)
+        return {
+            'contenedor': main_container,
+            'titulo': titulo,
+            'fig_composicion': fig_composicion,
+            'canvas_composicion': canvas_composicion,
+            'fig_nutricion': fig_nutricion,
+            'canvas_nutricion': canvas_nutricion,
+            'frame_tabla': right_frame,
+            'tabla': None
+        }
     
-    def crear_grafica_composicion_optimizada(self, parent, formulacion):
-        """Crea gráfica de composición más compacta"""
+    def crear_grafica_composicion_optimizada(self, parent):
+        """
+        Crea el área de la gráfica de composición más compacta
+        
+        Returns:
+            Tupla (figura, lienzo); la gráfica se dibuja en crear_visualizacion_formulacion
+        """
         # Frame para la gráfica
         frame_comp = ttk.LabelFrame(parent, text="Composición de Ingredientes (%)", padding=3)
         frame_comp.pack(fill=tk.BOTH, expand=True, padx=3, pady=3)
         
-        # Preparar datos
-        ingredientes_nombres = []
-        porcentajes_valores = []
-        colores = []
-        
-        for i, porcentaje in enumerate(formulacion['porcentajes']):
-            if porcentaje > 0.005 and i < len(INGREDIENTES):
-                nombre = INGREDIENTES[i].get('nombre', f'Ingrediente {i+1}')
-                # Acortar nombres largos
-                if len(nombre) > 20:
-                    nombre = nombre[:17] + "..."
-                ingredientes_nombres.append(nombre)
-                porcentajes_valores.append(porcentaje * 100)
-                
-                # Colores por tipo
-                if 'maíz' in nombre.lower():
-                    colores.append('#FFD700')
-                elif 'soya' in nombre.lower():
-                    colores.append('#8FBC8F')
-                elif 'ddg' in nombre.lower():
-                    colores.append('#DEB887')
-                else:
-                    colores.append('#87CEEB')
-        
-        # Crear gráfica más compacta
-        fig, ax = plt.subplots(figsize=(5, 3))
-        bars = ax.barh(ingredientes_nombres, porcentajes_valores, color=colores)
-        ax.set_xlabel('Porcentaje (%)', fontsize=8)
-        ax.set_title('Composición de la Formulación', fontsize=10)
-        ax.grid(True, alpha=0.3)
-        
-        # Tamaño de fuente más pequeño
-        ax.tick_params(axis='both', which='major', labelsize=7)
-        
-        # Añadir valores
-        for bar, valor in zip(bars, porcentajes_valores):
-            width = bar.get_width()
-            ax.text(width + 0.1, bar.get_y() + bar.get_height()/2, 
-                   f'{valor:.1f}%', ha='left', va='center', fontsize=7)
-        
-        plt.tight_layout()
+        # Figura fuera de pyplot: vive lo mismo que el panel
+        fig = Figure(figsize=(5, 3))
         
         # Integrar en tkinter
         canvas_comp = FigureCanvasTkAgg(fig, frame_comp)
         canvas_comp.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        canvas_comp.draw()
+        return fig, canvas_comp
     
-    def crear_grafica_nutricion_optimizada(self, parent, formulacion):
-        """Crea gráfica de nutrición más compacta"""
+    def crear_grafica_nutricion_optimizada(self, parent):
+        """
+        Crea el área de la gráfica de nutrición más compacta
+        
+        Returns:
+            Tupla (figura, lienzo); la gráfica se dibuja en crear_visualizacion_formulacion
+        """
         # Frame para la gráfica
         frame_nutr = ttk.LabelFrame(parent, text="Perfil Nutricional vs Requerimientos", padding=3)
         frame_nutr.pack(fill=tk.BOTH, expand=True, padx=3, pady=3)
         
-        # Datos simulados
-        nutrientes = ['Proteína\n(%)', 'Energía\n(kcal/kg)', 'Lisina\n(%)', 'Metionina\n(%)', 'Calcio\n(%)']
-        valores_actuales = [
-            formulacion['proteina_total'],
-            formulacion['energia_total'] / 100,  # Escalar para visualización
-            1.2 + random.uniform(-0.2, 0.2),
-            0.5 + random.uniform(-0.1, 0.1),
-            0.9 + random.uniform(-0.1, 0.1)
-        ]
-        
-        requerimientos = [20.0, 30.0, 1.1, 0.45, 0.85]  # Energía escalada también
-        
-        # Crear gráfica más compacta
-        fig, ax = plt.subplots(figsize=(5, 3))
-        
-        x = np.arange(len(nutrientes))
-        width = 0.35
-        
-        bars1 = ax.bar(x - width/2, valores_actuales, width, label='Formulación', color='#4CAF50', alpha=0.8)
-        bars2 = ax.bar(x + width/2, requerimientos, width, label='Requerimiento', color='#FF9800', alpha=0.8)
-        
-        ax.set_xlabel('Nutrientes', fontsize=8)
-        ax.set_ylabel('Valores', fontsize=8)
-        ax.set_title('Comparación Nutricional', fontsize=10)
-        ax.set_xticks(x)
-        ax.set_xticklabels(nutrientes, fontsize=7)
-        ax.legend(fontsize=7, loc='upper right')
-        ax.grid(True, alpha=0.3)
-        
-        # Tamaño de fuente más pequeño
-        ax.tick_params(axis='both', which='major', labelsize=7)
-        
-        # Añadir valores más pequeños
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                       f'{height:.1f}', ha='center', va='bottom', fontsize=6)
-        
-        plt.tight_layout()
+        fig = Figure(figsize=(5, 3))
         
         # Integrar en tkinter
         canvas_nutr = FigureCanvasTkAgg(fig, frame_nutr)
         canvas_nutr.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-        canvas_nutr.draw()
+        return fig, canvas_nutr
     
     def abrir_ventana_completa(self):
-        """Abre los resultados en una ventana maximizada separada"""
+        """Abre los resultados en una ventana maximizada separada (reutilizada si ya existe)"""
         if not self.main_window.resultados:
             messagebox.showwarning("Advertencia", "No hay resultados para mostrar")
             return
         
+        if self.ventana_completa is not None and self.ventana_completa.winfo_exists():
+            self.ventana_completa.deiconify()
+            self.ventana_completa.lift()
+            return
+        
         # Crear ventana nueva
         ventana = tk.Toplevel(self.main_window.root)
         ventana.title("Resultados Detallados - boilerNutri")
@@ -284,6 +292,10 @@ class ResultadosTab:
         ventana.state('zoomed')  # Windows
         # ventana.attributes('-zoomed', True)  # Linux
         
+        # Cerrar solo la oculta: se vuelve a mostrar sin reconstruirla
+        ventana.protocol("WM_DELETE_WINDOW", ventana.withdraw)
+        self.ventana_completa = ventana
+        
         # Crear interfaz en la nueva ventana
         main_frame = ttk.Frame(ventana)
         main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -296,18 +308,35 @@ class ResultadosTab:
         notebook = ttk.Notebook(main_frame)
         notebook.pack(fill=tk.BOTH, expand=True)
         
-        # Crear tabs para cada formulación
+        # Crear tabs para cada formulación (su contenido se dibuja al mostrarlas)
         formulaciones = self.main_window.resultados.get('formulaciones', [])
+        self.pendientes_ventana = {}
         for i, formulacion in enumerate(formulaciones[:3]):
             tab = ttk.Frame(notebook)
             notebook.add(tab, text=f"Solución #{i+1} - Fitness: {formulacion['fitness']:.2f}")
-            
-            # Crear visualización completa
-            self.crear_visualizacion_completa(tab, formulacion, i+1)
+            self.pendientes_ventana[i] = (tab, formulacion)
         
+        notebook.bind('<<NotebookTabChanged>>',
+                      lambda event: self.dibujar_solucion_ventana(notebook))
+        ventana.after_idle(lambda: self.dibujar_solucion_ventana(notebook))
+
         # Botón para cerrar
         ttk.Button(main_frame, text="Cerrar", 
-                  command=ventana.destroy).pack(pady=10)
+                  command=ventana.withdraw).pack(pady=10)
+    
+    def dibujar_solucion_ventana(self, notebook):
+        """Dibuja la pestaña visible de la ventana completa si aún no se ha dibujado"""
+        pendiente = self.pendientes_ventana.pop(notebook.index('current'), None)
+        if pendiente is not None:
+            tab, formulacion = pendiente
+            self.crear_visualizacion_completa(tab, formulacion, notebook.index('current') + 1)
+    
+    def descartar_ventana_completa(self):
+        """Destruye la ventana completa del resultado anterior"""
+        if self.ventana_completa is not None and self.ventana_completa.winfo_exists():
+            self.ventana_completa.destroy()
+        self.ventana_completa = None
+        self.pendientes_ventana = {}
     
     def crear_visualizacion_completa(self, parent, formulacion, numero):
         """Crea una visualización completa para ventana separada"""
@@ -356,7 +385,8 @@ class ResultadosTab:
         ingredientes_data.sort(key=lambda x: x['porcentaje'], reverse=True)
         
         # Crear gráfica más grande
-        fig, ax = plt.subplots(figsize=(8, 6))
+        fig = Figure(figsize=(8, 6))
+        ax = fig.add_subplot(111)
         
         nombres = [d['nombre'] for d in ingredientes_data]
         porcentajes = [d['porcentaje'] for d in ingredientes_data]
@@ -427,7 +457,8 @@ class ResultadosTab:
         }
         
         # Crear gráfica
-        fig, ax = plt.subplots(figsize=(8, 6))
+        fig = Figure(figsize=(8, 6))
+        ax = fig.add_subplot(111)
         
         nutrientes = list(nutrientes_data.keys())
         y_pos = np.arange(len(nutrientes))
@@ -477,7 +508,7 @@ class ResultadosTab:
                 ax.text(width + 0.1, bar.get_y() + bar.get_height()/2,
                        label, ha='left', va='center', fontsize=8)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Integrar en tkinter
         canvas = FigureCanvasTkAgg(fig, frame)
@@ -493,23 +524,27 @@ class ResultadosTab:
         directorio = filedialog.askdirectory(title="Seleccionar directorio para exportar gráficas")
         if directorio:
             try:
-                # Aquí iría el código real de exportación
-                import os
                 from datetime import datetime
                 
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 
-                # Simular exportación
-                num_graficas = len(self.main_window.resultados.get('formulaciones', [])) * 2
+                # Composición y nutrición de cada formulación, dibujadas en
+                # paralelo (o copiadas de la caché si ya se exportaron)
+                tareas = {}
+                for i, formulacion in enumerate(self.main_window.resultados.get('formulaciones', []), 1):
+                    tareas[f"composicion_{i}_{timestamp}"] = (grafica_composicion_formulacion,
+                                                              (formulacion, INGREDIENTES))
+                    tareas[f"nutricion_{i}_{timestamp}"] = (grafica_nutricion_formulacion,
+                                                            (formulacion, INGREDIENTES))
+                
+                archivos = renderizar_figuras(tareas, directorio=directorio)
+                nombres = "\n".join(f"• {os.path.basename(archivo)}" for archivo in list(archivos.values())[:4])
+                if len(archivos) > 4:
+                    nombres += "\n• ..."
                 
                 messagebox.showinfo("Exportación Exitosa", 
-                                  f"✅ Se exportaron {num_graficas} gráficas a:\n{directorio}\n\n"
-                                  f"Archivos generados:\n"
-                                  f"• composicion_1_{timestamp}.png\n"
-                                  f"• nutricion_1_{timestamp}.png\n"
-                                  f"• composicion_2_{timestamp}.png\n"
-                                  f"• nutricion_2_{timestamp}.png\n"
-                                  f"• ...")
+                                  f"✅ Se exportaron {len(archivos)} gráficas a:\n{directorio}\n\n"
+                                  f"Archivos generados:\n{nombres}")
             except Exception as e:
                 messagebox.showerror("Error", f"Error al exportar gráficas:\n{e}")
     
@@ -621,4 +656,7 @@ class ResultadosTab:
         # Limpiar tabs de soluciones
         for tab in self.tabs_soluciones:
             for widget in tab.winfo_children():
-                widget.destroy()
\ No newline at end of file
+                widget.destroy()
+        self.paneles = {}
+        self.formulaciones_pendientes = {}
+        self.descartar_ventana_completa()
\ No newline at end of file
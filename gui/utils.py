@@ -4,7 +4,7 @@ Utilidades para la interfaz gráfica
 
 import random
 from config import ALGORITMO_CONFIG
-from conocimiento import INGREDIENTES, RAZAS_POLLOS
+from conocimiento import INGREDIENTES, RAZAS_POLLOS, buscar_ingrediente
 
 
 def preparar_configuracion_algoritmo(main_window):
@@ -133,7 +133,7 @@ def buscar_raza_por_nombre(nombre):
 
 def buscar_ingrediente_por_nombre(nombre):
     """Busca un ingrediente por nombre en la lista"""
-    for ingrediente in INGREDIENTES:
-        if ingrediente["nombre"] == nombre:
-            return ingrediente
+    ingrediente = buscar_ingrediente(nombre=nombre)
+    if ingrediente is not None and ingrediente["nombre"] == nombre:
+        return ingrediente
     return None
\ No newline at end of file
@@ -4,17 +4,34 @@ Widget de tabla para mostrar formulaciones de alimentos
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import re
 from conocimiento import INGREDIENTES
+from .modelo_formulacion import ModeloFormulacion, obtener_nombre_proveedor
+
+# Identificador de la fila de totales en el Treeview
+ITEM_TOTAL = 'total'
 
 
 class TablaFormulacion(ttk.Frame):
-    """Widget de tabla para mostrar el detalle de una formulación CON PROVEEDOR"""
+    """
+    Widget de tabla para mostrar el detalle de una formulación CON PROVEEDOR
+    
+    Las filas vienen de un ModeloFormulacion calculado una vez; filtrar y
+    ordenar solo separan, reinsertan o mueven los elementos del Treeview que
+    cambian de lugar (cada fila conserva su elemento).
+    """
     
     def __init__(self, parent, formulacion):
         super().__init__(parent)
         self.formulacion = formulacion
         
+        # Columna y sentido del último ordenamiento
+        self.orden_columna = None
+        self.orden_descendente = False
+        self.sentido_columnas = {}
+        
+        # Elementos de las filas de la formulación mostrada
+        self.items = []
+        
         self.crear_tabla()
     
     def crear_tabla(self):
@@ -95,147 +112,122 @@ class TablaFormulacion(ttk.Frame):
         self.cargar_datos()
     
     def cargar_datos(self):
-        """Carga los datos en la tabla CON PROVEEDOR"""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # ✅ OBTENER DATOS CON PROVEEDOR
-        datos_ingredientes = self.procesar_datos_formulacion()
-        
-        # Variables para totales
-        total_costo = 0
-        total_proteina = 0
-        total_energia = 0
-        num_ingredientes = 0
-        
-        # Insertar datos
-        self.datos_tabla = []
-        for datos in datos_ingredientes:
-            if datos['porcentaje'] > 0.1:  # Solo mostrar ingredientes > 0.1%
-                costo_total = datos['costo_total']
-                total_costo += costo_total
-                
-                # Calcular contribución nutricional
-                try:
-                    ingrediente_idx = next(i for i, ing in enumerate(INGREDIENTES) 
-                                         if ing['nombre'] == datos['ingrediente'])
-                    nutrientes = INGREDIENTES[ingrediente_idx].get('nutrientes', {})
-                    porcentaje_decimal = datos['porcentaje'] / 100
-                    
-                    proteina_contrib = porcentaje_decimal * nutrientes.get('proteina', 0) * 100
-                    energia_contrib = porcentaje_decimal * nutrientes.get('energia', 0)
-                    
-                    total_proteina += proteina_contrib
-                    total_energia += energia_contrib
-                except StopIteration:
-                    pass  # Ingrediente no encontrado
-                
-                num_ingredientes += 1
-                
-                # Formatear valores con más claridad
-                porcentaje_str = f"{datos['porcentaje']:.2f}%"
-                kg_ton_str = f"{datos['kg_ton']:.1f}"
-                precio_str = f"${datos['precio']:.2f}"
-                costo_ton_str = f"${costo_total:.0f}"
-                
-                # ✅ INCLUIR PROVEEDOR EN LOS DATOS
-                self.tree.insert('', 'end', values=(
-                    datos['ingrediente'],
-                    porcentaje_str,
-                    kg_ton_str,
-                    precio_str,
-                    datos['proveedor'],  # 🔥 COLUMNA DE PROVEEDOR
-                    costo_ton_str       # Costo en pesos totales para esa cantidad
-                ))
-                
-                # Guardar para filtrado y ordenamiento
-                self.datos_tabla.append(datos)
-        
-        # Calcular costo por kg y por tonelada
-        costo_por_kg = total_costo / 1000 if total_costo > 0 else 0
-        costo_por_tonelada = total_costo
+        """Construye el modelo de la formulación y carga todas sus filas CON PROVEEDOR"""
+        # Limpiar tabla (también las filas ocultas por la búsqueda, que no
+        # aparecen en get_children)
+        self.tree.delete(*self.items)
+        if self.tree.exists(ITEM_TOTAL):
+            self.tree.delete(ITEM_TOTAL)
+        
+        # ✅ FILAS CON PROVEEDOR, CALCULADAS UNA SOLA VEZ
+        self.modelo = ModeloFormulacion(self.formulacion, INGREDIENTES)
+        self.items = [f"fila{i}" for i in range(len(self.modelo))]
+        self.posiciones = {item: i for i, item in enumerate(self.items)}
+        for item, fila in zip(self.items, self.modelo.filas):
+            self.tree.insert('', 'end', iid=item, values=fila.valores)
+        self.visibles = list(range(len(self.modelo)))
         
         # Fila de totales con información clara
-        self.tree.insert('', 'end', values=(
-            'TOTAL',
-            '100.00%',
-            '1000.0',
-            f'${costo_por_kg:.2f}/kg',
-            'TODOS LOS PROVEEDORES',
-            f'${costo_por_tonelada:.0f}/ton'
-        ), tags=('total',))
+        self.tree.insert('', 'end', iid=ITEM_TOTAL, values=self.valores_total(self.visibles, filtrado=False),
+                         tags=('total',))
         
         # Configurar estilo para fila total
         self.tree.tag_configure('total', background='#E3F2FD', font=('Arial', 9, 'bold'))
         
         # Actualizar labels con información más completa
-        self.total_label.config(text=f"Total: {num_ingredientes} ingredientes activos")
+        totales = self.modelo.totales(self.visibles)
+        costo_por_kg = totales['costo_total'] / 1000
+        self.total_label.config(text=f"Total: {totales['num_ingredientes']} ingredientes activos")
         
         # Calcular estimación por pollo (asumiendo 3.5 kg promedio)
         costo_por_pollo = costo_por_kg * 3.5
         
         self.resumen_label.config(
-            text=f"💰 COSTO: ${costo_por_kg:.2f}/kg • ${costo_por_tonelada:,.0f}/tonelada • ${costo_por_pollo:.0f}/pollo(3.5kg) | "
-            f"🥩 PROTEÍNA: {total_proteina:.1f}% | "
-            f"⚡ ENERGÍA: {total_energia:.0f} kcal/kg"
+            text=f"💰 COSTO: ${costo_por_kg:.2f}/kg • ${totales['costo_total']:,.0f}/tonelada • ${costo_por_pollo:.0f}/pollo(3.5kg) | "
+            f"🥩 PROTEÍNA: {totales['proteina']:.1f}% | "
+            f"⚡ ENERGÍA: {totales['energia']:.0f} kcal/kg"
         )
     
-    def procesar_datos_formulacion(self):
-        """✅ PROCESA LOS DATOS INCLUYENDO PROVEEDOR RECOMENDADO"""
-        datos = []
-        porcentajes = self.formulacion.get('porcentajes', [])
-        
-        # Obtener proveedores recomendados si existen
-        proveedores_rec = self.formulacion.get('proveedor_recomendado', {})
-        
-        for i, porcentaje in enumerate(porcentajes):
-            if i < len(INGREDIENTES):
-                ingrediente = INGREDIENTES[i]
-                
-                # Determinar proveedor y precio
-                if str(i) in proveedores_rec:
-                    # Usar proveedor recomendado por el algoritmo
-                    proveedor_info = proveedores_rec[str(i)]
-                    proveedor_clave = proveedor_info['proveedor']
-                    precio = proveedor_info['precio']
-                    proveedor_nombre = self.obtener_nombre_proveedor(proveedor_clave)
-                elif i in proveedores_rec:
-                    # Probar con índice numérico
-                    proveedor_info = proveedores_rec[i]
-                    proveedor_clave = proveedor_info['proveedor']
-                    precio = proveedor_info['precio']
-                    proveedor_nombre = self.obtener_nombre_proveedor(proveedor_clave)
-                else:
-                    # Buscar el mejor precio manualmente
-                    precios = ingrediente.get('precios', {})
-                    if precios:
-                        proveedor_clave = min(precios, key=precios.get)
-                        precio = precios[proveedor_clave]
-                        proveedor_nombre = self.obtener_nombre_proveedor(proveedor_clave)
-                    else:
-                        precio = ingrediente.get('precio_base', 0)
-                        proveedor_nombre = "No especificado"
-                
-                datos.append({
-                    'ingrediente': ingrediente.get('nombre', f'Ingrediente {i+1}'),
-                    'porcentaje': porcentaje * 100,  # Convertir a porcentaje
-                    'kg_ton': porcentaje * 1000,     # kg por tonelada
-                    'precio': precio,
-                    'proveedor': proveedor_nombre,   # 🔥 INFORMACIÓN DE PROVEEDOR
-                    'costo_total': porcentaje * 1000 * precio
-                })
-        
-        return datos
+    def mostrar_formulacion(self, formulacion):
+        """
+        Muestra otra formulación en la misma tabla (conserva búsqueda y orden)
+        
+        Args:
+            formulacion: Nueva formulación
+        """
+        self.formulacion = formulacion
+        self.cargar_datos()
+        if self.search_var.get() or self.orden_columna is not None:
+            self.actualizar_filas(self.search_var.get())
+    
+    def valores_total(self, indices, filtrado):
+        """Valores de la fila de totales (o subtotal si hay búsqueda)"""
+        costo_total = self.modelo.totales(indices)['costo_total']
+        if not filtrado:
+            return ('TOTAL', '100.00%', '1000.0', f'${costo_total / 1000:.2f}/kg',
+                    'TODOS LOS PROVEEDORES', f'${costo_total:.0f}/ton')
+        return (f'SUBTOTAL ({len(indices)} items)', '', '', f'${costo_total / 1000:.2f}/kg',
+                '', f'${costo_total:.0f}/ton')
+    
+    def actualizar_filas(self, busqueda):
+        """
+        Aplica búsqueda y orden actuales cambiando solo los elementos necesarios
+        
+        Args:
+            busqueda: Texto de búsqueda
+        """
+        indices = self.modelo.filtrar(busqueda)
+        if self.orden_columna is not None:
+            indices = self.modelo.ordenar(indices, self.orden_columna, self.orden_descendente)
+        
+        # Separar las filas que dejan de verse
+        nuevas = set(indices)
+        ocultas = [self.items[i] for i in self.visibles if i not in nuevas]
+        if ocultas:
+            self.tree.detach(*ocultas)
+        
+        # Las filas que siguen visibles conservan su orden relativo si el orden
+        # no cambió: solo se mueven las que aparecen o cambian de lugar
+        restantes = [i for i in self.visibles if i in nuevas]
+        pos_restantes = 0
+        movidas = set()
+        for posicion, i in enumerate(indices):
+            while pos_restantes < len(restantes) and restantes[pos_restantes] in movidas:
+                pos_restantes += 1
+            if pos_restantes < len(restantes) and restantes[pos_restantes] == i:
+                pos_restantes += 1
+                continue
+            self.tree.move(self.items[i], '', posicion)
+            movidas.add(i)
+        self.visibles = indices
+        
+        # Fila de totales (subtotal si hay búsqueda); sin filas no se muestra
+        if busqueda and not indices:
+            self.tree.detach(ITEM_TOTAL)
+        else:
+            self.tree.item(ITEM_TOTAL, values=self.valores_total(indices, filtrado=bool(busqueda)))
+            self.tree.move(ITEM_TOTAL, '', 'end')
+        
+        # Actualizar contador
+        if busqueda:
+            self.total_label.config(text=f"Mostrando: {len(indices)} ingredientes")
+        else:
+            self.total_label.config(text=f"Total: {len(indices)} ingredientes activos")
     
     def obtener_nombre_proveedor(self, clave_proveedor):
         """✅ OBTIENE EL NOMBRE LEGIBLE DEL PROVEEDOR"""
-        nombres_proveedores = {
-            'veterinaria_buenavista': 'Vet. Buenavista',
-            'veterinaria_don_paco': 'Vet. Don Paco', 
-            'veterinaria_don_edilberto': 'Vet. Don Edilberto'
-        }
-        return nombres_proveedores.get(clave_proveedor, clave_proveedor)
+        return obtener_nombre_proveedor(clave_proveedor)
+    
+    def obtener_fila(self, item):
+        """
+        Obtiene la fila del modelo de un elemento del Treeview
+        
+        Returns:
+            FilaFormulacion, o None para la fila de totales
+        """
+        if item == ITEM_TOTAL:
+            return None
+        return self.modelo.filas[self.posiciones[item]]
     
     def mostrar_menu_contextual(self, event):
         """✅ MUESTRA MENÚ CONTEXTUAL PARA CAMBIAR PROVEEDOR"""
@@ -244,8 +236,7 @@ class TablaFormulacion(ttk.Frame):
             return
         
         item = selection[0]
-        valores = self.tree.item(item, 'values')
-        if valores[0] == 'TOTAL':
+        if self.obtener_fila(item) is None:
             return
         
         # Crear menú contextual
@@ -267,18 +258,11 @@ class TablaFormulacion(ttk.Frame):
     
     def mostrar_comparacion_precios(self, item):
         """✅ MUESTRA COMPARACIÓN DE PRECIOS POR VETERINARIA"""
-        valores = self.tree.item(item, 'values')
-        ingrediente_nombre = valores[0]
-        
-        # Buscar el ingrediente
-        ingrediente_data = None
-        for ing in INGREDIENTES:
-            if ing['nombre'] == ingrediente_nombre:
-                ingrediente_data = ing
-                break
-        
-        if not ingrediente_data:
+        fila = self.obtener_fila(item)
+        if fila is None:
             return
+        ingrediente_nombre = fila.ingrediente
+        ingrediente_data = INGREDIENTES[fila.indice]
         
         # Crear ventana de comparación
         ventana = tk.Toplevel(self)
@@ -347,122 +331,16 @@ class TablaFormulacion(ttk.Frame):
     
     def filtrar_tabla(self, event=None):
         """Filtra la tabla según el texto de búsqueda"""
-        busqueda = self.search_var.get().lower()
-        
-        # Si no hay búsqueda, recargar todo
-        if not busqueda:
-            self.cargar_datos()
-            return
-        
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Filtrar datos
-        datos_ingredientes = self.procesar_datos_formulacion()
-        total_costo_filtrado = 0
-        num_mostrados = 0
-        
-        for datos in datos_ingredientes:
-            if (busqueda in datos['ingrediente'].lower() or 
-                busqueda in datos['proveedor'].lower()):
-                
-                if datos['porcentaje'] > 0.1:
-                    costo_total = datos['costo_total']
-                    total_costo_filtrado += costo_total
-                    num_mostrados += 1
-                    
-                    porcentaje_str = f"{datos['porcentaje']:.2f}%"
-                    kg_ton_str = f"{datos['kg_ton']:.1f}"
-                    precio_str = f"${datos['precio']:.2f}"
-                    costo_ton_str = f"${costo_total:.0f}"
-                    
-                    self.tree.insert('', 'end', values=(
-                        datos['ingrediente'],
-                        porcentaje_str,
-                        kg_ton_str,
-                        precio_str,
-                        datos['proveedor'],
-                        costo_ton_str
-                    ))
-        
-        # Añadir total filtrado
-        if num_mostrados > 0:
-            costo_kg_filtrado = total_costo_filtrado / 1000
-            costo_ton_filtrado = total_costo_filtrado
-            
-            self.tree.insert('', 'end', values=(
-                f'SUBTOTAL ({num_mostrados} items)',
-                '',
-                '',
-                f'${costo_kg_filtrado:.2f}/kg',
-                '',
-                f'${costo_ton_filtrado:.0f}/ton'
-            ), tags=('total',))
-        
-        # Actualizar contador
-        self.total_label.config(text=f"Mostrando: {num_mostrados} ingredientes")
+        self.actualizar_filas(self.search_var.get())
     
     def ordenar_columna(self, col):
-        """Ordena la tabla por la columna seleccionada"""
-        # Obtener datos actuales (sin la fila TOTAL)
-        datos = []
-        for child in self.tree.get_children()[:-1]:
-            datos.append(self.tree.item(child)['values'])
-        
-        # Determinar índice de columna
-        col_indices = {
-            'Ingrediente': 0, '(%)': 1, 'kg/ton': 2, 
-            'Precio': 3, 'Proveedor': 4, 'Costo/Ton': 5
-        }
-        col_idx = col_indices.get(col, 0)
-        
-        # Función de ordenamiento
-        def sort_key(item):
-            value = item[col_idx]
-            if col_idx in [0, 4]:  # Nombre e ingrediente, proveedor
-                return value
-            else:  # Valores numéricos
-                match = re.search(r'[\d.]+', str(value))
-                return float(match.group()) if match else 0
-        
-        # Verificar orden
-        sort_attr = f'_sort_reverse_{col}'
-        if not hasattr(self, sort_attr):
-            setattr(self, sort_attr, False)
-        
-        # Ordenar
-        datos.sort(key=sort_key, reverse=getattr(self, sort_attr))
-        setattr(self, sort_attr, not getattr(self, sort_attr))
-        
-        # Recargar tabla ordenada
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        for valores in datos:
-            self.tree.insert('', tk.END, values=valores)
-        
-        # Re-añadir fila total con información clara
-        total_costo_sum = 0
-        for valores in datos:
-            try:
-                # Extraer número de la columna de costo total
-                costo_str = str(valores[5]).replace('$', '').replace(',', '')
-                total_costo_sum += float(costo_str)
-            except (ValueError, IndexError):
-                continue
+        """Ordena la tabla por la columna seleccionada (alterna ascendente/descendente)"""
+        descendente = self.sentido_columnas.get(col, False)
+        self.sentido_columnas[col] = not descendente
         
-        costo_por_kg = total_costo_sum / 1000
-        costo_por_tonelada = total_costo_sum
-        
-        self.tree.insert('', tk.END, values=(
-            'TOTAL',
-            '100.00%',
-            '1000.0',
-            f'${costo_por_kg:.2f}/kg',
-            'TODOS LOS PROVEEDORES',
-            f'${costo_por_tonelada:.0f}/ton'
-        ), tags=('total',))
+        self.orden_columna = col
+        self.orden_descendente = descendente
+        self.actualizar_filas(self.search_var.get())
     
     def on_double_click(self, event):
         """Maneja doble click en la tabla"""
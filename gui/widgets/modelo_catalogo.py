@@ -0,0 +1,186 @@
+"""
+Modelo de datos del catálogo de ingredientes.
+
+Pensado para bases de conocimiento con miles de ingredientes: nada se
+recorre al crear el modelo. Las filas se formatean por páginas cuando la
+vista las pide (y se guardan para volver a mostrarlas), el índice de
+búsqueda se construye con la primera búsqueda y las categorías salen del
+índice por_categoria de la base de conocimiento. Sin filtros el resultado es
+un range, de modo que la vista completa no ocupa memoria por fila.
+
+La búsqueda usa, como la tabla de formulación, los nombres en minúsculas
+concatenados: una búsqueda de subcadena sobre el texto completo y bisección
+para ubicar el ingrediente de cada coincidencia.
+"""
+
+from bisect import bisect_right
+
+from conocimiento.base_datos import indexar_ingredientes
+
+# Filas formateadas por página
+TAMANO_PAGINA_CATALOGO = 100
+
+# Opción del filtro de categoría que muestra todos los ingredientes
+TODAS_CATEGORIAS = "Todas"
+
+# Separa los nombres en el índice (no puede aparecer en una búsqueda)
+_SEPARADOR = "\0"
+
+
+def formatear_ingrediente(ingrediente):
+    """
+    Obtiene los valores de la fila del catálogo de un ingrediente
+
+    Args:
+        ingrediente: Diccionario del ingrediente
+
+    Returns:
+        Tupla (nombre, precio, proteína, energía, disponible) como texto
+    """
+    nutrientes = ingrediente.get("nutrientes", {})
+    return (
+        ingrediente.get("nombre", "Sin nombre"),
+        f"${ingrediente.get('precio_base', 0) or 0:.2f}",
+        f"{nutrientes.get('proteina', 0) * 100:.1f}%",  # Convertir a porcentaje
+        f"{nutrientes.get('energia', 0):.0f}",
+        "Sí"  # Por defecto todos disponibles
+    )
+
+
+class ModeloCatalogo:
+    """
+    Catálogo de ingredientes con páginas, búsqueda indexada y filtro por categoría
+    """
+
+    def __init__(self, ingredientes, tamano_pagina=TAMANO_PAGINA_CATALOGO):
+        """
+        Args:
+            ingredientes: Lista de datos de ingredientes (no se copia)
+            tamano_pagina: Filas formateadas por página
+        """
+        self.ingredientes = ingredientes
+        self.tamano_pagina = tamano_pagina
+        self.invalidar()
+
+    def invalidar(self):
+        """Descarta páginas e índices (tras recargar la lista de ingredientes)"""
+        self.paginas = {}
+        self.inicios = None
+        self.texto_indice = ""
+        self.visibles = range(len(self.ingredientes))
+        self.busqueda = ""
+        self.categoria = TODAS_CATEGORIAS
+
+    def __len__(self):
+        return len(self.visibles)
+
+    def categorias(self):
+        """
+        Obtiene las categorías del catálogo para el filtro
+
+        Returns:
+            Lista con TODAS_CATEGORIAS seguida de las categorías ordenadas
+        """
+        return [TODAS_CATEGORIAS] + sorted(indexar_ingredientes(self.ingredientes)["por_categoria"])
+
+    def _construir_indice(self):
+        """Construye el índice de búsqueda de nombres"""
+        self.inicios = []
+        partes = []
+        posicion = 0
+        for ingrediente in self.ingredientes:
+            clave = ingrediente.get("nombre", "").lower() + _SEPARADOR
+            self.inicios.append(posicion)
+            partes.append(clave)
+            posicion += len(clave)
+        self.texto_indice = "".join(partes)
+
+    def _buscar(self, busqueda, candidatos=None):
+        """Posiciones de los ingredientes cuyo nombre contiene el texto"""
+        if candidatos is not None:
+            # Refinamiento: solo se revisan los candidatos
+            return [i for i in candidatos
+                    if busqueda in self.texto_indice[self.inicios[i]:self._fin_clave(i)]]
+
+        resultado = []
+        posicion = self.texto_indice.find(busqueda)
+        while posicion != -1:
+            i = bisect_right(self.inicios, posicion) - 1
+            resultado.append(i)
+            # Continuar desde el ingrediente siguiente: cada uno cuenta una vez
+            if i + 1 >= len(self.inicios):
+                break
+            posicion = self.texto_indice.find(busqueda, self.inicios[i + 1])
+        return resultado
+
+    def _fin_clave(self, i):
+        """Fin (exclusivo, sin separador) de la clave del ingrediente i en el índice"""
+        fin = self.inicios[i + 1] if i + 1 < len(self.inicios) else len(self.texto_indice)
+        return fin - len(_SEPARADOR)
+
+    def filtrar(self, busqueda="", categoria=TODAS_CATEGORIAS):
+        """
+        Restringe el catálogo por nombre y categoría
+
+        Args:
+            busqueda: Texto contenido en el nombre (sin distinguir mayúsculas)
+            categoria: Categoría de clasificar_ingrediente o TODAS_CATEGORIAS
+
+        Returns:
+            Número de ingredientes visibles
+        """
+        busqueda = busqueda.lower()
+        categoria = categoria or TODAS_CATEGORIAS
+        if busqueda and self.inicios is None:
+            self._construir_indice()
+
+        if busqueda and categoria == self.categoria and self.busqueda and self.busqueda in busqueda:
+            # El usuario sigue escribiendo: el resultado es un subconjunto del anterior
+            visibles = self._buscar(busqueda, self.visibles)
+        else:
+            if categoria != TODAS_CATEGORIAS:
+                visibles = indexar_ingredientes(self.ingredientes)["por_categoria"].get(categoria, [])
+            else:
+                visibles = range(len(self.ingredientes))
+            if busqueda:
+                if categoria != TODAS_CATEGORIAS:
+                    visibles = self._buscar(busqueda, visibles)
+                else:
+                    visibles = self._buscar(busqueda)
+
+        self.visibles = visibles
+        self.busqueda = busqueda
+        self.categoria = categoria
+        return len(visibles)
+
+    def fila(self, i):
+        """
+        Obtiene los valores formateados de un ingrediente, cargando su página si hace falta
+
+        Args:
+            i: Posición del ingrediente en la lista
+
+        Returns:
+            Tupla de valores para la vista
+        """
+        numero, desplazamiento = divmod(i, self.tamano_pagina)
+        pagina = self.paginas.get(numero)
+        if pagina is None:
+            inicio = numero * self.tamano_pagina
+            pagina = [formatear_ingrediente(ingrediente)
+                      for ingrediente in self.ingredientes[inicio:inicio + self.tamano_pagina]]
+            self.paginas[numero] = pagina
+        return pagina[desplazamiento]
+
+    def ventana(self, inicio, cantidad):
+        """
+        Obtiene las filas visibles a partir de una posición
+
+        Args:
+            inicio: Posición en el resultado filtrado
+            cantidad: Número de filas
+
+        Returns:
+            Lista de tuplas (posición del ingrediente, valores)
+        """
+        return [(i, self.fila(i)) for i in self.visibles[inicio:inicio + cantidad]]
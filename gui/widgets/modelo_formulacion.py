@@ -0,0 +1,213 @@
+"""
+Modelo de datos de la tabla de formulación.
+
+Las filas se calculan una sola vez por formulación con sus valores numéricos
+(para ordenar) y su texto ya formateado (para mostrar). La búsqueda usa un
+índice de claves en minúsculas concatenadas: una sola búsqueda de subcadena
+sobre el texto completo y bisección para ubicar la fila de cada
+coincidencia. Si la búsqueda nueva contiene a la anterior (el usuario sigue
+escribiendo) solo se revisan las filas del resultado anterior.
+"""
+
+from bisect import bisect_right
+
+# Porcentaje mínimo (0-100) para mostrar un ingrediente en la tabla
+PORCENTAJE_MINIMO_TABLA = 0.1
+
+# Nombres legibles de los proveedores
+NOMBRES_PROVEEDORES = {
+    'veterinaria_buenavista': 'Vet. Buenavista',
+    'veterinaria_don_paco': 'Vet. Don Paco',
+    'veterinaria_don_edilberto': 'Vet. Don Edilberto'
+}
+
+# Columna de la tabla -> atributo de FilaFormulacion usado para ordenar
+CLAVES_ORDEN = {
+    'Ingrediente': 'nombre_minusculas',
+    '(%)': 'porcentaje',
+    'kg/ton': 'kg_ton',
+    'Precio': 'precio',
+    'Proveedor': 'proveedor_minusculas',
+    'Costo/Ton': 'costo_total'
+}
+
+# Separa las claves en el índice (no puede aparecer en una búsqueda)
+_SEPARADOR = "\0"
+
+
+def obtener_nombre_proveedor(clave_proveedor):
+    """
+    Obtiene el nombre legible de un proveedor
+
+    Args:
+        clave_proveedor: Clave del proveedor
+
+    Returns:
+        Nombre para mostrar (la clave si no se conoce)
+    """
+    return NOMBRES_PROVEEDORES.get(clave_proveedor, clave_proveedor)
+
+
+class FilaFormulacion:
+    """Un ingrediente de la formulación con valores numéricos y texto para mostrar"""
+
+    __slots__ = ("indice", "ingrediente", "porcentaje", "kg_ton", "precio", "proveedor",
+                 "costo_total", "proteina", "energia", "nombre_minusculas", "proveedor_minusculas",
+                 "valores")
+
+    def __init__(self, indice, ingrediente, porcentaje, precio, proveedor, nutrientes):
+        """
+        Args:
+            indice: Posición del ingrediente en la lista de ingredientes
+            ingrediente: Nombre del ingrediente
+            porcentaje: Porcentaje en la formulación (0-100)
+            precio: Precio por kg
+            proveedor: Nombre legible del proveedor
+            nutrientes: Diccionario de nutrientes del ingrediente
+        """
+        self.indice = indice
+        self.ingrediente = ingrediente
+        self.porcentaje = porcentaje
+        self.kg_ton = porcentaje * 10
+        self.precio = precio
+        self.proveedor = proveedor
+        self.costo_total = self.kg_ton * precio
+
+        # Contribución nutricional
+        self.proteina = porcentaje / 100 * nutrientes.get('proteina', 0) * 100
+        self.energia = porcentaje / 100 * nutrientes.get('energia', 0)
+
+        self.nombre_minusculas = ingrediente.lower()
+        self.proveedor_minusculas = proveedor.lower()
+        self.valores = (
+            ingrediente,
+            f"{porcentaje:.2f}%",
+            f"{self.kg_ton:.1f}",
+            f"${precio:.2f}",
+            proveedor,
+            f"${self.costo_total:.0f}"
+        )
+
+
+class ModeloFormulacion:
+    """
+    Filas de una formulación con índice de búsqueda y ordenamiento por valores
+    """
+
+    def __init__(self, formulacion, ingredientes):
+        """
+        Construye las filas (solo ingredientes por encima de PORCENTAJE_MINIMO_TABLA)
+
+        Args:
+            formulacion: Diccionario con 'porcentajes' y opcionalmente 'proveedor_recomendado'
+            ingredientes: Lista de datos de ingredientes
+        """
+        self.filas = []
+        proveedores_rec = formulacion.get('proveedor_recomendado', {})
+
+        for i, porcentaje in enumerate(formulacion.get('porcentajes', [])[:len(ingredientes)]):
+            if porcentaje * 100 <= PORCENTAJE_MINIMO_TABLA:
+                continue
+            ingrediente = ingredientes[i]
+
+            # Proveedor recomendado por el algoritmo (clave texto o numérica) o el de mejor precio
+            proveedor_info = proveedores_rec.get(str(i), proveedores_rec.get(i))
+            if proveedor_info is not None:
+                precio = proveedor_info['precio']
+                proveedor = obtener_nombre_proveedor(proveedor_info['proveedor'])
+            else:
+                precios = ingrediente.get('precios', {})
+                if precios:
+                    clave = min(precios, key=precios.get)
+                    precio = precios[clave]
+                    proveedor = obtener_nombre_proveedor(clave)
+                else:
+                    precio = ingrediente.get('precio_base', 0)
+                    proveedor = "No especificado"
+
+            self.filas.append(FilaFormulacion(i, ingrediente.get('nombre', f'Ingrediente {i+1}'),
+                                              porcentaje * 100, precio, proveedor,
+                                              ingrediente.get('nutrientes', {})))
+
+        # Índice de búsqueda: claves concatenadas y posición de inicio de cada una
+        self.inicios = []
+        partes = []
+        posicion = 0
+        for fila in self.filas:
+            clave = fila.nombre_minusculas + _SEPARADOR + fila.proveedor_minusculas + _SEPARADOR
+            self.inicios.append(posicion)
+            partes.append(clave)
+            posicion += len(clave)
+        self.texto_indice = "".join(partes)
+
+        self._ultima_busqueda = ""
+        self._ultimo_resultado = list(range(len(self.filas)))
+
+    def __len__(self):
+        return len(self.filas)
+
+    def filtrar(self, busqueda):
+        """
+        Obtiene las filas cuyo ingrediente o proveedor contiene el texto
+
+        Args:
+            busqueda: Texto a buscar (sin distinguir mayúsculas)
+
+        Returns:
+            Lista de posiciones de fila, en orden del modelo
+        """
+        busqueda = busqueda.lower()
+        if not busqueda:
+            resultado = list(range(len(self.filas)))
+        elif self._ultima_busqueda and self._ultima_busqueda in busqueda:
+            # Refinamiento: el resultado es un subconjunto del anterior
+            resultado = [i for i in self._ultimo_resultado
+                         if busqueda in self.filas[i].nombre_minusculas
+                         or busqueda in self.filas[i].proveedor_minusculas]
+        else:
+            resultado = []
+            posicion = self.texto_indice.find(busqueda)
+            while posicion != -1:
+                fila = bisect_right(self.inicios, posicion) - 1
+                resultado.append(fila)
+                # Continuar desde la fila siguiente: cada fila cuenta una vez
+                siguiente = fila + 1
+                if siguiente >= len(self.inicios):
+                    break
+                posicion = self.texto_indice.find(busqueda, self.inicios[siguiente])
+
+        self._ultima_busqueda = busqueda
+        self._ultimo_resultado = resultado
+        return resultado
+
+    def ordenar(self, indices, columna, descendente=False):
+        """
+        Ordena posiciones de fila por el valor de una columna
+
+        Args:
+            indices: Posiciones de fila
+            columna: Nombre de la columna de la tabla
+            descendente: Orden descendente
+
+        Returns:
+            Nueva lista de posiciones ordenadas
+        """
+        atributo = CLAVES_ORDEN.get(columna, 'nombre_minusculas')
+        return sorted(indices, key=lambda i: getattr(self.filas[i], atributo), reverse=descendente)
+
+    def totales(self, indices):
+        """
+        Suma costo y contribución nutricional de un conjunto de filas
+
+        Args:
+            indices: Posiciones de fila
+
+        Returns:
+            Diccionario con costo_total, proteina, energia y num_ingredientes
+        """
+        return {
+            'costo_total': sum(self.filas[i].costo_total for i in indices),
+            'proteina': sum(self.filas[i].proteina for i in indices),
+            'energia': sum(self.filas[i].energia for i in indices),
+            'num_ingredientes': len(indices)
+        }
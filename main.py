@@ -1,7 +1,54 @@
-from gui import BoilerNutriGUI
+import argparse
+import sys
+
+
+def crear_parser():
+    """Crea el parser de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="boilerNutri - Optimización de alimentos para pollos")
+    subcomandos = parser.add_subparsers(dest="comando")
+
+    perfil = subcomandos.add_parser("profile", aliases=["perfil"],
+                                    help="Perfila una ejecución del algoritmo genético")
+    perfil.add_argument("--escenario", help="Archivo JSON del escenario (por defecto el canónico)")
+    perfil.add_argument("--salida", help="Directorio donde guardar los reportes")
+    perfil.add_argument("--poblacion", type=int, help="Tamaño de población")
+    perfil.add_argument("--generaciones", type=int, help="Número de generaciones")
+    perfil.add_argument("--procesos", type=int, help="Procesos de evaluación (0 = todos los núcleos)")
+    perfil.add_argument("--top", type=int, default=20, help="Funciones y asignaciones en el resumen")
+    perfil.add_argument("--intervalo", type=float, default=0.005, help="Segundos entre muestras de pila")
+    perfil.add_argument("--sin-memoria", action="store_true", help="No rastrear asignaciones con tracemalloc")
+    return parser
+
+
+def ejecutar_perfil(argumentos):
+    """Ejecuta el subcomando profile"""
+    from utils.perfilado import cargar_escenario, perfilar_escenario
+
+    escenario = cargar_escenario(argumentos.escenario)
+    if escenario is None:
+        return 1
+
+    sustituciones = {
+        "tamano_poblacion": argumentos.poblacion,
+        "num_generaciones": argumentos.generaciones,
+        "num_procesos": argumentos.procesos
+    }
+    escenario["algoritmo"].update({clave: valor for clave, valor in sustituciones.items() if valor is not None})
+
+    perfilar_escenario(escenario, argumentos.salida, memoria=not argumentos.sin_memoria,
+                       top=argumentos.top, intervalo=argumentos.intervalo)
+    return 0
+
+
 def main():
+    argumentos = crear_parser().parse_args()
+    if argumentos.comando in ("profile", "perfil"):
+        return ejecutar_perfil(argumentos)
+
+    from gui import BoilerNutriGUI
     app = BoilerNutriGUI()
     app.ejecutar()
-        
+    return 0
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
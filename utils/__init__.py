@@ -9,7 +9,9 @@ from datetime import datetime
 
 # Importaciones principales
 from .visualizacion import *
+from .renderizado import renderizar_figuras, cerrar_renderizado
 from .reporte import *
+from .reporte_lotes import generar_reportes_lote
 from .entrada_usuario import *
 
 # Nuevas importaciones para evolución de fitness
@@ -8,6 +8,7 @@ los parámetros proporcionados por el usuario.
 import json
 from conocimiento import INGREDIENTES, RAZAS_POLLOS, PROVEEDORES
 from conocimiento.restricciones_usuario import RestriccionesUsuario
+from conocimiento.diagnostico import diagnosticar_restricciones, generar_resumen_diagnostico
 
 def procesar_entradas():
     """
@@ -345,6 +346,13 @@ def configurar_restricciones_personalizadas():
     if preguntar_si_no("¿Desea especificar la capacidad de su planta de alimentos?"):
         establecer_capacidad_planta(restricciones)
     
+    # 5. Verificar que las restricciones admitan alguna formulación
+    diagnostico = diagnosticar_restricciones(INGREDIENTES, restricciones)
+    if not diagnostico["factible"]:
+        print(f"\n❌ {generar_resumen_diagnostico(diagnostico)}")
+        if preguntar_si_no("¿Desea configurar de nuevo las restricciones?"):
+            return configurar_restricciones_personalizadas()
+    
     return restricciones
 
 def preguntar_si_no(pregunta):
@@ -565,6 +573,11 @@ def validar_coherencia_entradas(parametros):
             
             if disponibles_set.issubset(excluidos_set):
                 errores.append("No se pueden excluir todos los ingredientes disponibles")
+        
+        # Verificar que exista al menos una formulación que cumpla las restricciones
+        diagnostico = diagnosticar_restricciones(INGREDIENTES, restricciones)
+        if not diagnostico["factible"]:
+            errores.append("Restricciones contradictorias: " + "; ".join(diagnostico["conflicto"]))
     
     # Validar volúmenes de producción
     cantidad_pollos = parametros.get("cantidad_pollos", 0)
@@ -600,10 +613,18 @@ def cargar_parametros_desde_archivo(archivo):
             restricciones_data = parametros["restricciones_usuario"]
             restricciones = RestriccionesUsuario()
             
-            # Cargar datos del objeto
-            for attr in ["ingredientes_excluidos", "limites_personalizados", "capacidad_planta", "presupuesto_maximo"]:
-                if attr in restricciones_data:
-                    setattr(restricciones, attr, restricciones_data[attr])
+            # Cargar datos con los métodos del objeto (mantienen conjuntos y versión)
+            for ingrediente_id in restricciones_data.get("ingredientes_excluidos") or []:
+                restricciones.agregar_exclusion(ingrediente_id)
+            for ingrediente_id in restricciones_data.get("ingredientes_disponibles") or []:
+                restricciones.agregar_ingrediente_disponible(ingrediente_id)
+            for ingrediente_id, limite in (restricciones_data.get("limites_personalizados") or {}).items():
+                # JSON guarda las claves como texto
+                restricciones.establecer_limite(int(ingrediente_id), limite["min"], limite["max"])
+            if restricciones_data.get("capacidad_planta") is not None:
+                restricciones.establecer_capacidad_planta(restricciones_data["capacidad_planta"])
+            if restricciones_data.get("presupuesto_maximo") is not None:
+                restricciones.establecer_presupuesto_maximo(restricciones_data["presupuesto_maximo"])
             
             parametros["restricciones_usuario"] = restricciones
         
@@ -637,6 +658,7 @@ def guardar_parametros_en_archivo(parametros, archivo):
             restricciones = parametros["restricciones_usuario"]
             parametros_serializables["restricciones_usuario"] = {
                 "ingredientes_excluidos": restricciones.ingredientes_excluidos,
+                "ingredientes_disponibles": restricciones.ingredientes_disponibles,
                 "limites_personalizados": restricciones.limites_personalizados,
                 "capacidad_planta": restricciones.capacidad_planta,
                 "presupuesto_maximo": restricciones.presupuesto_maximo
@@ -0,0 +1,485 @@
+"""
+Perfilado de una ejecución completa del algoritmo genético.
+
+Ejecuta un escenario (el canónico o uno definido en un archivo JSON) a través
+de AlgoritmoGenetico.ejecutar y recopila:
+
+- Estadísticas de cProfile (archivo .prof compatible con pstats/snakeviz)
+- Principales asignaciones de memoria por fase con tracemalloc
+- Pico de memoria residente (RSS) del proceso y de sus trabajadores
+- Pilas muestreadas en formato colapsado (entrada de flamegraph.pl/speedscope)
+- Tabla resumen en texto y en JSON
+
+Las fases son la construcción del algoritmo (presolve, reducción del
+genoma), cada fase evolutiva (inicial, intermedia y final) y la
+generación de resultados.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+
+from config import ALGORITMO_CONFIG, ARCHIVOS_CONFIG
+from conocimiento import INGREDIENTES
+from conocimiento.restricciones_usuario import RestriccionesUsuario
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Escenario canónico: valores por defecto de la interfaz con una corrida corta
+ESCENARIO_CANONICO = {
+    "nombre": "canonico",
+    "semilla": 42,
+    "algoritmo": {
+        "tamano_poblacion": 100,
+        "num_generaciones": 100
+    },
+    "config_evaluacion": {
+        "raza": "Ross",
+        "edad_dias": 21,
+        "peso_actual": 0.9,
+        "peso_objetivo": 2.5,
+        "cantidad_pollos": 1000
+    },
+    "restricciones_usuario": None
+}
+
+# Intervalo de muestreo de pilas en segundos
+INTERVALO_MUESTREO = 0.005
+
+# Funciones y asignaciones que se muestran en la tabla resumen
+TOP_PERFILADO = 20
+
+
+def cargar_escenario(archivo=None):
+    """
+    Carga un escenario de perfilado
+
+    El archivo JSON puede definir nombre, semilla, algoritmo (parámetros que
+    sustituyen a ALGORITMO_CONFIG), config_evaluacion y restricciones_usuario
+    (ingredientes_excluidos, limites_personalizados, capacidad_planta y
+    presupuesto_maximo). Lo que falte se toma del escenario canónico.
+
+    Args:
+        archivo: Ruta del archivo JSON (None = escenario canónico)
+
+    Returns:
+        Diccionario con el escenario, o None si no se pudo leer
+    """
+    escenario = json.loads(json.dumps(ESCENARIO_CANONICO))
+    if archivo is None:
+        return escenario
+
+    try:
+        with open(archivo, "r", encoding="utf-8") as f:
+            datos = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ Error al leer el escenario {archivo}: {e}")
+        return None
+
+    escenario["nombre"] = datos.get("nombre", os.path.splitext(os.path.basename(archivo))[0])
+    escenario["semilla"] = datos.get("semilla", escenario["semilla"])
+    escenario["algoritmo"].update(datos.get("algoritmo", {}))
+    escenario["config_evaluacion"].update(datos.get("config_evaluacion", {}))
+    escenario["restricciones_usuario"] = datos.get("restricciones_usuario")
+    return escenario
+
+
+def _crear_restricciones(datos):
+    """Crea RestriccionesUsuario a partir del diccionario del escenario"""
+    if not datos:
+        return None
+
+    restricciones = RestriccionesUsuario()
+    for ingrediente_id in datos.get("ingredientes_excluidos", []):
+        restricciones.agregar_exclusion(ingrediente_id)
+    for ingrediente_id, limites in datos.get("limites_personalizados", {}).items():
+        restricciones.establecer_limite(int(ingrediente_id), limites["min"], limites["max"])
+    if datos.get("capacidad_planta") is not None:
+        restricciones.establecer_capacidad_planta(datos["capacidad_planta"])
+    if datos.get("presupuesto_maximo") is not None:
+        restricciones.establecer_presupuesto_maximo(datos["presupuesto_maximo"])
+    return restricciones
+
+
+def preparar_configuracion_escenario(escenario):
+    """
+    Arma la configuración del algoritmo igual que la interfaz
+
+    Args:
+        escenario: Diccionario de cargar_escenario
+
+    Returns:
+        Configuración para AlgoritmoGenetico
+    """
+    config = ALGORITMO_CONFIG.copy()
+    config.update(escenario["algoritmo"])
+    config["config_evaluacion"] = dict(escenario["config_evaluacion"])
+    config["ingredientes_data"] = INGREDIENTES
+    config["restricciones_usuario"] = _crear_restricciones(escenario["restricciones_usuario"])
+    return config
+
+
+def obtener_pico_rss():
+    """
+    Obtiene el pico de memoria residente en bytes
+
+    Returns:
+        Diccionario con proceso y trabajadores (None si no está disponible)
+    """
+    if not RESOURCE_AVAILABLE:
+        return {"proceso": None, "trabajadores": None}
+
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    escala = 1 if sys.platform == "darwin" else 1024
+    return {
+        "proceso": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * escala,
+        "trabajadores": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * escala
+    }
+
+
+class MuestreadorPilas:
+    """
+    Muestrea periódicamente la pila del hilo principal
+
+    Produce pilas colapsadas ("modulo:funcion;...;modulo:funcion conteo"),
+    el formato que leen flamegraph.pl y speedscope.
+    """
+
+    def __init__(self, intervalo=INTERVALO_MUESTREO):
+        """
+        Inicializa el muestreador
+
+        Args:
+            intervalo: Segundos entre muestras
+        """
+        self.intervalo = intervalo
+        self.pilas = Counter()
+        self.muestras = 0
+        self._hilo_objetivo = threading.main_thread().ident
+        self._detener = threading.Event()
+        self._pausa = threading.Event()
+        self._hilo = None
+
+    def _muestrear(self):
+        """Ciclo del hilo muestreador"""
+        while not self._detener.wait(self.intervalo):
+            if self._pausa.is_set():
+                continue
+            marco = sys._current_frames().get(self._hilo_objetivo)
+            pila = []
+            while marco is not None:
+                codigo = marco.f_code
+                modulo = os.path.splitext(os.path.basename(codigo.co_filename))[0]
+                pila.append(f"{modulo}:{codigo.co_name}")
+                marco = marco.f_back
+            if pila:
+                self.pilas[";".join(reversed(pila))] += 1
+                self.muestras += 1
+
+    def iniciar(self):
+        """Inicia el muestreo en un hilo aparte"""
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._muestrear, name="muestreador-pilas", daemon=True)
+        self._hilo.start()
+
+    def pausar(self):
+        """Suspende el muestreo (por ejemplo mientras se toma una instantánea)"""
+        self._pausa.set()
+
+    def reanudar(self):
+        """Reanuda el muestreo"""
+        self._pausa.clear()
+
+    def detener(self):
+        """Detiene el muestreo"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join()
+            self._hilo = None
+
+    def exportar_colapsado(self, archivo):
+        """
+        Escribe las pilas en formato colapsado
+
+        Args:
+            archivo: Ruta del archivo de salida
+        """
+        with open(archivo, "w", encoding="utf-8") as f:
+            for pila, conteo in self.pilas.most_common():
+                f.write(f"{pila} {conteo}\n")
+
+
+class _SeguimientoMemoria:
+    """
+    Toma instantáneas de tracemalloc al cambiar de fase
+
+    Mientras se toma la instantánea se suspende el muestreador, y el reloj
+    que usa cProfile (reloj()) descuenta ese tiempo, así el costo de las
+    instantáneas no aparece en los perfiles.
+    """
+
+    def __init__(self, activo, top, muestreador):
+        self.activo = activo
+        self.top = top
+        self.muestreador = muestreador
+        self.fases = []
+        self.tiempo_instantaneas = 0.0
+        self._fase = None
+        self._instantanea = None
+        self._congelado = None
+
+    def reloj(self):
+        """Reloj de cProfile que se detiene mientras se toma una instantánea"""
+        if self._congelado is not None:
+            return self._congelado
+        return time.perf_counter() - self.tiempo_instantaneas
+
+    def iniciar_fase(self, fase):
+        """Cierra la fase en curso (si la hay) y comienza otra"""
+        if not self.activo:
+            return
+        self.muestreador.pausar()
+        self._congelado = self.reloj()
+        inicio = time.perf_counter()
+        try:
+            instantanea = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            if self._fase is not None:
+                self._cerrar(instantanea)
+            else:
+                tracemalloc.reset_peak()
+            self._fase = fase
+            self._instantanea = instantanea
+        finally:
+            self.tiempo_instantaneas += time.perf_counter() - inicio
+            self._congelado = None
+            self.muestreador.reanudar()
+
+    def _cerrar(self, instantanea):
+        """Registra las asignaciones de la fase en curso"""
+        _, pico = tracemalloc.get_traced_memory()
+        diferencias = instantanea.compare_to(self._instantanea, "lineno")
+        asignaciones = [{
+            "ubicacion": f"{d.traceback[0].filename}:{d.traceback[0].lineno}",
+            "bytes": d.size_diff,
+            "bloques": d.count_diff
+        } for d in diferencias[:self.top] if d.size_diff > 0]
+        self.fases.append({
+            "fase": self._fase,
+            "neto": sum(d.size_diff for d in diferencias),
+            "pico": pico,
+            "asignaciones": asignaciones
+        })
+        tracemalloc.reset_peak()
+
+    def terminar(self):
+        """Cierra la última fase"""
+        if self.activo and self._fase is not None:
+            self.iniciar_fase(None)
+            self._fase = None
+
+
+def _seguir_fases(ag, memoria):
+    """
+    Envuelve _actualizar_fase de la instancia para abrir una fase de memoria
+    cada vez que el algoritmo cambia de fase evolutiva
+    """
+    actualizar_fase = ag._actualizar_fase
+
+    def actualizar_y_registrar():
+        anterior = ag.fase_actual if ag.generacion_actual > 0 else None
+        actualizar_fase()
+        if ag.fase_actual != anterior:
+            memoria.iniciar_fase(f"evolucion.{ag.fase_actual}")
+
+    ag._actualizar_fase = actualizar_y_registrar
+
+
+def _formatear_bytes(valor):
+    """Texto legible de una cantidad de bytes"""
+    if valor is None:
+        return "n/d"
+    for unidad in ("B", "KB", "MB"):
+        if abs(valor) < 1024:
+            return f"{valor:.1f} {unidad}"
+        valor /= 1024
+    return f"{valor:.1f} GB"
+
+
+def _obtener_funciones(perfil, top):
+    """Funciones con mayor tiempo acumulado según cProfile"""
+    estadisticas = pstats.Stats(perfil)
+    funciones = []
+    for (archivo, linea, nombre), (_, llamadas, propio, acumulado, _) in estadisticas.stats.items():
+        funciones.append({
+            "funcion": f"{os.path.basename(archivo)}:{linea}({nombre})",
+            "llamadas": llamadas,
+            "tiempo_propio": propio,
+            "tiempo_acumulado": acumulado
+        })
+    funciones.sort(key=lambda f: -f["tiempo_acumulado"])
+    return funciones[:top]
+
+
+def generar_tabla_resumen(resumen):
+    """
+    Genera la tabla resumen en texto
+
+    Args:
+        resumen: Diccionario de perfilar_escenario
+
+    Returns:
+        String con la tabla
+    """
+    lineas = [
+        f"PERFIL DE EJECUCIÓN - escenario '{resumen['escenario']}'",
+        "=" * 78,
+        f"Población: {resumen['tamano_poblacion']}   Generaciones: {resumen['generaciones_ejecutadas']}"
+        f"   Procesos: {resumen['num_procesos']}",
+        f"Tiempo total: {resumen['tiempo_total']:.2f} s   Muestras de pila: {resumen['muestras_pila']}",
+        f"Pico RSS: {_formatear_bytes(resumen['pico_rss']['proceso'])} (proceso), "
+        f"{_formatear_bytes(resumen['pico_rss']['trabajadores'])} (trabajadores)",
+        ""
+    ]
+
+    if resumen["etapas"]:
+        lineas.append(f"{'Etapa':<28}{'Total (s)':>12}{'Llamadas':>12}{'Promedio (ms)':>16}")
+        lineas.append("-" * 68)
+        for etapa, datos in resumen["etapas"].items():
+            lineas.append(f"{etapa:<28}{datos['total']:>12.4f}{datos['llamadas']:>12}"
+                          f"{datos['promedio'] * 1000:>16.4f}")
+        lineas.append("")
+
+    lineas.append(f"{'Función':<52}{'Llamadas':>10}{'Propio (s)':>12}{'Acum. (s)':>12}")
+    lineas.append("-" * 86)
+    for funcion in resumen["funciones"]:
+        lineas.append(f"{funcion['funcion'][:51]:<52}{funcion['llamadas']:>10}"
+                      f"{funcion['tiempo_propio']:>12.4f}{funcion['tiempo_acumulado']:>12.4f}")
+
+    for fase in resumen["memoria"]:
+        lineas.append("")
+        lineas.append(f"Memoria en fase '{fase['fase']}': neto {_formatear_bytes(fase['neto'])}, "
+                      f"pico {_formatear_bytes(fase['pico'])}")
+        for asignacion in fase["asignaciones"]:
+            lineas.append(f"  {_formatear_bytes(asignacion['bytes']):>12}  {asignacion['bloques']:>8} bloques  "
+                          f"{asignacion['ubicacion']}")
+
+    return "\n".join(lineas)
+
+
+def perfilar_escenario(escenario=None, directorio_salida=None, memoria=True, top=TOP_PERFILADO,
+                       intervalo=INTERVALO_MUESTREO):
+    """
+    Ejecuta un escenario bajo cProfile, tracemalloc y el muestreador de pilas
+
+    Escribe en el directorio de salida perfil.prof, pilas.folded,
+    resumen.txt y resumen.json.
+
+    Args:
+        escenario: Diccionario de cargar_escenario (None = canónico)
+        directorio_salida: Directorio de los reportes (por defecto uno con fecha
+            dentro de ARCHIVOS_CONFIG["directorio_perfiles"])
+        memoria: Si es True, rastrea asignaciones con tracemalloc (más lento)
+        top: Número de funciones y asignaciones por fase en el resumen
+        intervalo: Segundos entre muestras de pila
+
+    Returns:
+        Diccionario con el resumen y la ruta de cada archivo generado
+    """
+    # Importación diferida: el paquete genetic no hace falta para cargar escenarios
+    import random
+    import numpy as np
+    from genetic import AlgoritmoGenetico
+
+    escenario = escenario or cargar_escenario()
+    if directorio_salida is None:
+        marca = datetime.now().strftime("%Y%m%d_%H%M%S")
+        directorio_salida = os.path.join(ARCHIVOS_CONFIG["directorio_perfiles"], f"{escenario['nombre']}_{marca}")
+    os.makedirs(directorio_salida, exist_ok=True)
+
+    config = preparar_configuracion_escenario(escenario)
+    if escenario.get("semilla") is not None:
+        random.seed(escenario["semilla"])
+        np.random.seed(escenario["semilla"])
+
+    print(f"🔬 Perfilando escenario '{escenario['nombre']}' "
+          f"({config['tamano_poblacion']} individuos, {config['num_generaciones']} generaciones)...")
+
+    muestreador = MuestreadorPilas(intervalo)
+    seguimiento = _SeguimientoMemoria(memoria, top, muestreador)
+    perfil = cProfile.Profile(seguimiento.reloj) if memoria else cProfile.Profile()
+    if memoria:
+        tracemalloc.start()
+
+    inicio = time.perf_counter()
+    try:
+        muestreador.iniciar()
+        perfil.enable()
+
+        seguimiento.iniciar_fase("construccion")
+        ag = AlgoritmoGenetico(config)
+        _seguir_fases(ag, seguimiento)
+
+        seguimiento.iniciar_fase("evolucion.inicializacion")
+        resultado = ag.ejecutar()
+
+        seguimiento.iniciar_fase("resultados")
+        estadisticas = ag.obtener_estadisticas_ejecucion()
+        seguimiento.terminar()
+    finally:
+        perfil.disable()
+        muestreador.detener()
+        if memoria:
+            tracemalloc.stop()
+    # El tiempo de las instantáneas de memoria no forma parte de la ejecución
+    tiempo_total = time.perf_counter() - inicio - seguimiento.tiempo_instantaneas
+
+    if "error" in resultado:
+        print(f"⚠️ La ejecución terminó con error: {resultado['error']}")
+
+    resumen = {
+        "escenario": escenario["nombre"],
+        "tamano_poblacion": config["tamano_poblacion"],
+        "generaciones_ejecutadas": resultado.get("generaciones_ejecutadas", 0),
+        "num_procesos": config.get("num_procesos", 1),
+        "tiempo_total": tiempo_total,
+        "mejor_fitness": resultado["mejor_individuo"].fitness if resultado.get("mejor_individuo") else None,
+        "pico_rss": obtener_pico_rss(),
+        "muestras_pila": muestreador.muestras,
+        "etapas": estadisticas.get("instrumentacion", {}).get("etapas", {}),
+        "contadores": estadisticas.get("instrumentacion", {}).get("contadores", {}),
+        "funciones": _obtener_funciones(perfil, top),
+        "memoria": seguimiento.fases
+    }
+
+    archivos = {
+        "perfil": os.path.join(directorio_salida, "perfil.prof"),
+        "pilas": os.path.join(directorio_salida, "pilas.folded"),
+        "resumen_texto": os.path.join(directorio_salida, "resumen.txt"),
+        "resumen_json": os.path.join(directorio_salida, "resumen.json")
+    }
+    perfil.dump_stats(archivos["perfil"])
+    muestreador.exportar_colapsado(archivos["pilas"])
+    tabla = generar_tabla_resumen(resumen)
+    with open(archivos["resumen_texto"], "w", encoding="utf-8") as f:
+        f.write(tabla + "\n")
+    with open(archivos["resumen_json"], "w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+
+    print(tabla)
+    print(f"\n✅ Reportes de perfilado guardados en: {directorio_salida}")
+    return {"resumen": resumen, "archivos": archivos}
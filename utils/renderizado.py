@@ -0,0 +1,311 @@
+"""
+Renderizado de gráficas en paralelo con caché en disco.
+
+Cada gráfica se describe como una tarea (función que construye la figura y
+sus argumentos). La clave de caché es un hash de los argumentos, del código
+fuente del módulo de la función (títulos, colores y funciones auxiliares
+incluidos), del formato, de los dpi, de la versión de matplotlib y de sus
+rcParams: si el archivo ya existe en el directorio de caché (relativo al
+directorio del proyecto) se copia sin volver a dibujar.
+Las gráficas que faltan se dibujan con el backend Agg en un grupo de
+procesos que se reutiliza entre llamadas (creados con "spawn" para que no
+hereden el estado de Tk de la interfaz gráfica). Quien además necesita las
+figuras usa construir_figuras, que las dibuja una vez en el proceso actual y
+guarda esas mismas figuras.
+"""
+
+import atexit
+import hashlib
+import inspect
+import multiprocessing
+import os
+import pickle
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+from config import VISUALIZACION_CONFIG, DIRECTORIO_PROYECTO
+
+# Cambia si cambia el aspecto de las gráficas sin cambiar el código de las funciones
+VERSION_GRAFICAS = 1
+
+# Hash del código fuente por módulo (se lee una vez por proceso)
+_HASH_MODULOS = {}
+
+# Grupo de procesos reutilizable y su tamaño
+_GRUPO = None
+_TAMANO_GRUPO = 0
+
+
+def calcular_clave_figura(funcion, argumentos, formato="png", dpi=300):
+    """
+    Calcula la clave de caché de una gráfica
+
+    Args:
+        funcion: Función que construye la figura
+        argumentos: Tupla de argumentos de la función
+        formato: Formato de archivo
+        dpi: Resolución
+
+    Returns:
+        Hash hexadecimal (sha256)
+    """
+    h = hashlib.sha256()
+    h.update(f"{VERSION_GRAFICAS}|{matplotlib.__version__}|{formato}|{dpi}|".encode())
+    h.update(f"{funcion.__module__}.{funcion.__qualname__}|".encode())
+    h.update(_hash_codigo(funcion))
+    h.update(_hash_estilo())
+    h.update(pickle.dumps(argumentos, protocol=4))
+    return h.hexdigest()
+
+
+def _hash_codigo(funcion):
+    """
+    Hash del código fuente del módulo de la función
+
+    Cubre los literales (títulos, colores, tamaños) y las funciones auxiliares
+    del mismo módulo. Sin fuente disponible se usan el bytecode, las
+    constantes y los nombres de la función.
+    """
+    modulo = inspect.getmodule(funcion)
+    nombre = getattr(modulo, "__name__", None)
+    if nombre in _HASH_MODULOS:
+        return _HASH_MODULOS[nombre]
+
+    try:
+        codigo = inspect.getsource(modulo).encode()
+    except (OSError, TypeError):
+        codigo = funcion.__code__.co_code + repr((funcion.__code__.co_consts, funcion.__code__.co_names)).encode()
+        return hashlib.sha256(codigo).digest()
+
+    _HASH_MODULOS[nombre] = hashlib.sha256(codigo).digest()
+    return _HASH_MODULOS[nombre]
+
+
+def _hash_estilo():
+    """Hash de los rcParams de matplotlib (sin el backend, que no cambia la imagen)"""
+    parametros = sorted((clave, repr(valor)) for clave, valor in matplotlib.rcParams.items()
+                        if not clave.startswith("backend"))
+    return hashlib.sha256(repr(parametros).encode()).digest()
+
+
+def _resolver_directorio_cache(directorio_cache):
+    """Directorio de caché absoluto (las rutas relativas parten del directorio del proyecto)"""
+    directorio_cache = directorio_cache or VISUALIZACION_CONFIG["directorio_cache"]
+    if not os.path.isabs(directorio_cache):
+        directorio_cache = os.path.join(DIRECTORIO_PROYECTO, directorio_cache)
+    return directorio_cache
+
+
+def _inicializar_trabajador():
+    """Usa el backend Agg (sin ventanas) en los procesos trabajadores"""
+    matplotlib.use("Agg", force=True)
+
+
+def _renderizar(funcion, argumentos, ruta, formato, dpi):
+    """
+    Construye una figura y la guarda (escritura atómica)
+
+    Returns:
+        Ruta del archivo guardado
+    """
+    import matplotlib.pyplot as plt
+
+    figura = funcion(*argumentos)
+    try:
+        return _guardar_figura(figura, ruta, formato, dpi)
+    finally:
+        plt.close(figura)
+
+
+def _guardar_figura(figura, ruta, formato, dpi):
+    """
+    Guarda una figura ya construida (escritura atómica)
+
+    Returns:
+        Ruta del archivo guardado
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        figura.savefig(temporal, format=formato, dpi=dpi, bbox_inches='tight')
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return ruta
+
+
+def _obtener_grupo(procesos):
+    """Crea (o reutiliza) el grupo de procesos de renderizado"""
+    global _GRUPO, _TAMANO_GRUPO
+    if _GRUPO is not None and _TAMANO_GRUPO >= procesos:
+        return _GRUPO
+    cerrar_renderizado()
+    _GRUPO = ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context("spawn"),
+                                 initializer=_inicializar_trabajador)
+    _TAMANO_GRUPO = procesos
+    return _GRUPO
+
+
+def cerrar_renderizado():
+    """Termina el grupo de procesos de renderizado (si existe)"""
+    global _GRUPO, _TAMANO_GRUPO
+    if _GRUPO is not None:
+        _GRUPO.shutdown(wait=True)
+        _GRUPO = None
+        _TAMANO_GRUPO = 0
+
+
+atexit.register(cerrar_renderizado)
+
+
+def _podar_cache(directorio_cache, max_archivos):
+    """Elimina los archivos de caché menos usados recientemente"""
+    try:
+        archivos = [os.path.join(directorio_cache, nombre) for nombre in os.listdir(directorio_cache)]
+        archivos = [archivo for archivo in archivos if os.path.isfile(archivo)]
+        if len(archivos) <= max_archivos:
+            return
+        archivos.sort(key=os.path.getmtime)
+        for archivo in archivos[:len(archivos) - max_archivos]:
+            os.remove(archivo)
+    except OSError:
+        pass
+
+
+def renderizar_figuras(tareas, directorio=None, formato=None, dpi=None, procesos=None, directorio_cache=None):
+    """
+    Renderiza gráficas a archivos usando la caché y procesos en paralelo
+
+    Args:
+        tareas: Diccionario nombre -> (funcion, argumentos); la función debe
+            estar definida a nivel de módulo y devolver una figura de matplotlib
+        directorio: Directorio donde copiar "<nombre>.<formato>" (None = solo caché)
+        formato: Formato de archivo (por defecto VISUALIZACION_CONFIG["formato_imagen"])
+        dpi: Resolución (por defecto VISUALIZACION_CONFIG["dpi"])
+        procesos: Procesos de renderizado (0 = todos los núcleos; por defecto
+            VISUALIZACION_CONFIG["procesos_graficas"])
+        directorio_cache: Directorio de la caché (por defecto VISUALIZACION_CONFIG["directorio_cache"];
+            las rutas relativas parten de DIRECTORIO_PROYECTO)
+
+    Returns:
+        Diccionario nombre -> ruta del archivo (las gráficas que fallaron no aparecen)
+    """
+    formato = formato or VISUALIZACION_CONFIG["formato_imagen"]
+    dpi = dpi or VISUALIZACION_CONFIG["dpi"]
+    procesos = VISUALIZACION_CONFIG["procesos_graficas"] if procesos is None else procesos
+    directorio_cache = _resolver_directorio_cache(directorio_cache)
+    if procesos <= 0:
+        procesos = multiprocessing.cpu_count()
+
+    en_cache, pendientes = _buscar_en_cache(tareas, directorio, formato, dpi, directorio_cache)
+
+    if len(pendientes) > 1 and procesos > 1:
+        grupo = _obtener_grupo(min(procesos, len(pendientes)))
+        futuros = {nombre: grupo.submit(_renderizar, funcion, argumentos, ruta, formato, dpi)
+                   for nombre, (funcion, argumentos, ruta) in pendientes.items()}
+        for nombre, futuro in futuros.items():
+            try:
+                en_cache[nombre] = futuro.result()
+            except Exception as e:
+                print(f"⚠️  Error generando gráfica {nombre}: {e}")
+    else:
+        for nombre, (funcion, argumentos, ruta) in pendientes.items():
+            try:
+                # Sobre una copia, como en un proceso trabajador: algunas gráficas
+                # recalculan propiedades del individuo y cambiarían su clave
+                copia = pickle.loads(pickle.dumps(argumentos, protocol=4))
+                en_cache[nombre] = _renderizar(funcion, copia, ruta, formato, dpi)
+            except Exception as e:
+                print(f"⚠️  Error generando gráfica {nombre}: {e}")
+
+    if pendientes:
+        _podar_cache(directorio_cache, VISUALIZACION_CONFIG["max_archivos_cache"])
+
+    return _copiar_archivos(tareas, en_cache, directorio, formato)
+
+
+def construir_figuras(tareas, directorio=None, formato=None, dpi=None, directorio_cache=None):
+    """
+    Construye las figuras en este proceso y guarda sus archivos usando la caché
+
+    Para quien necesita las figuras además de los archivos: cada figura se
+    dibuja una sola vez y las que faltan en la caché se guardan tal cual
+    (sin volver a dibujarlas en el grupo de procesos).
+
+    Args:
+        tareas: Diccionario nombre -> (funcion, argumentos), como en renderizar_figuras
+        directorio: Directorio donde copiar "<nombre>.<formato>" (None = solo caché)
+        formato: Formato de archivo (por defecto VISUALIZACION_CONFIG["formato_imagen"])
+        dpi: Resolución (por defecto VISUALIZACION_CONFIG["dpi"])
+        directorio_cache: Directorio de la caché (por defecto VISUALIZACION_CONFIG["directorio_cache"];
+            las rutas relativas parten de DIRECTORIO_PROYECTO)
+
+    Returns:
+        Tupla (figuras, archivos): diccionarios nombre -> figura y nombre -> ruta
+        del archivo (las gráficas que no se pudieron guardar no aparecen)
+    """
+    formato = formato or VISUALIZACION_CONFIG["formato_imagen"]
+    dpi = dpi or VISUALIZACION_CONFIG["dpi"]
+    directorio_cache = _resolver_directorio_cache(directorio_cache)
+
+    # Las claves se calculan antes de dibujar: algunas gráficas recalculan
+    # propiedades del individuo y cambiarían su clave
+    en_cache, pendientes = _buscar_en_cache(tareas, directorio, formato, dpi, directorio_cache)
+
+    figuras = {}
+    for nombre, (funcion, argumentos) in tareas.items():
+        figuras[nombre] = funcion(*argumentos)
+        if nombre in pendientes:
+            try:
+                en_cache[nombre] = _guardar_figura(figuras[nombre], pendientes[nombre][2], formato, dpi)
+            except Exception as e:
+                print(f"⚠️  Error guardando gráfica {nombre}: {e}")
+
+    if pendientes:
+        _podar_cache(directorio_cache, VISUALIZACION_CONFIG["max_archivos_cache"])
+
+    return figuras, _copiar_archivos(tareas, en_cache, directorio, formato)
+
+
+def _buscar_en_cache(tareas, directorio, formato, dpi, directorio_cache):
+    """
+    Crea los directorios y separa las gráficas en caché de las que hay que dibujar
+
+    Returns:
+        Tupla (nombre -> ruta en caché, nombre -> (funcion, argumentos, ruta en caché))
+    """
+    for carpeta in (directorio_cache, directorio):
+        if carpeta and not os.path.exists(carpeta):
+            os.makedirs(carpeta)
+
+    en_cache = {}
+    pendientes = {}
+    for nombre, (funcion, argumentos) in tareas.items():
+        clave = calcular_clave_figura(funcion, argumentos, formato, dpi)
+        ruta = os.path.join(directorio_cache, f"{clave}.{formato}")
+        if os.path.exists(ruta):
+            os.utime(ruta)
+            en_cache[nombre] = ruta
+        else:
+            pendientes[nombre] = (funcion, argumentos, ruta)
+    return en_cache, pendientes
+
+
+def _copiar_archivos(tareas, en_cache, directorio, formato):
+    """
+    Copia los archivos de la caché al directorio, en el orden de las tareas
+
+    Returns:
+        Diccionario nombre -> ruta del archivo (en caché si no hay directorio)
+    """
+    if directorio is None:
+        return {nombre: en_cache[nombre] for nombre in tareas if nombre in en_cache}
+
+    archivos = {}
+    for nombre in tareas:
+        if nombre in en_cache:
+            archivos[nombre] = os.path.join(directorio, f"{nombre}.{formato}")
+            shutil.copyfile(en_cache[nombre], archivos[nombre])
+    return archivos
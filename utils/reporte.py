@@ -3,6 +3,12 @@ Generación de reportes detallados con los resultados.
 
 Crea reportes completos con tablas de formulaciones,
 análisis nutricional y proyecciones económicas.
+
+Los datos que dependen solo del escenario (etapa, días y consumo hasta el
+peso objetivo según las tablas de la raza, cronograma de alimentación,
+nombres de proveedores y sustitutos) se calculan una vez con
+precalcular_escenario y se comparten entre las soluciones de un reporte y
+entre los reportes de un lote.
 """
 
 import json
@@ -11,9 +17,79 @@ from genetic.fitness.nutricion import evaluar_balance_nutricional, calcular_scor
 from genetic.fitness.costo import calcular_costo_por_ingrediente, estimar_ahorro_vs_formula_tradicional
 from genetic.fitness.eficiencia import proyectar_rendimiento_periodo
 from genetic.fitness.disponibilidad import evaluar_riesgo_suministro, generar_recomendaciones_suministro
-from conocimiento.proveedores import generar_resumen_compras
+from conocimiento.proveedores import PROVEEDORES, generar_resumen_compras
+from conocimiento.razas import estimar_dias_hasta_peso
+from conocimiento.requerimientos import obtener_etapa
+
+# Días de alimentación supuestos si no se puede estimar el tiempo al peso objetivo
+DIAS_PERIODO_POR_DEFECTO = 21
+
+def clave_escenario(config_evaluacion):
+    """
+    Obtiene la clave de los parámetros de producción que definen un escenario
+    
+    Args:
+        config_evaluacion: Configuración de evaluación
+        
+    Returns:
+        Cadena JSON (dos configuraciones con la misma clave comparten escenario)
+    """
+    return json.dumps({
+        "raza": config_evaluacion.get("raza", "Ross"),
+        "edad_dias": config_evaluacion.get("edad_dias", 35),
+        "peso_actual": config_evaluacion.get("peso_actual", 1.5),
+        "peso_objetivo": config_evaluacion.get("peso_objetivo", 2.5),
+        "cantidad_pollos": config_evaluacion.get("cantidad_pollos", 1000)
+    }, sort_keys=True, default=str)
+
+def precalcular_escenario(config_evaluacion, ingredientes_data):
+    """
+    Calcula los datos del reporte que no dependen de la solución
+    
+    Args:
+        config_evaluacion: Configuración de evaluación
+        ingredientes_data: Lista de datos de ingredientes
+        
+    Returns:
+        Diccionario con etapa, días y consumo hasta el peso objetivo,
+        cronograma de alimentación, nombres de proveedores y sustitutos
+    """
+    cantidad_pollos = config_evaluacion.get("cantidad_pollos", 1000)
+    edad_dias = config_evaluacion.get("edad_dias", 35)
+    peso_actual = config_evaluacion.get("peso_actual", 1.5)
+    peso_objetivo = config_evaluacion.get("peso_objetivo", 2.5)
+    raza = config_evaluacion.get("raza", "Ross")
+    
+    # Tiempo al peso objetivo según las tablas de crecimiento de la raza
+    dias_hasta_objetivo = estimar_dias_hasta_peso(peso_actual, peso_objetivo, raza, edad_dias)
+    dias_periodo = dias_hasta_objetivo or DIAS_PERIODO_POR_DEFECTO
+    consumo_periodo = estimar_consumo_total(cantidad_pollos, edad_dias, dias_periodo)
+    
+    # Sustitutos de los cereales principales
+    nombres_maiz = [ing["nombre"] for ing in ingredientes_data if "maíz" in ing["nombre"].lower()]
+    nombres_sorgo = [ing["nombre"] for ing in ingredientes_data if "sorgo" in ing["nombre"].lower()]
+    
+    return {
+        "clave": clave_escenario(config_evaluacion),
+        "etapa": obtener_etapa(edad_dias),
+        "etapa_comparacion": obtener_etapa(35),
+        "dias_hasta_objetivo": dias_hasta_objetivo,
+        "consumo_hasta_objetivo": consumo_periodo if dias_hasta_objetivo else 0,
+        "dias_periodo": dias_periodo,
+        "consumo_periodo": consumo_periodo,
+        "cronograma": generar_cronograma_alimentacion(cantidad_pollos, edad_dias, dias_periodo),
+        "nombres_proveedores": {proveedor["clave"]: proveedor["nombre"] for proveedor in PROVEEDORES},
+        "sustitutos": {"maíz": nombres_sorgo[:2], "sorgo": nombres_maiz[:2]}
+    }
+
+def _nombres_proveedores(escenario=None):
+    """Nombres legibles de los proveedores por clave"""
+    if escenario is not None:
+        return escenario["nombres_proveedores"]
+    return {proveedor["clave"]: proveedor["nombre"] for proveedor in PROVEEDORES}
 
-def generar_reporte_completo(resultados, ingredientes_data, config_evaluacion, restricciones_usuario=None):
+def generar_reporte_completo(resultados, ingredientes_data, config_evaluacion, restricciones_usuario=None,
+                             escenario=None):
     """
     Genera el reporte completo del sistema
     
@@ -22,11 +98,35 @@ def generar_reporte_completo(resultados, ingredientes_data, config_evaluacion, r
         ingredientes_data: Lista de datos de ingredientes
         config_evaluacion: Configuración de evaluación
         restricciones_usuario: Restricciones del usuario
+        escenario: Datos de precalcular_escenario (None = calcularlos)
         
     Returns:
         Diccionario con reporte completo
     """
     print("📊 Generando reporte completo...")
+    reporte = construir_reporte(resultados, ingredientes_data, config_evaluacion, restricciones_usuario,
+                                escenario, mostrar_progreso=True)
+    print("✅ Reporte completo generado")
+    return reporte
+
+def construir_reporte(resultados, ingredientes_data, config_evaluacion, restricciones_usuario=None,
+                      escenario=None, mostrar_progreso=False):
+    """
+    Construye el reporte completo (sin mensajes, para lotes)
+    
+    Args:
+        resultados: Resultado del algoritmo genético
+        ingredientes_data: Lista de datos de ingredientes
+        config_evaluacion: Configuración de evaluación
+        restricciones_usuario: Restricciones del usuario
+        escenario: Datos de precalcular_escenario (None = calcularlos)
+        mostrar_progreso: Mostrar cada solución analizada
+        
+    Returns:
+        Diccionario con reporte completo
+    """
+    if escenario is None:
+        escenario = precalcular_escenario(config_evaluacion, ingredientes_data)
     
     reporte = {
         "metadatos": generar_metadatos(config_evaluacion, restricciones_usuario),
@@ -40,23 +140,43 @@ def generar_reporte_completo(resultados, ingredientes_data, config_evaluacion, r
     mejores_individuos = resultados.get("mejores_individuos", [])[:3]
     
     for i, individuo in enumerate(mejores_individuos):
-        print(f"   • Analizando solución {i+1}...")
-        
-        analisis_solucion = {
-            "ranking": i + 1,
-            "formula": generar_tabla_formula(individuo, ingredientes_data),
-            "analisis_nutricional": generar_analisis_nutricional(individuo, config_evaluacion, ingredientes_data),
-            "analisis_economico": generar_analisis_economico(individuo, config_evaluacion, ingredientes_data),
-            "plan_implementacion": generar_plan_implementacion(individuo, config_evaluacion, ingredientes_data),
-            "analisis_riesgo": generar_analisis_riesgo(individuo, ingredientes_data),
-            "ventajas_desventajas": generar_ventajas_desventajas(individuo, mejores_individuos, i, ingredientes_data)
-        }
-        
-        reporte["mejores_soluciones"].append(analisis_solucion)
+        if mostrar_progreso:
+            print(f"   • Analizando solución {i+1}...")
+        reporte["mejores_soluciones"].append(
+            generar_analisis_solucion(individuo, mejores_individuos, i, ingredientes_data, config_evaluacion, escenario))
     
-    print("✅ Reporte completo generado")
     return reporte
 
+def generar_analisis_solucion(individuo, mejores_individuos, posicion, ingredientes_data, config_evaluacion,
+                              escenario=None):
+    """
+    Genera las secciones del reporte de una solución
+    
+    Args:
+        individuo: Solución a analizar
+        mejores_individuos: Soluciones del reporte (para comparar)
+        posicion: Posición de la solución en mejores_individuos
+        ingredientes_data: Lista de datos de ingredientes
+        config_evaluacion: Configuración de evaluación
+        escenario: Datos de precalcular_escenario (None = calcularlos)
+        
+    Returns:
+        Diccionario con fórmula, análisis, plan y riesgos de la solución
+    """
+    if escenario is None:
+        escenario = precalcular_escenario(config_evaluacion, ingredientes_data)
+    
+    return {
+        "ranking": posicion + 1,
+        "formula": generar_tabla_formula(individuo, ingredientes_data, escenario),
+        "analisis_nutricional": generar_analisis_nutricional(individuo, config_evaluacion, ingredientes_data, escenario),
+        "analisis_economico": generar_analisis_economico(individuo, config_evaluacion, ingredientes_data, escenario),
+        "plan_implementacion": generar_plan_implementacion(individuo, config_evaluacion, ingredientes_data, escenario),
+        "analisis_riesgo": generar_analisis_riesgo(individuo, ingredientes_data, escenario),
+        "ventajas_desventajas": generar_ventajas_desventajas(individuo, mejores_individuos, posicion,
+                                                             ingredientes_data, escenario)
+    }
+
 def generar_metadatos(config_evaluacion, restricciones_usuario):
     """
     Genera metadatos del reporte
@@ -152,10 +272,11 @@ def generar_recomendacion_principal(mejores_individuos):
     else:
         return f"Se recomienda la primera solución por su ventaja de costo ({diferencia_costo:.1f}% más económica que la siguiente mejor)."
 
-def generar_tabla_formula(individuo, ingredientes_data):
+def generar_tabla_formula(individuo, ingredientes_data, escenario=None):
     """
     Genera tabla con la fórmula optimizada
     """
+    nombres_proveedores = _nombres_proveedores(escenario)
     tabla = []
     costo_total = 0
     
@@ -165,10 +286,7 @@ def generar_tabla_formula(individuo, ingredientes_data):
             proveedor_info = individuo.proveedor_recomendado.get(i, {})
             
             if proveedor_info:
-                # Obtener nombre del proveedor
-                from conocimiento.proveedores import obtener_proveedor
-                proveedor_data = obtener_proveedor(proveedor_info["proveedor"])
-                proveedor_nombre = proveedor_data["nombre"] if proveedor_data else proveedor_info["proveedor"]
+                proveedor_nombre = nombres_proveedores.get(proveedor_info["proveedor"], proveedor_info["proveedor"])
                 
                 costo_por_kg = porcentaje * proveedor_info["precio"]
                 costo_por_tonelada = costo_por_kg * 1000
@@ -201,16 +319,15 @@ def generar_tabla_formula(individuo, ingredientes_data):
     
     return tabla
 
-def generar_analisis_nutricional(individuo, config_evaluacion, ingredientes_data):
+def generar_analisis_nutricional(individuo, config_evaluacion, ingredientes_data, escenario=None):
     """
     Genera análisis nutricional comparativo
     """
-    from conocimiento.requerimientos import obtener_etapa, obtener_requerimientos
-    
     # Determinar etapa
-    edad_dias = config_evaluacion.get("edad_dias", 35)
-    etapa = obtener_etapa(edad_dias)
-    requerimientos = obtener_requerimientos(edad_dias)
+    if escenario is not None:
+        etapa = escenario["etapa"]
+    else:
+        etapa = obtener_etapa(config_evaluacion.get("edad_dias", 35))
     
     # Evaluar balance nutricional
     balance = evaluar_balance_nutricional(individuo, etapa, ingredientes_data)
@@ -289,7 +406,7 @@ def generar_resumen_cumplimiento(balance):
                             else "Deficiente"
     }
 
-def generar_analisis_economico(individuo, config_evaluacion, ingredientes_data):
+def generar_analisis_economico(individuo, config_evaluacion, ingredientes_data, escenario=None):
     """
     Genera análisis económico y proyecciones
     """
@@ -299,19 +416,13 @@ def generar_analisis_economico(individuo, config_evaluacion, ingredientes_data):
     # Estimación de ahorro
     ahorro_info = estimar_ahorro_vs_formula_tradicional(individuo)
     
-    # Proyección económica total
+    # Proyección económica total (consumo estimado del escenario)
     cantidad_pollos = config_evaluacion.get("cantidad_pollos", 1000)
-    peso_actual = config_evaluacion.get("peso_actual", 1.5)
-    peso_objetivo = config_evaluacion.get("peso_objetivo", 2.5)
-    raza = config_evaluacion.get("raza", "Ross")
-    edad_dias = config_evaluacion.get("edad_dias", 35)
-    
-    # Estimar consumo total
-    from conocimiento.razas import estimar_dias_hasta_peso
-    dias_hasta_objetivo = estimar_dias_hasta_peso(peso_actual, peso_objetivo, raza, edad_dias)
+    if escenario is None:
+        escenario = precalcular_escenario(config_evaluacion, ingredientes_data)
     
-    if dias_hasta_objetivo:
-        consumo_total_estimado = estimar_consumo_total(cantidad_pollos, edad_dias, dias_hasta_objetivo)
+    if escenario["dias_hasta_objetivo"]:
+        consumo_total_estimado = escenario["consumo_hasta_objetivo"]
         costo_total_alimentacion = consumo_total_estimado * individuo.costo_total
         ahorro_total = consumo_total_estimado * ahorro_info["ahorro_absoluto"]
     else:
@@ -391,24 +502,16 @@ def generar_analisis_rentabilidad(individuo, config_evaluacion):
                      else "Preocupante"
     }
 
-def generar_plan_implementacion(individuo, config_evaluacion, ingredientes_data):
+def generar_plan_implementacion(individuo, config_evaluacion, ingredientes_data, escenario=None):
     """
     Genera plan detallado de implementación
     """
-    cantidad_pollos = config_evaluacion.get("cantidad_pollos", 1000)
-    edad_dias = config_evaluacion.get("edad_dias", 35)
-    peso_actual = config_evaluacion.get("peso_actual", 1.5)
-    peso_objetivo = config_evaluacion.get("peso_objetivo", 2.5)
-    raza = config_evaluacion.get("raza", "Ross")
-    
-    # Calcular necesidades de producción
-    from conocimiento.razas import estimar_dias_hasta_peso
-    dias_hasta_objetivo = estimar_dias_hasta_peso(peso_actual, peso_objetivo, raza, edad_dias)
-    
-    if not dias_hasta_objetivo:
-        dias_hasta_objetivo = 21  # Valor por defecto
-    
-    consumo_total_kg = estimar_consumo_total(cantidad_pollos, edad_dias, dias_hasta_objetivo)
+    # Necesidades de producción del escenario
+    if escenario is None:
+        escenario = precalcular_escenario(config_evaluacion, ingredientes_data)
+    dias_hasta_objetivo = escenario["dias_periodo"]
+    consumo_total_kg = escenario["consumo_periodo"]
+    nombres_proveedores = escenario["nombres_proveedores"]
     
     # Calcular cantidad de cada ingrediente
     ingredientes_a_comprar = []
@@ -419,9 +522,7 @@ def generar_plan_implementacion(individuo, config_evaluacion, ingredientes_data)
             proveedor_info = individuo.proveedor_recomendado.get(i, {})
             
             if proveedor_info:
-                from conocimiento.proveedores import obtener_proveedor
-                proveedor_data = obtener_proveedor(proveedor_info["proveedor"])
-                proveedor_nombre = proveedor_data["nombre"] if proveedor_data else "Proveedor desconocido"
+                proveedor_nombre = nombres_proveedores.get(proveedor_info["proveedor"], "Proveedor desconocido")
                 
                 ingredientes_a_comprar.append({
                     "ingrediente": ingrediente["nombre"],
@@ -434,9 +535,6 @@ def generar_plan_implementacion(individuo, config_evaluacion, ingredientes_data)
     # Resumen por proveedor
     resumen_proveedores = generar_resumen_compras(individuo.proveedor_recomendado, consumo_total_kg)
     
-    # Cronograma de alimentación
-    cronograma = generar_cronograma_alimentacion(cantidad_pollos, edad_dias, dias_hasta_objetivo)
-    
     return {
         "resumen_produccion": {
             "periodo_alimentacion": dias_hasta_objetivo,
@@ -446,7 +544,7 @@ def generar_plan_implementacion(individuo, config_evaluacion, ingredientes_data)
         },
         "ingredientes_a_comprar": ingredientes_a_comprar,
         "resumen_por_proveedor": resumen_proveedores,
-        "cronograma_alimentacion": cronograma[:10],  # Primeros 10 días como ejemplo
+        "cronograma_alimentacion": escenario["cronograma"][:10],  # Primeros 10 días como ejemplo
         "recomendaciones_implementacion": generar_recomendaciones_implementacion(individuo, config_evaluacion)
     }
 
@@ -519,7 +617,7 @@ def generar_recomendaciones_implementacion(individuo, config_evaluacion):
     
     return recomendaciones
 
-def generar_analisis_riesgo(individuo, ingredientes_data):
+def generar_analisis_riesgo(individuo, ingredientes_data, escenario=None):
     """
     Genera análisis de riesgo de la formulación
     """
@@ -530,7 +628,7 @@ def generar_analisis_riesgo(individuo, ingredientes_data):
         "riesgo_suministro": riesgo_suministro,
         "recomendaciones": recomendaciones_suministro,
         "factores_riesgo": identificar_factores_riesgo(individuo, ingredientes_data),
-        "plan_contingencia": generar_plan_contingencia(individuo, ingredientes_data)
+        "plan_contingencia": generar_plan_contingencia(individuo, ingredientes_data, escenario)
     }
 
 def identificar_factores_riesgo(individuo, ingredientes_data):
@@ -560,7 +658,7 @@ def identificar_factores_riesgo(individuo, ingredientes_data):
     
     return factores
 
-def generar_plan_contingencia(individuo, ingredientes_data):
+def generar_plan_contingencia(individuo, ingredientes_data, escenario=None):
     """
     Genera plan de contingencia para problemas de suministro
     """
@@ -570,7 +668,7 @@ def generar_plan_contingencia(individuo, ingredientes_data):
     for i, porcentaje in enumerate(individuo.porcentajes):
         if porcentaje > 0.15 and i < len(ingredientes_data):  # Más del 15%
             ingrediente = ingredientes_data[i]
-            sustitutos = identificar_sustitutos(ingrediente, ingredientes_data)
+            sustitutos = identificar_sustitutos(ingrediente, ingredientes_data, escenario)
             if sustitutos:
                 plan.append(f"Para {ingrediente['nombre']}: usar {sustitutos[0]} como sustituto")
     
@@ -583,11 +681,19 @@ def generar_plan_contingencia(individuo, ingredientes_data):
     
     return plan
 
-def identificar_sustitutos(ingrediente_principal, ingredientes_data):
+def identificar_sustitutos(ingrediente_principal, ingredientes_data, escenario=None):
     """
     Identifica posibles sustitutos para un ingrediente
     """
     nombre_principal = ingrediente_principal["nombre"].lower()
+    
+    # Sustitutos ya calculados para el escenario
+    if escenario is not None:
+        for cereal, sustitutos in escenario["sustitutos"].items():
+            if cereal in nombre_principal:
+                return list(sustitutos)
+        return []
+    
     sustitutos = []
     
     # Reglas de sustitución básicas
@@ -602,7 +708,7 @@ def identificar_sustitutos(ingrediente_principal, ingredientes_data):
     
     return sustitutos[:2]  # Máximo 2 sustitutos
 
-def generar_ventajas_desventajas(individuo, todos_individuos, posicion, ingredientes_data):
+def generar_ventajas_desventajas(individuo, todos_individuos, posicion, ingredientes_data, escenario=None):
     """
     Genera análisis de ventajas y desventajas comparando con otras soluciones
     """
@@ -635,10 +741,7 @@ def generar_ventajas_desventajas(individuo, todos_individuos, posicion, ingredie
             ventajas.append("Composición más diversificada")
     
     # Análisis nutricional comparativo
-    from genetic.fitness.nutricion import calcular_score_nutricional
-    from conocimiento.requerimientos import obtener_etapa
-    
-    etapa = obtener_etapa(35)  # Usar etapa por defecto
+    etapa = escenario["etapa_comparacion"] if escenario is not None else obtener_etapa(35)  # Usar etapa por defecto
     score = calcular_score_nutricional(individuo, etapa, ingredientes_data)
     
     if score >= 85:
@@ -766,60 +869,70 @@ def exportar_reporte_texto(reporte, nombre_archivo="reporte_optimizacion.txt"):
     Exporta el reporte a archivo de texto legible
     """
     with open(nombre_archivo, 'w', encoding='utf-8') as f:
-        f.write("=" * 80 + "\n")
-        f.write("REPORTE DE OPTIMIZACIÓN DE FORMULACIÓN DE ALIMENTOS\n")
-        f.write("Sistema boilerNutri v1.0.0\n")
-        f.write("=" * 80 + "\n\n")
+        escribir_reporte_texto(reporte, f)
+    
+    print(f"✅ Reporte exportado a: {nombre_archivo}")
+
+def escribir_reporte_texto(reporte, f):
+    """
+    Escribe el reporte en formato de texto legible sobre un archivo abierto
+    
+    Args:
+        reporte: Diccionario de generar_reporte_completo
+        f: Archivo de texto abierto para escritura
+    """
+    f.write("=" * 80 + "\n")
+    f.write("REPORTE DE OPTIMIZACIÓN DE FORMULACIÓN DE ALIMENTOS\n")
+    f.write("Sistema boilerNutri v1.0.0\n")
+    f.write("=" * 80 + "\n\n")
+    
+    # Metadatos
+    metadatos = reporte["metadatos"]
+    f.write(f"Fecha de generación: {metadatos['fecha_generacion']}\n")
+    f.write(f"Parámetros de producción:\n")
+    for clave, valor in metadatos["parametros_produccion"].items():
+        f.write(f"  - {clave.replace('_', ' ').title()}: {valor}\n")
+    f.write(f"Restricciones: {metadatos['restricciones_aplicadas']}\n\n")
+    
+    # Resumen ejecutivo
+    resumen = reporte["resumen_ejecutivo"]
+    f.write("RESUMEN EJECUTIVO\n")
+    f.write("-" * 40 + "\n")
+    for conclusion in resumen["conclusiones_principales"]:
+        f.write(f"• {conclusion}\n")
+    f.write(f"\nRecomendación principal: {resumen['recomendacion_principal']}\n\n")
+    
+    # Mejores soluciones
+    for i, solucion in enumerate(reporte["mejores_soluciones"]):
+        f.write(f"SOLUCIÓN #{i+1}\n")
+        f.write("-" * 40 + "\n")
         
-        # Metadatos
-        metadatos = reporte["metadatos"]
-        f.write(f"Fecha de generación: {metadatos['fecha_generacion']}\n")
-        f.write(f"Parámetros de producción:\n")
-        for clave, valor in metadatos["parametros_produccion"].items():
-            f.write(f"  - {clave.replace('_', ' ').title()}: {valor}\n")
-        f.write(f"Restricciones: {metadatos['restricciones_aplicadas']}\n\n")
+        # Fórmula
+        f.write("Fórmula:\n")
+        for ingrediente in solucion["formula"][:-1]:  # Excluir total
+            f.write(f"  {ingrediente['ingrediente']}: {ingrediente['porcentaje']:.1f}% "
+                   f"({ingrediente['proveedor']})\n")
         
-        # Resumen ejecutivo
-        resumen = reporte["resumen_ejecutivo"]
-        f.write("RESUMEN EJECUTIVO\n")
-        f.write("-" * 40 + "\n")
-        for conclusion in resumen["conclusiones_principales"]:
-            f.write(f"• {conclusion}\n")
-        f.write(f"\nRecomendación principal: {resumen['recomendacion_principal']}\n\n")
+        total = solucion["formula"][-1]
+        f.write(f"\nCosto total: ${total['costo_por_kg_formula']:.4f}/kg\n")
         
-        # Mejores soluciones
-        for i, solucion in enumerate(reporte["mejores_soluciones"]):
-            f.write(f"SOLUCIÓN #{i+1}\n")
-            f.write("-" * 40 + "\n")
-            
-            # Fórmula
-            f.write("Fórmula:\n")
-            for ingrediente in solucion["formula"][:-1]:  # Excluir total
-                f.write(f"  {ingrediente['ingrediente']}: {ingrediente['porcentaje']:.1f}% "
-                       f"({ingrediente['proveedor']})\n")
-            
-            total = solucion["formula"][-1]
-            f.write(f"\nCosto total: ${total['costo_por_kg_formula']:.4f}/kg\n")
-            
-            # Análisis nutricional
-            nutricional = solucion["analisis_nutricional"]
-            f.write(f"Score nutricional: {nutricional['score_nutricional']}/100\n")
-            f.write(f"Cumplimiento: {nutricional['resumen_cumplimiento']['porcentaje_cumplimiento']:.1f}%\n")
-            
-            # Ventajas y desventajas
-            ventajas = solucion["ventajas_desventajas"]
-            f.write("Ventajas:\n")
-            for ventaja in ventajas["ventajas"]:
-                f.write(f"  + {ventaja}\n")
-            
-            if ventajas["desventajas"]:
-                f.write("Desventajas:\n")
-                for desventaja in ventajas["desventajas"]:
-                    f.write(f"  - {desventaja}\n")
-            
-            f.write(f"Recomendación: {ventajas['recomendacion_uso']}\n\n")
-    
-    print(f"✅ Reporte exportado a: {nombre_archivo}")
+        # Análisis nutricional
+        nutricional = solucion["analisis_nutricional"]
+        f.write(f"Score nutricional: {nutricional['score_nutricional']}/100\n")
+        f.write(f"Cumplimiento: {nutricional['resumen_cumplimiento']['porcentaje_cumplimiento']:.1f}%\n")
+        
+        # Ventajas y desventajas
+        ventajas = solucion["ventajas_desventajas"]
+        f.write("Ventajas:\n")
+        for ventaja in ventajas["ventajas"]:
+            f.write(f"  + {ventaja}\n")
+        
+        if ventajas["desventajas"]:
+            f.write("Desventajas:\n")
+            for desventaja in ventajas["desventajas"]:
+                f.write(f"  - {desventaja}\n")
+        
+        f.write(f"Recomendación: {ventajas['recomendacion_uso']}\n\n")
 
 def exportar_reporte_json(reporte, nombre_archivo="reporte_optimizacion.json"):
     """
@@ -0,0 +1,178 @@
+"""
+Reportes de muchas ejecuciones en una sola llamada.
+
+Las ejecuciones se agrupan por escenario (raza, edad, pesos y cantidad de
+pollos): los datos compartidos de precalcular_escenario se calculan una vez
+por escenario y no por reporte ni por solución. Con lotes grandes los
+reportes se generan en un grupo de procesos ("spawn", como el renderizado de
+gráficas) que recibe los ingredientes y los escenarios una sola vez al
+arrancar; cada tarea lleva solo los resultados que usa el reporte.
+
+Cada reporte se escribe en cuanto está listo (json.dump y el escritor de
+texto van directo al archivo, con escritura atómica) y se anexa una línea al
+índice JSON Lines del lote, de modo que un lote largo no acumula los
+reportes en memoria y se puede seguir con `tail -f`.
+"""
+
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from config import REPORTES_CONFIG
+from utils.reporte import clave_escenario, precalcular_escenario, construir_reporte, escribir_reporte_texto
+
+# Claves de los resultados que usa el reporte (la población final y el
+# historial de métricas no se envían a los procesos)
+CLAVES_RESULTADOS_REPORTE = ("mejor_individuo", "mejores_individuos", "historico_fitness",
+                             "tiempo_ejecucion", "generaciones_ejecutadas", "convergencia_detectada")
+
+# Ingredientes y escenarios del lote en cada proceso trabajador
+_COMPARTIDOS = {}
+
+
+def _inicializar_trabajador(ingredientes_data, escenarios):
+    """Recibe una sola vez los datos compartidos por todas las tareas"""
+    _COMPARTIDOS["ingredientes"] = ingredientes_data
+    _COMPARTIDOS["escenarios"] = escenarios
+
+
+def _escribir_atomico(ruta, escribir):
+    """
+    Escribe un archivo de texto con una función escritora (archivo temporal y os.replace)
+
+    Returns:
+        Ruta del archivo escrito
+    """
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8") as f:
+            escribir(f)
+        os.replace(temporal, ruta)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+    return ruta
+
+
+def _generar_reporte_ejecucion(nombre, resultados, config_evaluacion, restricciones_usuario,
+                               ingredientes_data, escenario, directorio, formatos):
+    """
+    Genera (y escribe, si hay directorio) el reporte de una ejecución
+
+    Returns:
+        Tupla (nombre, reporte o None si se escribió, resumen para el índice)
+    """
+    reporte = construir_reporte(resultados, ingredientes_data, config_evaluacion, restricciones_usuario, escenario)
+
+    resumen = {"ejecucion": nombre, "escenario": json.loads(escenario["clave"])}
+    metricas = reporte["resumen_ejecutivo"].get("metricas_clave")
+    if metricas:
+        resumen["mejor_costo"] = metricas["mejor_costo"]
+        resumen["mejor_fitness"] = metricas["mejor_fitness"]
+        resumen["numero_soluciones"] = metricas["numero_soluciones"]
+
+    if directorio is None:
+        return nombre, reporte, resumen
+
+    archivos = {}
+    base = os.path.join(directorio, nombre)
+    if "json" in formatos:
+        archivos["json"] = _escribir_atomico(
+            f"{base}.json", lambda f: json.dump(reporte, f, indent=2, ensure_ascii=False, default=str))
+    if "txt" in formatos:
+        archivos["txt"] = _escribir_atomico(f"{base}.txt", lambda f: escribir_reporte_texto(reporte, f))
+    resumen["archivos"] = archivos
+    return nombre, None, resumen
+
+
+def _tarea_trabajador(nombre, resultados, config_evaluacion, restricciones_usuario, clave, directorio, formatos):
+    """Tarea de un proceso trabajador: usa los datos recibidos al arrancar"""
+    return _generar_reporte_ejecucion(nombre, resultados, config_evaluacion, restricciones_usuario,
+                                      _COMPARTIDOS["ingredientes"], _COMPARTIDOS["escenarios"][clave],
+                                      directorio, formatos)
+
+
+def generar_reportes_lote(ejecuciones, ingredientes_data, directorio=None, formatos=None, procesos=None):
+    """
+    Genera los reportes de varias ejecuciones compartiendo el precálculo por escenario
+
+    Args:
+        ejecuciones: Diccionario nombre -> (resultados, config_evaluacion) o
+            (resultados, config_evaluacion, restricciones_usuario); el nombre
+            se usa como nombre de archivo
+        ingredientes_data: Lista de datos de ingredientes
+        directorio: Directorio del lote (None = devolver los reportes sin escribir archivos)
+        formatos: Formatos a escribir, "txt" y/o "json" (por defecto REPORTES_CONFIG["formatos"])
+        procesos: Procesos de generación (0 = todos los núcleos; por defecto
+            REPORTES_CONFIG["procesos_reportes"]); lotes con menos de
+            REPORTES_CONFIG["min_ejecuciones_paralelo"] ejecuciones se generan en serie
+
+    Returns:
+        Diccionario nombre -> reporte (sin directorio) o nombre -> {formato: ruta}
+        (con directorio); las ejecuciones que fallaron no aparecen
+    """
+    inicio = time.perf_counter()
+    formatos = REPORTES_CONFIG["formatos"] if formatos is None else formatos
+    procesos = REPORTES_CONFIG["procesos_reportes"] if procesos is None else procesos
+    if procesos <= 0:
+        procesos = multiprocessing.cpu_count()
+
+    # Precálculo compartido: una vez por escenario distinto
+    escenarios = {}
+    tareas = []
+    for nombre, ejecucion in ejecuciones.items():
+        resultados, config_evaluacion = ejecucion[0], ejecucion[1]
+        restricciones_usuario = ejecucion[2] if len(ejecucion) > 2 else None
+        clave = clave_escenario(config_evaluacion)
+        if clave not in escenarios:
+            escenarios[clave] = precalcular_escenario(config_evaluacion, ingredientes_data)
+        resultados = {k: resultados[k] for k in CLAVES_RESULTADOS_REPORTE if k in resultados}
+        tareas.append((nombre, resultados, config_evaluacion, restricciones_usuario, clave))
+
+    print(f"📊 Generando {len(tareas)} reportes ({len(escenarios)} escenarios)...")
+
+    indice = None
+    if directorio is not None:
+        if not os.path.exists(directorio):
+            os.makedirs(directorio)
+        indice = open(os.path.join(directorio, REPORTES_CONFIG["archivo_indice"]), "a", encoding="utf-8")
+
+    generados = {}
+
+    def registrar(nombre, reporte, resumen):
+        generados[nombre] = reporte if directorio is None else resumen["archivos"]
+        if indice is not None:
+            resumen["tiempo"] = time.time()
+            indice.write(json.dumps(resumen, ensure_ascii=False, default=str) + "\n")
+            indice.flush()
+
+    try:
+        if procesos > 1 and len(tareas) >= max(2, REPORTES_CONFIG["min_ejecuciones_paralelo"]):
+            with ProcessPoolExecutor(max_workers=min(procesos, len(tareas)),
+                                     mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_inicializar_trabajador,
+                                     initargs=(ingredientes_data, escenarios)) as grupo:
+                futuros = {grupo.submit(_tarea_trabajador, *tarea, directorio, formatos): tarea[0]
+                           for tarea in tareas}
+                for futuro in as_completed(futuros):
+                    try:
+                        registrar(*futuro.result())
+                    except Exception as e:
+                        print(f"⚠️  Error generando reporte {futuros[futuro]}: {e}")
+        else:
+            for nombre, resultados, config_evaluacion, restricciones_usuario, clave in tareas:
+                try:
+                    registrar(*_generar_reporte_ejecucion(nombre, resultados, config_evaluacion,
+                                                          restricciones_usuario, ingredientes_data,
+                                                          escenarios[clave], directorio, formatos))
+                except Exception as e:
+                    print(f"⚠️  Error generando reporte {nombre}: {e}")
+    finally:
+        if indice is not None:
+            indice.close()
+
+    print(f"✅ {len(generados)} reportes generados en {time.perf_counter() - inicio:.2f} s")
+    # En el orden de las ejecuciones
+    return {nombre: generados[nombre] for nombre in ejecuciones if nombre in generados}
@@ -11,10 +11,51 @@ import seaborn as sns
 from matplotlib.patches import Rectangle
 import warnings
 
+from utils.renderizado import renderizar_figuras, construir_figuras
+
 # Configurar estilo por defecto
 plt.style.use('seaborn-v0_8')
 sns.set_palette("husl")
 
+def _tareas_graficas(resultados, ingredientes_data, config_evaluacion=None):
+    """
+    Describe las gráficas que corresponden a un resultado
+    
+    Args:
+        resultados: Resultado del algoritmo genético
+        ingredientes_data: Lista de datos de ingredientes
+        config_evaluacion: Configuración de evaluación (opcional)
+        
+    Returns:
+        Diccionario nombre -> (función, argumentos), en orden de generación
+    """
+    tareas = {}
+    
+    # 1. Gráfica de evolución del fitness
+    if "historico_fitness" in resultados:
+        tareas["evolucion_fitness"] = (grafica_evolucion_fitness, (resultados["historico_fitness"],))
+    
+    # 2. Comparativa de mejores soluciones
+    if "mejores_individuos" in resultados:
+        tareas["comparativa_soluciones"] = (grafica_comparativa_soluciones,
+                                            (resultados["mejores_individuos"], ingredientes_data))
+    
+    # 3. Análisis nutricional del mejor individuo
+    if "mejor_individuo" in resultados and resultados["mejor_individuo"]:
+        tareas["perfil_nutricional"] = (grafica_perfil_nutricional,
+                                        (resultados["mejor_individuo"], config_evaluacion, ingredientes_data))
+    
+    # 4. Distribución de costos por ingrediente
+    if "mejores_individuos" in resultados and resultados["mejores_individuos"]:
+        tareas["distribucion_costos"] = (grafica_distribucion_costos,
+                                         (resultados["mejores_individuos"][0], ingredientes_data))
+    
+    # 5. Métricas del algoritmo
+    if "historico_metricas" in resultados:
+        tareas["metricas_algoritmo"] = (grafica_metricas_algoritmo, (resultados["historico_metricas"],))
+    
+    return tareas
+
 def generar_graficas(resultados, ingredientes_data, config_evaluacion=None, guardar_archivos=False):
     """
     Genera todas las gráficas del sistema
@@ -23,7 +64,8 @@ def generar_graficas(resultados, ingredientes_data, config_evaluacion=None, guar
         resultados: Resultado del algoritmo genético
         ingredientes_data: Lista de datos de ingredientes
         config_evaluacion: Configuración de evaluación (opcional)
-        guardar_archivos: Si guardar las gráficas como archivos
+        guardar_archivos: Si guardar también las gráficas como archivos (se
+            guardan las mismas figuras o se copian de la caché, ver utils.renderizado)
         
     Returns:
         Diccionario con las figuras generadas
@@ -31,41 +73,12 @@ def generar_graficas(resultados, ingredientes_data, config_evaluacion=None, guar
     figuras = {}
     
     try:
-        # 1. Gráfica de evolución del fitness
-        if "historico_fitness" in resultados:
-            fig_evolucion = grafica_evolucion_fitness(resultados["historico_fitness"])
-            figuras["evolucion_fitness"] = fig_evolucion
-            if guardar_archivos:
-                fig_evolucion.savefig("evolucion_fitness.png", dpi=300, bbox_inches='tight')
-        
-        # 2. Comparativa de mejores soluciones
-        if "mejores_individuos" in resultados:
-            fig_comparativa = grafica_comparativa_soluciones(resultados["mejores_individuos"], ingredientes_data)
-            figuras["comparativa_soluciones"] = fig_comparativa
-            if guardar_archivos:
-                fig_comparativa.savefig("comparativa_soluciones.png", dpi=300, bbox_inches='tight')
-        
-        # 3. Análisis nutricional del mejor individuo
-        if "mejor_individuo" in resultados and resultados["mejor_individuo"]:
-            fig_nutricional = grafica_perfil_nutricional(resultados["mejor_individuo"], 
-                                                       config_evaluacion, ingredientes_data)
-            figuras["perfil_nutricional"] = fig_nutricional
-            if guardar_archivos:
-                fig_nutricional.savefig("perfil_nutricional.png", dpi=300, bbox_inches='tight')
-        
-        # 4. Distribución de costos por ingrediente
-        if "mejores_individuos" in resultados and resultados["mejores_individuos"]:
-            fig_costos = grafica_distribucion_costos(resultados["mejores_individuos"][0], ingredientes_data)
-            figuras["distribucion_costos"] = fig_costos
-            if guardar_archivos:
-                fig_costos.savefig("distribucion_costos.png", dpi=300, bbox_inches='tight')
-        
-        # 5. Métricas del algoritmo
-        if "historico_metricas" in resultados:
-            fig_metricas = grafica_metricas_algoritmo(resultados["historico_metricas"])
-            figuras["metricas_algoritmo"] = fig_metricas
-            if guardar_archivos:
-                fig_metricas.savefig("metricas_algoritmo.png", dpi=300, bbox_inches='tight')
+        tareas = _tareas_graficas(resultados, ingredientes_data, config_evaluacion)
+        if guardar_archivos:
+            figuras.update(construir_figuras(tareas, directorio=".")[0])
+        else:
+            for nombre, (funcion, argumentos) in tareas.items():
+                figuras[nombre] = funcion(*argumentos)
         
         print(f"✅ Se generaron {len(figuras)} gráficas exitosamente")
         
@@ -395,17 +408,33 @@ def grafica_distribucion_costos(individuo, ingredientes_data):
     plt.tight_layout()
     return fig
 
+def _obtener_columnas_metricas(historico_metricas, nombres):
+    """
+    Obtiene las métricas como arreglos
+
+    Con un HistorialMetricas se usan sus columnas sin copiarlas; con una
+    lista de diccionarios se construyen los arreglos.
+
+    Returns:
+        Diccionario nombre -> arreglo (NaN donde falta la métrica)
+    """
+    if hasattr(historico_metricas, "columna"):
+        return {nombre: historico_metricas.columna(nombre) for nombre in nombres}
+    return {nombre: np.array([m.get(nombre, np.nan) for m in historico_metricas], dtype=float)
+            for nombre in nombres}
+
+
 def grafica_metricas_algoritmo(historico_metricas):
     """
     Genera gráfica de métricas del algoritmo a lo largo de las generaciones
     
     Args:
-        historico_metricas: Lista de métricas por generación
+        historico_metricas: HistorialMetricas o lista de métricas por generación
         
     Returns:
         Figura de matplotlib
     """
-    if not historico_metricas:
+    if not len(historico_metricas):
         fig, ax = plt.subplots(figsize=(10, 6))
         ax.text(0.5, 0.5, 'No hay métricas disponibles', 
                 ha='center', va='center', transform=ax.transAxes, fontsize=16)
@@ -413,11 +442,14 @@ def grafica_metricas_algoritmo(historico_metricas):
     
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(16, 12))
     
-    generaciones = [m["generacion"] for m in historico_metricas]
+    columnas = _obtener_columnas_metricas(historico_metricas, (
+        "generacion", "mejor_fitness", "fitness_promedio", "diversidad", "mejor_costo", "costo_promedio",
+        "num_mejores_encontrados"))
+    generaciones = columnas["generacion"]
     
     # Gráfica 1: Evolución del fitness (mejor vs promedio)
-    mejor_fitness = [m["mejor_fitness"] for m in historico_metricas]
-    fitness_promedio = [m["fitness_promedio"] for m in historico_metricas]
+    mejor_fitness = columnas["mejor_fitness"]
+    fitness_promedio = columnas["fitness_promedio"]
     
     ax1.plot(generaciones, mejor_fitness, 'b-', linewidth=2, label='Mejor Fitness')
     ax1.plot(generaciones, fitness_promedio, 'r--', linewidth=1, label='Fitness Promedio')
@@ -430,14 +462,22 @@ def grafica_metricas_algoritmo(historico_metricas):
     ax1.grid(True, alpha=0.3)
     
     # Gráfica 2: Diversidad de la población
-    diversidad = [m.get("diversidad", 0) for m in historico_metricas]
-    fases = [m.get("fase", "inicial") for m in historico_metricas]
+    diversidad = np.nan_to_num(columnas["diversidad"])
+    if hasattr(historico_metricas, "fases"):
+        fases = np.array(historico_metricas.fases(), dtype=object)
+    else:
+        fases = np.array([m.get("fase", "inicial") for m in historico_metricas], dtype=object)
     
-    # Colorear según fase
+    # Colorear según fase: una línea por fase; cada tramo toma el color de la
+    # fase de su generación inicial
     colores_fase = {'inicial': 'green', 'intermedia': 'orange', 'final': 'red'}
-    for i in range(len(generaciones)-1):
-        color = colores_fase.get(fases[i], 'blue')
-        ax2.plot(generaciones[i:i+2], diversidad[i:i+2], color=color, linewidth=2)
+    for fase, color in colores_fase.items():
+        en_fase = fases == fase
+        if not en_fase.any():
+            continue
+        visibles = en_fase.copy()
+        visibles[1:] |= en_fase[:-1]
+        ax2.plot(generaciones, np.where(visibles, diversidad, np.nan), color=color, linewidth=2)
     
     ax2.set_xlabel('Generación')
     ax2.set_ylabel('Diversidad')
@@ -451,12 +491,12 @@ def grafica_metricas_algoritmo(historico_metricas):
     ax2.grid(True, alpha=0.3)
     
     # Gráfica 3: Evolución del costo
-    if "mejor_costo" in historico_metricas[0]:
-        mejor_costo = [m["mejor_costo"] for m in historico_metricas]
-        costo_promedio = [m.get("costo_promedio", 0) for m in historico_metricas]
+    if not np.isnan(columnas["mejor_costo"]).all():
+        mejor_costo = columnas["mejor_costo"]
+        costo_promedio = np.nan_to_num(columnas["costo_promedio"])
         
         ax3.plot(generaciones, mejor_costo, 'g-', linewidth=2, label='Mejor Costo')
-        if any(c > 0 for c in costo_promedio):
+        if (costo_promedio > 0).any():
             ax3.plot(generaciones, costo_promedio, 'g--', linewidth=1, label='Costo Promedio')
         
         ax3.set_xlabel('Generación')
@@ -469,7 +509,7 @@ def grafica_metricas_algoritmo(historico_metricas):
                 ha='center', va='center', transform=ax3.transAxes)
     
     # Gráfica 4: Número de mejores individuos encontrados
-    num_mejores = [m.get("num_mejores_encontrados", 0) for m in historico_metricas]
+    num_mejores = np.nan_to_num(columnas["num_mejores_encontrados"])
     
     ax4.step(generaciones, num_mejores, 'purple', linewidth=2, where='post')
     ax4.fill_between(generaciones, num_mejores, step='post', alpha=0.3, color='purple')
@@ -482,6 +522,122 @@ def grafica_metricas_algoritmo(historico_metricas):
     plt.tight_layout()
     return fig
 
+def _preparar_figura(fig, figsize):
+    """Crea una figura con un solo eje, o limpia y reutiliza la dada"""
+    if fig is None:
+        return plt.subplots(figsize=figsize)
+    fig.clear()
+    return fig, fig.add_subplot(111)
+
+def grafica_composicion_formulacion(formulacion, ingredientes_data, fig=None):
+    """
+    Genera gráfica compacta de composición de una formulación de la interfaz
+    
+    Args:
+        formulacion: Formulación (diccionario con 'porcentajes')
+        ingredientes_data: Lista de datos de ingredientes
+        fig: Figura a reutilizar (se limpia y se vuelve a dibujar); None crea una nueva
+        
+    Returns:
+        Figura de matplotlib
+    """
+    ingredientes_nombres = []
+    porcentajes_valores = []
+    colores = []
+    
+    for i, porcentaje in enumerate(formulacion['porcentajes']):
+        if porcentaje > 0.005 and i < len(ingredientes_data):
+            nombre = ingredientes_data[i].get('nombre', f'Ingrediente {i+1}')
+            # Acortar nombres largos
+            if len(nombre) > 20:
+                nombre = nombre[:17] + "..."
+            ingredientes_nombres.append(nombre)
+            porcentajes_valores.append(porcentaje * 100)
+            
+            # Colores por tipo
+            if 'maíz' in nombre.lower():
+                colores.append('#FFD700')
+            elif 'soya' in nombre.lower():
+                colores.append('#8FBC8F')
+            elif 'ddg' in nombre.lower():
+                colores.append('#DEB887')
+            else:
+                colores.append('#87CEEB')
+    
+    fig, ax = _preparar_figura(fig, (5, 3))
+    bars = ax.barh(ingredientes_nombres, porcentajes_valores, color=colores)
+    ax.set_xlabel('Porcentaje (%)', fontsize=8)
+    ax.set_title('Composición de la Formulación', fontsize=10)
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='both', which='major', labelsize=7)
+    
+    # Añadir valores
+    for bar, valor in zip(bars, porcentajes_valores):
+        width = bar.get_width()
+        ax.text(width + 0.1, bar.get_y() + bar.get_height()/2, 
+               f'{valor:.1f}%', ha='left', va='center', fontsize=7)
+    
+    fig.tight_layout()
+    return fig
+
+def grafica_nutricion_formulacion(formulacion, ingredientes_data, fig=None):
+    """
+    Genera gráfica compacta del perfil nutricional de una formulación de la interfaz
+    
+    Args:
+        formulacion: Formulación (diccionario con 'porcentajes', 'proteina_total' y 'energia_total')
+        ingredientes_data: Lista de datos de ingredientes
+        fig: Figura a reutilizar (se limpia y se vuelve a dibujar); None crea una nueva
+        
+    Returns:
+        Figura de matplotlib
+    """
+    # Aminoácidos y calcio aportados por los ingredientes de la formulación
+    aportes = {"lisina": 0, "metionina": 0, "calcio": 0}
+    for i, porcentaje in enumerate(formulacion['porcentajes']):
+        if porcentaje > 0 and i < len(ingredientes_data):
+            nutrientes_ingrediente = ingredientes_data[i].get('nutrientes', {})
+            for nutriente in aportes:
+                aportes[nutriente] += porcentaje * nutrientes_ingrediente.get(nutriente, 0)
+    
+    nutrientes = ['Proteína\n(%)', 'Energía\n(kcal/kg)', 'Lisina\n(%)', 'Metionina\n(%)', 'Calcio\n(%)']
+    valores_actuales = [
+        formulacion['proteina_total'],
+        formulacion['energia_total'] / 100,  # Escalar para visualización
+        aportes["lisina"] * 100,  # Convertir a porcentaje
+        aportes["metionina"] * 100,
+        aportes["calcio"] * 100
+    ]
+    
+    requerimientos = [20.0, 30.0, 1.1, 0.45, 0.85]  # Energía escalada también
+    
+    fig, ax = _preparar_figura(fig, (5, 3))
+    
+    x = np.arange(len(nutrientes))
+    width = 0.35
+    
+    bars1 = ax.bar(x - width/2, valores_actuales, width, label='Formulación', color='#4CAF50', alpha=0.8)
+    bars2 = ax.bar(x + width/2, requerimientos, width, label='Requerimiento', color='#FF9800', alpha=0.8)
+    
+    ax.set_xlabel('Nutrientes', fontsize=8)
+    ax.set_ylabel('Valores', fontsize=8)
+    ax.set_title('Comparación Nutricional', fontsize=10)
+    ax.set_xticks(x)
+    ax.set_xticklabels(nutrientes, fontsize=7)
+    ax.legend(fontsize=7, loc='upper right')
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='both', which='major', labelsize=7)
+    
+    # Añadir valores
+    for bars in [bars1, bars2]:
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                   f'{height:.1f}', ha='center', va='bottom', fontsize=6)
+    
+    fig.tight_layout()
+    return fig
+
 def configurar_estilo_graficas(estilo="seaborn"):
     """
     Configura el estilo global de las gráficas
@@ -511,29 +667,27 @@ def exportar_todas_graficas(resultados, ingredientes_data, config_evaluacion=Non
     """
     Exporta todas las gráficas a archivos
     
+    Las gráficas se dibujan en paralelo y se guardan en caché por el hash de
+    sus datos: exportar de nuevo el mismo resultado solo copia los archivos.
+    
     Args:
         resultados: Resultado del algoritmo genético
         ingredientes_data: Lista de datos de ingredientes
         config_evaluacion: Configuración de evaluación
         directorio: Directorio donde guardar las gráficas
         formato: Formato de archivo (png, pdf, svg)
-    """
-    import os
-    
-    # Crear directorio si no existe
-    if not os.path.exists(directorio):
-        os.makedirs(directorio)
     
-    # Generar y guardar gráficas
-    figuras = generar_graficas(resultados, ingredientes_data, config_evaluacion, False)
+    Returns:
+        Diccionario nombre -> ruta de cada gráfica exportada
+    """
+    tareas = _tareas_graficas(resultados, ingredientes_data, config_evaluacion)
+    archivos = renderizar_figuras(tareas, directorio=directorio, formato=formato)
     
-    for nombre, figura in figuras.items():
-        if nombre != "error":
-            archivo = os.path.join(directorio, f"{nombre}.{formato}")
-            figura.savefig(archivo, dpi=300, bbox_inches='tight')
-            print(f"Gráfica guardada: {archivo}")
+    for archivo in archivos.values():
+        print(f"Gráfica guardada: {archivo}")
     
     print(f"✅ Todas las gráficas exportadas a: {directorio}")
+    return archivos
 
 # Configurar estilo por defecto al importar
 configurar_estilo_graficas()
\ No newline at end of file